@@ -1,7 +1,10 @@
+from utils.startup_timer import StartupTimer
+boot_timer = StartupTimer()
+
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
-from config.config import init_db, db, init_jwt, init_cors
+from config.config import init_db, init_jwt, init_cors
 from config.config_mp import init_mp
 from routes import init_app
 from utils.bot import enviar_alerta
@@ -10,9 +13,10 @@ from utils.logging_config import setup_logging
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+boot_timer.mark('imports')
+
 app = Flask(__name__)
 # Solucionar IP reales a traves del proxy de produccion
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
@@ -30,18 +34,24 @@ limiter = Limiter(
 load_dotenv(override=True)
 
 
-init_mp()
-setup_logging(app)
-init_db(app)
-init_jwt(app)
-init_cors(app) # En caso de entrar en modo desarrollador comentar y volver al comando basico de cors
-init_mail(app) # Inicializo la configuración de mail
+with boot_timer.phase('config'):
+    init_mp()
+    setup_logging(app)
+    init_db(app)
+    init_jwt(app)
+    init_cors(app) # En caso de entrar en modo desarrollador comentar y volver al comando basico de cors
+    init_mail(app) # Inicializo la configuración de mail
 
 import os
 from flask import request, abort, send_from_directory
 from models.ip_manager import IPRegistry
 from datetime import datetime, timedelta
 from utils.ip_manager_cache import ip_manager_cache
+from utils.login_bookkeeping import login_bookkeeper
+from utils.request_metrics import request_metrics
+from utils.query_stats import query_stats
+from utils.request_profiler import request_profiler
+from utils.worker_health import worker_health
 
 @app.route('/uploads/<path:filename>')
 @app.route('/api/uploads/<path:filename>')
@@ -79,202 +89,27 @@ def track_ip_stats(response):
     
     return response
 
-# Crea las tablas en la base de datos
-with app.app_context():
-    import models
-    db.create_all()
-
-    # DB Schema Migration: Add room_type column to rooms table if it doesn't exist
-    try:
-        result = db.session.execute(db.text("SHOW COLUMNS FROM rooms LIKE 'room_type'")).fetchone()
-        if not result:
-            db.session.execute(db.text("ALTER TABLE rooms ADD COLUMN room_type VARCHAR(50) NOT NULL DEFAULT 'coworking'"))
-            db.session.execute(db.text("UPDATE rooms SET room_type = 'meeting' WHERE name LIKE '%Reuniones%' OR name LIKE '%SUM%'"))
-            db.session.commit()
-            app.logger.info("Database migration: Added room_type column to rooms and updated meeting rooms.")
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error executing room_type migration: {e}")
-
-    from models.profile import ProfileModel
-    from models.access import AccessModel
-    from models.room import RoomModel
-    import uuid
-    import json
-
-    # 1. Seed default accesses (permissions)
-    default_accesses = {
-        'view_news': 'Ver sección de noticias',
-        'manage_news': 'Publicar, editar y eliminar noticias',
-        'view_trainings': 'Ver sección de capacitaciones',
-        'manage_trainings': 'Crear, editar y eliminar capacitaciones',
-        'view_tags': 'Ver categorías de noticias/capacitaciones',
-        'manage_tags': 'Crear, editar y eliminar categorías',
-        'view_edicts': 'Ver sección de edictos',
-        'manage_edicts': 'Crear, editar y eliminar edictos',
-        'view_professionals': 'Ver directorio de profesionales',
-        'manage_professionals': 'Crear, editar y eliminar profesionales',
-        'view_rates': 'Ver sección de tasas',
-        'manage_rates': 'Crear, editar y eliminar tasas',
-        'view_receipts': 'Ver historial de recibos',
-        'manage_receipts': 'Descargar y gestionar recibos',
-        'view_revenue': 'Ver dashboard de ingresos',
-        'manage_revenue': 'Gestionar datos del dashboard de ingresos',
-        'view_lawyer_payments': 'Ver historial de pagos de membresías',
-        'manage_lawyer_payments': 'Registrar pagos de membresías',
-        'view_collection_admin': 'Ver administrador de cobros de membresías',
-        'manage_collection_admin': 'Modificar valores y ver reportes de deudores',
-        'view_integrantes': 'Ver sección nosotros/integrantes',
-        'manage_integrantes': 'Crear, editar y eliminar integrantes',
-        'book_rooms': 'Reservar salas de coworking',
-        'view_rooms': 'Ver gestión de salas coworking',
-        'manage_rooms': 'Crear, editar y eliminar salas de coworking',
-        'book_meeting_rooms': 'Reservar salas de reuniones',
-        'view_meeting_rooms': 'Ver gestión de salas de reuniones',
-        'manage_meeting_rooms': 'Crear, editar y eliminar salas de reuniones',
-        'view_membership_sync': 'Ver historial de sincronización de cuotas',
-        'manage_membership_sync': 'Sincronizar cuotas desde Excel/Sheets',
-    }
-
-    db_accesses = {}
-    try:
-        db_accesses = {a.name: a for a in AccessModel.query.all()}
-        for name, desc in default_accesses.items():
-            if name not in db_accesses:
-                new_acc = AccessModel(
-                    uuid=str(uuid.uuid4()),
-                    name=name,
-                    description=desc
-                )
-                db.session.add(new_acc)
-                db_accesses[name] = new_acc
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error seeding accesses: {e}")
+# Crea las tablas y carga los datos iniciales solo si el seed manifest cambió
+# (ver services/bootstrap_service.py y `flask --app app bootstrap`)
+from services.bootstrap_service import bootstrap_if_needed, register_commands
 
-    # 2. Seed profiles and map permissions
-    try:
-        # Seed lawyer profile if missing
-        lawyer_profile = ProfileModel.query.filter_by(name='lawyer').first()
-        if not lawyer_profile:
-            lawyer_profile = ProfileModel(
-                uuid=str(uuid.uuid4()),
-                name='lawyer',
-                description='Rol para Abogados Colegiados'
-            )
-            db.session.add(lawyer_profile)
-            db.session.commit()
-            
-        # Give lawyer default accesses
-        default_lawyer_accesses = [
-            'view_news',
-            'view_trainings',
-            'view_tags',
-            'view_professionals',
-            'view_rates',
-            'view_receipts',
-            'view_integrantes',
-            'view_lawyer_payments',
-            'manage_lawyer_payments',
-            'book_rooms',
-            'book_meeting_rooms'
-        ]
-        for name in default_lawyer_accesses:
-            acc = db_accesses.get(name)
-            if acc and acc not in lawyer_profile.accesses:
-                lawyer_profile.accesses.append(acc)
-
-        # Give Administrators all permissions by default
-        admin_profiles = ProfileModel.query.filter(ProfileModel.name.in_(['Admin', 'Administrador'])).all()
-        for ap in admin_profiles:
-            for acc in db_accesses.values():
-                if acc not in ap.accesses:
-                    ap.accesses.append(acc)
-
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error seeding lawyer profile accesses: {e}")
-
-    # 3. Seed initial rooms
-    try:
-        if RoomModel.query.filter(RoomModel.deleted_at.is_(None)).count() == 0:
-            initial_rooms = [
-                RoomModel(
-                    name='Sala de Reuniones Ejecutiva',
-                    capacity=10,
-                    price=1500.0,
-                    image='/meeting_room_exec.png',
-                    description='Ideal para reuniones de directorio, negociaciones, conciliaciones o presentaciones corporativas. Ambiente climatizado y privado.',
-                    amenities=json.dumps([
-                        'Mesa de directorio para 10 pers.',
-                        'Pantalla Smart TV 55"',
-                        'Wi-Fi Simétrico de Alta Velocidad',
-                        'Cámara para Videoconferencias'
-                    ], ensure_ascii=False),
-                    is_active=True,
-                    room_type='meeting'
-                ),
-                RoomModel(
-                    name='SUM / Auditorio Multiuso',
-                    capacity=30,
-                    price=3000.0,
-                    image='/auditorium_sum.png',
-                    description='Perfecto para capacitaciones, charlas informativas, asambleas o talleres grupales. Mobiliario modular configurable.',
-                    amenities=json.dumps([
-                        'Capacidad de hasta 30 personas',
-                        'Proyector HD & Pantalla Gigante',
-                        'Sistema de Audio & Micrófonos',
-                        'Wi-Fi de Alta Velocidad'
-                    ], ensure_ascii=False),
-                    is_active=True,
-                    room_type='meeting'
-                ),
-                RoomModel(
-                    name='Box de Enfoque Individual',
-                    capacity=1,
-                    price=500.0,
-                    image='/individual_box.png',
-                    description='Espacio optimizado para el trabajo individual concentrado, videollamadas privadas o estudio. Aislado acústicamente.',
-                    amenities=json.dumps([
-                        'Escritorio Individual Amplio',
-                        'Wi-Fi de Alta Velocidad',
-                        'Ergonomía & Tomas de Carga Directa',
-                        'Panel de Absorción Acústica'
-                    ], ensure_ascii=False),
-                    is_active=True,
-                    room_type='coworking'
-                )
-            ]
-            for room in initial_rooms:
-                db.session.add(room)
-            db.session.commit()
-            app.logger.info("Seeded initial rooms.")
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error seeding initial rooms: {e}")
-
-    # 4. Seed default system configurations
-    try:
-        from models.config import SystemConfigModel
-        default_configs = {
-            'disable_membership_validation': 'false'
-        }
-        for k, v in default_configs.items():
-            conf = SystemConfigModel.query.filter_by(key=k).first()
-            if not conf:
-                new_conf = SystemConfigModel(key=k, value=v)
-                db.session.add(new_conf)
-        db.session.commit()
-        app.logger.info("Seeded initial configurations.")
-    except Exception as e:
-        db.session.rollback()
-        app.logger.error(f"Error seeding configurations: {e}")
+register_commands(app)
+with boot_timer.phase('bootstrap'):
+    with app.app_context():
+        import models
+        bootstrap_if_needed(app, boot_timer)
 
 # Inicializar y registrar todos los blueprints
-init_app(app)
-ip_manager_cache.init_app(app)
+with boot_timer.phase('blueprints'):
+    init_app(app)
+with boot_timer.phase('ip_cache'):
+    ip_manager_cache.init_app(app)
+login_bookkeeper.init_app(app)
+request_metrics.init_app(app)
+query_stats.init_app(app)
+request_profiler.init_app(app)
+worker_health.init_app(app)
+boot_timer.finish(app)
 
 if __name__ == '__main__':
     # enviar_alerta("🤖 Monitoreando colejus")
@@ -4,10 +4,32 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate
 
-db = SQLAlchemy()
+from utils.db_routing import REPLICA_BIND, RoutingSession, replica_router
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 migrate = Migrate()
 
+def engine_options_from_env():
+    """Opciones del pool de conexiones (por worker) tomadas de las variables de entorno.
+
+    DB_POOL_RECYCLE debe quedar por debajo del wait_timeout de MySQL: una conexión más vieja se
+    descarta antes de usarla en lugar de fallar en la primera consulta. DB_POOL_PRE_PING hace un
+    ping al tomar cada conexión y reconecta si el servidor la cerró. DB_POOL_TIMEOUT va en
+    segundos enteros: Flask-SQLAlchemy arma el engine con engine_from_config, que lo convierte
+    con int() (0.5 quedaría en 0 y el pool fallaría sin esperar).
+    """
+    from utils.pool_metrics import InstrumentedQueuePool
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    }
+
 def init_db(app):
     print("=== INICIANDO BASE DE DATOS ===")
     username = os.environ.get('MYSQL_USER')
@@ -15,9 +37,15 @@ def init_db(app):
     host = os.environ.get('MYSQL_HOST')
     database = os.environ.get('MYSQL_DATABASE')
     app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql+pymysql://{username}:{password}@{host}/{database}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env()
+    replica_uri = os.environ.get('DB_REPLICA_URI')
+    if replica_uri:
+        # Réplica de solo lectura para las vistas con @read_replica (ver utils/db_routing.py)
+        app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: {'url': replica_uri, **engine_options_from_env()}}
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['DEBUG'] = True
     db.init_app(app)
+    replica_router.init_app(app, db)
     migrate.init_app(app, db)
 
 def init_jwt(app):
@@ -1,14 +1,17 @@
-import mercadopago
 import os
+import threading
 import dotenv
 
 dotenv.load_dotenv()
 
 # Global variable to store the initialized SDK
 sdk = None
+# El token se valida al arrancar; el SDK (y el import de mercadopago) se crea en el primer pago
+_access_token = None
+_sdk_lock = threading.Lock()
 
 def init_mp():
-    global sdk
+    global _access_token
     # Get the access token from environment variables
     access_token = os.getenv("MERCADO_PAGO_ACCESS_TOKEN")
     print("=== INICIANDO MERCADO PAGO ===")
@@ -28,10 +31,16 @@ def init_mp():
     if not access_token:
         raise ValueError("Mercado Pago access token is missing. Set MERCADO_PAGO_ACCESS_TOKEN in your environment.")
 
-    # Initialize the Mercado Pago SDK
-    sdk = mercadopago.SDK(access_token)
+    _access_token = access_token
 
 def get_mp_sdk():
+    global sdk
     if sdk is None:
-        raise ValueError("Mercado Pago SDK has not been initialized. Call init_mp() first.")
+        if _access_token is None:
+            raise ValueError("Mercado Pago SDK has not been initialized. Call init_mp() first.")
+        with _sdk_lock:
+            if sdk is None:
+                # Initialize the Mercado Pago SDK
+                import mercadopago
+                sdk = mercadopago.SDK(_access_token)
     return sdk
\ No newline at end of file
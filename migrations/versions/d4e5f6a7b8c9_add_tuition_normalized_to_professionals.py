@@ -0,0 +1,55 @@
+"""add indexed tuition_normalized to professionals
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    columns = [c['name'] for c in insp.get_columns('professionals')]
+    with op.batch_alter_table('professionals', schema=None) as batch_op:
+        if 'tuition_normalized' not in columns:
+            batch_op.add_column(sa.Column('tuition_normalized', sa.String(length=10), nullable=True))
+
+    # Backfill: la matrícula sin espacios ni puntos (misma regla que models.professional.tuition_key)
+    op.execute(
+        "UPDATE professionals "
+        "SET tuition_normalized = NULLIF(REPLACE(REPLACE(tuition, ' ', ''), '.', ''), '') "
+        "WHERE tuition IS NOT NULL"
+    )
+
+    existing_indexes = {idx['name'] for idx in insp.get_indexes('professionals')}
+    if 'ix_professionals_tuition_normalized' not in existing_indexes:
+        op.create_index(
+            'ix_professionals_tuition_normalized',
+            'professionals',
+            ['tuition_normalized'],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    existing_indexes = {idx['name'] for idx in insp.get_indexes('professionals')}
+    if 'ix_professionals_tuition_normalized' in existing_indexes:
+        op.drop_index('ix_professionals_tuition_normalized', table_name='professionals')
+
+    columns = [c['name'] for c in insp.get_columns('professionals')]
+    with op.batch_alter_table('professionals', schema=None) as batch_op:
+        if 'tuition_normalized' in columns:
+            batch_op.drop_column('tuition_normalized')
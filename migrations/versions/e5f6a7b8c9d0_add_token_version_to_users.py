@@ -0,0 +1,37 @@
+"""add token_version to users
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    columns = [c['name'] for c in insp.get_columns('users')]
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        if 'token_version' not in columns:
+            batch_op.add_column(
+                sa.Column('token_version', sa.Integer(), nullable=False, server_default='0')
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+
+    columns = [c['name'] for c in insp.get_columns('users')]
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        if 'token_version' in columns:
+            batch_op.drop_column('token_version')
@@ -5,7 +5,7 @@ class BlockedRegion(db.Model):
     __tablename__ = 'blocked_regions'
     
     id = db.Column(db.Integer, primary_key=True)
-    region_type = db.Column(db.String(50), nullable=False) # 'country' or 'continent'
+    region_type = db.Column(db.String(50), nullable=False) # 'country', 'continent', 'cidr', 'asn' or 'provider'
     region_name = db.Column(db.String(100), nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
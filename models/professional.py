@@ -1,7 +1,17 @@
 import uuid
 from datetime import datetime
+from sqlalchemy.orm import validates
 from config.config import db
 
+
+def tuition_key(tuition):
+    """Matrícula sin espacios ni puntos: la forma indexada en tuition_normalized."""
+    if tuition is None:
+        return None
+    key = str(tuition).replace(' ', '').replace('.', '')
+    return key or None
+
+
 class ProfessionalModel(db.Model):
     __tablename__ = 'professionals'
     
@@ -11,6 +21,8 @@ class ProfessionalModel(db.Model):
     email = db.Column(db.String(128), nullable=False)
     address = db.Column(db.String(128), nullable=True)
     tuition = db.Column(db.String(10))
+    # Se mantiene desde `tuition` (ver set_tuition); login y sincronización de cuotas buscan por acá
+    tuition_normalized = db.Column(db.String(10), nullable=True, index=True)
     procurador_professions= db.Column(db.String(100), nullable=True)
     phone = db.Column(db.String(36), nullable=True)
     location = db.Column(db.String(36), nullable=False)
@@ -22,6 +34,11 @@ class ProfessionalModel(db.Model):
     def __repr__(self):
         return f"<Professional {self.name}>"
 
+    @validates('tuition')
+    def set_tuition(self, key, value):
+        self.tuition_normalized = tuition_key(value)
+        return value
+
     @staticmethod
     def from_json(json_data):
         return ProfessionalModel(
@@ -16,6 +16,8 @@ class UserModel(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = db.Column(db.DateTime, nullable=True)
     must_change_password = db.Column(db.Boolean, nullable=False, default=False)
+    # Va en el claim 'tv' del JWT; incrementarlo revoca todos los tokens emitidos antes
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     profiles = db.relationship('ProfileModel', secondary='profiles_users', lazy='subquery', backref=backref('users', lazy=True))
     
     def __repr__(self):
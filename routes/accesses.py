@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models import AccessModel
 from utils.decorators import token_required, access_required
+from utils.principal_cache import invalidate_all
 from flask_jwt_extended import jwt_required
 
 access_bp = Blueprint('access_bp', __name__)
@@ -48,6 +49,8 @@ def update_access(uuid):
         access.name = data.get('name', access.name).lower()
         access.description = data.get('description', access.description)
         db.session.commit()
+        # access_required compara por nombre: cambia el permiso de todos los que lo tienen
+        invalidate_all()
         return jsonify({'message': 'Access updated successfully'}), 200
     return jsonify({'message': 'Access not found'}), 404
 
@@ -60,5 +63,6 @@ def delete_access(uuid):
     if access:
         access.deleted_at = datetime.utcnow()
         db.session.commit()
+        invalidate_all()
         return jsonify({'message': 'Access deleted successfully'}), 200
     return jsonify({'message': 'Access not found'}), 404
\ No newline at end of file
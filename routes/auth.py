@@ -1,10 +1,11 @@
-from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from models import UserModel, ProfileModel, ProfessionalModel
+from models import UserModel, ProfileModel
 from config.config import db
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash
 from utils.decorators import token_required
+from utils.tuition_utils import find_professional_by_tuition
+from services import auth_service
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -39,7 +40,7 @@ def create_user():
         # Check and associate professional if tuition/matricula is provided
         tuition = data.get('tuition') or data.get('matricula')
         if tuition:
-            professional = ProfessionalModel.query.filter_by(tuition=str(tuition), deleted_at=None).first()
+            professional = find_professional_by_tuition(str(tuition))
             if professional:
                 if professional.uuid_user and professional.uuid_user != user.uuid:
                     return {'error': 'Este perfil profesional ya está vinculado a otro usuario.'}, 400
@@ -63,35 +64,8 @@ def login():
         return {'error': 'tuition_or_email and password are required'}, 400
 
     try:
-        # First try to find user by email directly (handles emails and special usernames like admin, dev, etc.)
-        user = UserModel.query.filter_by(email=email_or_tuition, deleted_at=None).first()
-        
-        if not user:
-            # Check if it matches a professional's tuition/enrollment number (stripping dots and spaces)
-            clean_input = str(email_or_tuition).replace('.', '').replace(' ', '')
-            from sqlalchemy import func
-            professional = ProfessionalModel.query.filter(
-                func.replace(func.replace(ProfessionalModel.tuition, ' ', ''), '.', '') == clean_input,
-                ProfessionalModel.deleted_at == None
-            ).first()
-            if professional and professional.uuid_user:
-                user = UserModel.query.filter_by(uuid=professional.uuid_user, deleted_at=None).first()
-
-        if user is None or not user.check_password(password):
-            return {'error': 'Invalid email, tuition or password'}, 401
-            
-        expires = timedelta(days=1)
-        additional_claims = {"timestamp": datetime.utcnow().timestamp()}
-        access_token = create_access_token(identity=user.email, expires_delta=expires, additional_claims=additional_claims)
-            
-        token_expiration_date = datetime.utcnow() + expires
-        user.token_expiration_date = token_expiration_date
-        user.auth_token = access_token
-
-        db.session.add(user)
-        db.session.commit()
-            
-        return user.to_json_login(), 200
+        # La escritura del token en users es diferida (ver utils/login_bookkeeping.py)
+        return auth_service.login(email_or_tuition, password)
     except Exception as e:
         print(f"Exception: {e}")
         return {'error': str(e)}, 500
@@ -121,4 +95,19 @@ def change_password():
     except Exception as e:
         print(e)
         db.session.rollback()
-        return {'error': str(e)}, 500
\ No newline at end of file
+        return {'error': str(e)}, 500
+
+@auth_bp.route('/logout_all', methods=['POST'])
+@jwt_required()
+@token_required
+def logout_all():
+    # Revoca todos los tokens del usuario (incluido el de esta petición)
+    try:
+        user = UserModel.query.filter_by(uuid=request.user.uuid).first()
+        if not user:
+            return {'error': 'User not found'}, 404
+        auth_service.revoke_tokens(user)
+        return {'message': 'All sessions revoked.'}, 200
+    except Exception as e:
+        db.session.rollback()
+        return {'error': str(e)}, 500
@@ -6,6 +6,8 @@ from models.room import RoomModel
 from models import UserModel, ProfileModel
 from sqlalchemy.exc import IntegrityError
 from utils.decorators import token_required, access_required
+from utils.db_routing import read_replica
+from utils.permissions import can_access_room, has_admin_role, room_access_required
 
 booking_bp = Blueprint('booking', __name__)
 
@@ -30,20 +32,7 @@ def get_occupied_slots():
         if not room:
             return jsonify({'error': 'Room not found.'}), 404
 
-        # Dynamic permission check based on room type
-        required_permission = 'book_rooms' if room.room_type == 'coworking' else 'book_meeting_rooms'
-        has_access = False
-        for profile in request.user.profiles:
-            if profile.name.lower() == 'dev':
-                has_access = True
-                break
-            for access in profile.accesses:
-                if access.name == required_permission:
-                    has_access = True
-                    break
-            if has_access:
-                break
-        if not has_access:
+        if not can_access_room(request.principal, 'book', room.room_type):
             return jsonify({'message': 'Access denied'}), 403
 
         try:
@@ -142,20 +131,7 @@ def create_booking():
     if not room:
         return jsonify({'error': 'Room not found.'}), 404
 
-    # Dynamic permission check based on room type
-    required_permission = 'book_rooms' if room.room_type == 'coworking' else 'book_meeting_rooms'
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name == required_permission:
-                has_access = True
-                break
-        if has_access:
-            break
-    if not has_access:
+    if not can_access_room(request.principal, 'book', room.room_type):
         return jsonify({'message': 'Access denied'}), 403
     date_str = data['booking_date']
     time_slots = data['time_slots']
@@ -337,6 +313,7 @@ def create_booking():
 
 @booking_bp.route('/bookings/stats', methods=['GET'])
 @token_required
+@read_replica
 def get_booking_stats():
     room_id = request.args.get('room_id')
     start_date_str = request.args.get('start_date')
@@ -369,20 +346,7 @@ def get_booking_stats():
         if not room:
             return jsonify({'error': 'Room not found.'}), 404
 
-        # Dynamic permission check based on room type
-        required_permission = 'view_rooms' if room.room_type == 'coworking' else 'view_meeting_rooms'
-        has_access = False
-        for profile in request.user.profiles:
-            if profile.name.lower() == 'dev':
-                has_access = True
-                break
-            for access in profile.accesses:
-                if access.name == required_permission:
-                    has_access = True
-                    break
-            if has_access:
-                break
-        if not has_access:
+        if not can_access_room(request.principal, 'view', room.room_type):
             return jsonify({'message': 'Access denied'}), 403
 
         # 2. Parse Date Range
@@ -491,22 +455,8 @@ def get_booking_stats():
 
 @booking_bp.route('/bookings/lawyers', methods=['GET'])
 @token_required
+@room_access_required('book')
 def get_lawyers_list():
-    # Allow access if user can book coworking or meeting rooms
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name in ['book_rooms', 'book_meeting_rooms']:
-                has_access = True
-                break
-        if has_access:
-            break
-    if not has_access:
-        return jsonify({'message': 'Access denied'}), 403
-
     search_query = request.args.get('name', '').strip()
     try:
         # Join users with profiles and filter by name = 'lawyer'
@@ -531,22 +481,8 @@ def get_lawyers_list():
 
 @booking_bp.route('/bookings/my-bookings', methods=['GET'])
 @token_required
+@room_access_required('book')
 def get_my_bookings():
-    # Allow access if user can book coworking or meeting rooms
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name in ['book_rooms', 'book_meeting_rooms']:
-                has_access = True
-                break
-        if has_access:
-            break
-    if not has_access:
-        return jsonify({'message': 'Access denied'}), 403
-
     date_str = request.args.get('date')
     user_email = request.user.email
     
@@ -585,31 +521,13 @@ def get_my_bookings():
 
 @booking_bp.route('/bookings/<int:booking_id>', methods=['DELETE'])
 @token_required
+@room_access_required('book')
 def delete_booking(booking_id):
-    # Allow access if user can book coworking or meeting rooms
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name in ['book_rooms', 'book_meeting_rooms']:
-                has_access = True
-                break
-        if has_access:
-            break
-    if not has_access:
-        return jsonify({'message': 'Access denied'}), 403
-
     user_email = request.user.email
     user_uuid = request.user.uuid if hasattr(request.user, 'uuid') else None
     
     # Check if the user is an admin or dev
-    is_admin = False
-    for profile in request.user.profiles:
-        if profile.name.lower() in ['admin', 'administrador', 'dev']:
-            is_admin = True
-            break
+    is_admin = has_admin_role(request.principal)
             
     try:
         booking = BookingModel.query.get(booking_id)
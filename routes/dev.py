@@ -1,8 +1,17 @@
-from flask import Blueprint, Response, jsonify, request
+from flask import Blueprint, Response, jsonify, request, send_file
 import psutil
 import time
 from datetime import datetime
-from utils.logging_config import get_log_stream, get_recent_logs
+from utils.logging_config import get_recent_logs, get_log_pipeline_stats
+from utils.log_broadcaster import log_broadcaster
+from utils.log_store import recent_logs, parse_since, parse_level, iter_json_array
+from utils import log_viewer
+from utils.request_metrics import request_metrics
+from utils.query_stats import query_stats
+from utils.request_profiler import request_profiler, pstats_text, HEADER as PROFILE_HEADER
+from utils.worker_health import worker_health
+from utils.pool_metrics import pool_stats
+from utils.db_routing import REPLICA_BIND, replica_router
 from models.ip_manager import IPRegistry
 from models import UserModel, ProfileModel, ProfessionalModel
 from config.config import db
@@ -13,6 +22,10 @@ from models.access import AccessModel
 from sqlalchemy.orm import subqueryload
 from flask_jwt_extended import jwt_required
 from utils.decorators import token_required, access_required
+from utils.principal_cache import principal_cache, invalidate_identity, invalidate_all
+from utils.tuition_utils import find_professional_by_tuition
+from utils.login_bookkeeping import login_bookkeeper
+from services import auth_service
 
 dev_bp = Blueprint('dev', __name__)
 
@@ -21,14 +34,51 @@ dev_bp = Blueprint('dev', __name__)
 @token_required
 @access_required('manage_dev')
 def stream_logs():
-    return Response(get_log_stream(), mimetype='text/event-stream')
+    # EventSource manda Last-Event-ID al reconectarse; ?since= permite retomar a mano
+    since = request.args.get('since') or request.headers.get('Last-Event-ID')
+    subscription = log_broadcaster.subscribe(since=int(since) if since and since.isdigit() else None)
+    if subscription is None:
+        return jsonify({'error': 'Too many open log streams'}), 503
+    return Response(
+        log_broadcaster.sse_stream(subscription),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@dev_bp.route('/dev/logs/pipeline')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def log_pipeline_stats():
+    return jsonify(get_log_pipeline_stats())
+
+@dev_bp.route('/dev/logs/subscribers')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def log_stream_stats():
+    return jsonify(log_broadcaster.stats())
 
 @dev_bp.route('/dev/logs/recent')
 @jwt_required()
 @token_required
 @access_required('manage_dev')
 def get_recent_logs_api():
-    return jsonify(get_recent_logs())
+    try:
+        since = parse_since(request.args.get('since'))
+        min_level = parse_level(request.args.get('level'))
+        limit = request.args.get('limit', type=int)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Se transmite a medida que se descomprimen los segmentos, sin armar la lista completa
+    return Response(iter_json_array(get_recent_logs(since, min_level, limit)), mimetype='application/json')
+
+@dev_bp.route('/dev/logs/recent/stats')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def recent_logs_stats():
+    return jsonify(recent_logs.stats())
 
 @dev_bp.route('/dev/stats')
 @jwt_required()
@@ -42,7 +92,189 @@ def get_stats():
     }
     return jsonify(stats)
 
+@dev_bp.route('/dev/workers')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_workers():
+    # Una fila por worker de gunicorn, leída del segmento compartido (ver utils/worker_health.py)
+    report = worker_health.report()
+    report['host'] = {
+        'cpu_usage': psutil.cpu_percent(interval=None),
+        'memory_usage': psutil.virtual_memory().percent,
+    }
+    return jsonify(report)
+
+@dev_bp.route('/dev/metrics')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_metrics():
+    # ?format=prometheus (o un Accept que prefiera text/plain, como el de Prometheus) devuelve el formato de texto
+    best = request.accept_mimetypes.best_match(['application/json', 'text/plain;version=0.0.4', 'text/plain'])
+    wants_text = best is not None and best.startswith('text/plain')
+    if request.args.get('format') == 'prometheus' or wants_text:
+        return Response(request_metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    return jsonify(request_metrics.to_json())
+
+@dev_bp.route('/dev/sql')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_sql_stats():
+    # Sentencias con más tiempo acumulado en este worker y endpoints con posibles N+1
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify(query_stats.stats(limit=limit))
+
+@dev_bp.route('/dev/db/pool')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_pool_stats():
+    # Contadores del pool de conexiones de este worker (ver utils/pool_metrics.py)
+    return jsonify(pool_stats.snapshot(db.engine.pool))
+
+@dev_bp.route('/dev/db/replica')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_replica_stats():
+    # Lecturas enviadas a la réplica, failovers y estado de su pool en este worker (ver utils/db_routing.py)
+    data = replica_router.stats()
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is not None:
+        data['pool'] = pool_stats.snapshot(replica.pool).get('pool')
+    return jsonify(data)
+
+@dev_bp.route('/dev/profiling', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def list_request_profiles():
+    return jsonify(request_profiler.list_profiles())
+
+@dev_bp.route('/dev/profiling/token', methods=['POST'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def issue_profile_token():
+    # El token va en el header X-Profile de la request a perfilar; sirve para una sola request
+    data = request.get_json(silent=True) or {}
+    try:
+        token = request_profiler.issue_token(data.get('mode', 'cprofile'), issued_by=request.user.uuid)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'header': PROFILE_HEADER, 'token': token, 'expires_in': request_profiler.token_seconds})
+
+@dev_bp.route('/dev/profiling/sampling', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_profile_sampling():
+    return jsonify(request_profiler.get_rules())
+
+@dev_bp.route('/dev/profiling/sampling', methods=['POST'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def set_profile_sampling():
+    data = request.get_json(silent=True) or {}
+    endpoint = data.get('endpoint')
+    if endpoint not in current_app.view_functions:
+        return jsonify({'error': f'Unknown endpoint: {endpoint}'}), 400
+    try:
+        rule = request_profiler.set_rule(
+            endpoint,
+            every=int(data.get('every', 10)),
+            limit=int(data.get('limit', 10)),
+            mode=data.get('mode', 'cprofile'),
+            minutes=float(data.get('minutes', 60)),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'endpoint': endpoint, **rule})
+
+@dev_bp.route('/dev/profiling/sampling/<endpoint>', methods=['DELETE'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def delete_profile_sampling(endpoint):
+    if not request_profiler.delete_rule(endpoint):
+        return jsonify({'error': 'Sampling rule not found'}), 404
+    return jsonify({'message': f'Sampling for {endpoint} stopped'})
+
+@dev_bp.route('/dev/profiling/<name>', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def download_request_profile(name):
+    path = request_profiler.profile_path(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    # ?format=text resume un .prof con pstats (ordenado por ?sort=, cumulative por defecto)
+    if request.args.get('format') == 'text' and name.endswith('.prof'):
+        try:
+            text = pstats_text(path, sort=request.args.get('sort', 'cumulative'), limit=request.args.get('limit', 60, type=int))
+        except KeyError:
+            return jsonify({'error': 'Invalid sort key'}), 400
+        return Response(text, mimetype='text/plain')
+    return send_file(path, as_attachment=True, download_name=name)
+
+@dev_bp.route('/dev/profiling/<name>', methods=['DELETE'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def delete_request_profile(name):
+    if not request_profiler.delete_profile(name):
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify({'message': f'Profile {name} deleted'})
+
+@dev_bp.route('/dev/startup')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_startup_timings():
+    # Tiempo de arranque por fase del worker que atiende la petición
+    return jsonify(current_app.extensions.get('startup_timings', {}))
+
+@dev_bp.route('/dev/auth/cache')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_principal_cache_stats():
+    # Caché de principals del worker que atiende la petición
+    return jsonify(principal_cache.stats())
+
+@dev_bp.route('/dev/auth/logins')
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def get_login_bookkeeping_stats():
+    # Escritor diferido de auth_token/token_expiration_date del worker
+    return jsonify(login_bookkeeper.stats())
+
 from utils.ip_manager_cache import ip_manager_cache
+from utils.ip_range_matcher import parse_block_target, normalize_region, RANGE_REGION_TYPES
+
+REGION_TYPES = ('country', 'continent') + RANGE_REGION_TYPES
+
+def _save_region_block(region_type, region_name):
+    from models.blocked_region import BlockedRegion
+    r = BlockedRegion.query.filter_by(region_name=region_name).first()
+    if not r:
+        r = BlockedRegion(region_type=region_type, region_name=region_name)
+        db.session.add(r)
+        db.session.commit()
+    # update cache (y el estado compartido entre workers)
+    ip_manager_cache.block_region(region_type, region_name)
+
+def _delete_region_block(region_name):
+    from models.blocked_region import BlockedRegion
+    r = BlockedRegion.query.filter_by(region_name=region_name).first()
+    if r:
+        db.session.delete(r)
+        db.session.commit()
+    ip_manager_cache.unblock_region(region_name)
 
 @dev_bp.route('/dev/ips', methods=['GET'])
 @jwt_required()
@@ -50,17 +282,69 @@ from utils.ip_manager_cache import ip_manager_cache
 @access_required('manage_dev')
 def list_ips():
     # Retrieve from cache to get the most up-to-date stats without hitting DB
-    ips = []
-    for info in ip_manager_cache.ip_cache.values():
-        rec = dict(info['record'])
-        if isinstance(rec['last_seen'], datetime):
-            rec['last_seen'] = rec['last_seen'].isoformat()
-        if 'last_minute_reset' in rec: del rec['last_minute_reset']
-        if 'last_month_reset' in rec: del rec['last_month_reset']
-        ips.append(rec)
-    # Sort by last_seen
-    ips.sort(key=lambda x: x['last_seen'], reverse=True)
-    return jsonify(ips)
+    args = request.args
+    if args.get('all', '').lower() in ('1', 'true', 'yes'):
+        # Exportación completa (formato original, una lista) de una sola instantánea de la caché
+        return jsonify(ip_manager_cache.export_all())
+
+    limit = max(1, min(args.get('limit', 100, type=int), 1000))
+    blocked = args.get('blocked')
+    if blocked is not None:
+        blocked = blocked.lower() in ('1', 'true', 'yes')
+    try:
+        items, total, next_cursor = ip_manager_cache.list_recent(
+            limit=limit,
+            cursor=args.get('cursor'),
+            pais=args.get('pais'),
+            proveedor=args.get('proveedor'),
+            blocked=blocked,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'total': total, 'next_cursor': next_cursor})
+
+@dev_bp.route('/dev/ips/top', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def top_ips():
+    # IPs con más peticiones en la ventana (segundos): 10, 60, 300 o 3600
+    try:
+        limit = max(1, min(request.args.get('limit', 20, type=int), 1000))
+        top = ip_manager_cache.rates.top(request.args.get('window', 60), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    with ip_manager_cache.lock:
+        for item in top:
+            record = ip_manager_cache.ip_cache.peek(item['ip'])
+            if record is not None:
+                item.update(pais=record.pais, proveedor=record.proveedor, is_blocked=record.is_blocked)
+    return jsonify(top)
+
+@dev_bp.route('/dev/ips/rates/histogram', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def ip_rate_histogram():
+    try:
+        return jsonify(ip_manager_cache.rates.histogram(request.args.get('window', 60)))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@dev_bp.route('/dev/ips/<ip>/rate', methods=['GET'])
+@jwt_required()
+@token_required
+@access_required('manage_dev')
+def ip_rate_series(ip):
+    try:
+        series = ip_manager_cache.rates.series(
+            ip, request.args.get('window', 300), request.args.get('bucket', 1, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if series is None:
+        return jsonify({'error': 'IP without requests in the last hour'}), 404
+    return jsonify(series)
 
 @dev_bp.route('/dev/ips/block', methods=['POST'])
 @jwt_required()
@@ -71,7 +355,17 @@ def block_ip():
     ip_to_block = data.get('ip')
     if not ip_to_block:
         return jsonify({'error': 'IP is required'}), 400
-    
+
+    # Acepta también prefijos CIDR (1.2.3.0/24, 2001:db8::/32), ASN (AS15169) o nombres de proveedor;
+    # un proveedor con nombre ambiguo se manda con "type": "provider"
+    try:
+        target_type, target = parse_block_target(ip_to_block, data.get('type'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if target_type != 'ip':
+        _save_region_block(target_type, target)
+        return jsonify({'message': f'{target_type.upper()} {target} blocked successfully'})
+
     ip_manager_cache.block_ip(ip_to_block)
     return jsonify({'message': f'IP {ip_to_block} blocked successfully'})
 
@@ -84,7 +378,15 @@ def unblock_ip():
     ip_to_unblock = data.get('ip')
     if not ip_to_unblock:
         return jsonify({'error': 'IP is required'}), 400
-    
+
+    try:
+        target_type, target = parse_block_target(ip_to_unblock, data.get('type'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if target_type != 'ip':
+        _delete_region_block(target)
+        return jsonify({'message': f'{target_type.upper()} {target} unblocked successfully'})
+
     ip_manager_cache.unblock_ip(ip_to_unblock)
     return jsonify({'message': f'IP {ip_to_unblock} unblocked successfully'})
 
@@ -103,20 +405,19 @@ def list_blocked_regions():
 @access_required('manage_dev')
 def block_region():
     data = request.get_json()
-    region_type = data.get('region_type') # 'country' or 'continent'
+    region_type = data.get('region_type') # 'country', 'continent', 'cidr', 'asn' or 'provider'
     region_name = data.get('region_name')
     if not region_type or not region_name:
         return jsonify({'error': 'region_type and region_name required'}), 400
-        
-    from models.blocked_region import BlockedRegion
-    r = BlockedRegion.query.filter_by(region_name=region_name).first()
-    if not r:
-        r = BlockedRegion(region_type=region_type, region_name=region_name)
-        db.session.add(r)
-        db.session.commit()
-        # update cache
-        ip_manager_cache.blocked_regions[region_type].add(region_name)
-        
+    if region_type not in REGION_TYPES:
+        return jsonify({'error': f'region_type must be one of: {", ".join(REGION_TYPES)}'}), 400
+    try:
+        region_name = normalize_region(region_type, region_name)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    _save_region_block(region_type, region_name)
+
     return jsonify({'message': f'Region {region_name} blocked successfully'})
 
 @dev_bp.route('/dev/regions/unblock', methods=['POST'])
@@ -127,15 +428,14 @@ def unblock_region():
     data = request.get_json()
     region_name = data.get('region_name')
     region_type = data.get('region_type')
-    
-    from models.blocked_region import BlockedRegion
-    r = BlockedRegion.query.filter_by(region_name=region_name).first()
-    if r:
-        db.session.delete(r)
-        db.session.commit()
-        if region_name in ip_manager_cache.blocked_regions[r.region_type]:
-            ip_manager_cache.blocked_regions[r.region_type].remove(region_name)
-            
+    if region_type in RANGE_REGION_TYPES:
+        try:
+            region_name = normalize_region(region_type, region_name)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    _delete_region_block(region_name)
+
     return jsonify({'message': f'Region {region_name} unblocked successfully'})
 
 @dev_bp.route('/dev/logs/history', methods=['GET'])
@@ -158,18 +458,38 @@ def list_logs():
 @access_required('manage_dev')
 def view_log(filename):
     log_dir = os.path.join(current_app.root_path, 'logs')
-    file_path = os.path.join(log_dir, filename)
-    
     # Seguridad básica para evitar path traversal
-    if not os.path.exists(file_path) or '..' in filename:
+    file_path = log_viewer.resolve_log_path(log_dir, filename)
+    if file_path is None:
         return jsonify({'error': 'Log file not found'}), 404
-        
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return Response(content, mimetype='text/plain')
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        tail = request.args.get('tail', type=int)
+        min_level = parse_level(request.args.get('level'))
+        pattern = log_viewer.compile_filter(request.args.get('q'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if tail is not None and tail < 0:
+        return jsonify({'error': 'tail must be >= 0'}), 400
+
+    # Todo se transmite por trozos desde un mmap; nunca se lee el archivo entero
+    if pattern is not None or min_level:
+        return Response(log_viewer.stream_filtered(file_path, pattern, min_level, tail), mimetype='text/plain')
+    if tail is not None:
+        return Response(log_viewer.stream_tail(file_path, tail), mimetype='text/plain')
+
+    size = os.path.getsize(file_path)
+    headers = {'Accept-Ranges': 'bytes'}
+    if request.range is not None:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            return Response(status=416, headers={'Content-Range': f'bytes */{size}'})
+        start, stop = byte_range
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+        headers['Content-Length'] = str(stop - start)
+        return Response(log_viewer.stream_bytes(file_path, start, stop), status=206, mimetype='text/plain', headers=headers)
+    headers['Content-Length'] = str(size)
+    return Response(log_viewer.stream_bytes(file_path, 0, size), mimetype='text/plain', headers=headers)
 
 @dev_bp.route('/dev/users', methods=['GET'])
 @jwt_required()
@@ -223,7 +543,7 @@ def create_user_dev():
         # Check and associate professional if tuition/matricula is provided
         tuition = data.get('tuition') or data.get('matricula')
         if tuition:
-            professional = ProfessionalModel.query.filter_by(tuition=str(tuition), deleted_at=None).first()
+            professional = find_professional_by_tuition(str(tuition))
             if professional:
                 if professional.uuid_user and professional.uuid_user != new_user.uuid:
                     return jsonify({'error': 'Este perfil profesional ya está vinculado a otro usuario.'}), 400
@@ -338,6 +658,7 @@ def edit_user_dev():
         return jsonify({'error': 'User not found'}), 404
         
     try:
+        previous_email = user.email
         if 'name' in data and data['name']:
             user.name = data['name']
         if 'email' in data and data['email']:
@@ -351,6 +672,11 @@ def edit_user_dev():
             user.profiles = profiles
             
         db.session.commit()
+        if data.get('password'):
+            # Con la contraseña reseteada no deben seguir valiendo las sesiones abiertas
+            auth_service.revoke_tokens(user)
+        invalidate_identity(previous_email)
+        invalidate_identity(user.email)
         return jsonify(user.to_json()), 200
     except Exception as e:
         db.session.rollback()
@@ -380,8 +706,10 @@ def delete_user_dev(uuid):
         user.profiles = []
         
         # Delete user
+        email = user.email
         db.session.delete(user)
         db.session.commit()
+        invalidate_identity(email)
         return jsonify({'message': 'User deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -401,6 +729,7 @@ def delete_profile_dev(uuid):
         profile.accesses = []
         db.session.delete(profile)
         db.session.commit()
+        invalidate_all()
         return jsonify({'message': 'Profile deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -423,6 +752,7 @@ def delete_access_dev(uuid):
         # Delete the access
         db.session.delete(access)
         db.session.commit()
+        invalidate_all()
         return jsonify({'message': 'Permission deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models import EdictModel
 from utils.decorators import token_required, access_required
+from utils.db_routing import read_replica
 from flask_jwt_extended import jwt_required
 from sqlalchemy import desc
 import os
@@ -50,6 +51,7 @@ from datetime import datetime
 from sqlalchemy import desc, or_
 
 @edicts_bp.route('/edicts', methods=['GET'])
+@read_replica
 def get_all_edicts():
     """Get all edicts with optional scheduling filter, search and pagination."""
     try:
@@ -121,6 +123,7 @@ def get_all_edicts():
 @jwt_required()
 @token_required
 @access_required('view_edicts')
+@read_replica
 def get_edict(uuid):
     """Get a single edict entry by UUID with tags."""
     try:
@@ -8,7 +8,6 @@ from utils.send_mails import enviar_comprobante_pago_por_mail, enviar_mail
 from flask_jwt_extended import jwt_required
 from utils.errors import ValidationError, register_in_txt
 from config.config_mp import get_mp_sdk
-import qrcode
 import base64
 from sqlalchemy import desc
 from utils.seguridad_bcm import verify_bcm_webhook_security
@@ -16,29 +15,21 @@ from flask import current_app
 from flask_mail import Message
 from config.config_mail import mail
 
-from io import BytesIO
 from typing import List, Dict
 import math
 from models.interest import InterestPeriod
 from models.rate import RateType
 import os
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
 from datetime import datetime
-from io import BytesIO
 import logging
+import traceback
 from utils.bot import enviar_alerta
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.graphics.barcode import code128
-import os, base64, hmac, hashlib, requests
-from datetime import datetime
-from io import BytesIO
-import qrcode
+import requests
 import hmac, hashlib, json
 import uuid
 
-from reportlab.lib.utils import ImageReader
+# reportlab/PIL (PDFs), qrcode y playwright se importan dentro de los endpoints que los usan:
+# ver utils/forms_pdf.py, utils/forms_qr.py y utils/tribunales_scraper.py
 
 
 forms_bp = Blueprint('forms_bp', __name__)
@@ -48,14 +39,6 @@ BOLSA_API_KEY  = os.getenv("BOLSA_API_KEY", "")
 BOLSA_CLIENT_ID = os.getenv("BOLSA_CLIENT_ID", "")
 BOLSA_SECRET   = os.getenv("BOLSA_SECRET", "")
 
-def _make_qr_png_bytes(qr_payload, box_size=8, border=2, err=qrcode.constants.ERROR_CORRECT_M):
-    qr = qrcode.QRCode(version=None, error_correction=err, box_size=box_size, border=border)
-    qr.add_data(qr_payload)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = BytesIO(); img.save(buf, format="PNG"); buf.seek(0)
-    return buf
-
 def _bolsa_signature():
     if not (BOLSA_CLIENT_ID and BOLSA_SECRET):
         return None
@@ -321,6 +304,7 @@ def generar_boleta_bolsa():
         # codigo_barra, qr_payload = get_bolsa_identifiers(nuevo_df)
 
         # 📄 Generar PDF con código de barras
+        from utils.forms_pdf import generar_boleta_pdf_con_estilo
         pdf_buffer = generar_boleta_pdf_con_estilo(nuevo_df, codigo_barra)
 
         # Guardar recibo en estado "Pendiente"
@@ -408,10 +392,8 @@ def derecho_fijo_qr():
    
 
         # Generate the QR code image from the URL
-        qr = qrcode.make(qr_code_url)
-        buffered = BytesIO()
-        qr.save(buffered, format="PNG")
-        qr_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        from utils.forms_qr import make_qr_base64
+        qr_base64 = make_qr_base64(qr_code_url)
 
         return jsonify({
             "message": "Pago creado exitosamente.",
@@ -1000,6 +982,7 @@ def download_receipt():
         }
 
         # Generar el PDF
+        from utils.forms_pdf import generate_receipt_pdf
         pdf_buffer = generate_receipt_pdf(payment_data, derecho_fijo)
 
         return send_file(
@@ -1016,603 +999,6 @@ def download_receipt():
         return jsonify({"error": str(e)}), 500
 
 
-from reportlab.graphics.barcode import code128
-from reportlab.graphics.shapes import Drawing
-
-###====== Deprecado, se deja en caso de haber mal funcionamiento con la original =======##
-
-def generar_boleta_pdf_con_estilo(derecho_fijo, codigo_barra: str, qr_payload: str = None):
-    """
-    Versión prolija, centrada y con manejo de carátulas largas.
-    """
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # --- Config ---
-    MARGIN = 15 * mm
-    BOX_RADIUS = 6
-    LIGHT_BORDER = colors.HexColor("#E5E7EB")
-    PRIMARY = colors.HexColor("#06092E")
-    ACCENT = colors.HexColor("#4F46E5")
-    TEXT = colors.HexColor("#111827")
-
-    c.setTitle("Boleta de Pago - Bolsa de Comercio")
-
-    # --- Helpers de dibujo ---
-    def try_draw_image(path, x, y, w, h):
-        if os.path.exists(path):
-            try:
-                c.drawImage(path, x, y, width=w, height=h, preserveAspectRatio=True, mask='auto')
-            except:
-                pass
-
-    def rounded_box(x, y, w, h, stroke=LIGHT_BORDER, fill=None):
-        c.setStrokeColor(stroke)
-        c.setFillColor(fill if fill else colors.white)
-        c.setLineWidth(1)
-        c.roundRect(x, y, w, h, BOX_RADIUS, stroke=1, fill=1)
-
-    def label_value(x, y, label, value, lw=110):
-        c.setFont("Helvetica-Bold", 9)
-        c.setFillColor(colors.HexColor("#6B7280"))
-        c.drawString(x, y, label)
-        c.setFont("Helvetica", 10)
-        c.setFillColor(TEXT)
-        c.drawString(x + lw, y, value if value is not None else "-")
-
-    def draw_label_value_wrapped(
-        x, y, label, value, max_width,
-        lw=80, font_name="Helvetica", font_size=10,
-        leading=4 * mm, max_lines=4
-    ):
-        """
-        Dibuja label + value en varias líneas (corta por caracteres).
-        """
-        value = (value or "").strip() or "-"
-        # Label
-        c.setFont("Helvetica-Bold", 9)
-        c.setFillColor(colors.HexColor("#6B7280"))
-        c.drawString(x, y, label)
-
-        # Valor envuelto
-        c.setFont(font_name, font_size)
-        c.setFillColor(TEXT)
-
-        start_x = x + lw
-        lines = []
-        current = ""
-
-        for ch in value:
-            test = current + ch
-            if c.stringWidth(test, font_name, font_size) <= max_width:
-                current = test
-            else:
-                if current:
-                    lines.append(current)
-                current = ch
-
-        if current:
-            lines.append(current)
-
-        # Limitar cantidad de líneas
-        if len(lines) > max_lines:
-            lines = lines[:max_lines]
-            if not lines[-1].endswith("..."):
-                lines[-1] = lines[-1] + " ..."
-
-        for i, line in enumerate(lines):
-            c.drawString(start_x, y - i * leading, line)
-
-        return y - (len(lines) - 1) * leading
-
-    # --- Logos ---
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    logo_left = os.path.join(base_dir, "utils", "assets", "logo-violeta.png")
-
-    # --- Encabezado ---
-    header_h = 32 * mm
-    c.setFillColor(colors.white)
-    c.rect(0, height - header_h, width, header_h, fill=1, stroke=0)
-    c.setStrokeColor(LIGHT_BORDER)
-    c.setLineWidth(1)
-    c.line(MARGIN, height - header_h, width - MARGIN, height - header_h)
-
-    # logo a la izquierda
-    try_draw_image(logo_left, MARGIN + 10, height - 21 * mm, 22 * mm, 22 * mm)
-
-    # textos centrados
-    c.setFillColor(PRIMARY)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width / 2, height - 21 * mm, "COLEGIO PÚBLICO DE ABOGADOS Y PROCURADORES")
-
-    c.setFont("Helvetica-Bold", 12)
-    c.setFillColor(ACCENT)
-    c.drawCentredString(width / 2, height - 27 * mm, "Segunda Circunscripción Judicial - Mendoza")
-
-    c.setFillColor(TEXT)
-    c.setFont("Helvetica-Bold", 15)
-    c.drawCentredString(width / 2, height - header_h - 8 * mm,
-                        "Boleta de Pago Presencial – Bolsa de Comercio")
-
-    # --- Bloque Datos del expediente ---
-    top = height - header_h - 14 * mm
-    box1_h = 52 * mm
-    rounded_box(MARGIN, top - box1_h, width - 2 * MARGIN, box1_h)
-
-    c.setFont("Helvetica-Bold", 11)
-    c.setFillColor(PRIMARY)
-    c.drawString(MARGIN + 6 * mm, top - 7 * mm, "Datos del expediente")
-    c.setFillColor(TEXT)
-
-    y = top - 15 * mm
-    left_x = MARGIN + 8 * mm
-    col2_x = width / 2 + 2 * mm
-
-    label_value(left_x, y, "N° de Expediente:", getattr(derecho_fijo, "juicio_n", ""))
-    label_value(col2_x, y, "Juzgado:", getattr(derecho_fijo, "juzgado", ""))
-
-    # Carátula envuelta
-    y -= 7 * mm
-    caratula = getattr(derecho_fijo, "caratula", "")
-    max_width_caratula = (width - 2 * MARGIN) - (left_x + 80)
-    y = draw_label_value_wrapped(
-        x=left_x,
-        y=y,
-        label="Carátula:",
-        value=caratula,
-        max_width=max_width_caratula,
-        lw=80,
-        font_size=10,
-        leading=4 * mm,
-        max_lines=4
-    )
-
-    y -= 5 * mm
-    label_value(left_x, y, "Parte:", getattr(derecho_fijo, "parte", ""))
-
-    y -= 7 * mm
-    fi = getattr(derecho_fijo, "fecha_inicio", None)
-    fv = getattr(derecho_fijo, "fecha", None)
-    fi_str = fi.strftime("%d/%m/%Y") if fi else "-"
-    fv_str = fv.strftime("%d/%m/%Y") if fv else "-"
-    label_value(left_x, y, "Fecha Inicio:", fi_str)
-    label_value(col2_x, y, "Fecha Vencimiento:", fv_str)
-
-    y -= 7 * mm
-    label_value(left_x, y, "Lugar:", getattr(derecho_fijo, "lugar", ""))
-
-    # --- Bloque Datos de pago + Monto ---
-    box2_h = 34 * mm
-    top2 = top - box1_h - 6 * mm
-    rounded_box(MARGIN, top2 - box2_h, width - 2 * MARGIN, box2_h)
-
-    c.setFont("Helvetica-Bold", 11)
-    c.setFillColor(PRIMARY)
-    c.drawString(MARGIN + 6 * mm, top2 - 7 * mm, "Datos de pago")
-    c.setFillColor(TEXT)
-
-    y2 = top2 - 15 * mm
-    label_value(MARGIN + 8 * mm, y2, "Tasa de justicia:", f"$ {getattr(derecho_fijo, 'tasa_justicia', '0')}")
-    label_value(width / 2 - 9 * mm, y2, "Derecho fijo 5%:", f"$ {float(getattr(derecho_fijo, 'total_depositado', '0')) * 0.05}")
-
-    amount_box_w = 70 * mm
-    amount_box_h = 18 * mm
-    amount_box_x = width - MARGIN - amount_box_w - 4
-    amount_box_y = top2 - amount_box_h - 10 * mm
-    rounded_box(amount_box_x, amount_box_y, amount_box_w, amount_box_h, stroke=ACCENT)
-
-    c.setFillColor(ACCENT)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(amount_box_x + 6, amount_box_y + amount_box_h - 6 * mm, "Importe a pagar")
-
-    c.setFillColor(TEXT)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawRightString(amount_box_x + amount_box_w - 6, amount_box_y + 6,
-                      f"$ {getattr(derecho_fijo, 'total_depositado', '0')}")
-
-    # --- Código de barras (principal) centrado ---
-    top3 = top2 - box2_h - 8 * mm
-    barcode = code128.Code128(codigo_barra, barHeight=18 * mm, barWidth=0.5)
-    bw = barcode.width
-    bx = (width - bw) / 2
-    by = top3 - 17 * mm
-    barcode.drawOn(c, bx, by)
-
-    c.setFont("Helvetica", 9)
-    c.setFillColor(colors.HexColor("#4B5563"))
-    c.drawCentredString(width / 2, by - 4 * mm, codigo_barra)
-
-    # --- Instrucciones ---
-    instr_top = by - 14 * mm
-    rounded_box(MARGIN, instr_top - 22 * mm, width - 2 * MARGIN, 28 * mm)
-
-    c.setFont("Helvetica-Bold", 10)
-    c.setFillColor(PRIMARY)
-    c.drawString(MARGIN + 6 * mm, instr_top - 1 * mm, "Instrucciones")
-
-    c.setFillColor(TEXT)
-    c.setFont("Helvetica", 9)
-    lines = [
-        "• Presentar esta boleta en la Bolsa de Comercio para efectuar el pago.",
-        "• La boleta es válida hasta la fecha de vencimiento indicada.",
-        "• Conserve el talón inferior sellado como comprobante de pago.",
-    ]
-    yy = instr_top - 6 * mm
-    for line in lines:
-        c.drawString(MARGIN + 8 * mm, yy, line)
-        yy -= 5 * mm
-
-    # --- Línea de corte ---
-    cut_y = instr_top - 26 * mm
-    c.setStrokeColor(colors.HexColor("#9CA3AF"))
-    c.setDash(2, 2)
-    c.line(MARGIN, cut_y, width - MARGIN, cut_y)
-    c.setDash()
-
-    c.setFont("Helvetica", 8)
-    c.setFillColor(colors.HexColor("#6B7280"))
-    c.drawCentredString(width / 2, cut_y - 4 * mm,
-                        "— — — — — — — — — — — —  Corte aquí  — — — — — — — — — — — —")
-
-    # --- Talón para caja ---
-    slip_h = 40 * mm
-    slip_y = cut_y - slip_h - 6 * mm
-    rounded_box(MARGIN, slip_y, width - 2 * MARGIN, slip_h)
-
-    c.setFillColor(PRIMARY)
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(MARGIN + 6 * mm, slip_y + slip_h - 7 * mm,
-                 "Talón para caja – Bolsa de Comercio")
-
-    c.setFillColor(TEXT)
-    c.setFont("Helvetica", 9)
-
-    ty = slip_y + slip_h - 14 * mm
-    label_value(MARGIN + 8 * mm, ty, "Expediente:", getattr(derecho_fijo, "juicio_n", ""))
-    ty -= 6 * mm
-
-    # mini código de barras (lo calculamos antes para saber dónde empieza)
-    mini = code128.Code128(codigo_barra, barHeight=12 * mm, barWidth=0.45)
-    mini_x = width - MARGIN - mini.width - 10
-    mini_y = slip_y + 8 * mm
-
-    # Carátula envuelta, con ancho máximo hasta antes del barcode
-    caratula = getattr(derecho_fijo, "caratula", "")
-    lw_caratula = 70
-    padding = 5
-    text_start_x = MARGIN + 8 * mm + lw_caratula
-    max_width_caratula_talon = max(40, mini_x - padding - text_start_x)
-
-    ty = draw_label_value_wrapped(
-        x=MARGIN + 8 * mm,
-        y=ty,
-        label="Carátula:",
-        value=caratula,
-        max_width=max_width_caratula_talon,
-        lw=lw_caratula,
-        font_size=8,
-        leading=3.5 * mm,
-        max_lines=3
-    )
-
-    ty -= 5 * mm
-    label_value(MARGIN + 8 * mm, ty, "Importe:", f"$ {getattr(derecho_fijo, 'total_depositado', '0')}")
-
-    # ahora sí dibujamos el mini-barcode
-    mini.drawOn(c, mini_x, mini_y)
-    c.setFont("Helvetica", 8)
-    c.setFillColor(colors.HexColor("#4B5563"))
-    c.drawRightString(mini_x + mini.width - 15, mini_y - 10, codigo_barra)
-
-    # --- Cerrar PDF correctamente ---
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer
-
-
-from io import BytesIO
-def _make_qr_png_bytes(qr_payload, box_size=8, border=2, err=qrcode.constants.ERROR_CORRECT_M):
-    qr = qrcode.QRCode(version=None, error_correction=err, box_size=box_size, border=border)
-    qr.add_data(qr_payload)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
-
-# def generar_boleta_pdf_con_estilo(derecho_fijo, codigo_barra: str, qr_payload: str = None):  # <<<
-#     """
-#     Genera un PDF de boleta con:
-#       - Encabezado con logo y título
-#       - Bloques de Datos del expediente y Datos de pago
-#       - Monto destacado
-#       - Código de barras centrado + legible
-#       - Instrucciones
-#       - Línea de corte y Talón para caja (con mini código de barras)
-#       - (Opcional) QR grande y mini‑QR en talón si se envía `qr_payload`  # <<<
-#     """
-#     buffer = BytesIO()
-#     c = canvas.Canvas(buffer, pagesize=A4)
-#     width, height = A4
-
-#     # --- Config ---
-#     MARGIN = 15 * mm
-#     BOX_RADIUS = 6
-#     LIGHT_BORDER = colors.HexColor("#E5E7EB")
-#     PRIMARY = colors.HexColor("#06092E")
-#     ACCENT = colors.HexColor("#4F46E5")
-#     TEXT = colors.HexColor("#111827")
-
-#     c.setTitle("Boleta de Pago - Bolsa de Comercio")
-
-#     # --- Logos ---
-#     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-#     logo_left = os.path.join(base_dir, "utils", "assets", "logo-violeta.png")
-
-#     def try_draw_image(path, x, y, w, h):
-#         if os.path.exists(path):
-#             try:
-#                 c.drawImage(path, x, y, width=w, height=h, preserveAspectRatio=True, mask='auto')
-#             except:
-#                 pass
-
-#     # --- Encabezado ---
-#     header_h = 32 * mm
-#     c.setFillColor(colors.white)
-#     c.rect(0, height - header_h, width, header_h, fill=1, stroke=0)
-#     c.setStrokeColor(LIGHT_BORDER)
-#     c.setLineWidth(1)
-#     c.line(MARGIN, height - header_h, width - MARGIN, height - header_h)
-#     try_draw_image(logo_left, MARGIN, height - 26*mm, 24*mm, 24*mm)
-
-#     c.setFillColor(PRIMARY)
-#     c.setFont("Helvetica-Bold", 16)
-#     c.drawString(MARGIN + 30*mm, height - 14*mm, "COLEGIO PÚBLICO DE ABOGADOS Y PROCURADORES")
-#     c.setFont("Helvetica-Bold", 12)
-#     c.setFillColor(ACCENT)
-#     c.drawString(MARGIN + 30*mm, height - 20*mm, "Segunda Circunscripción Judicial - Mendoza")
-#     c.setFillColor(TEXT)
-#     c.setFont("Helvetica-Bold", 15)
-#     c.drawString(MARGIN, height - header_h - 8*mm, "Boleta de Pago Presencial – Bolsa de Comercio")
-
-#     def rounded_box(x, y, w, h, stroke=LIGHT_BORDER, fill=None):
-#         c.setStrokeColor(stroke)
-#         c.setFillColor(fill if fill else colors.white)
-#         c.setLineWidth(1)
-#         c.roundRect(x, y, w, h, BOX_RADIUS, stroke=1, fill=1)
-
-#     def label_value(x, y, label, value, lw=110):
-#         c.setFont("Helvetica-Bold", 9)
-#         c.setFillColor(colors.HexColor("#6B7280"))
-#         c.drawString(x, y, label)
-#         c.setFont("Helvetica", 10)
-#         c.setFillColor(TEXT)
-#         c.drawString(x + lw, y, value if value is not None else "-")
-
-#     # --- Bloque Datos del expediente ---
-#     top = height - header_h - 14*mm
-#     box1_h = 48*mm
-#     rounded_box(MARGIN, top - box1_h, width - 2*MARGIN, box1_h)
-#     c.setFont("Helvetica-Bold", 11); c.setFillColor(PRIMARY)
-#     c.drawString(MARGIN + 6*mm, top - 7*mm, "Datos del expediente")
-#     c.setFillColor(TEXT)
-
-#     y = top - 15*mm
-#     left_x = MARGIN + 8*mm
-#     col2_x = width/2 + 2*mm
-#     label_value(left_x, y, "N° de Expediente:", getattr(derecho_fijo, "juicio_n", ""))
-#     label_value(col2_x, y, "Juzgado:", getattr(derecho_fijo, "juzgado", ""))
-
-#     y -= 7*mm
-#     label_value(left_x, y, "Carátula:", getattr(derecho_fijo, "caratula", ""))
-#     label_value(col2_x, y, "Parte:", getattr(derecho_fijo, "parte", ""))
-
-#     y -= 7*mm
-#     fi = getattr(derecho_fijo, "fecha_inicio", None)
-#     fv = getattr(derecho_fijo, "fecha", None)
-#     fi_str = fi.strftime("%d/%m/%Y") if fi else "-"
-#     fv_str = fv.strftime("%d/%m/%Y") if fv else "-"
-#     label_value(left_x, y, "Fecha Inicio:", fi_str)
-#     label_value(col2_x, y, "Fecha Vencimiento:", fv_str)
-
-#     y -= 7*mm
-#     label_value(left_x, y, "Lugar:", getattr(derecho_fijo, "lugar", ""))
-
-#     # --- Bloque Datos de pago + Monto ---
-#     box2_h = 34*mm
-#     top2 = top - box1_h - 6*mm
-#     rounded_box(MARGIN, top2 - box2_h, width - 2*MARGIN, box2_h)
-#     c.setFont("Helvetica-Bold", 11); c.setFillColor(PRIMARY)
-#     c.drawString(MARGIN + 6*mm, top2 - 7*mm, "Datos de pago")
-#     c.setFillColor(TEXT)
-
-#     y2 = top2 - 15*mm
-#     label_value(MARGIN + 8*mm, y2, "Tasa de justicia:", f"$ {getattr(derecho_fijo, 'tasa_justicia', '0')}")
-#     label_value(width/2 - 9*mm, y2, "Derecho fijo 5%:", f"$ {getattr(derecho_fijo, 'derecho_fijo_5pc', '0')}")
-
-#     amount_box_w = 70*mm
-#     amount_box_h = 18*mm
-#     amount_box_x = width - MARGIN - amount_box_w - 4
-#     amount_box_y = top2 - amount_box_h - 10*mm
-#     rounded_box(amount_box_x, amount_box_y, amount_box_w, amount_box_h, stroke=ACCENT)
-#     c.setFillColor(ACCENT); c.setFont("Helvetica-Bold", 10)
-#     c.drawString(amount_box_x + 6, amount_box_y + amount_box_h - 6*mm, "Importe a pagar")
-#     c.setFillColor(TEXT); c.setFont("Helvetica-Bold", 14)
-#     c.drawRightString(amount_box_x + amount_box_w - 6, amount_box_y + 6, f"$ {getattr(derecho_fijo, 'total_depositado', '0')}")
-
-#     # --- Código de barras (principal) ---
-#     top3 = top2 - box2_h - 8*mm
-#     barcode = code128.Code128(codigo_barra, barHeight=18*mm, barWidth=0.5)
-#     bw = barcode.width
-#     bx = (width - bw) / 7
-#     by = top3 - 17*mm
-#     barcode.drawOn(c, bx, by)
-#     c.setFont("Helvetica", 9); c.setFillColor(colors.HexColor("#4B5563"))
-#     c.drawCentredString(width/3.5, by - 4*mm, codigo_barra)
-
-#     # --- QR grande (opcional) ---  # <<<
-#     if qr_payload:
-#         try:
-#             qr_buf = _make_qr_png_bytes(qr_payload, box_size=8, border=2)
-#             qr_img = ImageReader(qr_buf)
-#             qr_size = 25 * mm                     # recomendado ≥ 30–35 mm
-#             qr_x = width - 30*mm - qr_size        # margen derecho
-#             qr_y = by + (mm - 10)                     # sobre el barcode
-#             c.drawImage(qr_img, qr_x, qr_y, width=qr_size, height=qr_size, preserveAspectRatio=True, mask='auto')
-#             c.setFont("Helvetica", 8); c.setFillColor(colors.HexColor("#6B7280"))
-#             c.drawCentredString(qr_x + qr_size/2, qr_y - 10, "Escanear en caja")
-#         except Exception as e:
-#             print("⚠️ Error dibujando QR:", e)
-
-#     # --- Instrucciones ---
-#     instr_top = by - 14*mm
-#     rounded_box(MARGIN, instr_top - 22*mm, width - 2*MARGIN, 28*mm)
-#     c.setFont("Helvetica-Bold", 10); c.setFillColor(PRIMARY)
-#     c.drawString(MARGIN + 6*mm, instr_top - 1*mm, "Instrucciones")
-#     c.setFillColor(TEXT); c.setFont("Helvetica", 9)
-#     lines = [
-#         "• Presentar esta boleta en la Bolsa de Comercio para efectuar el pago.",
-#         "• La boleta es válida hasta la fecha de vencimiento indicada.",
-#         "• Conserve el talón inferior sellado como comprobante de pago.",
-#     ]
-#     yy = instr_top - 6*mm
-#     for line in lines:
-#         c.drawString(MARGIN + 8*mm, yy, line)
-#         yy -= 5*mm
-
-#     # --- Línea de corte ---
-#     cut_y = instr_top - 26*mm
-#     c.setStrokeColor(colors.HexColor("#9CA3AF"))
-#     c.setDash(2, 2); c.line(MARGIN, cut_y, width - MARGIN, cut_y); c.setDash()
-#     c.setFont("Helvetica", 8); c.setFillColor(colors.HexColor("#6B7280"))
-#     c.drawCentredString(width/2, cut_y - 4*mm, "— — — — — — — — — — — —  Corte aquí  — — — — — — — — — — — —")
-
-#     # --- Talón para caja ---
-#     slip_h = 40*mm
-#     slip_y = cut_y - slip_h - 6*mm
-#     rounded_box(MARGIN, slip_y, width - 2*MARGIN, slip_h)
-
-#     c.setFillColor(PRIMARY); c.setFont("Helvetica-Bold", 10)
-#     c.drawString(MARGIN + 6*mm, slip_y + slip_h - 7*mm, "Talón para caja – Bolsa de Comercio")
-#     c.setFillColor(TEXT); c.setFont("Helvetica", 9)
-
-#     ty = slip_y + slip_h - 14*mm
-#     label_value(MARGIN + 8*mm, ty, "Expediente:", getattr(derecho_fijo, "juicio_n", ""))
-#     ty -= 6*mm
-#     label_value(MARGIN + 8*mm, ty, "Carátula:", (getattr(derecho_fijo, "caratula", "") or "")[:45])
-#     ty -= 6*mm
-#     label_value(MARGIN + 8*mm, ty, "Importe:", f"$ {getattr(derecho_fijo, 'total_depositado', '0')}")
-
-#     # mini código de barras
-#     mini = code128.Code128(codigo_barra, barHeight=12*mm, barWidth=0.45)
-#     mini_x = width - MARGIN - mini.width - 10
-#     mini_y = slip_y + 8*mm
-#     mini.drawOn(c, mini_x, mini_y)
-#     c.setFont("Helvetica", 8); c.setFillColor(colors.HexColor("#4B5563"))
-#     c.drawRightString(mini_x + mini.width - 15, mini_y - 10, codigo_barra)
-
-#     # # mini‑QR en talón (opcional)  # <<<
-#     # if qr_payload:
-#     #     try:
-#     #         mini_qr_buf = _make_qr_png_bytes(qr_payload, box_size=5, border=2)
-#     #         mini_qr_img = ImageReader(mini_qr_buf)
-#     #         mini_qr_size = 26 * mm
-#     #         mini_qr_x = mini_x - 6 - mini_qr_size    # a la izquierda del mini-barcode
-#     #         mini_qr_y = slip_y + 7*mm
-#     #         c.drawImage(mini_qr_img, mini_qr_x, mini_qr_y, width=mini_qr_size, height=mini_qr_size, preserveAspectRatio=True, mask='auto')
-#     #     except Exception as e:
-#     #         print("⚠️ Error dibujando mini‑QR:", e)
-
-#     # Footer
-#     c.setFillColor(colors.HexColor("#9CA3AF")); c.setFont("Helvetica", 8)
-#     c.drawCentredString(width/2, 10*mm, "Colegio Público de Abogados y Procuradores – 2° Circ. Judicial (Mendoza)")
-
-#     c.showPage(); c.save(); buffer.seek(0)
-#     return buffer
-
-
-def generate_receipt_pdf( payment_data, derecho_fijo):
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    print(derecho_fijo, f"este e")
-    # Obtener la ruta del logo
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Sube un nivel desde 'routes/'
-    logo_path = os.path.join(base_dir, "utils", "assets", "logo-violeta.png")
-
-
-    # Cargar el logo si existe
-    if os.path.exists(logo_path):
-        try:
-            c.drawImage(logo_path, 40, 750, width=120, height=120, preserveAspectRatio=True, mask='auto')
-        except Exception as e:
-            print(f"Error al cargar el logo: {e}")
-    else:
-        print(f"⚠️ No se encontró el logo en: {logo_path}")
-
-        # Obtener la ruta de la segunda imagen (lado derecho)
-    otro_logo_path = os.path.join(base_dir, "utils", "assets", "pagado.jpg")  # Ajusta el nombre del archivo
-
-    # Cargar el segundo logo si existe
-    if os.path.exists(otro_logo_path):
-        try:
-            c.drawImage(otro_logo_path, 450, 750, width=120, height=120, preserveAspectRatio=True, mask='auto')
-        except Exception as e:
-            print(f"Error al cargar el segundo logo: {e}")
-    else:
-        print(f"⚠️ No se encontró el segundo logo en: {otro_logo_path}")
-
-    # Header
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(100, 750, "COLEGIO PÚBLICO DE ABOGADOS Y")
-    c.drawString(100, 730, "PROCURADORES")
-
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(450, 750, "DERECHO FIJO")
-
-    c.setFont("Helvetica", 12)
-    c.drawString(100, 700, "Segunda Circunscripción Judicial - Mendoza")
-
-    # Main content
-    y = 650
-    c.setFont("Helvetica-Bold", 10)
-
-    # Verificar que las fechas no sean None
-    fecha_inicio = getattr(derecho_fijo, 'fecha_inicio', None)
-    fecha = getattr(derecho_fijo, 'fecha', None)
-
-    fecha_inicio_str = fecha_inicio.strftime("%Y-%m-%d") if fecha_inicio else "No disponible"
-    fecha_str = fecha.strftime("%Y-%m-%d") if fecha else "No disponible"
-    
-
-    fields = [
-        ("Fecha Inicio:", fecha_inicio_str),
-        ("Fecha Vencimiento:", fecha_str),
-        ("Caratula:", getattr(derecho_fijo, 'caratula', 'No disponible')),
-        ("TOTAL DEPOSITADO:", f"$ {getattr(derecho_fijo, 'total_depositado', '0')}"),
-        ("Juzgado:", getattr(derecho_fijo, 'juzgado', 'No disponible')),
-        ("¿Paga tasa de justicia?", "Sí"),
-        ("Monto:", getattr(derecho_fijo, 'tasa_justicia', '0')),
-        ("N° de Expediente", getattr(derecho_fijo, 'juicio_n', 'No disponible')),
-        ("ID de Pago:", payment_data.get('id', 'No disponible')),
-        ("Fecha de Pago:", (derecho_fijo.created_at - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M") if derecho_fijo.created_at else "No disponible")
-
-    ]
-
-    for label, value in fields:
-        c.drawString(100, y, label)
-        c.setFont("Helvetica", 10)
-        c.drawString(250, y, str(value))
-        c.setFont("Helvetica-Bold", 10)
-        y -= 20
-
-    c.save()
-    buffer.seek(0)
-    return buffer
-
 def get_relevant_rates(start_date: datetime, end_date: datetime, rate_type: RateType) -> List[RateModel]:
     """Get all relevant rates for the given period and rate type"""
     return RateModel.query.filter(
@@ -1677,16 +1063,6 @@ def confirm_receipt():
         register_in_txt(f"Error al confirmar recibo:\n> uuid:{uuid}\npayment_id:{payment_id}\n> error:{e}", "logs_bcm.txt")
         return jsonify({"error": str(e)}), 500
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.units import inch
-from io import BytesIO
-from PIL import Image as PILImage
-import os
-import uuid
-
 def build_bolsa_payload_local(derecho_fijo, convenio="CBAMZA", version="1"):
     """
     Arma un payload QR/Barcode en texto siguiendo especificación de la Bolsa.
@@ -1757,113 +1133,6 @@ def save_receipt_to_db(db_session, derecho_fijo, payment_id, status="Pendiente",
         db_session.rollback()
 
 # FUNCION Q GENERA EL PDF DE LIQ
-def generate_liquidacion_pdf( capital: float, fecha_origen: datetime, fecha_liquidacion: datetime, 
-                          detalles: list, tasa_total: float, monto_final: float) -> BytesIO:
-   # Create a buffer to receive PDF data
-   buffer = BytesIO()
-   
-   # Create the PDF object
-   doc = SimpleDocTemplate(
-       buffer,
-       pagesize=letter,
-       rightMargin=72,
-       leftMargin=72,
-       topMargin=72,
-       bottomMargin=72
-   )
-   
-   # Container for the 'Flowable' objects
-   elements = []
-   
-   # Define styles
-   styles = getSampleStyleSheet()
-   title_style = ParagraphStyle(
-       'CustomTitle',
-       parent=styles['Heading1'],
-       fontSize=14,
-       spaceAfter=30
-   )
-   normal_style = ParagraphStyle(
-       'CustomNormal',
-       parent=styles['Normal'],
-       fontSize=12,
-       spaceAfter=12
-   )
-   
-   # Process and add logo
-   utils_dir = os.path.dirname(os.path.abspath(__file__))
-   logo_path = os.path.join(utils_dir, 'assets', 'logo-grande.png')
-   
-   if os.path.exists(logo_path):
-       # Open and convert image to black
-       with PILImage.open(logo_path) as img:
-           # Convert to grayscale then to black
-           img = img.convert('L')  # Convert to grayscale
-           # Convert to black (threshold at 128)
-           img = img.point(lambda x: 0 if x > 128 else 255, '1')
-           
-           # Save to temporary buffer
-           temp_buffer = BytesIO()
-           img.save(temp_buffer, format='PNG')
-           temp_buffer.seek(0)
-           
-           # Create reportlab image
-           logo = Image(temp_buffer)
-           # Set dimensions (adjust as needed)
-           logo.drawHeight = 1*inch
-           logo.drawWidth = 1.5*inch
-           elements.append(logo)
-           elements.append(Spacer(1, 20))
-   
-   # Add title
-   elements.append(Paragraph("Colegio de Abogados de Mendoza - Formularios", title_style))
-   elements.append(Spacer(1, 12))
-   
-   # Add calculation title
-   elements.append(Paragraph("Cálculo de liquidación", title_style))
-   elements.append(Spacer(1, 12))
-   
-   # Add basic information
-   elements.append(Paragraph(f"Capital (pesos) {capital}$", normal_style))
-   elements.append(Paragraph("Tasa utilizada: Tasa Banco Nación Activa", normal_style))
-   elements.append(Paragraph(f"Fecha de origen: {fecha_origen.strftime('%d/%m/%Y')}", normal_style))
-   elements.append(Paragraph(f"Fecha de liquidación: {fecha_liquidacion.strftime('%d/%m/%Y')}", normal_style))
-   elements.append(Spacer(1, 12))
-   
-   # Add rate details
-   for detalle in detalles:
-       elements.append(Paragraph(detalle, normal_style))
-   
-   # Add total rate
-   elements.append(Spacer(1, 12))
-   tasa_efectiva = (tasa_total / capital) * 100
-   elements.append(Paragraph(f"Tasa de interés: {tasa_efectiva:.2f}%", normal_style))
-   elements.append(Spacer(1, 12))
-   
-   # Add final amount
-   elements.append(Paragraph(f"Interés: {int(monto_final - capital)}$", normal_style))
-   elements.append(Paragraph("=========", normal_style))
-   elements.append(Paragraph(f"Monto Final: {int(monto_final)}$", normal_style))
-   
-   # Add footer
-   elements.append(Spacer(1, 30))
-   elements.append(Spacer(1, 12))
-   footer_style = ParagraphStyle(
-       'Footer',
-       parent=styles['Normal'],
-       fontSize=10,
-       alignment=1  # Center alignment
-   )
-   elements.append(Paragraph("Segunda Circunscripción Judicial de Mendoza", footer_style))
-   elements.append(Paragraph("(San Rafael - Gral. Alvear - Malargüe)", footer_style))
-   
-   # Build PDF
-   doc.build(elements)
-   buffer.seek(0)
-  
-
-   return buffer
-
 def calculate_bank_rate(capital_inicial: float, fecha_origen: datetime, fecha_liquidacion: datetime, frecuencia_aplicacion: float = 1):
     """Handle 'tasa_bancaria' calculation type"""
     # Get rates from database
@@ -1954,6 +1223,7 @@ def generar_liquidaciones():
             return jsonify({"error": "Tipo de cálculo no válido"}), 400
 
         # Generate PDF
+        from utils.forms_pdf import generate_liquidacion_pdf
         pdf_buffer = generate_liquidacion_pdf(
             capital=capital_inicial,
             fecha_origen=fecha_origen,
@@ -1984,226 +1254,6 @@ def generar_liquidaciones():
         return jsonify({"error": str(e)}), 500
     
 
-from flask import Blueprint, request, jsonify
-import logging
-import random
-import time
-import traceback
-from playwright.sync_api import sync_playwright
-import re
-
-
-# FUNC Q PARSEA EL RESULTADO DEL SCRAPP DE LIQ A UN JSON MAS LIMPIO
-def parse_resultado_html(html_content: str) -> dict:
-    """
-    Parsea el HTML de respuesta de Tribunales Mendoza y extrae los datos de la liquidación.
-    
-    Estructura esperada de la tabla:
-    - Fila 1: Concepto (pesos) | Monto capital
-    - Fila 2: Tasa utilizada: ... | &nbsp;
-    - Fila 3: Fecha de origen: DD/MM/YYYY | &nbsp;
-    - Fila 4: Fecha de liquidación: DD/MM/YYYY | &nbsp;
-    - Filas N: DD/MM/YYYY .. DD/MM/YYYY: (X% / 365) x N días = X.XXXX% | vacío
-    - Fila: Tasa de interés: X.XX% | monto_intereses
-    - Fila: &nbsp; | ==========
-    - Fila: &nbsp; | total_final
-    """
-    from bs4 import BeautifulSoup
-    import re
-    
-    resultado = {
-        "concepto": None,
-        "capital": None,
-        "tasa_utilizada": None,
-        "fecha_origen": None,
-        "fecha_liquidacion": None,
-        "periodos": [],
-        "tasa_interes_porcentaje": None,
-        "monto_intereses": None,
-        "total_final": None
-    }
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Buscar la tabla principal
-    table = soup.find('table', class_='table-striped')
-    if not table:
-        table = soup.find('table')
-    
-    if not table:
-        return resultado
-    
-    rows = table.find_all('tr')
-    
-    for row in rows:
-        cells = row.find_all('td')
-        if len(cells) < 2:
-            continue
-        
-        col1 = cells[0].get_text(strip=True).replace('\xa0', ' ').replace('&nbsp;', ' ').strip()
-        col2 = cells[1].get_text(strip=True).replace('\xa0', ' ').replace('&nbsp;', ' ').strip()
-        
-        # Ignorar filas vacías o separadores
-        if col2 == "==========" or (not col1 and not col2):
-            continue
-        
-        # Fila con concepto y capital (primera fila con número en col2)
-        if col1 and col2 and col2.isdigit() and resultado["capital"] is None:
-            resultado["concepto"] = col1
-            resultado["capital"] = int(col2)
-            continue
-        
-        # Tasa utilizada
-        if col1.startswith("Tasa utilizada:"):
-            resultado["tasa_utilizada"] = col1.replace("Tasa utilizada:", "").strip()
-            continue
-        
-        # Fecha de origen
-        if col1.startswith("Fecha de origen:"):
-            resultado["fecha_origen"] = col1.replace("Fecha de origen:", "").strip()
-            continue
-        
-        # Fecha de liquidación
-        if col1.startswith("Fecha de liquidación:"):
-            resultado["fecha_liquidacion"] = col1.replace("Fecha de liquidación:", "").strip()
-            continue
-        
-        # Período de cálculo de interés
-        # Formato: "DD/MM/YYYY .. DD/MM/YYYY: (X% / 365) x N días = X.XXXX%"
-        periodo_match = re.match(
-            r'(\d{2}/\d{2}/\d{4})\s*\.\.\s*(\d{2}/\d{2}/\d{4}):\s*\(([^)]+)\)\s*x\s*(\d+)\s*días\s*=\s*([\d.,]+%)',
-            col1
-        )
-        if periodo_match:
-            resultado["periodos"].append({
-                "fecha_desde": periodo_match.group(1),
-                "fecha_hasta": periodo_match.group(2),
-                "tasa": periodo_match.group(3).strip(),
-                "dias": int(periodo_match.group(4)),
-                "resultado_porcentaje": periodo_match.group(5)
-            })
-            continue
-        
-        # Tasa de interés total
-        if col1.startswith("Tasa de interés:"):
-            tasa_match = re.search(r'([\d.,]+%)', col1)
-            if tasa_match:
-                resultado["tasa_interes_porcentaje"] = tasa_match.group(1)
-            if col2 and col2.isdigit():
-                resultado["monto_intereses"] = int(col2)
-            continue
-        
-        # Total final (fila donde col1 está vacío y col2 es un número)
-        if not col1 and col2 and col2.isdigit():
-            resultado["total_final"] = int(col2)
-            continue
-    
-    return resultado
-
-
-def scrape_liquidacion_directo(concepto: str, tasa: str, capital: float, fecha_desde: str, fecha_hasta: str) -> dict:
-    """
-    Realiza scraping directo al endpoint de Tribunales Mendoza usando requests.
-    Mucho más rápido que Playwright (segundos vs minutos).
-    
-    Args:
-        concepto: Descripción del concepto a liquidar
-        tasa: Valor de la tasa (ej: "Tasa Banco Nación Activa")
-        capital: Monto del capital
-        fecha_desde: Fecha inicio (DD/MM/YYYY)
-        fecha_hasta: Fecha fin (DD/MM/YYYY)
-    
-    Returns:
-        dict con los resultados parseados
-    """
-    url = "https://tribunalesmza.com.ar/pdforms/calculo/post"
-    
-    # Mapeo de nombres descriptivos a valores del formulario
-    # Estos valores deben coincidir con los 'value' del <select> en el formulario original
-    TASA_MAP = {
-        "Tasa Banco Nación Activa": "0",
-        "Tasa Banco Nación Libre 36 meses - Fuera de uso": "1",
-        "Tasa Banco Nación Libre 60 meses - Fuera de uso": "2",
-        "Tasa Banco Nación Libre 72 meses - Ley 9516": "3",
-        "Tasa Banco Nación Pasiva": "4",
-        "Tasa Ley 4087": "5",
-        "Unidad de Valor Adquisitivo (UVA)": "6",
-    }
-    
-    # Obtener el valor numérico de la tasa
-    tasa_value = TASA_MAP.get(tasa, "0")  # Default a "0" si no se encuentra
-    print(f"📊 Tasa recibida: '{tasa}' -> valor: '{tasa_value}'")
-    
-    # Headers para simular un navegador
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language": "es-AR,es;q=0.9,en-US;q=0.8,en;q=0.7",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Origin": "https://tribunalesmza.com.ar",
-        "Referer": "https://tribunalesmza.com.ar/pdforms/calculo/form",
-        "sec-ch-ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        "sec-ch-ua-mobile": "?0",
-        "sec-ch-ua-platform": '"Windows"',
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "same-origin",
-        "Sec-Fetch-User": "?1",
-        "Upgrade-Insecure-Requests": "1",
-    }
-    
-    # Asegurar que capital sea entero (sin decimales)
-    capital_int = int(float(capital))
-    
-    # Payload del formulario (nombres de campos según el formulario original)
-    payload = {
-        "concepto": concepto,
-        "tasa": tasa_value,
-        "capital": str(capital_int),
-        "desde": fecha_desde,
-        "hasta": fecha_hasta,
-        "submit": "Calcular"
-    }
-    
-    # Crear sesión para manejar cookies
-    session = requests.Session()
-    
-    # Primero hacemos GET al formulario para obtener cookies
-    try:
-        session.get("https://tribunalesmza.com.ar/pdforms/calculo/form", headers=headers, timeout=30)
-    except Exception as e:
-        logging.warning(f"⚠️ No se pudo obtener cookies iniciales: {e}")
-    
-    # Hacer POST al endpoint
-    response = session.post(url, data=payload, headers=headers, timeout=60)
-    
-    print(f"📡 Response status: {response.status_code}")
-    
-    if response.status_code != 200:
-        raise Exception(f"Error en la petición: HTTP {response.status_code}")
-    
-    html_content = response.text
-    
-    # Guardar HTML para debug siempre (temporalmente)
-    debug_path = os.path.join(os.path.dirname(__file__), "scrape_debug.html")
-    with open(debug_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    print(f"📄 HTML guardado en: {debug_path}")
-    
-    # Parsear el HTML completo (la función ya busca la tabla internamente)
-    resultado = parse_resultado_html(html_content)
-    
-    print(f"📊 Resultado parseado: {resultado}")
-    
-    # Verificar que se encontraron resultados
-    if resultado["total_final"] is None:
-        print(f"❌ No se encontró total_final. Verificar HTML en: {debug_path}")
-        raise Exception(f"No se pudo extraer el total final de la liquidación. HTML guardado en: {debug_path}")
-    
-    return resultado
-
-
 @forms_bp.route('/forms/calcular_liquidacion_v2', methods=['POST'])
 def calcular_liquidacion_v2():
     """
@@ -2226,6 +1276,7 @@ def calcular_liquidacion_v2():
         datetime.strptime(fecha_liquidacion_str, "%d/%m/%Y")
 
         # Llamar al scraper directo
+        from utils.tribunales_scraper import scrape_liquidacion_directo
         resultado = scrape_liquidacion_directo(
             concepto=concepto,
             tasa=tasa,
@@ -2256,23 +1307,6 @@ def calcular_liquidacion_v2():
         register_in_txt(f"Error en calcular_liquidacion_v2: {e}", "logs_bcm.txt")
         return jsonify({"ok": False, "error": str(e)}), 500
 
-#Scraper de las liquidaciones a la otra web de colegio de abogados
-# Funciones auxiliares
-def human_delay(min_seconds=0.5, max_seconds=2.0):
-    delay = random.uniform(min_seconds, max_seconds)
-    time.sleep(delay)
-
-def move_mouse_randomly(page):
-    page.mouse.move(
-        random.randint(100, 500),
-        random.randint(100, 500)
-    )
-
-def scroll_randomly(page):
-    page.evaluate("window.scrollBy(0, {})".format(random.randint(100, 300)))
-    human_delay(0.3, 1.0)
-
-
 @forms_bp.route('/forms/calcular_liquidacion', methods=['POST'])
 def calcular_liquidacion():
     data = request.json
@@ -2290,6 +1324,9 @@ def calcular_liquidacion():
         fecha_origen = datetime.strptime(fecha_origen_str, "%d/%m/%Y")
         fecha_liquidacion = datetime.strptime(fecha_liquidacion_str, "%d/%m/%Y")
 
+        from playwright.sync_api import sync_playwright
+        from utils.tribunales_scraper import human_delay, move_mouse_randomly, scroll_randomly, parse_resultado_html
+
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
 
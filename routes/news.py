@@ -6,6 +6,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models import NewsModel, TagModel
 from utils.decorators import token_required, access_required
+from utils.db_routing import read_replica
 from flask_jwt_extended import jwt_required
 from sqlalchemy import desc, asc, func
 
@@ -212,6 +213,7 @@ def create_news():
 
 
 @news_bp.route('/news', methods=['GET'])
+@read_replica
 def get_all_news():
     """Get all news with pagination and ordering by latest."""
     try:
@@ -260,6 +262,7 @@ def get_all_news():
 
 
 @news_bp.route('/news/<uuid>', methods=['GET'])
+@read_replica
 def get_news(uuid):
     """Get a single news entry by UUID."""
     try:
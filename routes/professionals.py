@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models.professional import ProfessionalModel
 from utils.decorators import token_required, access_required
+from utils.db_routing import read_replica
 from flask_jwt_extended import jwt_required
 from sqlalchemy import or_
 
@@ -93,6 +94,7 @@ def get_all_professionals():
         return jsonify({'error': str(e)}), 500
 
 @professional_bp.route('/public/professionals', methods=['GET'])
+@read_replica
 def get_public_professionals():
     try:
         page = request.args.get('page', 1, type=int)
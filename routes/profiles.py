@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models import ProfileModel, AccessModel
 from utils.decorators import token_required, access_required
+from utils.principal_cache import invalidate_all
 from flask_jwt_extended import jwt_required
 
 profile_bp = Blueprint('profile_bp', __name__)
@@ -107,6 +108,7 @@ def update_profile(uuid):
         profile.name = data.get('name', profile.name).lower()
         profile.description = data.get('description', profile.description)
         db.session.commit()
+        invalidate_all()
         return jsonify({'message': 'Profile updated successfully'}), 200
     return jsonify({'message': 'Profile not found'}), 404
 
@@ -119,6 +121,8 @@ def delete_profile(uuid):
     if profile:
         profile.deleted_at = datetime.utcnow()
         db.session.commit()
+        # Los usuarios con este perfil pierden sus permisos
+        invalidate_all()
         return jsonify({'message': 'Profile deleted successfully'}), 200
     return jsonify({'message': 'Profile not found'}), 404
 
@@ -139,6 +143,8 @@ def set_accesses(uuid_profile):
     if accesses:
         profile.accesses = accesses
         db.session.commit()
+        # Cambian los permisos de todos los usuarios con este perfil
+        invalidate_all()
         # return jsonify({'message': 'Accesses assigned successfully'}), 200
         return jsonify(profile.to_json()), 200
     else:
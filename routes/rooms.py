@@ -2,47 +2,44 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models.room import RoomModel
 from utils.decorators import token_required, access_required
+from utils.db_routing import read_replica
+from utils.permissions import can_access_room, room_access_required
 from datetime import datetime
 import os
 import uuid
 
 rooms_bp = Blueprint('rooms', __name__)
 
+def _requested_room_type():
+    return request.args.get('room_type', 'coworking').strip().lower()
+
 @rooms_bp.route('/rooms', methods=['GET'])
+@read_replica
 def get_active_rooms():
     """Public/Private: returns active rooms filtered by room_type."""
     room_type = request.args.get('room_type')
     
     # Check if authorization token is provided
     token = request.headers.get('Authorization')
-    user = None
+    principal = None
     if token:
         try:
-            from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+            from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+            from utils.decorators import load_principal
             verify_jwt_in_request()
-            email = get_jwt_identity()
-            from models import UserModel
-            user = UserModel.query.filter_by(email=email).first()
+            claims = get_jwt()
+            principal, _ = load_principal(get_jwt_identity(), claims.get('iat'))
+            if principal and claims.get('tv', principal.token_version) != principal.token_version:
+                principal = None  # token revocado
         except Exception:
             pass
 
     # If room_type is meeting, verify 'book_meeting_rooms' permission
     if room_type == 'meeting':
-        if not user:
+        if not principal:
             return jsonify({'message': 'Authorization token required for meeting rooms'}), 401
         
-        has_access = False
-        for profile in user.profiles:
-            if profile.name.lower() == 'dev':
-                has_access = True
-                break
-            for access in profile.accesses:
-                if access.name == 'book_meeting_rooms':
-                    has_access = True
-                    break
-            if has_access:
-                break
-        if not has_access:
+        if not can_access_room(principal, 'book', 'meeting'):
             return jsonify({'message': 'Access denied for meeting rooms'}), 403
             
         try:
@@ -69,25 +66,10 @@ def get_active_rooms():
 
 @rooms_bp.route('/rooms/all', methods=['GET'])
 @token_required
+@room_access_required('view', room_type=_requested_room_type)
 def get_all_rooms():
     """Backoffice: returns all rooms of a type (active and inactive)."""
-    room_type = request.args.get('room_type', 'coworking').strip().lower()
-    
-    required_permission = 'view_rooms' if room_type == 'coworking' else 'view_meeting_rooms'
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name == required_permission:
-                has_access = True
-                break
-        if has_access:
-            break
-            
-    if not has_access:
-        return jsonify({'message': 'Access denied'}), 403
+    room_type = _requested_room_type()
 
     try:
         rooms = RoomModel.query.filter(
@@ -115,20 +97,7 @@ def create_room():
     if room_type not in ['coworking', 'meeting']:
         return jsonify({'error': 'Invalid room type'}), 400
 
-    required_permission = 'manage_rooms' if room_type == 'coworking' else 'manage_meeting_rooms'
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name == required_permission:
-                has_access = True
-                break
-        if has_access:
-            break
-            
-    if not has_access:
+    if not can_access_room(request.principal, 'manage', room_type):
         return jsonify({'message': 'Access denied'}), 403
 
     try:
@@ -169,20 +138,7 @@ def update_room(room_id):
     if not room:
         return jsonify({'error': 'Room not found'}), 404
 
-    required_permission = 'manage_rooms' if room.room_type == 'coworking' else 'manage_meeting_rooms'
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name == required_permission:
-                has_access = True
-                break
-        if has_access:
-            break
-            
-    if not has_access:
+    if not can_access_room(request.principal, 'manage', room.room_type):
         return jsonify({'message': 'Access denied'}), 403
 
     data = request.json
@@ -231,20 +187,7 @@ def delete_room(room_id):
     if not room:
         return jsonify({'error': 'Room not found'}), 404
 
-    required_permission = 'manage_rooms' if room.room_type == 'coworking' else 'manage_meeting_rooms'
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name == required_permission:
-                has_access = True
-                break
-        if has_access:
-            break
-            
-    if not has_access:
+    if not can_access_room(request.principal, 'manage', room.room_type):
         return jsonify({'message': 'Access denied'}), 403
 
     try:
@@ -258,23 +201,9 @@ def delete_room(room_id):
 
 @rooms_bp.route('/rooms/upload-image', methods=['POST'])
 @token_required
+@room_access_required('manage')
 def upload_room_image():
     """Upload an image for a coworking or meeting room."""
-    has_access = False
-    for profile in request.user.profiles:
-        if profile.name.lower() == 'dev':
-            has_access = True
-            break
-        for access in profile.accesses:
-            if access.name in ['manage_rooms', 'manage_meeting_rooms']:
-                has_access = True
-                break
-        if has_access:
-            break
-            
-    if not has_access:
-        return jsonify({'message': 'Access denied'}), 403
-
     if 'image' not in request.files:
         return jsonify({'error': 'No image file provided'}), 400
 
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from config.config import db
 from models import UserModel, ProfileModel
 from utils.decorators import token_required, access_required
+from utils.principal_cache import invalidate_identity
 from flask_jwt_extended import jwt_required
 
 users_bp = Blueprint('users_bp', __name__)
@@ -72,6 +73,7 @@ def set_profiles(uuid_user):
     profiles = ProfileModel.query.filter(ProfileModel.uuid.in_(profiles_uuids), ProfileModel.deleted_at == None).all()
     user.profiles = profiles
     db.session.commit()
+    invalidate_identity(user.email)
     return jsonify({'message': 'Profiles assigned successfully'}), 200
 
 @users_bp.route('/users/<uuid_user>/profiles', methods=['GET'])
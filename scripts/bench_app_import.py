@@ -0,0 +1,124 @@
+"""
+Mide cuánto tarda en importarse la aplicación (lo que paga cada worker de gunicorn al
+arrancar) y la memoria residente que queda, usando `python -X importtime` en un proceso
+nuevo por corrida. Lista los módulos que más tiempo acumulan y avisa si alguna de las
+dependencias pesadas (reportlab, PIL, qrcode, playwright, mercadopago...) se cargó en el
+arranque.
+
+Con --save se guarda el resultado en JSON; con --compare se compara contra uno guardado y
+el script termina con código 1 si el tiempo o la RSS empeoraron más que --tolerance.
+
+Uso:
+  python scripts/bench_app_import.py
+  python scripts/bench_app_import.py --module routes.forms --runs 5
+  python scripts/bench_app_import.py --save import_baseline.json
+  python scripts/bench_app_import.py --compare import_baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['reportlab', 'PIL', 'qrcode', 'playwright', 'mercadopago', 'bs4', 'pandas', 'numpy']
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import psutil
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss": psutil.Process().memory_info().rss,
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+'''
+
+
+def run_once(module):
+    code = CHILD.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        error = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError('\n'.join(error[-5:]))
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, raw_name = line.split(':', 1)[1].split('|')
+        name = raw_name.strip()
+        # Cada nivel de anidamiento suma dos espacios; se guardan los primeros niveles
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        if depth <= 2:
+            modules[name] = max(modules.get(name, 0), int(cumulative_us))
+    result['modules'] = modules
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', default='app', help='Módulo a importar (por defecto app)')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--save', help='Guardar el resultado en este JSON')
+    parser.add_argument('--compare', help='JSON guardado con --save para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        try:
+            runs.append(run_once(args.module))
+        except RuntimeError as e:
+            print(f'No se pudo importar {args.module}:\n{e}')
+            return 2
+
+    seconds = statistics.median(r['seconds'] for r in runs)
+    rss = statistics.median(r['rss'] for r in runs)
+    modules = runs[-1]['modules']
+
+    print(f'import {args.module}: {seconds * 1000:.0f} ms (mediana de {args.runs}), RSS {rss / 1e6:.1f} MB')
+    print('\nMódulos con más tiempo acumulado:')
+    for name, us in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f'  {us / 1000:8.1f} ms  {name}')
+    heavy = runs[-1]['heavy']
+    print(f'\nDependencias pesadas cargadas al importar: {", ".join(heavy) if heavy else "ninguna"}')
+
+    summary = {'module': args.module, 'seconds': seconds, 'rss': rss, 'heavy': heavy}
+    if args.save:
+        with open(args.save, 'w') as handle:
+            json.dump(summary, handle, indent=2)
+        print(f'Guardado en {args.save}')
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = []
+        for key, label in (('seconds', 'tiempo'), ('rss', 'RSS')):
+            change = (summary[key] - baseline[key]) / baseline[key]
+            print(f'{label}: {change:+.1%} respecto de {args.compare}')
+            if change > args.tolerance:
+                regressions.append(label)
+        new_heavy = sorted(set(heavy) - set(baseline.get('heavy', [])))
+        if new_heavy:
+            print(f'Nuevas dependencias pesadas en el arranque: {", ".join(new_heavy)}')
+            regressions.append('dependencias')
+        if regressions:
+            print(f'Regresión: {", ".join(regressions)}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Benchmark de GET autenticados (jwt_required + token_required + access_required) con y sin
+la caché de principals (utils/principal_cache.py).
+
+Usa una base SQLite temporal y el test client de Flask. Con --db-latency-ms se suma una
+espera por consulta para simular el viaje de red hasta MySQL, que es lo que ahorra la caché.
+
+Uso:
+  python scripts/bench_auth_cache.py
+  python scripts/bench_auth_cache.py --requests 5000 --profiles 3 --accesses 30 --db-latency-ms 0.5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify, request
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+import utils.decorators as decorators
+from utils import principal_cache as pc
+from utils.decorators import token_required, access_required
+
+
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+def build_app(path, args):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = 'bench-secret-key-with-enough-bytes'
+    db.init_app(app)
+    JWTManager(app)
+
+    @app.route('/protected')
+    @jwt_required()
+    @token_required
+    @access_required('target_access')
+    def protected():
+        return jsonify({'uuid': request.user.uuid})
+
+    with app.app_context():
+        from models import UserModel, ProfileModel, AccessModel
+        db.create_all()
+        profiles = []
+        for p in range(args.profiles):
+            accesses = [AccessModel(uuid=f'a-{p}-{a}', name=f'access_{p}_{a}') for a in range(args.accesses)]
+            profiles.append(ProfileModel(uuid=f'p-{p}', name=f'profile_{p}', accesses=accesses))
+        # El acceso pedido está en el último perfil: peor caso para el recorrido anidado
+        profiles[-1].accesses.append(AccessModel(uuid='a-target', name='target_access'))
+        db.session.add(UserModel(uuid='u-bench', name='Bench', email='bench@example.com',
+                                 password='x', profiles=profiles))
+        db.session.commit()
+        token = create_access_token(identity='bench@example.com')
+
+        if args.db_latency_ms:
+            delay = args.db_latency_ms / 1000
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def _latency(*_):
+                time.sleep(delay)
+    return app, {'Authorization': f'Bearer {token}'}
+
+
+def run(app, headers, ttl, count):
+    cache = pc.PrincipalCache(ttl=ttl)
+    decorators.principal_cache = cache
+    queries = [0]
+    with app.app_context():
+        engine = db.engine
+
+    def _count(*_):
+        queries[0] += 1
+    event.listen(engine, 'before_cursor_execute', _count)
+    client = app.test_client()
+    try:
+        client.get('/protected', headers=headers)  # calentamiento
+        queries[0] = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            response = client.get('/protected', headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, 'before_cursor_execute', _count)
+    return count / elapsed, elapsed / count * 1000, queries[0] / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--profiles', type=int, default=2)
+    parser.add_argument('--accesses', type=int, default=15, help='accesos por perfil')
+    parser.add_argument('--db-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, headers = build_app(os.path.join(tmp, 'bench.db'), args)
+        print(f'{args.requests} GET, {args.profiles} perfiles x {args.accesses} accesos, '
+              f'latencia simulada {args.db_latency_ms} ms/consulta')
+        for label, ttl in (('sin caché', 0), ('con caché', 60)):
+            rps, ms, qpr = run(app, headers, ttl, args.requests)
+            print(f'  {label:10s} {rps:9.0f} req/s  {ms:7.3f} ms/req  {qpr:5.2f} consultas/req')
+
+
+if __name__ == '__main__':
+    main()
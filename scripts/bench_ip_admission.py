@@ -0,0 +1,136 @@
+"""
+Benchmark de latencia de before_request (check_ip_block) ante una ráfaga de IPs nuevas.
+
+Levanta un servidor de geolocalización lento que imita a ipinfo.io y compara el modo
+síncrono (consulta BD + HTTP con el lock tomado) contra la admisión no bloqueante con
+enriquecimiento en segundo plano.
+
+Uso:
+  python scripts/bench_ip_admission.py
+  python scripts/bench_ip_admission.py --ips 200 --threads 32 --geo-delay 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request, abort
+
+from config.config import db
+from models.ip_manager import IPRegistry
+from models.blocked_region import BlockedRegion
+from utils.ip_manager_cache import IPCacheManager
+
+
+def start_slow_geo_server(delay):
+    class SlowGeoHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({
+                'country': 'AR',
+                'city': 'Mendoza',
+                'continent': 'SA',
+                'as_name': 'Bench ISP',
+                'as_domain': 'bench.example',
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowGeoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_app(db_path, async_geo):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        IPRegistry.__table__.create(db.engine, checkfirst=True)
+        BlockedRegion.__table__.create(db.engine, checkfirst=True)
+
+    manager = IPCacheManager()
+    manager.ASYNC_GEO = async_geo
+    manager.SYNC_INTERVAL = 10 ** 9
+    manager.init_app(app)
+
+    # Misma lógica que app.check_ip_block
+    @app.before_request
+    def check_ip_block():
+        client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
+        if client_ip:
+            client_ip = client_ip.split(',')[0].strip()
+        if manager.check_blocked(client_ip):
+            abort(403)
+
+    return app, manager
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_burst(app, n_ips, threads, offset):
+    def one_request(i):
+        ip = f'10.{offset}.{i // 256}.{i % 256}'
+        with app.test_request_context('/api/news', headers={'X-Forwarded-For': ip}):
+            start = time.perf_counter()
+            app.preprocess_request()
+            return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one_request, range(n_ips)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia de before_request con IPs nuevas')
+    parser.add_argument('--ips', type=int, default=100, help='IPs nuevas en la ráfaga')
+    parser.add_argument('--threads', type=int, default=16, help='Peticiones concurrentes')
+    parser.add_argument('--geo-delay', type=float, default=0.1, help='Demora del servidor de geolocalización (s)')
+    args = parser.parse_args()
+
+    server = start_slow_geo_server(args.geo_delay)
+    os.environ['IPINFO_TOKEN'] = 'bench'
+    os.environ['IPINFO_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+
+    print(f'{args.ips} IPs nuevas, {args.threads} hilos, geolocalización {args.geo_delay * 1000:.0f} ms')
+    print(f'{"modo":<10} {"p50 ms":>10} {"p95 ms":>10} {"p99 ms":>10} {"max ms":>10} {"total s":>10}')
+
+    for offset, (label, async_geo) in enumerate([('sync', False), ('async', True)]):
+        with tempfile.TemporaryDirectory() as tmp:
+            app, manager = build_app(os.path.join(tmp, 'bench.db'), async_geo)
+            start = time.perf_counter()
+            latencies = run_burst(app, args.ips, args.threads, offset)
+            total = time.perf_counter() - start
+            if async_geo:
+                manager.geo_queue.join()
+            ms = [v * 1000 for v in latencies]
+            print(
+                f'{label:<10} {percentile(ms, 50):>10.2f} {percentile(ms, 95):>10.2f} '
+                f'{percentile(ms, 99):>10.2f} {max(ms):>10.2f} {total:>10.2f}'
+            )
+            with app.app_context():
+                db.engine.dispose()
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
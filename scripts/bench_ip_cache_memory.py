@@ -0,0 +1,120 @@
+"""
+Benchmark de memoria de la caché de IPs: compara el RSS de N IPs con el layout anterior
+(dict de dicts armado desde IPRegistry.to_dict()) contra IPRecordStore con IPRecord (__slots__).
+
+Cada layout se mide en un subproceso propio para que no se contaminen entre sí.
+
+Uso:
+  python scripts/bench_ip_cache_memory.py
+  python scripts/bench_ip_cache_memory.py --ips 200000
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+COUNTRIES = ['AR', 'US', 'BR', 'CL', 'DE', 'CN', 'NL', 'FR']
+CITIES = ['Mendoza', 'Ashburn', 'São Paulo', 'Santiago', 'Frankfurt', 'Beijing', 'Amsterdam', 'Paris']
+PROVIDERS = ['Telecom Argentina', 'Amazon.com', 'Google LLC', 'DigitalOcean', 'Hetzner', 'OVH SAS']
+
+
+class FakeRow:
+    """Imita una fila de IPRegistry leída de BD: cada valor es un objeto nuevo, como los arma el driver."""
+
+    def __init__(self, i, now):
+        self.ip = f'{(i >> 24) & 255}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}'
+        self.last_seen = now - timedelta(seconds=i)
+        self.requests_minute = i % 7
+        self.requests_month = i % 500
+        self.is_blocked = False
+        self.last_minute_reset = now - timedelta(seconds=i % 60)
+        self.last_month_reset = now - timedelta(days=i % 28)
+        self.pais = ''.join(COUNTRIES[i % len(COUNTRIES)])
+        self.ciudad = ''.join(CITIES[i % len(CITIES)])
+        self.continente = ''.join(['SA', 'NA', 'EU'][i % 3])
+        self.proveedor = ''.join(PROVIDERS[i % len(PROVIDERS)])
+        self.dominio_proveedor = PROVIDERS[i % len(PROVIDERS)].split()[0].lower() + '.com'
+
+    def to_dict(self):
+        return {
+            'ip': self.ip,
+            'last_seen': self.last_seen.isoformat(),
+            'requests_minute': self.requests_minute,
+            'requests_month': self.requests_month,
+            'is_blocked': self.is_blocked,
+            'pais': self.pais,
+            'ciudad': self.ciudad,
+            'continente': self.continente,
+            'proveedor': self.proveedor,
+            'dominio_proveedor': self.dominio_proveedor
+        }
+
+
+def build_dict_layout(n, now):
+    # Igual que el antiguo IPCacheManager._load_regions
+    cache = {}
+    for i in range(n):
+        ip_record = FakeRow(i + 16777216, now)
+        data = ip_record.to_dict()
+        data['last_seen'] = datetime.fromisoformat(data['last_seen'])
+        data['last_minute_reset'] = ip_record.last_minute_reset
+        data['last_month_reset'] = ip_record.last_month_reset
+        cache[ip_record.ip] = {'record': data, 'dirty': False, 'new': False}
+    return cache
+
+
+def build_slots_layout(n, now):
+    from utils.ip_manager_cache import IPRecord, IPRecordStore
+
+    store = IPRecordStore(max_entries=n)
+    for i in range(n):
+        record = IPRecord.from_model(FakeRow(i + 16777216, now))
+        store.put(record.ip, record)
+    return store
+
+
+def measure(layout, n):
+    if layout == 'slots':
+        # Importar antes de la medición para no contar el costo de los módulos
+        import utils.ip_manager_cache  # noqa: F401
+    process = psutil.Process()
+    gc.collect()
+    before = process.memory_info().rss
+    builder = build_dict_layout if layout == 'dict' else build_slots_layout
+    cache = builder(n, datetime.utcnow())
+    gc.collect()
+    after = process.memory_info().rss
+    print(after - before, len(cache))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSS de la caché de IPs por layout')
+    parser.add_argument('--ips', type=int, default=100000, help='Cantidad de IPs')
+    parser.add_argument('--layout', choices=['dict', 'slots'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        measure(args.layout, args.ips)
+        return
+
+    print(f'{args.ips} IPs')
+    results = {}
+    for layout in ('dict', 'slots'):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--ips', str(args.ips), '--layout', layout],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        results[layout] = int(out[0])
+        print(f'{layout:<6} {results[layout] / 1024 / 1024:>8.1f} MB  ({results[layout] / args.ips:.0f} bytes/IP)')
+    print(f'ahorro: {(1 - results["slots"] / results["dict"]) * 100:.0f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark de la base local de geolocalización: arma una base sintética con N rangos
+y mide el tiempo por consulta y la memoria del proceso tras abrirla.
+
+Uso:
+  python scripts/bench_ip_geo_db.py
+  python scripts/bench_ip_geo_db.py --ranges 1000000 --lookups 200000
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from utils.ip_geo_db import GeoRangeDB, build_geo_db
+
+COUNTRIES = ['AR', 'BR', 'US', 'DE', 'CN', 'RU', 'NL', 'FR', 'GB', 'JP']
+
+
+def synthetic_rows(n, rng):
+    step = (2 ** 32) // n
+    for i in range(n):
+        start = i * step
+        end = start + rng.randint(0, step - 1)
+        fields = {
+            'pais': rng.choice(COUNTRIES),
+            'ciudad': f'Ciudad {rng.randint(1, 2000)}',
+            'continente': 'Desconocido',
+            'proveedor': f'AS{rng.randint(1, 5000)} Example',
+            'dominio_proveedor': 'Desconocido',
+        }
+        yield ipaddress.IPv4Address(start), ipaddress.IPv4Address(end), fields
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ranges', type=int, default=500000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    process = psutil.Process()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'geo.db')
+        start = time.perf_counter()
+        build_geo_db(synthetic_rows(args.ranges, rng), path)
+        print(f'Construcción: {time.perf_counter() - start:.1f}s, {os.path.getsize(path) / 1e6:.1f} MB')
+
+        rss_before = process.memory_info().rss
+        start = time.perf_counter()
+        db = GeoRangeDB(path)
+        print(f'Apertura: {(time.perf_counter() - start) * 1e3:.2f} ms, '
+              f'RSS +{(process.memory_info().rss - rss_before) / 1e6:.1f} MB')
+
+        ips = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(args.lookups)]
+        hits = 0
+        start = time.perf_counter()
+        for ip_address in ips:
+            if db.lookup(ip_address) is not None:
+                hits += 1
+        elapsed = time.perf_counter() - start
+        print(f'{args.lookups} consultas en {elapsed:.2f}s: {elapsed / args.lookups * 1e6:.2f} µs/consulta '
+              f'({hits} aciertos)')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
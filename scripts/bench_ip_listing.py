@@ -0,0 +1,88 @@
+"""
+Benchmark del listado de /dev/ips: copia y orden completo de la caché (implementación
+anterior) contra el índice por last_seen con paginación por cursor.
+
+Uso:
+  python scripts/bench_ip_listing.py
+  python scripts/bench_ip_listing.py --sizes 10000 100000 --limit 100
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ip_manager_cache import IPCacheManager, IPRecord, IPRecordStore
+
+COUNTRIES = ['AR', 'BR', 'US', 'DE', 'CN', 'RU', 'NL', 'FR']
+PROVIDERS = ['Telecom Argentina S.A.', 'Google LLC', 'Amazon.com, Inc.', 'DigitalOcean, LLC', 'Claro']
+
+
+def build_manager(size, rng):
+    manager = IPCacheManager()
+    manager.ip_cache = IPRecordStore(size)
+    start = datetime.utcnow() - timedelta(days=1)
+    for i in range(size):
+        record = IPRecord(f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}', start + timedelta(seconds=rng.random() * 86400))
+        record.pais = rng.choice(COUNTRIES)
+        record.proveedor = rng.choice(PROVIDERS)
+        record.is_blocked = rng.random() < 0.01
+        manager.ip_cache.put(record.ip, record)
+    return manager
+
+
+def legacy_listing(manager):
+    with manager.lock:
+        ips = [record.to_dict() for record in manager.ip_cache.values()]
+    ips.sort(key=lambda x: x['last_seen'], reverse=True)
+    return ips
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    for size in args.sizes:
+        manager = build_manager(size, rng)
+        _, _, cursor = manager.list_recent(limit=size // 2)
+        records = list(manager.ip_cache.values())
+
+        def touch():
+            record = rng.choice(records)
+            with manager.lock:
+                record.last_seen = datetime.utcnow()
+                manager.ip_cache.reindex(record)
+
+        print(f'--- {size} IPs ---')
+        print(f'  anterior (copia + sort):        {timed(lambda: legacy_listing(manager)):8.2f} ms')
+        print(f'  primera página:                 {timed(lambda: manager.list_recent(limit=args.limit)):8.2f} ms')
+        print(f'  página a mitad del índice:      '
+              f'{timed(lambda: manager.list_recent(limit=args.limit, cursor=cursor)):8.2f} ms')
+        print(f'  filtro pais=AR:                 '
+              f'{timed(lambda: manager.list_recent(limit=args.limit, pais="AR")):8.2f} ms')
+        print(f'  filtro blocked=true:            '
+              f'{timed(lambda: manager.list_recent(limit=args.limit, blocked=True)):8.2f} ms')
+        start = time.perf_counter()
+        for _ in range(10000):
+            touch()
+        print(f'  actualización del índice:       {(time.perf_counter() - start) / 10000 * 1e6:8.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark del matcher de rangos CIDR: consultas por segundo con N prefijos cargados.
+
+Uso:
+  python scripts/bench_ip_ranges.py
+  python scripts/bench_ip_ranges.py --prefixes 50000 --lookups 500000
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from utils.ip_range_matcher import RangeMatcher
+
+
+def random_prefixes(n, rng):
+    prefixes = []
+    for _ in range(n):
+        if rng.random() < 0.8:
+            prefixlen = rng.randint(12, 28)
+            network = ipaddress.IPv4Network((rng.getrandbits(32), prefixlen), strict=False)
+        else:
+            prefixlen = rng.randint(29, 64)
+            network = ipaddress.IPv6Network((rng.getrandbits(128), prefixlen), strict=False)
+        prefixes.append(str(network))
+    return prefixes
+
+
+def random_ips(n, rng):
+    ips = []
+    for _ in range(n):
+        if rng.random() < 0.8:
+            ips.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+        else:
+            ips.append(str(ipaddress.IPv6Address(rng.getrandbits(128))))
+    return ips
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Consultas/s del matcher CIDR')
+    parser.add_argument('--prefixes', type=int, default=50000)
+    parser.add_argument('--lookups', type=int, default=300000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    prefixes = random_prefixes(args.prefixes, rng)
+    ips = random_ips(args.lookups, rng)
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    matcher = RangeMatcher(prefixes)
+    build = time.perf_counter() - start
+    rss_after = process.memory_info().rss
+
+    match_ip = matcher.match_ip
+    hits = 0
+    start = time.perf_counter()
+    for ip in ips:
+        if match_ip(ip):
+            hits += 1
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.prefixes} prefijos ({matcher.v4.size} IPv4, {matcher.v6.size} IPv6)')
+    print(f'compilación: {build:.2f}s, {len(matcher.v4.left) + len(matcher.v6.left)} nodos, '
+          f'{(rss_after - rss_before) / 1024 / 1024:.1f} MB')
+    print(f'{args.lookups} consultas en {elapsed:.2f}s: {args.lookups / elapsed:,.0f} consultas/s '
+          f'({elapsed / args.lookups * 1e6:.2f} µs/consulta), {hits} coincidencias')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark del alta de usuarios abogados (MembershipSyncService._provision_lawyer_users) para
+cada modo de LAWYER_PROVISION_HASHING: shared (un hash por corrida), pool (un hash por usuario
+en un ProcessPoolExecutor) y per_user (un hash por usuario en el proceso, como antes).
+
+Cada modo corre sobre una base SQLite nueva con N estados de cuota sin usuario; se informa el
+tiempo total y cuánto de eso fue hashear contraseñas.
+
+Uso:
+  python scripts/bench_lawyer_provisioning.py
+  python scripts/bench_lawyer_provisioning.py --lawyers 2000 --modes shared,pool --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from models.membership_constants import MEMBERSHIP_STATUS_UP_TO_DATE
+from services import membership_sync_service
+from services.membership_sync_service import MembershipSyncService
+
+
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+def build_app(path, lawyers):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        from models import LawyerMembershipStatusModel, ProfileModel
+        db.create_all()
+        db.session.add(ProfileModel(name='lawyer'))
+        db.session.add_all([
+            LawyerMembershipStatusModel(tuition_normalized=str(10000 + i), tuition_display=f'{10 + i // 1000}.{i % 1000:03d}',
+                                        first_name='Nombre', last_name=str(i),
+                                        status=MEMBERSHIP_STATUS_UP_TO_DATE, last_import_uuid='bench')
+            for i in range(lawyers)
+        ])
+        db.session.commit()
+    return app
+
+
+def run(mode, args):
+    original = membership_sync_service.hash_default_passwords
+    hashing = [0.0]
+
+    def timed_hash(*a, **kw):
+        start = time.perf_counter()
+        try:
+            return original(*a, **kw)
+        finally:
+            hashing[0] += time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.lawyers)
+        membership_sync_service.hash_default_passwords = timed_hash
+        try:
+            with app.app_context():
+                start = time.perf_counter()
+                provisioned = MembershipSyncService()._provision_lawyer_users('bench', hashing=mode)
+                elapsed = time.perf_counter() - start
+                db.session.remove()
+                db.engine.dispose()
+        finally:
+            membership_sync_service.hash_default_passwords = original
+    return provisioned, elapsed, hashing[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lawyers', type=int, default=2000)
+    parser.add_argument('--modes', default='shared,pool,per_user')
+    parser.add_argument('--workers', type=int, default=0, help='procesos del modo pool (0 = os.cpu_count())')
+    args = parser.parse_args()
+    if args.workers:
+        os.environ['LAWYER_PROVISION_WORKERS'] = str(args.workers)
+
+    print(f'{args.lawyers} abogados nuevos, {os.cpu_count()} CPUs')
+    for mode in args.modes.split(','):
+        provisioned, elapsed, hashing = run(mode, args)
+        print(f'  {mode:9s} {elapsed:8.2f} s  ({hashing:8.2f} s hasheando, {provisioned} usuarios, '
+              f'{provisioned / elapsed:8.0f} usuarios/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark de /dev/logs/view sobre un log sintético grande: la lectura anterior (f.read() del
+archivo entero) contra los generadores por mmap de utils/log_viewer.py (completo, rango, tail,
+regex y nivel).
+
+Para cada operación informa el tiempo y el pico de RSS del proceso por encima del inicial,
+muestreado cada 5 ms mientras se consume la respuesta.
+
+Uso:
+  python scripts/bench_log_viewer.py
+  python scripts/bench_log_viewer.py --size-mb 500 --keep /tmp/logs_bench.txt --skip-legacy
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import log_viewer
+
+
+def rss_bytes():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class PeakRSS:
+    def __enter__(self):
+        self.base = rss_bytes()
+        self.peak = self.base
+        self.running = True
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        while self.running:
+            self.peak = max(self.peak, rss_bytes())
+            time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def generate(path, size_mb):
+    block = []
+    for i in range(2000):
+        if i % 100 == 42:
+            block.append(f'[2026-10-18 10:{i // 60 % 60:02d}:{i % 60:02d},000] ERROR in bookings: Database Error {i}\n'
+                         'Traceback (most recent call last):\n  File "routes/booking.py", line 120, in create\n'
+                         'sqlalchemy.exc.OperationalError: (2013, Lost connection)\n')
+        else:
+            block.append(f'[2026-10-18 10:{i // 60 % 60:02d}:{i % 60:02d},000] INFO in app: '
+                         f'GET /api/rooms/{i} 200 in 12.{i % 10} ms\n')
+    block = ''.join(block).encode()
+    target = size_mb * 1024 * 1024
+    with open(path, 'wb') as f:
+        written = 0
+        while written < target:
+            f.write(block)
+            written += len(block)
+        # Una sola aparición de la marca buscada, al final
+        f.write(b'[2026-10-18 23:59:59,000] WARNING in auth: needle-7f3a\n')
+
+
+def legacy(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return len(content.encode('utf-8'))
+
+
+def consume(chunks):
+    return sum(len(chunk) for chunk in chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=500)
+    parser.add_argument('--keep', help='ruta donde dejar (o reutilizar) el archivo generado')
+    parser.add_argument('--skip-legacy', action='store_true', help='no medir la lectura completa en memoria')
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.keep
+    if not path:
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, 'logs_bench.txt')
+    if not os.path.exists(path):
+        generate(path, args.size_mb)
+    size = os.path.getsize(path)
+
+    operations = [
+        ('completo (mmap)', lambda: consume(log_viewer.stream_bytes(path))),
+        ('Range 10 MB del medio', lambda: consume(log_viewer.stream_bytes(path, size // 2, size // 2 + 10 * 1024 * 1024))),
+        ('tail=1000', lambda: consume(log_viewer.stream_tail(path, 1000))),
+        ('regex needle', lambda: consume(log_viewer.stream_filtered(path, log_viewer.compile_filter('needle-7f3a')))),
+        ('level=ERROR tail=100', lambda: consume(log_viewer.stream_filtered(path, None, logging.ERROR, tail=100))),
+    ]
+    if not args.skip_legacy:
+        operations.insert(0, ('f.read() anterior', lambda: legacy(path)))
+
+    print(f'archivo de {size / 1024 / 1024:.0f} MB')
+    try:
+        for label, operation in operations:
+            with PeakRSS() as rss:
+                start = time.perf_counter()
+                sent = operation()
+                elapsed = time.perf_counter() - start
+            print(f'  {label:24s} {elapsed:7.2f} s  {sent / 1024 / 1024:8.1f} MB enviados  '
+                  f'pico RSS +{(rss.peak - rss.base) / 1024 / 1024:7.1f} MB')
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark del costo de logger.info en el hilo que loguea: handlers directos en el logger
+(LOG_ASYNC=false) contra el pipeline asíncrono de utils/log_pipeline.py.
+
+Usa los handlers reales de utils/logging_config.py (archivo diario + difusión SSE / caché de
+6 horas) sobre un directorio temporal. Para el modo asíncrono informa también cuánto tarda el
+listener en vaciar la cola y cuántos registros se descartaron.
+
+Uso:
+  python scripts/bench_logging.py
+  python scripts/bench_logging.py --calls 200000 --queue-size 10000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logging_config
+from utils.log_pipeline import LogPipeline
+from utils.log_store import recent_logs
+
+
+def build_handlers(log_dir):
+    file_handler = logging_config.DailyRotatingFileHandler(log_dir)
+    file_handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s in %(module)s: %(message)s'))
+    sse_handler = logging_config.QueueHandler()
+    sse_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    return file_handler, sse_handler
+
+
+def run(mode, args):
+    recent_logs.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_handler, sse_handler = build_handlers(tmp)
+        logger = logging.getLogger(f'bench.{mode}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        pipeline = None
+        if mode == 'async':
+            pipeline = LogPipeline([file_handler, sse_handler], queue_size=args.queue_size)
+            logger.addHandler(pipeline.handler)
+        else:
+            logger.addHandler(file_handler)
+            logger.addHandler(sse_handler)
+
+        start = time.perf_counter()
+        for i in range(args.calls):
+            logger.info('GET /api/rooms/%s 200 in %.2f ms', i, 1.5)
+        caller = time.perf_counter() - start
+
+        drain = 0.0
+        stats = {}
+        if pipeline is not None:
+            drain_start = time.perf_counter()
+            pipeline.stop(timeout=120)
+            drain = time.perf_counter() - drain_start
+            stats = pipeline.stats()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        file_handler.close()
+    return caller / args.calls * 1e6, caller + drain, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50000)
+    parser.add_argument('--queue-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f'{args.calls} llamadas a logger.info, cola de {args.queue_size}')
+    for mode in ('sync', 'async'):
+        us, total, stats = run(mode, args)
+        extra = ''
+        if stats:
+            extra = (f'  descartados {stats["dropped"]}, {stats["batches"]} lotes, '
+                     f'{stats["flushes"]} flushes, profundidad máx {stats["max_depth"]}')
+        print(f'  {mode:6s} {us:7.2f} µs/llamada en el hilo del request  (total con vaciado {total:6.2f} s){extra}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark de POST /login concurrentes con cada modo de utils/login_bookkeeping.py
+(sync = UPDATE + commit en el request, deferred = buffer + UPDATE por lotes, off).
+
+Usa una base SQLite en archivo, varios hilos con el test client de Flask y contraseñas con
+pocas iteraciones de pbkdf2 para que el costo del hash no tape la escritura. Con
+--db-latency-ms se suma una espera por consulta para simular el viaje de red hasta MySQL.
+
+Uso:
+  python scripts/bench_login.py
+  python scripts/bench_login.py --threads 16 --users 500 --logins 4000 --db-latency-ms 0.5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request
+from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+from werkzeug.security import generate_password_hash
+
+from config.config import db
+from services import auth_service
+from utils.login_bookkeeping import LoginBookkeeper
+
+
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+def build_app(path, args):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30, 'check_same_thread': False}}
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = 'bench-secret-key-with-enough-bytes'
+    db.init_app(app)
+    JWTManager(app)
+
+    @app.route('/login', methods=['POST'])
+    def login():
+        data = request.json
+        return auth_service.login(data['tuition_or_email'], data['password'])
+
+    with app.app_context():
+        from models import UserModel
+        db.create_all()
+        password = generate_password_hash('secret', method=f'pbkdf2:sha256:{args.hash_iterations}')
+        db.session.add_all([
+            UserModel(uuid=f'u-{i}', name=f'User {i}', email=f'user{i}@example.com', password=password)
+            for i in range(args.users)
+        ])
+        db.session.commit()
+
+        if args.db_latency_ms:
+            delay = args.db_latency_ms / 1000
+
+            @event.listens_for(db.engine, 'before_cursor_execute')
+            def _latency(*_):
+                time.sleep(delay)
+    return app
+
+
+def run(app, mode, args):
+    bookkeeper = LoginBookkeeper()
+    bookkeeper.mode = mode
+    bookkeeper.init_app(app)
+    auth_service.login_bookkeeper = bookkeeper
+    per_thread = args.logins // args.threads
+    failures = []
+
+    def worker(n):
+        client = app.test_client()
+        for i in range(per_thread):
+            user = (n * per_thread + i) % args.users
+            response = client.post('/login', json={'tuition_or_email': f'user{user}@example.com', 'password': 'secret'})
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    flush_start = time.perf_counter()
+    bookkeeper.flush()
+    flush_ms = (time.perf_counter() - flush_start) * 1000
+    total = per_thread * args.threads
+    return total / elapsed, elapsed / total * 1000, flush_ms, len(failures), bookkeeper.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--logins', type=int, default=2000)
+    parser.add_argument('--hash-iterations', type=int, default=1000)
+    parser.add_argument('--db-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args)
+        print(f'{args.logins} logins, {args.threads} hilos, {args.users} usuarios, '
+              f'latencia simulada {args.db_latency_ms} ms/consulta')
+        for mode in ('sync', 'deferred', 'off'):
+            rps, ms, flush_ms, failures, stats = run(app, mode, args)
+            print(f'  {mode:9s} {rps:8.0f} logins/s  {ms:7.3f} ms/login  '
+                  f'flush final {flush_ms:6.1f} ms  {stats["batches"]} lotes / {stats["flushed"]} filas  errores {failures}')
+
+
+if __name__ == '__main__':
+    main()
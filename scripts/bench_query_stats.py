@@ -0,0 +1,103 @@
+"""
+Benchmark del costo por consulta de la instrumentación SQL de utils/query_stats.py: la misma
+consulta sobre SQLite en memoria sin listeners, con listeners fuera de una request y con
+listeners dentro de una request (acumulando por huella). Informa también el costo de calcular
+una huella nueva y el de una que ya está en la caché.
+
+Uso:
+  python scripts/bench_query_stats.py
+  python scripts/bench_query_stats.py --queries 20000 --rounds 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from utils import query_stats as query_stats_module
+from utils.query_stats import QueryStats, fingerprint
+
+STATEMENT = (
+    'SELECT bookings.id, bookings.room_id, bookings.booking_date, bookings.user_email '
+    'FROM bookings WHERE bookings.room_id = ? AND bookings.booking_date = ? AND bookings.status IN (?, ?)'
+)
+
+
+def per_query(conn, queries):
+    statement = text('SELECT id FROM bookings WHERE room_id = :room_id')
+    for i in range(200):
+        conn.execute(statement, {'room_id': i}).all()
+    start = time.perf_counter()
+    for i in range(queries):
+        conn.execute(statement, {'room_id': i}).all()
+    return (time.perf_counter() - start) / queries
+
+
+def listeners(stats, add):
+    for name in ('before_cursor_execute', 'after_cursor_execute'):
+        (event.listen if add else event.remove)(Engine, name, getattr(stats, f'_{name}'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=7, help='se informa la mejor ronda de cada variante')
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE bookings (id INTEGER PRIMARY KEY, room_id INTEGER)'))
+        conn.execute(text('INSERT INTO bookings (room_id) VALUES (1), (2), (3)'))
+
+    stats = QueryStats(slow_query_ms=10_000, header=False)
+    app = Flask(__name__)
+    base = outside = inside = float('inf')
+    # Rondas alternadas: la variación de la máquina es mayor que el costo que se quiere medir
+    for _ in range(args.rounds):
+        with engine.connect() as conn:
+            base = min(base, per_query(conn, args.queries))
+        listeners(stats, True)
+        try:
+            with engine.connect() as conn:
+                outside = min(outside, per_query(conn, args.queries))
+                with app.test_request_context('/'):
+                    stats._before_request()
+                    inside = min(inside, per_query(conn, args.queries))
+                    stats._local.current = None
+        finally:
+            listeners(stats, False)
+    print(f'sin listeners:              {base * 1e6:7.1f} µs/consulta')
+    print(f'con listeners, sin request: {outside * 1e6:7.1f} µs/consulta  (+{(outside - base) * 1e6:.1f} µs)')
+    print(f'con listeners, en request:  {inside * 1e6:7.1f} µs/consulta  (+{(inside - base) * 1e6:.1f} µs)')
+
+    listener_calls = args.queries * 10
+    with app.test_request_context('/'):
+        stats._before_request()
+        context = type('Context', (), {})()
+        start = time.perf_counter()
+        for _ in range(listener_calls):
+            stats._before_cursor_execute(None, None, STATEMENT, None, context, False)
+            stats._after_cursor_execute(None, None, STATEMENT, None, context, False)
+        print(f'listeners solos (before+after): {(time.perf_counter() - start) / listener_calls * 1e6:.2f} µs')
+
+    calls = 20000
+    start = time.perf_counter()
+    for i in range(calls):
+        query_stats_module._fingerprints.clear()
+        fingerprint(STATEMENT)
+    cold = (time.perf_counter() - start) / calls
+    start = time.perf_counter()
+    for i in range(calls):
+        fingerprint(STATEMENT)
+    warm = (time.perf_counter() - start) / calls
+    print(f'huella nueva: {cold * 1e6:.1f} µs, huella en caché: {warm * 1e6:.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
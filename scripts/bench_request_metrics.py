@@ -0,0 +1,94 @@
+"""
+Benchmark del costo por request de las métricas de utils/request_metrics.py: la misma app de
+Flask con y sin los hooks, atendida con el test client, más el costo aislado de registrar una
+observación y de armar /dev/metrics.
+
+Uso:
+  python scripts/bench_request_metrics.py
+  python scripts/bench_request_metrics.py --requests 20000 --endpoints 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify
+
+from utils.request_metrics import RequestMetrics
+
+
+def build_app(metrics):
+    app = Flask(__name__)
+
+    @app.route('/items/<int:item_id>')
+    def item(item_id):
+        return jsonify({'id': item_id})
+
+    if metrics is not None:
+        metrics.init_app(app)
+    return app
+
+
+def per_request(app, requests):
+    client = app.test_client()
+    for i in range(200):
+        client.get(f'/items/{i}')
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get(f'/items/{i}')
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=5, help='se informa la mejor ronda de cada variante')
+    parser.add_argument('--endpoints', type=int, default=30, help='endpoints distintos para el snapshot')
+    args = parser.parse_args()
+
+    plain_app = build_app(None)
+    metrics_app = build_app(RequestMetrics())
+    base = with_metrics = float('inf')
+    # Rondas alternadas para que el ruido de la máquina afecte a las dos variantes por igual
+    for _ in range(args.rounds):
+        base = min(base, per_request(plain_app, args.requests))
+        with_metrics = min(with_metrics, per_request(metrics_app, args.requests))
+    print(f'sin métricas:  {base * 1e6:8.1f} µs/request')
+    print(f'con métricas:  {with_metrics * 1e6:8.1f} µs/request  (+{(with_metrics - base) * 1e6:.1f} µs)')
+
+    # Los tres hooks solos, dentro de un contexto de request: el test client tiene más ruido
+    # que el costo que se quiere medir
+    metrics = RequestMetrics()
+    app = build_app(metrics)
+    calls = args.requests * 10
+    with app.test_request_context('/items/1'):
+        response = Response('{}', mimetype='application/json')
+        start = time.perf_counter()
+        for _ in range(calls):
+            metrics._before_request()
+            metrics._after_request(response)
+        print(f'hooks before+after: {(time.perf_counter() - start) / calls * 1e6:.2f} µs')
+
+    metrics = RequestMetrics()
+    start = time.perf_counter()
+    for i in range(calls):
+        metrics.start('items')
+        metrics.observe('items', 200, 0.0005 * (i % 100), 0, 512)
+        metrics.finish('items')
+    print(f'start+observe+finish: {(time.perf_counter() - start) / calls * 1e6:.2f} µs')
+
+    for e in range(args.endpoints):
+        for status in (200, 404, 500):
+            metrics.observe(f'endpoint_{e}', status, 0.01)
+    for label, render in (('to_json', metrics.to_json), ('to_prometheus', metrics.to_prometheus)):
+        start = time.perf_counter()
+        for _ in range(100):
+            render()
+        print(f'{label} ({args.endpoints * 3 + 1} series): {(time.perf_counter() - start) / 100 * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
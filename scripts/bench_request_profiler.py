@@ -0,0 +1,96 @@
+"""
+Benchmark del perfilado de requests de utils/request_profiler.py: costo de los hooks cuando no
+hay token ni reglas, y cuánto se alarga una request con muchas llamadas a funciones (como armar
+un PDF o un código de barras) perfilada con cProfile y con el muestreo de stacks.
+
+Uso:
+  python scripts/bench_request_profiler.py
+  python scripts/bench_request_profiler.py --requests 20 --work-ms 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from utils.request_profiler import RequestProfiler
+
+
+def checksum(values):
+    total = 0
+    for value in values:
+        total = (total * 31 + value) % 1_000_003
+    return total
+
+
+def build_app(profiler, work_calls):
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'bench-secret-key-with-enough-bytes'
+
+    @app.route('/work')
+    def work():
+        return str(sum(checksum(range(i % 50)) for i in range(work_calls)))
+
+    profiler.init_app(app)
+    return app
+
+
+def timed(client, requests, headers_for):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/work', headers=headers_for())
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--work-ms', type=float, default=50, help='duración aproximada de la request sin perfilar')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = RequestProfiler(tmp)
+        profiler.max_files = 10 ** 6
+
+        calls = 1000
+        app = build_app(profiler, calls)
+        with app.test_request_context('/work'):
+            response = app.response_class('ok')
+            hook_calls = 50000
+            start = time.perf_counter()
+            for _ in range(hook_calls):
+                profiler._before_request()
+                profiler._after_request(response)
+            print(f'hooks sin token ni reglas: {(time.perf_counter() - start) / hook_calls * 1e6:.2f} µs/request')
+
+        # Ajustar el trabajo de la vista a --work-ms
+        client = app.test_client()
+        per_call = timed(client, 3, dict) / calls
+        app = build_app(profiler, max(1, int(args.work_ms / 1000 / per_call)))
+        client = app.test_client()
+
+        def token_headers(mode):
+            def headers():
+                with app.app_context():
+                    return {'X-Profile': profiler.issue_token(mode)}
+            return headers
+
+        base = timed(client, args.requests, dict)
+        print(f'sin perfilar:    {base * 1000:8.1f} ms/request')
+        for mode in ('sample', 'cprofile'):
+            profiled = timed(client, args.requests, token_headers(mode))
+            print(f'{mode:<15}: {profiled * 1000:8.1f} ms/request  (x{profiled / base:.2f})')
+        sizes = {}
+        for profile in profiler.list_profiles():
+            sizes.setdefault(profile['mode'], []).append(profile['size'])
+        for mode, values in sizes.items():
+            print(f'archivo {mode}: {sum(values) / len(values) / 1024:.1f} KB promedio')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de la salud por worker de utils/worker_health.py: costo de tomar una muestra (con y
+sin USS), de publicarla en el segmento compartido y de armar el reporte de /dev/workers con
+todos los slots ocupados por procesos reales.
+
+Uso:
+  python scripts/bench_worker_health.py
+  python scripts/bench_worker_health.py --workers 8 --slots 32
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.worker_health import WorkerHealth
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def run_worker(path, slots, ready, done):
+    health = WorkerHealth(path=path, slots=slots, interval=1)
+    health.start()
+    ready.set()
+    done.wait(60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='procesos que publican en el segmento')
+    parser.add_argument('--slots', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'health')
+        health = WorkerHealth(path=path, slots=args.slots, interval=3600)
+        health.start()
+
+        health.collect_uss = True
+        print(f'muestra con USS:   {per_call(health.sample, args.calls) * 1e6:8.1f} µs')
+        health.collect_uss = False
+        print(f'muestra sin USS:   {per_call(health.sample, args.calls) * 1e6:8.1f} µs')
+        values = health.sample()
+        print(f'escritura en slot: {per_call(lambda: health.segment.write(health.slot, values), args.calls * 50) * 1e6:8.2f} µs')
+
+        context = multiprocessing.get_context('fork')
+        done = context.Event()
+        processes = []
+        for _ in range(args.workers):
+            ready = context.Event()
+            process = context.Process(target=run_worker, args=(path, args.slots, ready, done))
+            process.start()
+            processes.append(process)
+            ready.wait(30)
+        try:
+            report = per_call(health.report, args.calls)
+            workers = len(health.report()['workers'])
+            print(f'reporte /dev/workers ({workers} workers, {args.slots} slots): {report * 1e3:.2f} ms')
+        finally:
+            done.set()
+            for process in processes:
+                process.join(30)
+        health.stop()
+        size = os.path.getsize(path)
+        print(f'tamaño del segmento: {size} bytes')
+
+
+if __name__ == '__main__':
+    main()
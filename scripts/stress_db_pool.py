@@ -0,0 +1,174 @@
+"""
+Prueba de estrés del pool de conexiones con la carga de create_booking: cada request busca la
+sala, revisa la idempotencia, busca solapamientos por cada email (titular y acompañantes),
+revisa la capacidad de cada horario e inserta una reserva por horario, todo en la misma
+sesión, así que la conexión queda tomada durante todas esas consultas.
+
+Corre sobre SQLite con InstrumentedQueuePool y agrega una latencia fija por consulta para
+simular la ida y vuelta a MySQL. Con más hilos que pool_size + max_overflow y una conexión
+tomada más tiempo que pool_timeout, aparecen los TimeoutError de pool agotado; el reporte
+muestra los contadores de utils/pool_metrics.py para cada configuración.
+
+Uso:
+  python scripts/stress_db_pool.py
+  python scripts/stress_db_pool.py --threads 32 --requests 200 --latency-ms 5 --pools 5/0,10/10,20/20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from utils.pool_metrics import InstrumentedQueuePool, pool_stats
+
+SLOTS = ['09:00', '10:00', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00']
+
+
+# models/news.py usa LONGTEXT de MySQL; en SQLite es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+def build_app(path, pool_size, max_overflow, pool_timeout, latency):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_pre_ping': True,
+        'connect_args': {'timeout': 30, 'check_same_thread': False},
+    }
+    db.init_app(app)
+    with app.app_context():
+        engine = db.engine
+
+        @event.listens_for(engine, 'connect')
+        def _wal(dbapi_connection, connection_record):
+            dbapi_connection.execute('PRAGMA journal_mode=WAL')
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _network(conn, cursor, statement, parameters, context, executemany):
+            # Ida y vuelta simulada a MySQL; sleep libera el GIL como lo haría el socket
+            time.sleep(latency)
+
+        from models import RoomModel
+        db.create_all()
+        db.session.add(RoomModel(name='Coworking', capacity=1000, price=0, room_type='coworking'))
+        db.session.commit()
+    return app
+
+
+def book(app, i, companions=1, slots=3):
+    """Una reserva con el mismo patrón de consultas que create_booking."""
+    from models import BookingModel, RoomModel
+
+    with app.app_context():
+        try:
+            room = RoomModel.query.filter_by(id=1, deleted_at=None).first()
+            key = uuid.uuid4().hex
+            BookingModel.query.filter(BookingModel.idempotency_key.like(f'{key}_%')).all()
+            room = RoomModel.query.filter_by(id=1, deleted_at=None).first()
+            booking_date = date(2026, 11, 1 + i % 28)
+            time_slots = [SLOTS[(i + k) % len(SLOTS)] for k in range(slots)]
+            for email in [f'user{i}@example.com'] + [f'guest{i}-{c}@example.com' for c in range(companions)]:
+                BookingModel.query.filter(
+                    db.func.lower(BookingModel.user_email) == email,
+                    BookingModel.booking_date == booking_date,
+                    BookingModel.time_slot.in_(time_slots),
+                ).all()
+            for slot in time_slots:
+                BookingModel.query.filter(
+                    BookingModel.room_id == room.id,
+                    BookingModel.booking_date == booking_date,
+                    BookingModel.time_slot == slot,
+                ).all()
+            for slot in time_slots:
+                db.session.add(BookingModel(
+                    room_id=room.id, booking_date=booking_date, time_slot=slot, user_name=f'User {i}',
+                    user_email=f'user{i}@example.com', user_phone='0', user_tuition='T', attendees=1,
+                    idempotency_key=f'{key}_{slot}',
+                ))
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def run(pool_size, max_overflow, pool_timeout, threads, requests, latency):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'stress.db'), pool_size, max_overflow, pool_timeout, latency)
+        pool_stats.reset()
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+
+        def one(i):
+            start = time.perf_counter()
+            try:
+                book(app, i)
+            except PoolTimeoutError:
+                with lock:
+                    failures.append(i)
+                return
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(one, range(requests)))
+        elapsed = time.perf_counter() - start
+        with app.app_context():
+            snapshot = pool_stats.snapshot(db.engine.pool)
+            db.engine.dispose()
+    latencies.sort()
+    return {
+        'ok': len(latencies),
+        'timeouts': len(failures),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+        'pool': snapshot,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16, help='requests concurrentes (hilos del worker)')
+    parser.add_argument('--requests', type=int, default=120)
+    parser.add_argument('--latency-ms', type=float, default=5, help='latencia simulada por consulta')
+    parser.add_argument('--pool-timeout', type=int, default=1, help='segundos enteros (engine_from_config usa int())')
+    parser.add_argument('--pools', default='5/0,10/10', help='configuraciones pool_size/max_overflow')
+    args = parser.parse_args()
+
+    for config in args.pools.split(','):
+        pool_size, max_overflow = (int(value) for value in config.split('/'))
+        result = run(pool_size, max_overflow, args.pool_timeout, args.threads, args.requests, args.latency_ms / 1000)
+        pool = result['pool']
+        p95 = f"{result['p95_ms']:.0f}" if result['p95_ms'] is not None else '-'
+        print(
+            f"pool {pool_size}/{max_overflow}: {result['ok']} ok, {result['timeouts']} TimeoutError, "
+            f"{result['throughput']:.1f} reservas/s, p95 {p95} ms | "
+            f"espera media {pool['wait_mean_ms']} ms (máx {pool['wait_max_ms']}), "
+            f"conexión tomada {pool['held_mean_ms']} ms, conexiones abiertas {pool['connects']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
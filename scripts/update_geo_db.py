@@ -0,0 +1,63 @@
+"""
+Regenera la base local de geolocalización (IP_GEO_DB_PATH) a partir de un dump CSV.
+
+Acepta columnas `start_ip,end_ip` o `network` (CIDR) más los campos de ipinfo
+(country, city, continent, as_name, as_domain). El archivo se reemplaza de forma atómica,
+así que se puede correr con la aplicación levantada: los workers toman la versión nueva
+en la siguiente verificación (como mucho un minuto).
+
+Uso:
+  python scripts/update_geo_db.py --csv dump.csv
+  python scripts/update_geo_db.py --url https://ejemplo/ip_country_asn.csv.gz --output data/ip_geo.db
+"""
+
+import argparse
+import gzip
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from dotenv import load_dotenv
+
+from utils.ip_geo_db import build_geo_db, rows_from_csv
+
+
+def open_source(args):
+    if args.csv:
+        if args.csv.endswith('.gz'):
+            return io.TextIOWrapper(gzip.open(args.csv, 'rb'), encoding='utf-8', newline='')
+        return open(args.csv, encoding='utf-8', newline='')
+
+    response = requests.get(args.url, timeout=300)
+    response.raise_for_status()
+    content = response.content
+    if args.url.endswith('.gz') or content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    return io.StringIO(content.decode('utf-8'), newline='')
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='Ruta al CSV (puede estar comprimido con gzip)')
+    source.add_argument('--url', help='URL desde donde descargar el CSV')
+    parser.add_argument('--output', default=os.getenv('IP_GEO_DB_PATH'),
+                        help='Archivo de salida (por defecto IP_GEO_DB_PATH)')
+    args = parser.parse_args()
+
+    if not args.output:
+        parser.error('Indicar --output o configurar IP_GEO_DB_PATH')
+
+    start = time.perf_counter()
+    with open_source(args) as handle:
+        count = build_geo_db(rows_from_csv(handle), args.output)
+    print(f'{count} rangos escritos en {args.output} ({time.perf_counter() - start:.1f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Login y revocación de tokens.
+
+El token lleva en el claim 'tv' la users.token_version del momento del login; token_required
+rechaza los tokens cuyo 'tv' no coincide con la versión actual, así que revocar todas las
+sesiones de un usuario es incrementar ese contador. La escritura de auth_token y
+token_expiration_date la maneja utils/login_bookkeeping.py (diferida por defecto).
+"""
+
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from config.config import db
+from models import UserModel
+from utils.login_bookkeeping import login_bookkeeper
+from utils.principal_cache import invalidate_identity
+from utils.tuition_utils import find_professional_by_tuition
+
+TOKEN_LIFETIME = timedelta(days=1)
+TOKEN_VERSION_CLAIM = 'tv'
+
+
+def find_login_user(email_or_tuition):
+    # First try to find user by email directly (handles emails and special usernames like admin, dev, etc.)
+    user = UserModel.query.filter_by(email=email_or_tuition, deleted_at=None).first()
+    if user:
+        return user
+
+    # Check if it matches a professional's tuition/enrollment number (stripping dots and spaces)
+    professional = find_professional_by_tuition(str(email_or_tuition))
+    if professional and professional.uuid_user:
+        return UserModel.query.filter_by(uuid=professional.uuid_user, deleted_at=None).first()
+    return None
+
+
+def login(email_or_tuition, password):
+    """Retorna (body, status) con el mismo formato que tenía /login."""
+    user = find_login_user(email_or_tuition)
+    if user is None or not user.check_password(password):
+        return {'error': 'Invalid email, tuition or password'}, 401
+
+    additional_claims = {
+        "timestamp": datetime.utcnow().timestamp(),
+        TOKEN_VERSION_CLAIM: user.token_version or 0,
+    }
+    access_token = create_access_token(identity=user.email, expires_delta=TOKEN_LIFETIME, additional_claims=additional_claims)
+    login_bookkeeper.record(user, access_token, datetime.utcnow() + TOKEN_LIFETIME)
+
+    body = user.to_json_login()
+    body['auth_token'] = access_token
+    return body, 200
+
+
+def revoke_tokens(user):
+    """Invalida todos los tokens emitidos hasta ahora para el usuario (hace commit)."""
+    user.token_version = (user.token_version or 0) + 1
+    db.session.commit()
+    # Después del commit: una carga del principal anterior a esto no vuelve a la caché
+    invalidate_identity(user.email)
@@ -0,0 +1,385 @@
+"""
+Bootstrap de la base: creación de tablas, migraciones puntuales y datos iniciales
+(accesos, perfiles, salas y configuraciones).
+
+Se ejecuta una sola vez con `flask --app app bootstrap`. Al terminar se guarda en
+system_configs la huella del "seed manifest" (datos por defecto + esquema de los modelos);
+al arrancar, cada worker compara esa huella con la del código y solo vuelve a correr el
+bootstrap si algo cambió (o si APP_AUTO_BOOTSTRAP=false, avisa y sigue sin correrlo).
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from contextlib import nullcontext
+
+import click
+from sqlalchemy import inspect
+
+from config.config import db
+
+# Subir cuando cambie la lógica del bootstrap sin que cambien los datos del manifest
+BOOTSTRAP_VERSION = 1
+FINGERPRINT_KEY = 'seed_manifest_fingerprint'
+
+DEFAULT_ACCESSES = {
+    'view_news': 'Ver sección de noticias',
+    'manage_news': 'Publicar, editar y eliminar noticias',
+    'view_trainings': 'Ver sección de capacitaciones',
+    'manage_trainings': 'Crear, editar y eliminar capacitaciones',
+    'view_tags': 'Ver categorías de noticias/capacitaciones',
+    'manage_tags': 'Crear, editar y eliminar categorías',
+    'view_edicts': 'Ver sección de edictos',
+    'manage_edicts': 'Crear, editar y eliminar edictos',
+    'view_professionals': 'Ver directorio de profesionales',
+    'manage_professionals': 'Crear, editar y eliminar profesionales',
+    'view_rates': 'Ver sección de tasas',
+    'manage_rates': 'Crear, editar y eliminar tasas',
+    'view_receipts': 'Ver historial de recibos',
+    'manage_receipts': 'Descargar y gestionar recibos',
+    'view_revenue': 'Ver dashboard de ingresos',
+    'manage_revenue': 'Gestionar datos del dashboard de ingresos',
+    'view_lawyer_payments': 'Ver historial de pagos de membresías',
+    'manage_lawyer_payments': 'Registrar pagos de membresías',
+    'view_collection_admin': 'Ver administrador de cobros de membresías',
+    'manage_collection_admin': 'Modificar valores y ver reportes de deudores',
+    'view_integrantes': 'Ver sección nosotros/integrantes',
+    'manage_integrantes': 'Crear, editar y eliminar integrantes',
+    'book_rooms': 'Reservar salas de coworking',
+    'view_rooms': 'Ver gestión de salas coworking',
+    'manage_rooms': 'Crear, editar y eliminar salas de coworking',
+    'book_meeting_rooms': 'Reservar salas de reuniones',
+    'view_meeting_rooms': 'Ver gestión de salas de reuniones',
+    'manage_meeting_rooms': 'Crear, editar y eliminar salas de reuniones',
+    'view_membership_sync': 'Ver historial de sincronización de cuotas',
+    'manage_membership_sync': 'Sincronizar cuotas desde Excel/Sheets',
+}
+
+DEFAULT_LAWYER_ACCESSES = [
+    'view_news',
+    'view_trainings',
+    'view_tags',
+    'view_professionals',
+    'view_rates',
+    'view_receipts',
+    'view_integrantes',
+    'view_lawyer_payments',
+    'manage_lawyer_payments',
+    'book_rooms',
+    'book_meeting_rooms'
+]
+
+ADMIN_PROFILES = ['Admin', 'Administrador']
+
+INITIAL_ROOMS = [
+    {
+        'name': 'Sala de Reuniones Ejecutiva',
+        'capacity': 10,
+        'price': 1500.0,
+        'image': '/meeting_room_exec.png',
+        'description': 'Ideal para reuniones de directorio, negociaciones, conciliaciones o presentaciones corporativas. Ambiente climatizado y privado.',
+        'amenities': [
+            'Mesa de directorio para 10 pers.',
+            'Pantalla Smart TV 55"',
+            'Wi-Fi Simétrico de Alta Velocidad',
+            'Cámara para Videoconferencias'
+        ],
+        'room_type': 'meeting'
+    },
+    {
+        'name': 'SUM / Auditorio Multiuso',
+        'capacity': 30,
+        'price': 3000.0,
+        'image': '/auditorium_sum.png',
+        'description': 'Perfecto para capacitaciones, charlas informativas, asambleas o talleres grupales. Mobiliario modular configurable.',
+        'amenities': [
+            'Capacidad de hasta 30 personas',
+            'Proyector HD & Pantalla Gigante',
+            'Sistema de Audio & Micrófonos',
+            'Wi-Fi de Alta Velocidad'
+        ],
+        'room_type': 'meeting'
+    },
+    {
+        'name': 'Box de Enfoque Individual',
+        'capacity': 1,
+        'price': 500.0,
+        'image': '/individual_box.png',
+        'description': 'Espacio optimizado para el trabajo individual concentrado, videollamadas privadas o estudio. Aislado acústicamente.',
+        'amenities': [
+            'Escritorio Individual Amplio',
+            'Wi-Fi de Alta Velocidad',
+            'Ergonomía & Tomas de Carga Directa',
+            'Panel de Absorción Acústica'
+        ],
+        'room_type': 'coworking'
+    },
+]
+
+DEFAULT_CONFIGS = {
+    'disable_membership_validation': 'false'
+}
+
+
+def seed_manifest():
+    """Todo lo que, si cambia, obliga a volver a correr el bootstrap."""
+    import models  # noqa: F401  (registra todas las tablas en la metadata)
+
+    schema = {
+        table.name: sorted(column.name for column in table.columns)
+        for table in db.metadata.sorted_tables
+    }
+    return {
+        'version': BOOTSTRAP_VERSION,
+        'accesses': DEFAULT_ACCESSES,
+        'lawyer_accesses': DEFAULT_LAWYER_ACCESSES,
+        'admin_profiles': ADMIN_PROFILES,
+        'rooms': INITIAL_ROOMS,
+        'configs': DEFAULT_CONFIGS,
+        'schema': schema,
+    }
+
+
+def manifest_fingerprint():
+    payload = json.dumps(seed_manifest(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def stored_fingerprint():
+    """Huella guardada en system_configs, o None si no hay (o la tabla todavía no existe)."""
+    from models.config import SystemConfigModel
+    try:
+        conf = db.session.get(SystemConfigModel, FINGERPRINT_KEY)
+        return conf.value if conf else None
+    except Exception:
+        db.session.rollback()
+        return None
+
+
+def migrate_schema(app):
+    """Retorna False si alguna migración puntual falló."""
+    db.create_all()
+    ok = True
+
+    # DB Schema Migration: Add room_type column to rooms table if it doesn't exist
+    try:
+        columns = {column['name'] for column in inspect(db.engine).get_columns('rooms')}
+        if 'room_type' not in columns:
+            db.session.execute(db.text("ALTER TABLE rooms ADD COLUMN room_type VARCHAR(50) NOT NULL DEFAULT 'coworking'"))
+            db.session.execute(db.text("UPDATE rooms SET room_type = 'meeting' WHERE name LIKE '%Reuniones%' OR name LIKE '%SUM%'"))
+            db.session.commit()
+            app.logger.info("Database migration: Added room_type column to rooms and updated meeting rooms.")
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error executing room_type migration: {e}")
+        ok = False
+
+    # Misma migración que d4e5f6a7b8c9 (professionals.tuition_normalized), por si no se corrió `flask db upgrade`
+    try:
+        from utils.tuition_utils import BACKFILL_TUITION_NORMALIZED_SQL
+        inspector = inspect(db.engine)
+        columns = {column['name'] for column in inspector.get_columns('professionals')}
+        if 'tuition_normalized' not in columns:
+            db.session.execute(db.text("ALTER TABLE professionals ADD COLUMN tuition_normalized VARCHAR(10) NULL"))
+            db.session.execute(db.text(BACKFILL_TUITION_NORMALIZED_SQL))
+            db.session.commit()
+            app.logger.info("Database migration: Added tuition_normalized column to professionals.")
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('professionals')}
+        if 'ix_professionals_tuition_normalized' not in indexes:
+            db.session.execute(db.text("CREATE INDEX ix_professionals_tuition_normalized ON professionals (tuition_normalized)"))
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error executing tuition_normalized migration: {e}")
+        ok = False
+
+    # Misma migración que e5f6a7b8c9d0 (users.token_version)
+    try:
+        columns = {column['name'] for column in inspect(db.engine).get_columns('users')}
+        if 'token_version' not in columns:
+            db.session.execute(db.text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+            db.session.commit()
+            app.logger.info("Database migration: Added token_version column to users.")
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error executing token_version migration: {e}")
+        ok = False
+    return ok
+
+
+def seed_accesses(app):
+    """Retorna ({nombre: AccessModel}, ok)."""
+    from models.access import AccessModel
+
+    db_accesses = {}
+    try:
+        db_accesses = {a.name: a for a in AccessModel.query.all()}
+        for name, desc in DEFAULT_ACCESSES.items():
+            if name not in db_accesses:
+                new_acc = AccessModel(
+                    uuid=str(uuid.uuid4()),
+                    name=name,
+                    description=desc
+                )
+                db.session.add(new_acc)
+                db_accesses[name] = new_acc
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error seeding accesses: {e}")
+        return db_accesses, False
+    return db_accesses, True
+
+
+def seed_profiles(app, db_accesses):
+    from models.profile import ProfileModel
+
+    try:
+        # Seed lawyer profile if missing
+        lawyer_profile = ProfileModel.query.filter_by(name='lawyer').first()
+        if not lawyer_profile:
+            lawyer_profile = ProfileModel(
+                uuid=str(uuid.uuid4()),
+                name='lawyer',
+                description='Rol para Abogados Colegiados'
+            )
+            db.session.add(lawyer_profile)
+            db.session.commit()
+
+        # Give lawyer default accesses
+        for name in DEFAULT_LAWYER_ACCESSES:
+            acc = db_accesses.get(name)
+            if acc and acc not in lawyer_profile.accesses:
+                lawyer_profile.accesses.append(acc)
+
+        # Give Administrators all permissions by default
+        admin_profiles = ProfileModel.query.filter(ProfileModel.name.in_(ADMIN_PROFILES)).all()
+        for ap in admin_profiles:
+            for acc in db_accesses.values():
+                if acc not in ap.accesses:
+                    ap.accesses.append(acc)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error seeding lawyer profile accesses: {e}")
+        return False
+    return True
+
+
+def seed_rooms(app):
+    from models.room import RoomModel
+
+    try:
+        if RoomModel.query.filter(RoomModel.deleted_at.is_(None)).count() == 0:
+            for room in INITIAL_ROOMS:
+                db.session.add(RoomModel(
+                    name=room['name'],
+                    capacity=room['capacity'],
+                    price=room['price'],
+                    image=room['image'],
+                    description=room['description'],
+                    amenities=json.dumps(room['amenities'], ensure_ascii=False),
+                    is_active=True,
+                    room_type=room['room_type']
+                ))
+            db.session.commit()
+            app.logger.info("Seeded initial rooms.")
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error seeding initial rooms: {e}")
+        return False
+    return True
+
+
+def seed_configs(app):
+    from models.config import SystemConfigModel
+
+    try:
+        for k, v in DEFAULT_CONFIGS.items():
+            conf = SystemConfigModel.query.filter_by(key=k).first()
+            if not conf:
+                new_conf = SystemConfigModel(key=k, value=v)
+                db.session.add(new_conf)
+        db.session.commit()
+        app.logger.info("Seeded initial configurations.")
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error seeding configurations: {e}")
+        return False
+    return True
+
+
+def save_fingerprint(fingerprint):
+    from models.config import SystemConfigModel
+
+    conf = db.session.get(SystemConfigModel, FINGERPRINT_KEY)
+    if conf:
+        conf.value = fingerprint
+    else:
+        db.session.add(SystemConfigModel(key=FINGERPRINT_KEY, value=fingerprint))
+    db.session.commit()
+
+
+def run_bootstrap(app, timer=None):
+    """
+    Corre todas las fases y, si todas terminaron bien, guarda la huella. Retorna la huella
+    guardada o None: con alguna fase fallida el próximo arranque vuelve a intentar el bootstrap.
+    Debe llamarse dentro de un app_context.
+    """
+    phase = timer.phase if timer else (lambda name: nullcontext())
+    fingerprint = manifest_fingerprint()
+    with phase('bootstrap.schema'):
+        ok = migrate_schema(app)
+    with phase('bootstrap.accesses'):
+        db_accesses, accesses_ok = seed_accesses(app)
+    with phase('bootstrap.profiles'):
+        profiles_ok = seed_profiles(app, db_accesses)
+    with phase('bootstrap.rooms'):
+        rooms_ok = seed_rooms(app)
+    with phase('bootstrap.configs'):
+        configs_ok = seed_configs(app)
+    if not (ok and accesses_ok and profiles_ok and rooms_ok and configs_ok):
+        app.logger.error("Bootstrap incompleto: no se guarda la huella del seed manifest, se reintenta en el próximo arranque.")
+        return None
+    try:
+        save_fingerprint(fingerprint)
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error saving seed manifest fingerprint: {e}")
+        return None
+    return fingerprint
+
+
+def bootstrap_if_needed(app, timer=None):
+    """
+    Lo que hace cada worker al arrancar: una lectura de system_configs. Retorna True si
+    corrió el bootstrap.
+    """
+    if stored_fingerprint() == manifest_fingerprint():
+        return False
+    if os.getenv('APP_AUTO_BOOTSTRAP', 'true').lower() != 'true':
+        app.logger.warning("La base no está al día con el seed manifest: ejecutar `flask --app app bootstrap`.")
+        return False
+    app.logger.info("Seed manifest cambiado o ausente: ejecutando bootstrap.")
+    if run_bootstrap(app, timer):
+        app.extensions['bootstrap_done'] = True
+    return True
+
+
+def register_commands(app):
+    @app.cli.command('bootstrap')
+    @click.option('--force', is_flag=True, help='Correr aunque la huella guardada coincida.')
+    def bootstrap_command(force):
+        """Crea tablas, aplica migraciones puntuales y carga los datos iniciales."""
+        if app.extensions.get('bootstrap_done') and not force:
+            click.echo('Bootstrap ya ejecutado al cargar la aplicación.')
+            return
+        if not force and stored_fingerprint() == manifest_fingerprint():
+            click.echo('La base ya está al día con el seed manifest (usar --force para repetir).')
+            return
+        fingerprint = run_bootstrap(app)
+        if fingerprint is None:
+            raise click.ClickException('Bootstrap incompleto: revisar el log; la huella no se guardó.')
+        click.echo(f'Bootstrap completo. Huella: {fingerprint[:12]}')
@@ -11,12 +11,15 @@ Flujo:
 
 import csv
 import io
+import multiprocessing
 import os
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Optional
 
 import requests
+from sqlalchemy import insert
 from werkzeug.security import generate_password_hash
 
 from config.config import db
@@ -27,6 +30,7 @@ from models import (
     MembershipSheetImportModel,
     MembershipSheetRowRawModel,
     LawyerMembershipStatusModel,
+    profiles_users,
 )
 from models.membership_constants import (
     IMPORT_STATUS_PROCESSING,
@@ -49,6 +53,7 @@ from utils.tuition_utils import (
     tuition_display_from_raw,
     link_membership_status_uuids,
     find_professional_by_tuition,
+    professionals_by_tuition,
 )
 
 
@@ -58,6 +63,18 @@ DEFAULT_MEMBERSHIP_SHEET_URL = (
     '?format=csv&gid=191760753'
 )
 
+# Hash de la contraseña por defecto de los abogados provisionados (LAWYER_PROVISION_HASHING):
+# - shared: un solo hash por corrida para todos los usuarios nuevos. Todos comparten la misma
+#   contraseña inicial y quedan con must_change_password, así que la sal individual no protege
+#   nada hasta que la cambian (y al cambiarla cada uno recibe su propio hash).
+# - pool: un hash por usuario, repartidos en un ProcessPoolExecutor (LAWYER_PROVISION_WORKERS).
+#   Los procesos se crean con forkserver (spawn donde no existe) y no con fork: el worker de
+#   gunicorn tiene varios hilos (geo, logs, health...) y un hijo forkeado puede heredar sus
+#   locks tomados (logging, pool de SQLAlchemy) y quedar bloqueado.
+# - per_user: un hash por usuario en el proceso actual (comportamiento anterior).
+PROVISION_HASHING_MODES = ('shared', 'pool', 'per_user')
+PROVISION_CHUNK = int(os.getenv('LAWYER_PROVISION_CHUNK', '500'))
+
 
 def _read_csv_rows(content: str) -> List[List[str]]:
     if content.startswith('\ufeff'):
@@ -73,6 +90,30 @@ def _fetch_csv_from_url(url: str) -> str:
     return response.content.decode('utf-8', errors='replace')
 
 
+def _hashing_context():
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def hash_default_passwords(password: str, count: int, mode: Optional[str] = None) -> List[str]:
+    """Retorna `count` hashes de `password` según el modo de LAWYER_PROVISION_HASHING."""
+    mode = (mode or os.getenv('LAWYER_PROVISION_HASHING', 'shared')).lower()
+    if mode not in PROVISION_HASHING_MODES:
+        raise ValueError(f'Modo de hash inválido: {mode}')
+    if count <= 0:
+        return []
+    if mode == 'shared':
+        return [generate_password_hash(password)] * count
+    if mode == 'pool' and count > 1:
+        workers = int(os.getenv('LAWYER_PROVISION_WORKERS', '0')) or os.cpu_count() or 1
+        workers = min(workers, count)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_hashing_context()) as executor:
+            return list(executor.map(
+                generate_password_hash, [password] * count, chunksize=max(1, count // (workers * 4))
+            ))
+    return [generate_password_hash(password) for _ in range(count)]
+
+
 class MembershipSyncService:
     def __init__(self, reference_date=None):
         self.reference_date = reference_date
@@ -120,14 +161,10 @@ class MembershipSyncService:
             ambiguous_count = 0
             blocked_count = 0
 
-            # Cargar todos los profesionales activos en memoria para lookup O(1)
-            all_professionals = ProfessionalModel.query.filter(ProfessionalModel.deleted_at == None).all()
-            prof_by_tuition = {}
-            for prof in all_professionals:
-                if prof.tuition:
-                    key = prof.tuition.replace(' ', '').replace('.', '')
-                    if key not in prof_by_tuition:
-                        prof_by_tuition[key] = prof
+            # Solo los profesionales de las matrículas del archivo, por el índice de tuition_normalized
+            prof_by_tuition = professionals_by_tuition(
+                normalize_tuition(get_row_cell(row, 'mat', column_map)) for row in data_rows
+            )
 
             # Cargar todos los estados de cuota existentes en memoria para lookup O(1)
             all_existing_statuses = LawyerMembershipStatusModel.query.all()
@@ -288,83 +325,88 @@ class MembershipSyncService:
             provision_users=provision_users,
         )
 
-    def _provision_lawyer_users(self, import_uuid: str) -> int:
+    def _provision_lawyer_users(self, import_uuid: str, hashing: Optional[str] = None) -> int:
         default_password = os.getenv('LAWYER_DEFAULT_PASSWORD', 'Colejus2026')
         lawyer_profile = ProfileModel.query.filter_by(name='lawyer', deleted_at=None).first()
         if not lawyer_profile:
             return 0
 
         statuses = LawyerMembershipStatusModel.query.filter_by(last_import_uuid=import_uuid).all()
-        
-        # Pre-cargar usuarios activos
-        all_users = UserModel.query.filter_by(deleted_at=None).all()
-        users_by_email = {u.email.lower(): u for u in all_users if u.email}
-
-        # Pre-cargar profesionales activos
-        all_professionals = ProfessionalModel.query.filter(ProfessionalModel.deleted_at == None).all()
-        prof_by_tuition = {}
-        for p in all_professionals:
-            if p.tuition:
-                key = p.tuition.replace(' ', '').replace('.', '')
-                if key not in prof_by_tuition:
-                    prof_by_tuition[key] = p
-
-        provisioned = 0
-
-        # First pass: create all missing users and add lawyer profiles
+
+        # Pre-cargar solo uuid/email de los usuarios activos (sin instanciar modelos ni sus perfiles)
+        users_by_email = {
+            email.lower(): user_uuid
+            for user_uuid, email in db.session.query(UserModel.uuid, UserModel.email).filter(UserModel.deleted_at.is_(None))
+            if email
+        }
+        with_lawyer_profile = {
+            user_uuid for (user_uuid,) in db.session.query(profiles_users.c.user_uuid)
+            .filter(profiles_users.c.profile_uuid == lawyer_profile.uuid)
+        }
+
+        # Pre-cargar los profesionales de estas matrículas
+        prof_by_tuition = professionals_by_tuition(s.tuition_normalized for s in statuses)
+
+        def find_user_uuid(status_record):
+            # Buscar usuario por email (matrícula normalizada o formato display)
+            user_uuid = users_by_email.get(status_record.tuition_normalized.lower())
+            if not user_uuid and status_record.tuition_display:
+                user_uuid = users_by_email.get(status_record.tuition_display.lower())
+            return user_uuid
+
+        # First pass: collect the missing users and the lawyer profile links
+        new_users = []
+        new_links = []
         for status_record in statuses:
             if status_record.status == MEMBERSHIP_STATUS_AMBIGUOUS:
                 continue
 
             tuition = status_record.tuition_normalized
-            display_name = ' '.join(
-                filter(None, [status_record.first_name, status_record.last_name])
-            ).strip() or f'Matrícula {tuition}'
-
-            # Buscar usuario por email (matrícula normalizada o formato display)
-            user = users_by_email.get(tuition.lower())
-            if not user and status_record.tuition_display:
-                user = users_by_email.get(status_record.tuition_display.lower())
-
-            if not user:
-                user = UserModel()
-                user.uuid = str(uuid.uuid4())
-                user.email = tuition
-                user.name = display_name
-                user.password = generate_password_hash(default_password)
-                user.must_change_password = True
-                user.profiles = [lawyer_profile]
-                db.session.add(user)
-                users_by_email[tuition.lower()] = user
-                provisioned += 1
-            elif lawyer_profile not in user.profiles:
-                user.profiles.append(lawyer_profile)
-
-        # Flush to database so all user uuids are created and exist in the users table
-        db.session.flush()
+            user_uuid = find_user_uuid(status_record)
+            if not user_uuid:
+                user_uuid = str(uuid.uuid4())
+                display_name = ' '.join(
+                    filter(None, [status_record.first_name, status_record.last_name])
+                ).strip() or f'Matrícula {tuition}'
+                new_users.append({
+                    'uuid': user_uuid,
+                    'email': tuition,
+                    'name': display_name,
+                    'must_change_password': True,
+                })
+                users_by_email[tuition.lower()] = user_uuid
+            if user_uuid not in with_lawyer_profile:
+                new_links.append({'user_uuid': user_uuid, 'profile_uuid': lawyer_profile.uuid})
+                with_lawyer_profile.add(user_uuid)
+
+        passwords = hash_default_passwords(default_password, len(new_users), hashing)
+        for row, password in zip(new_users, passwords):
+            row['password'] = password
+
+        # Inserciones por lotes: un executemany por chunk en lugar de un INSERT por usuario
+        for i in range(0, len(new_users), PROVISION_CHUNK):
+            db.session.execute(insert(UserModel), new_users[i:i + PROVISION_CHUNK])
+        for i in range(0, len(new_links), PROVISION_CHUNK):
+            db.session.execute(profiles_users.insert(), new_links[i:i + PROVISION_CHUNK])
 
         # Second pass: link status records and professionals to the users
         for status_record in statuses:
             if status_record.status == MEMBERSHIP_STATUS_AMBIGUOUS:
                 continue
 
-            tuition = status_record.tuition_normalized
-            user = users_by_email.get(tuition.lower())
-            if not user and status_record.tuition_display:
-                user = users_by_email.get(status_record.tuition_display.lower())
-
-            if user:
-                status_record.uuid_user = user.uuid
-                professional = prof_by_tuition.get(tuition)
+            user_uuid = find_user_uuid(status_record)
+            if user_uuid:
+                status_record.uuid_user = user_uuid
+                professional = prof_by_tuition.get(status_record.tuition_normalized)
                 if professional:
                     if not professional.uuid_user:
-                        professional.uuid_user = user.uuid
+                        professional.uuid_user = user_uuid
                     status_record.uuid_professional = professional.uuid
                     db.session.add(professional)
                 db.session.add(status_record)
 
         db.session.commit()
-        return provisioned
+        return len(new_users)
 
 
 def get_user_tuition_normalized(user) -> Optional[str]:
@@ -0,0 +1,108 @@
+"""Tests del bootstrap de la base (seed manifest + huella en system_configs)."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from services import bootstrap_service
+from utils.startup_timer import StartupTimer
+
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestBootstrap(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'boot.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+        bootstrap_service.register_commands(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def test_first_boot_seeds_and_stores_fingerprint(self):
+        from models import AccessModel, ProfileModel, RoomModel
+
+        timer = StartupTimer()
+        self.assertTrue(bootstrap_service.bootstrap_if_needed(self.app, timer))
+        self.assertEqual(AccessModel.query.count(), len(bootstrap_service.DEFAULT_ACCESSES))
+        lawyer = ProfileModel.query.filter_by(name='lawyer').one()
+        self.assertEqual(len(lawyer.accesses), len(bootstrap_service.DEFAULT_LAWYER_ACCESSES))
+        self.assertEqual(RoomModel.query.count(), len(bootstrap_service.INITIAL_ROOMS))
+        self.assertEqual(bootstrap_service.stored_fingerprint(), bootstrap_service.manifest_fingerprint())
+        names = [name for name, _ in timer.phases]
+        self.assertIn('bootstrap.schema', names)
+        self.assertIn('bootstrap.configs', names)
+
+    def test_unchanged_manifest_is_skipped(self):
+        bootstrap_service.bootstrap_if_needed(self.app)
+        with mock.patch.object(bootstrap_service, 'run_bootstrap') as run:
+            self.assertFalse(bootstrap_service.bootstrap_if_needed(self.app))
+            run.assert_not_called()
+
+    def test_manifest_change_triggers_bootstrap(self):
+        from models import AccessModel
+
+        bootstrap_service.bootstrap_if_needed(self.app)
+        accesses = dict(bootstrap_service.DEFAULT_ACCESSES, view_reports='Ver reportes')
+        with mock.patch.object(bootstrap_service, 'DEFAULT_ACCESSES', accesses):
+            self.assertTrue(bootstrap_service.bootstrap_if_needed(self.app))
+        self.assertIsNotNone(AccessModel.query.filter_by(name='view_reports').first())
+
+    def test_failed_phase_does_not_store_fingerprint(self):
+        from models import RoomModel
+
+        # Una sala sin los campos requeridos hace fallar la fase de salas (la captura y la loguea)
+        with mock.patch.object(bootstrap_service, 'INITIAL_ROOMS', [{'name': 'Sala rota'}]):
+            with self.assertLogs(self.app.logger, 'ERROR') as logs:
+                self.assertTrue(bootstrap_service.bootstrap_if_needed(self.app))
+        self.assertTrue(any('Error seeding initial rooms' in line for line in logs.output))
+        self.assertIsNone(bootstrap_service.stored_fingerprint())
+        self.assertNotIn('bootstrap_done', self.app.extensions)
+
+        # El próximo arranque reintenta y esta vez completa
+        self.assertTrue(bootstrap_service.bootstrap_if_needed(self.app))
+        self.assertEqual(RoomModel.query.count(), len(bootstrap_service.INITIAL_ROOMS))
+        self.assertEqual(bootstrap_service.stored_fingerprint(), bootstrap_service.manifest_fingerprint())
+        self.assertFalse(bootstrap_service.bootstrap_if_needed(self.app))
+
+    def test_cli_reports_incomplete_bootstrap(self):
+        with mock.patch.object(bootstrap_service, 'seed_configs', return_value=False):
+            result = self.app.test_cli_runner().invoke(args=['bootstrap'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Bootstrap incompleto', result.output)
+        self.assertIsNone(bootstrap_service.stored_fingerprint())
+
+    def test_auto_bootstrap_disabled(self):
+        with mock.patch.dict(os.environ, {'APP_AUTO_BOOTSTRAP': 'false'}):
+            self.assertFalse(bootstrap_service.bootstrap_if_needed(self.app))
+        self.assertIsNone(bootstrap_service.stored_fingerprint())
+
+    def test_cli_command(self):
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['bootstrap'])
+        self.assertIn('Bootstrap completo', result.output)
+        result = runner.invoke(args=['bootstrap'])
+        self.assertIn('ya está al día', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Tests del ruteo de lecturas a la réplica (utils/db_routing.py) con dos bases SQLite."""
+
+import os
+import tempfile
+import unittest
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from utils.db_routing import PIN_COOKIE, REPLICA_BIND, read_replica, replica_router
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+    def setUp(self):
+        from models import RoomModel
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.primary_path = os.path.join(tmp.name, 'primary.db')
+        self.replica_path = os.path.join(tmp.name, 'replica.db')
+        # Cada base tiene una sala con otro nombre, para saber de cuál leyó cada request
+        for path, name in ((self.primary_path, 'primary'), (self.replica_path, 'replica')):
+            engine = create_engine(f'sqlite:///{path}')
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(RoomModel.__table__.insert(), {'name': name, 'capacity': 1, 'price': 0})
+            engine.dispose()
+
+        replica_router.reset()
+        replica_router.retry_seconds = 30
+        app = self.app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{self.primary_path}'
+        # La réplica se abre en solo lectura: una escritura que llegara ahí fallaría
+        app.config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND: {'url': f'sqlite:///file:{self.replica_path}?mode=ro&uri=true'},
+        }
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(app)
+        replica_router.init_app(app, db)
+        self.addCleanup(self.dispose)
+
+        def names():
+            return [room.name for room in RoomModel.query.order_by(RoomModel.id)]
+
+        @app.route('/rooms', methods=['GET', 'POST'])
+        @read_replica
+        def rooms():
+            return jsonify(names())
+
+        @app.route('/rooms/primary')
+        def rooms_primary():
+            return jsonify(names())
+
+        @app.route('/rooms/create', methods=['POST'])
+        def create_room():
+            db.session.add(RoomModel(name='new', capacity=1, price=0))
+            db.session.commit()
+            return jsonify(names())
+
+        @app.route('/rooms/touch')
+        @read_replica
+        def touch_room():
+            # Lee, escribe y vuelve a leer dentro de la misma vista marcada
+            before = names()
+            db.session.add(RoomModel(name='touched', capacity=1, price=0))
+            db.session.flush()
+            after = names()
+            db.session.commit()
+            return jsonify({'before': before, 'after': after})
+
+        self.client = app.test_client()
+
+    def dispose(self):
+        with self.app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+        # init_app registra una metadata vacía por bind; sin sacarla, el create_all() de los
+        # demás tests (que no tienen réplica) buscaría el bind en su app
+        db.metadatas.pop(REPLICA_BIND, None)
+
+    def test_marked_get_reads_from_replica(self):
+        self.assertEqual(self.client.get('/rooms').get_json(), ['replica'])
+        self.assertEqual(self.client.get('/rooms/primary').get_json(), ['primary'])
+        self.assertEqual(self.client.post('/rooms').get_json(), ['primary'])
+        stats = replica_router.stats()
+        self.assertEqual(stats['replica_reads'], 1)
+        self.assertEqual(stats['failovers'], 0)
+
+    def test_write_in_session_sticks_to_primary(self):
+        response = self.client.get('/rooms/touch')
+        self.assertEqual(response.get_json(), {'before': ['replica'], 'after': ['primary', 'touched']})
+        self.assertIn(PIN_COOKIE, response.headers['Set-Cookie'])
+
+    def test_client_is_pinned_to_primary_after_a_write(self):
+        response = self.client.post('/rooms/create')
+        self.assertEqual(response.get_json(), ['primary', 'new'])
+        self.assertIn(PIN_COOKIE, response.headers['Set-Cookie'])
+        # La réplica todavía no tiene la sala nueva: el mismo cliente debe leer del primario
+        self.assertEqual(self.client.get('/rooms').get_json(), ['primary', 'new'])
+        self.assertEqual(replica_router.stats()['pinned_requests'], 1)
+        # Otro cliente, sin la cookie, sigue leyendo de la réplica
+        self.assertEqual(self.app.test_client().get('/rooms').get_json(), ['replica'])
+        # Las lecturas no renuevan la cookie
+        self.assertNotIn('Set-Cookie', self.client.get('/rooms/primary').headers)
+
+    def test_expired_pin_reads_from_replica_again(self):
+        self.client.set_cookie(PIN_COOKIE, '1')
+        self.assertEqual(self.client.get('/rooms').get_json(), ['replica'])
+        self.client.set_cookie(PIN_COOKIE, 'garbage')
+        self.assertEqual(self.client.get('/rooms').get_json(), ['replica'])
+
+    def test_fails_over_to_primary_when_replica_is_down(self):
+        self.assertEqual(self.client.get('/rooms').get_json(), ['replica'])
+        self.dispose()
+        os.remove(self.replica_path)
+
+        with self.assertLogs('utils.db_routing', 'WARNING'):
+            self.assertEqual(self.client.get('/rooms').get_json(), ['primary'])
+        stats = replica_router.stats()
+        self.assertEqual(stats['failovers'], 1)
+        self.assertFalse(stats['available'])
+        self.assertIn('unable to open database file', stats['last_error'])
+
+        # Durante la ventana de reintento no se vuelve a intentar la conexión
+        self.assertEqual(self.client.get('/rooms').get_json(), ['primary'])
+        self.assertEqual(replica_router.stats()['failovers'], 1)
+
+        # Pasada la ventana, con la réplica de vuelta, las lecturas vuelven a la réplica
+        engine = create_engine(f'sqlite:///{self.replica_path}')
+        db.metadata.create_all(engine)
+        engine.dispose()
+        replica_router.down_until = 0.0
+        self.assertEqual(self.client.get('/rooms').get_json(), [])
+
+    def test_without_replica_decorator_is_a_no_op(self):
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{self.primary_path}'
+        db.init_app(app)
+        replica_router.init_app(app, db)
+        self.addCleanup(replica_router.init_app, self.app, db)
+
+        @app.route('/rooms')
+        @read_replica
+        def rooms():
+            from models import RoomModel
+            return jsonify([room.name for room in RoomModel.query])
+
+        self.assertEqual(app.test_client().get('/rooms').get_json(), ['primary'])
+        self.assertEqual(replica_router.stats()['replica_reads'], 0)
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
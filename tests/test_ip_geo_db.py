@@ -0,0 +1,143 @@
+"""Tests de la base local de geolocalización (rangos ordenados sobre mmap)."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import ip_location
+from utils.ip_geo_db import GeoRangeDB, build_geo_db, rows_from_csv
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SAMPLE_DB = os.path.join(FIXTURES, 'geo_sample.db')
+SAMPLE_CSV = os.path.join(FIXTURES, 'geo_sample.csv')
+
+
+class TestGeoRangeDB(unittest.TestCase):
+    def setUp(self):
+        self.db = GeoRangeDB(SAMPLE_DB)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_ranges(self):
+        self.assertEqual(len(self.db), 6)
+        location = self.db.lookup('190.104.12.34')
+        self.assertEqual(location['pais'], 'AR')
+        self.assertEqual(location['ciudad'], 'Ciudad de Corrientes')
+        self.assertEqual(location['continente'], 'South America')
+        self.assertEqual(location['proveedor'], 'Telecom Argentina S.A.')
+        self.assertEqual(location['dominio_proveedor'], 'telecom.com.ar')
+
+    def test_range_bounds(self):
+        self.assertEqual(self.db.lookup('8.8.8.0')['proveedor'], 'Google LLC')
+        self.assertEqual(self.db.lookup('8.8.8.255')['proveedor'], 'Google LLC')
+        self.assertIsNone(self.db.lookup('8.8.9.0'))
+        self.assertIsNone(self.db.lookup('0.255.255.255'))
+        self.assertIsNone(self.db.lookup('255.255.255.255'))
+        # Hueco dentro del rango de un inicio anterior
+        self.assertIsNone(self.db.lookup('203.0.113.200'))
+
+    def test_ipv6_and_mapped(self):
+        self.assertEqual(self.db.lookup('2001:db8:1::5')['pais'], 'DE')
+        self.assertIsNone(self.db.lookup('2001:db9::1'))
+        self.assertEqual(self.db.lookup('::ffff:1.0.0.1')['pais'], 'AU')
+
+    def test_missing_fields_and_unicode(self):
+        location = self.db.lookup('203.0.113.5')
+        self.assertEqual(location['ciudad'], 'Tōkyō')
+        self.assertEqual(location['dominio_proveedor'], 'Desconocido')
+
+    def test_invalid_ip(self):
+        self.assertIsNone(self.db.lookup('no-es-una-ip'))
+        self.assertIsNone(self.db.lookup(''))
+
+    def test_results_are_independent_copies(self):
+        self.db.lookup('8.8.8.8')['pais'] = 'XX'
+        self.assertEqual(self.db.lookup('8.8.8.8')['pais'], 'US')
+
+    def test_fixture_matches_csv(self):
+        # Si cambia el formato hay que regenerar tests/fixtures/geo_sample.db
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'geo.db')
+            with open(SAMPLE_CSV, encoding='utf-8', newline='') as handle:
+                build_geo_db(rows_from_csv(handle), path)
+            with open(path, 'rb') as built, open(SAMPLE_DB, 'rb') as shipped:
+                self.assertEqual(built.read(), shipped.read())
+
+    def test_network_column(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'lite.csv')
+            with open(csv_path, 'w', encoding='utf-8') as handle:
+                handle.write('network,country,continent,as_name,as_domain\n')
+                handle.write('45.0.0.0/22,BR,South America,Example BR,example.com.br\n')
+                handle.write('invalid,XX,,,\n')
+            db_path = os.path.join(tmp, 'geo.db')
+            with open(csv_path, encoding='utf-8', newline='') as handle:
+                self.assertEqual(build_geo_db(rows_from_csv(handle), db_path), 1)
+            db = GeoRangeDB(db_path)
+            self.assertEqual(db.lookup('45.0.3.255')['pais'], 'BR')
+            self.assertEqual(db.lookup('45.0.3.255')['ciudad'], 'Desconocido')
+            self.assertIsNone(db.lookup('45.0.4.0'))
+            db.close()
+
+    def test_invalid_file(self):
+        with tempfile.NamedTemporaryFile(suffix='.db') as handle:
+            handle.write(b'not a geo database' * 10)
+            handle.flush()
+            with self.assertRaises(ValueError):
+                GeoRangeDB(handle.name)
+
+
+class TestLocalBackend(unittest.TestCase):
+    def setUp(self):
+        ip_location._local_db = None
+
+    def tearDown(self):
+        ip_location._local_db = None
+
+    def test_local_backend_never_calls_http(self):
+        env = {'IP_GEO_BACKEND': 'local', 'IP_GEO_DB_PATH': SAMPLE_DB, 'IPINFO_TOKEN': 'x'}
+        with mock.patch.dict(os.environ, env), \
+                mock.patch.object(ip_location.requests, 'get') as http_get:
+            self.assertEqual(ip_location.get_ip_location('181.0.1.1')['pais'], 'AR')
+            self.assertEqual(ip_location.get_ip_location('9.9.9.9')['pais'], 'Desconocido')
+            http_get.assert_not_called()
+
+    def test_http_fallback_when_configured(self):
+        env = {'IP_GEO_BACKEND': 'local', 'IP_GEO_DB_PATH': SAMPLE_DB,
+               'IP_GEO_HTTP_FALLBACK': 'true', 'IPINFO_TOKEN': 'x'}
+        with mock.patch.dict(os.environ, env), \
+                mock.patch.object(ip_location.requests, 'get') as http_get:
+            http_get.return_value.json.return_value = {'country': 'CH', 'city': 'Zürich'}
+            self.assertEqual(ip_location.get_ip_location('8.8.8.8')['pais'], 'US')
+            http_get.assert_not_called()
+            self.assertEqual(ip_location.get_ip_location('9.9.9.9')['pais'], 'CH')
+            http_get.assert_called_once()
+
+    def test_refresh_replaces_open_db(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'geo.db')
+            with open(SAMPLE_CSV, encoding='utf-8', newline='') as handle:
+                build_geo_db(rows_from_csv(handle), path)
+            env = {'IP_GEO_BACKEND': 'local', 'IP_GEO_DB_PATH': path}
+            with mock.patch.dict(os.environ, env):
+                self.assertEqual(ip_location.get_ip_location('9.9.9.9')['pais'], 'Desconocido')
+                old_db = ip_location._local_db
+
+                csv_path = os.path.join(tmp, 'new.csv')
+                with open(csv_path, 'w', encoding='utf-8') as handle:
+                    handle.write('start_ip,end_ip,country\n9.9.9.0,9.9.9.255,CH\n')
+                with open(csv_path, encoding='utf-8', newline='') as handle:
+                    build_geo_db(rows_from_csv(handle), path)
+                os.utime(path, (time.time() + 5, time.time() + 5))
+
+                ip_location._local_db_checked_at = 0.0
+                self.assertEqual(ip_location.get_ip_location('9.9.9.9')['pais'], 'CH')
+                # La base anterior sigue siendo legible para quien la tenga abierta
+                self.assertEqual(old_db.lookup('8.8.8.8')['pais'], 'US')
+
+
+if __name__ == '__main__':
+    unittest.main()
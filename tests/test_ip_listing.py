@@ -0,0 +1,104 @@
+"""Tests del listado paginado de IPs (índice por last_seen de la caché)."""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from utils.ip_manager_cache import IPCacheManager, IPRecord, IPRecordStore
+
+T0 = datetime(2025, 3, 1, 12, 0, 0)
+
+
+def make_record(i, **fields):
+    record = IPRecord(f'192.0.2.{i}', T0 + timedelta(seconds=i))
+    for name, value in fields.items():
+        setattr(record, name, value)
+    return record
+
+
+class TestIPListing(unittest.TestCase):
+    def setUp(self):
+        self.manager = IPCacheManager()
+        self.manager.ip_cache = IPRecordStore(1000)
+        for i in range(1, 51):
+            record = make_record(
+                i,
+                pais='AR' if i % 2 else 'US',
+                proveedor='Telecom Argentina S.A.' if i % 5 == 0 else 'Google LLC',
+                is_blocked=(i % 10 == 0),
+            )
+            self.manager.ip_cache.put(record.ip, record)
+
+    def collect(self, **filters):
+        ips = []
+        cursor = None
+        while True:
+            items, total, cursor = self.manager.list_recent(limit=7, cursor=cursor, **filters)
+            ips.extend(item['ip'] for item in items)
+            if cursor is None:
+                return ips, total
+
+    def test_pages_follow_last_seen_desc(self):
+        ips, total = self.collect()
+        self.assertEqual(total, 50)
+        self.assertEqual(ips, [f'192.0.2.{i}' for i in range(50, 0, -1)])
+
+    def test_filters(self):
+        ips, total = self.collect(pais='AR', proveedor='telecom')
+        self.assertEqual(ips, [f'192.0.2.{i}' for i in (45, 35, 25, 15, 5)])
+        self.assertEqual(total, 5)
+        ips, total = self.collect(blocked=True)
+        self.assertEqual(total, 5)
+        self.assertEqual(ips[0], '192.0.2.50')
+        _, total = self.collect(blocked=False)
+        self.assertEqual(total, 45)
+
+    def test_reindex_after_new_request(self):
+        record = self.manager.ip_cache.peek('192.0.2.3')
+        record.last_seen = T0 + timedelta(hours=1)
+        self.manager.ip_cache.reindex(record)
+        items, _, _ = self.manager.list_recent(limit=2)
+        self.assertEqual([item['ip'] for item in items], ['192.0.2.3', '192.0.2.50'])
+
+    def test_same_last_seen_is_not_skipped(self):
+        for i in range(51, 56):
+            record = make_record(i)
+            record.last_seen = T0
+            self.manager.ip_cache.put(record.ip, record)
+        ips, total = self.collect()
+        self.assertEqual(len(ips), total)
+        self.assertEqual(len(set(ips)), total)
+
+    def test_eviction_removes_from_index(self):
+        store = IPRecordStore(3)
+        for i in range(1, 6):
+            record = make_record(i)
+            store.put(record.ip, record)
+        self.assertEqual([r.ip for r in store.iter_recent()], ['192.0.2.5', '192.0.2.4', '192.0.2.3'])
+
+    def test_export_is_a_single_snapshot(self):
+        export = self.manager.export_all()
+        self.assertEqual([item['ip'] for item in export], [f'192.0.2.{i}' for i in range(50, 0, -1)])
+
+        # Una IP que se vuelve la más reciente durante la exportación no se pierde ni se repite
+        serialize = IPRecord.to_dict
+
+        def touch_while_serializing(record):
+            if record.ip == '192.0.2.40':
+                moved = self.manager.ip_cache.peek('192.0.2.10')
+                moved.last_seen = T0 + timedelta(hours=1)
+                self.manager.ip_cache.reindex(moved)
+            return serialize(record)
+
+        with mock.patch.object(IPRecord, 'to_dict', autospec=True, side_effect=touch_while_serializing):
+            ips = [item['ip'] for item in self.manager.export_all()]
+        self.assertEqual(len(ips), 50)
+        self.assertEqual(set(ips), {f'192.0.2.{i}' for i in range(1, 51)})
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.manager.list_recent(cursor='yesterday|192.0.2.1')
+
+
+if __name__ == '__main__':
+    unittest.main()
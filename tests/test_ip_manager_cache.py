@@ -0,0 +1,246 @@
+"""Tests de la caché de IPs: admisión provisoria, fusión con la BD, sincronización y desalojo."""
+
+import os
+import queue
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from flask import Flask
+
+from config.config import db
+from models.blocked_region import BlockedRegion
+from models.ip_manager import IPRegistry
+from utils.ip_manager_cache import IPCacheManager, IPRecordStore
+from utils.ip_shared_state import SharedIPState
+
+IP = '198.51.100.7'
+
+
+class IPCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'ips.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+        with self.app.app_context():
+            db.metadata.create_all(db.engine, tables=[IPRegistry.__table__, BlockedRegion.__table__])
+        self.addCleanup(self.dispose)
+
+        # Sin red: la geolocalización no encuentra nada
+        patcher = mock.patch('utils.ip_manager_cache.get_ip_location', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dispose(self):
+        with self.app.app_context():
+            db.engine.dispose()
+
+    def make_manager(self, max_entries=None, shared_path=''):
+        manager = IPCacheManager()
+        manager.GEO_WORKERS = 0  # el enriquecimiento se corre a mano con _enrich_ip
+        if max_entries is not None:
+            manager.ip_cache = IPRecordStore(max_entries)
+        manager.SHARED_STATE_PATH = shared_path
+        manager.init_app(self.app)
+        return manager
+
+    def add_row(self, ip_address, **fields):
+        with self.app.app_context():
+            db.session.add(IPRegistry(ip=ip_address, **fields))
+            db.session.commit()
+
+    def row(self, ip_address):
+        with self.app.app_context():
+            return db.session.get(IPRegistry, ip_address)
+
+    def enrich(self, manager, ip_address):
+        with self.app.app_context():
+            manager._enrich_ip(ip_address)
+
+
+class TestAdmission(IPCacheTestCase):
+    def test_pending_record_merges_counters_with_db_row(self):
+        now = datetime.utcnow()
+        self.add_row(IP, requests_month=40, last_month_reset=now - timedelta(minutes=5),
+                     last_minute_reset=now - timedelta(hours=1), last_seen=now - timedelta(hours=1),
+                     pais='Argentina')
+        manager = self.make_manager()
+        for _ in range(3):
+            manager.track_request(IP)
+        self.assertTrue(manager.ip_cache.peek(IP).pending)
+
+        self.enrich(manager, IP)
+        record = manager.ip_cache.peek(IP)
+        self.assertFalse(record.pending)
+        self.assertFalse(record.new)
+        self.assertTrue(record.dirty)
+        self.assertEqual(record.requests_month, 43)
+        self.assertEqual(record.requests_minute, 3)
+        self.assertEqual(record.pais, 'Argentina')
+
+    def test_unknown_ip_becomes_new(self):
+        manager = self.make_manager()
+        manager.track_request(IP)
+        self.enrich(manager, IP)
+        record = manager.ip_cache.peek(IP)
+        self.assertFalse(record.pending)
+        self.assertTrue(record.new)
+        self.assertEqual(record.requests_month, 1)
+
+    def test_blocked_db_row_overrides_placeholder(self):
+        self.add_row(IP, is_blocked=True)
+        manager = self.make_manager()
+        manager.shared_blocked.clear()  # solo la fila de BD sabe que está bloqueada
+        manager.track_request(IP)
+        self.assertFalse(manager.ip_cache.peek(IP).is_blocked)
+        self.enrich(manager, IP)
+        self.assertTrue(manager.check_blocked(IP))
+
+    def test_ip_blocked_elsewhere_is_rejected_before_enrichment(self):
+        manager = self.make_manager()
+        # Otro worker la bloqueó: llega por el estado compartido antes de que este worker la vea
+        manager.shared_blocked[IP] = True
+        self.assertNotIn(IP, manager.ip_cache)
+        self.assertTrue(manager.check_blocked(IP))
+        self.assertTrue(manager.ip_cache.peek(IP).pending)
+        self.assertFalse(manager.check_blocked('198.51.100.8'))
+
+
+class TestSync(IPCacheTestCase):
+    def resolved(self, manager, count):
+        ips = [f'203.0.113.{i}' for i in range(1, count + 1)]
+        for ip_address in ips:
+            manager.track_request(ip_address)
+            self.enrich(manager, ip_address)
+        return ips
+
+    def test_chunked_upsert_inserts_and_updates(self):
+        manager = self.make_manager()
+        manager.SYNC_CHUNK_SIZE = 3
+        self.add_row('203.0.113.2', requests_month=5, pais='Chile')
+        ips = self.resolved(manager, 10)
+
+        with self.app.app_context(), mock.patch.object(db.session, 'execute', wraps=db.session.execute) as execute:
+            manager._sync_to_db_sync()
+            self.assertEqual(execute.call_count, 4)  # 10 filas en trozos de 3
+        with self.app.app_context():
+            self.assertEqual(IPRegistry.query.count(), 10)
+        self.assertEqual(self.row('203.0.113.2').requests_month, 6)
+        self.assertEqual(self.row('203.0.113.2').pais, 'Chile')
+        self.assertFalse(any(manager.ip_cache.peek(ip).dirty or manager.ip_cache.peek(ip).new for ip in ips))
+
+        # Una segunda pasada actualiza las filas existentes
+        manager.track_request('203.0.113.9')
+        with self.app.app_context():
+            manager._sync_to_db_sync()
+        self.assertEqual(self.row('203.0.113.9').requests_month, 2)
+
+    def test_failed_chunk_is_retried_next_cycle(self):
+        manager = self.make_manager()
+        manager.SYNC_CHUNK_SIZE = 4
+        self.resolved(manager, 10)
+        execute = db.session.execute
+        calls = []
+
+        def flaky(statement, *args, **kwargs):
+            calls.append(statement)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return execute(statement, *args, **kwargs)
+
+        with self.app.app_context():
+            with mock.patch.object(db.session, 'execute', side_effect=flaky), self.assertLogs('utils.ip_manager_cache', 'ERROR'):
+                manager._sync_to_db_sync()
+            self.assertEqual(IPRegistry.query.count(), 4)
+            self.assertEqual(sum(1 for record in manager.ip_cache.values() if record.dirty), 6)
+            manager._sync_to_db_sync()
+            self.assertEqual(IPRegistry.query.count(), 10)
+
+
+class TestStartupAndEviction(IPCacheTestCase):
+    def test_blocked_rows_are_preloaded(self):
+        self.add_row(IP, is_blocked=True)
+        self.add_row('198.51.100.8', is_blocked=False)
+        manager = self.make_manager()
+        # Tras un reinicio, la IP bloqueada se rechaza sin esperar a cargarla desde BD
+        self.assertNotIn(IP, manager.ip_cache)
+        self.assertTrue(manager.check_blocked(IP))
+        self.assertFalse(manager.check_blocked('198.51.100.8'))
+
+    def test_blocked_rows_are_seeded_into_shared_state(self):
+        self.add_row(IP, is_blocked=True)
+        self.add_row('198.51.100.8', is_blocked=True)
+        path = os.path.join(self.tmp.name, 'ip_state.db')
+        # Un worker ya desbloqueó 198.51.100.8; la BD todavía no lo refleja
+        SharedIPState(path).set_ip_blocked('198.51.100.8', False)
+
+        manager = self.make_manager(shared_path=path)
+        self.assertTrue(manager.check_blocked(IP))
+        self.assertFalse(manager.check_blocked('198.51.100.8'))
+        _, ips, _ = SharedIPState(path).load_blocks()
+        self.assertEqual(ips, {IP: True, '198.51.100.8': False})
+
+    def test_sync_prunes_idle_shared_counters(self):
+        path = os.path.join(self.tmp.name, 'ip_state.db')
+        manager = self.make_manager(shared_path=path)
+        for _ in range(3):
+            manager.track_request(IP)
+        self.enrich(manager, IP)
+        manager.track_request('198.51.100.8')
+
+        manager.SHARED_IDLE_SECONDS = 3600
+        with mock.patch('utils.ip_shared_state.time.time', return_value=time.time() + 7200):
+            manager._sync_to_db()
+        self.assertIsNone(manager.shared.get_counters(IP))
+        self.assertEqual(self.row(IP).requests_month, 3)
+
+        # La IP sigue en la caché del worker: su total del mes no vuelve a empezar de cero
+        manager.track_request(IP)
+        self.assertEqual(manager.shared.get_counters(IP)['requests_month'], 4)
+        self.assertEqual(manager.ip_cache.peek(IP).requests_month, 4)
+
+    def test_evicted_dirty_record_is_flushed(self):
+        manager = self.make_manager(max_entries=2)
+        for ip_address in ('203.0.113.1', '203.0.113.2'):
+            manager.track_request(ip_address)
+            self.enrich(manager, ip_address)
+        manager.track_request('203.0.113.2')
+
+        manager.track_request('203.0.113.3')  # desaloja 203.0.113.1, nueva y sin escribir
+        self.assertNotIn('203.0.113.1', manager.ip_cache)
+        deadline = time.time() + 5
+        while (manager._evicted_flush_running or manager.evicted_dirty) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(manager.evicted_dirty, {})
+        self.assertEqual(self.row('203.0.113.1').requests_month, 1)
+
+    def test_evicted_dirty_record_is_recovered_before_flush(self):
+        manager = self.make_manager(max_entries=1)
+        manager.track_request('203.0.113.1')
+        self.enrich(manager, '203.0.113.1')
+        with mock.patch('utils.ip_manager_cache.Thread'):  # el flush de desalojados no corre
+            manager.track_request('203.0.113.2')
+            self.assertIn('203.0.113.1', manager.evicted_dirty)
+            manager.track_request('203.0.113.1')
+        record = manager.ip_cache.peek('203.0.113.1')
+        self.assertFalse(record.pending)
+        self.assertEqual(record.requests_month, 2)
+
+    def test_pending_flood_stays_bounded(self):
+        manager = self.make_manager(max_entries=50)
+        manager.geo_queue = queue.Queue(maxsize=10)  # nadie la consume: se llena y se descartan
+        for i in range(2000):
+            manager.track_request(f'10.{i // 250}.{i % 250}.1')
+        self.assertEqual(len(manager.ip_cache), 50)
+        self.assertEqual(manager.evicted_dirty, {})
+        self.assertGreater(manager.geo_dropped, 0)
+        self.assertTrue(manager.geo_scheduled <= {record.ip for record in manager.ip_cache.values()})
+
+
+if __name__ == '__main__':
+    unittest.main()
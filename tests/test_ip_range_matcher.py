@@ -0,0 +1,84 @@
+"""Tests del matcher de bloqueos por rango (CIDR / ASN / proveedor)."""
+
+import unittest
+
+from utils.ip_range_matcher import RangeMatcher, parse_block_target, normalize_region
+
+
+class TestRangeMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = RangeMatcher(
+            cidrs=['192.0.2.0/24', '198.51.100.128/25', '10.0.0.0/8', '2001:db8::/32'],
+            providers=['AS14061', 'Hetzner Online GmbH'],
+        )
+
+    def test_ipv4_prefixes(self):
+        self.assertEqual(self.matcher.match_ip('192.0.2.77'), '192.0.2.0/24')
+        self.assertEqual(self.matcher.match_ip('10.200.3.4'), '10.0.0.0/8')
+        self.assertEqual(self.matcher.match_ip('198.51.100.200'), '198.51.100.128/25')
+        self.assertIsNone(self.matcher.match_ip('198.51.100.5'))
+        self.assertIsNone(self.matcher.match_ip('192.0.3.1'))
+
+    def test_ipv6_prefixes(self):
+        self.assertEqual(self.matcher.match_ip('2001:db8:abcd::1'), '2001:db8::/32')
+        self.assertIsNone(self.matcher.match_ip('2001:db9::1'))
+
+    def test_ipv4_mapped_ipv6(self):
+        self.assertEqual(self.matcher.match_ip('::ffff:192.0.2.1'), '192.0.2.0/24')
+
+    def test_invalid_ip_never_matches(self):
+        self.assertIsNone(self.matcher.match_ip('not-an-ip'))
+        self.assertIsNone(self.matcher.match_ip(''))
+
+    def test_default_route_matches_everything(self):
+        matcher = RangeMatcher(cidrs=['0.0.0.0/0'])
+        self.assertTrue(matcher.match_ip('8.8.8.8'))
+        self.assertIsNone(matcher.match_ip('::1'))
+
+    def test_host_prefix(self):
+        matcher = RangeMatcher(cidrs=['203.0.113.9/32'])
+        self.assertTrue(matcher.match_ip('203.0.113.9'))
+        self.assertIsNone(matcher.match_ip('203.0.113.8'))
+
+    def test_provider_and_asn(self):
+        self.assertTrue(self.matcher.match_provider('hetzner online gmbh', 'Desconocido'))
+        self.assertTrue(self.matcher.match_provider('AS14061 DigitalOcean, LLC', 'Desconocido'))
+        self.assertFalse(self.matcher.match_provider('Telecom Argentina S.A.', 'telecom.com.ar'))
+        self.assertFalse(self.matcher.match_provider('Desconocido', 'Desconocido'))
+
+
+class TestBlockTargets(unittest.TestCase):
+    def test_parse_block_target(self):
+        self.assertEqual(parse_block_target('203.0.113.9'), ('ip', '203.0.113.9'))
+        self.assertEqual(parse_block_target('2001:db8::1'), ('ip', '2001:db8::1'))
+        self.assertEqual(parse_block_target('203.0.113.9/24'), ('cidr', '203.0.113.0/24'))
+        self.assertEqual(parse_block_target('as15169'), ('asn', 'AS15169'))
+        self.assertEqual(parse_block_target('DigitalOcean, LLC'), ('provider', 'DigitalOcean, LLC'))
+
+    def test_invalid_cidr(self):
+        with self.assertRaises(ValueError):
+            parse_block_target('300.0.0.0/8')
+
+    def test_malformed_ip_is_not_a_provider(self):
+        for value in ('203.0.113.300', '10.0.0.', '10.0.0', '2001:db8::g1', '2001:db8:::1', '15169'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_block_target(value)
+        with self.assertRaises(ValueError):
+            parse_block_target('')
+
+    def test_explicit_type(self):
+        self.assertEqual(parse_block_target('1&1 Versatel', 'provider'), ('provider', '1&1 Versatel'))
+        self.assertEqual(parse_block_target('10.0.0.', 'provider'), ('provider', '10.0.0.'))
+        self.assertEqual(parse_block_target('AS15169', 'asn'), ('asn', 'AS15169'))
+        for value, target_type in (('203.0.113.9', 'cidr'), ('DigitalOcean', 'asn'), ('203.0.113.9', 'country')):
+            with self.subTest(value=value, type=target_type), self.assertRaises(ValueError):
+                parse_block_target(value, target_type)
+
+    def test_normalize_asn(self):
+        self.assertEqual(normalize_region('asn', '14061'), 'AS14061')
+        with self.assertRaises(ValueError):
+            normalize_region('asn', 'DigitalOcean')
+
+
+if __name__ == '__main__':
+    unittest.main()
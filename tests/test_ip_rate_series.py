@@ -0,0 +1,94 @@
+"""Tests de la serie de peticiones por segundo por IP (ring buffer de una hora)."""
+
+import random
+import unittest
+
+from utils.ip_rate_series import RequestRateTracker, WINDOWS, SECONDS
+
+T0 = 1_700_000_000
+
+
+class TestRequestRateTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = RequestRateTracker(max_series=100)
+
+    def test_window_totals_slide(self):
+        for i in range(120):
+            self.tracker.record('203.0.113.1', T0 + i)
+        now = T0 + 119
+        self.assertEqual(self.tracker.top(10, now=now)[0]['requests'], 10)
+        self.assertEqual(self.tracker.top(60, now=now)[0]['requests'], 60)
+        self.assertEqual(self.tracker.top(300, now=now)[0]['requests'], 120)
+        # 30 segundos después la ventana de 60 solo conserva 30 peticiones
+        self.assertEqual(self.tracker.top(60, now=now + 30)[0]['requests'], 30)
+        self.assertEqual(self.tracker.top(10, now=now + 30), [])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        events = {}
+        second = T0
+        for _ in range(3000):
+            second += rng.choice([0, 0, 1, 2, 7, 45, 400])
+            ip_address = rng.choice(['192.0.2.1', '192.0.2.2', '2001:db8::1'])
+            self.tracker.record(ip_address, second)
+            events.setdefault(ip_address, []).append(second)
+            if rng.random() < 0.05:
+                window = rng.choice(WINDOWS)
+                expected = {
+                    ip: sum(1 for s in seconds if s > second - window)
+                    for ip, seconds in events.items()
+                }
+                got = {item['ip']: item['requests'] for item in self.tracker.top(window, 10, now=second)}
+                self.assertEqual(got, {ip: n for ip, n in expected.items() if n})
+
+    def test_top_order_and_limit(self):
+        for n, ip_address in enumerate(['198.51.100.1', '198.51.100.2', '198.51.100.3'], start=1):
+            for _ in range(n * 5):
+                self.tracker.record(ip_address, T0)
+        top = self.tracker.top(60, limit=2, now=T0)
+        self.assertEqual([item['ip'] for item in top], ['198.51.100.3', '198.51.100.2'])
+        self.assertEqual(top[0]['rate'], 0.25)
+
+    def test_saturates_per_second(self):
+        for _ in range(1000):
+            self.tracker.record('203.0.113.9', T0)
+        self.assertEqual(self.tracker.top(10, now=T0)[0]['requests'], 255)
+
+    def test_series_buckets(self):
+        for i in range(20):
+            self.tracker.record('203.0.113.5', T0 + i)
+        series = self.tracker.series('203.0.113.5', 60, bucket=10, now=T0 + 19)
+        self.assertEqual(len(series), 6)
+        self.assertEqual([b['requests'] for b in series], [0, 0, 0, 0, 10, 10])
+        self.assertEqual(series[-1]['start'], T0 + 10)
+        self.assertIsNone(self.tracker.series('203.0.113.6', 60, now=T0))
+
+    def test_histogram(self):
+        self.tracker.record('192.0.2.1', T0)
+        for _ in range(5):
+            self.tracker.record('192.0.2.2', T0)
+        for _ in range(6):
+            self.tracker.record('192.0.2.3', T0)
+        self.assertEqual(self.tracker.histogram(60, now=T0), [
+            {'min_requests': 1, 'max_requests': 1, 'ips': 1},
+            {'min_requests': 4, 'max_requests': 7, 'ips': 2},
+        ])
+
+    def test_idle_series_are_dropped(self):
+        self.tracker.record('192.0.2.1', T0)
+        self.assertEqual(self.tracker.top(3600, now=T0 + SECONDS), [])
+        self.assertEqual(len(self.tracker), 0)
+
+    def test_max_series(self):
+        tracker = RequestRateTracker(max_series=2)
+        for ip_address in ['192.0.2.1', '192.0.2.2', '192.0.2.3']:
+            tracker.record(ip_address, T0)
+        self.assertEqual({item['ip'] for item in tracker.top(60, now=T0)}, {'192.0.2.2', '192.0.2.3'})
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            self.tracker.top(42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Tests del estado de IPs compartido entre workers (SQLite WAL)."""
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from utils.ip_shared_state import SharedIPState
+
+PROCESSES = 4
+THREADS_PER_PROCESS = 2
+INCREMENTS_PER_THREAD = 150
+IPS = ['203.0.113.10', '2001:db8::1']
+
+
+def _hammer(path, start_event):
+    # Cada proceso simula un worker de gunicorn con varios hilos atendiendo peticiones
+    import threading
+
+    state = SharedIPState(path)
+    start_event.wait()
+
+    def run():
+        for i in range(INCREMENTS_PER_THREAD):
+            state.increment(IPS[i % len(IPS)], datetime.utcnow())
+
+    threads = [threading.Thread(target=run) for _ in range(THREADS_PER_PROCESS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def _block(path, ip_address):
+    SharedIPState(path).set_ip_blocked(ip_address, True)
+
+
+class TestSharedIPState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'ip_state.db')
+        self.state = SharedIPState(self.path)
+        self.ctx = multiprocessing.get_context('spawn')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_counts_are_exact_across_processes(self):
+        start_event = self.ctx.Event()
+        procs = [self.ctx.Process(target=_hammer, args=(self.path, start_event)) for _ in range(PROCESSES)]
+        for p in procs:
+            p.start()
+        start_event.set()
+        for p in procs:
+            p.join(timeout=120)
+            self.assertEqual(p.exitcode, 0)
+
+        expected = PROCESSES * THREADS_PER_PROCESS * INCREMENTS_PER_THREAD // len(IPS)
+        for ip_address in IPS:
+            counters = self.state.get_counters(ip_address)
+            self.assertEqual(counters['requests_month'], expected)
+            self.assertEqual(counters['requests_minute'], expected)
+
+    def test_block_from_another_process_is_visible(self):
+        version_before = self.state.block_version()
+        p = self.ctx.Process(target=_block, args=(self.path, '198.51.100.7'))
+        p.start()
+        p.join(timeout=60)
+
+        self.assertNotEqual(self.state.block_version(), version_before)
+        _, ips, _ = self.state.load_blocks()
+        self.assertTrue(ips['198.51.100.7'])
+
+    def test_region_changes_bump_version(self):
+        version = self.state.block_version()
+        self.state.add_region('country', 'CN')
+        self.assertEqual(self.state.block_version(), version + 1)
+        # Repetir el alta no cambia nada
+        self.state.add_region('country', 'CN')
+        self.assertEqual(self.state.block_version(), version + 1)
+        _, _, regions = self.state.load_blocks()
+        self.assertIn('CN', regions['country'])
+
+        self.state.remove_region('CN')
+        _, _, regions = self.state.load_blocks()
+        self.assertNotIn('CN', regions['country'])
+
+    def test_db_history_is_seeded_once(self):
+        now = datetime.utcnow()
+        self.state.increment('192.0.2.1', now)
+        self.state.seed('192.0.2.1', 40, now, now)
+        # Un segundo worker que carga la misma fila de BD no vuelve a sumarla
+        counters = self.state.seed('192.0.2.1', 40, now, now)
+        self.assertEqual(counters['requests_month'], 41)
+
+    def test_idle_counters_are_pruned(self):
+        now = datetime.utcnow()
+        self.state.increment('192.0.2.1', now - timedelta(hours=2))
+        self.state.increment('192.0.2.2', now - timedelta(minutes=5))
+        self.assertEqual(self.state.prune_counters(3600), 1)
+        self.assertIsNone(self.state.get_counters('192.0.2.1'))
+        self.assertEqual(self.state.get_counters('192.0.2.2')['requests_month'], 1)
+        self.assertEqual(self.state.prune_counters(3600), 0)
+
+    def test_pruned_ip_restarts_from_the_worker_total(self):
+        now = datetime.utcnow()
+        # El worker ya tenía 41 peticiones en el mes (histórico de BD incluido) y esta es la 42
+        counters = self.state.increment('192.0.2.1', now, requests_month=42, seeded=True)
+        self.assertEqual(counters['requests_month'], 42)
+        self.assertEqual(counters['requests_minute'], 1)
+        # Otro worker que carga la fila de BD no vuelve a sumar el histórico
+        self.assertEqual(self.state.seed('192.0.2.1', 40, now, now)['requests_month'], 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Tests del alta masiva de usuarios abogados en MembershipSyncService._provision_lawyer_users."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+from werkzeug.security import check_password_hash
+
+from config.config import db
+from models.membership_constants import MEMBERSHIP_STATUS_AMBIGUOUS, MEMBERSHIP_STATUS_UP_TO_DATE
+from services import membership_sync_service
+from services.membership_sync_service import MembershipSyncService, hash_default_passwords
+
+IMPORT_UUID = 'import-1'
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestLawyerProvisioning(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'provision.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        from models import LawyerMembershipStatusModel, ProfessionalModel, ProfileModel, UserModel
+        self.lawyer = ProfileModel(uuid='p-lawyer', name='lawyer')
+        db.session.add(self.lawyer)
+        # Usuario existente sin el perfil de abogado, registrado con la matrícula en formato display
+        db.session.add(UserModel(uuid='u-existing', name='Existente', email='1.001', password='x'))
+        db.session.add(ProfessionalModel(name='Ana', title='Abogada', email='ana@example.com',
+                                         location='San Rafael', tuition='1002'))
+        statuses = [
+            LawyerMembershipStatusModel(tuition_normalized=str(1000 + i), tuition_display=f'1.{i:03d}',
+                                        first_name='Nombre', last_name=str(i),
+                                        status=MEMBERSHIP_STATUS_UP_TO_DATE, last_import_uuid=IMPORT_UUID)
+            for i in range(12)
+        ]
+        statuses.append(LawyerMembershipStatusModel(tuition_normalized='9999', status=MEMBERSHIP_STATUS_AMBIGUOUS,
+                                                    last_import_uuid=IMPORT_UUID))
+        db.session.add_all(statuses)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def provision(self, hashing):
+        count = MembershipSyncService()._provision_lawyer_users(IMPORT_UUID, hashing=hashing)
+        db.session.expire_all()
+        return count
+
+    def users(self):
+        from models import UserModel
+        return {u.email: u for u in UserModel.query.all()}
+
+    def assert_provisioned(self, hashing):
+        from models import LawyerMembershipStatusModel, ProfessionalModel
+        self.assertEqual(self.provision(hashing), 11)
+        users = self.users()
+        self.assertEqual(len(users), 12)
+        self.assertNotIn('9999', users)
+
+        new = [users[str(1000 + i)] for i in range(2, 12)] + [users['1000']]
+        for user in new:
+            self.assertTrue(user.must_change_password)
+            self.assertEqual(user.token_version, 0)
+            self.assertIsNotNone(user.created_at)
+            self.assertEqual([p.name for p in user.profiles], ['lawyer'])
+            self.assertTrue(check_password_hash(user.password, 'Colejus2026'))
+        self.assertEqual(users['1000'].name, 'Nombre 0')
+        self.assertEqual([p.name for p in users['1.001'].profiles], ['lawyer'])
+
+        status = LawyerMembershipStatusModel.query.filter_by(tuition_normalized='1001').one()
+        self.assertEqual(status.uuid_user, 'u-existing')
+        professional = ProfessionalModel.query.filter_by(tuition='1002').one()
+        self.assertEqual(professional.uuid_user, users['1002'].uuid)
+
+        # Una segunda corrida no crea ni vincula nada de nuevo
+        self.assertEqual(self.provision(hashing), 0)
+        self.assertEqual(len(self.users()), 12)
+        return new
+
+    def test_shared_hash(self):
+        new = self.assert_provisioned('shared')
+        self.assertEqual(len({user.password for user in new}), 1)
+
+    def test_per_user_hash(self):
+        new = self.assert_provisioned('per_user')
+        self.assertEqual(len({user.password for user in new}), len(new))
+
+    def test_inserts_in_chunks(self):
+        inserts = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT INTO users'):
+                inserts.append(len(parameters) if executemany else 1)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            with mock.patch.object(membership_sync_service, 'PROVISION_CHUNK', 4):
+                self.assertEqual(self.provision('shared'), 11)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        self.assertEqual(inserts, [4, 4, 3])
+
+    def test_pool_hashing(self):
+        with mock.patch.dict(os.environ, {'LAWYER_PROVISION_WORKERS': '2'}):
+            hashes = hash_default_passwords('secreto', 3, 'pool')
+        self.assertEqual(len(set(hashes)), 3)
+        self.assertTrue(all(check_password_hash(h, 'secreto') for h in hashes))
+        self.assertEqual(hash_default_passwords('secreto', 0, 'pool'), [])
+        with self.assertRaises(ValueError):
+            hash_default_passwords('secreto', 1, 'md5')
+
+    def test_pool_hashing_does_not_fork(self):
+        # Un fork dentro del worker multihilo puede heredar locks tomados por otros hilos
+        with mock.patch('services.membership_sync_service.ProcessPoolExecutor') as executor:
+            executor.return_value.__enter__.return_value.map.return_value = ['h1', 'h2']
+            self.assertEqual(hash_default_passwords('secreto', 2, 'pool'), ['h1', 'h2'])
+        self.assertIn(executor.call_args.kwargs['mp_context'].get_start_method(), ('forkserver', 'spawn'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""Verifica que importar los módulos del arranque no cargue las dependencias pesadas."""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['reportlab', 'PIL', 'qrcode', 'playwright', 'mercadopago']
+
+
+def loaded_heavy_modules(module):
+    # Proceso nuevo para que sys.modules no arrastre lo importado por otros tests
+    code = (
+        f'import sys, json; import {module}; '
+        f'print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))'
+    )
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise AssertionError(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_mercadopago_is_loaded_on_first_payment(self):
+        self.assertEqual(loaded_heavy_modules('config.config_mp'), [])
+
+    @unittest.skipUnless(importlib.util.find_spec('flask_mail'), 'requiere las dependencias de routes/forms.py')
+    def test_forms_blueprint_import(self):
+        self.assertEqual(loaded_heavy_modules('routes.forms'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Tests de la difusión de logs en vivo a varios clientes de /dev/logs."""
+
+import logging
+import threading
+import unittest
+from unittest import mock
+
+from utils import logging_config
+from utils.log_broadcaster import LogBroadcaster
+
+
+def consume(broadcaster, subscription, expected, received):
+    while len(received) < expected:
+        lines, _ = broadcaster.read(subscription, timeout=5)
+        if not lines and len(received) < expected:
+            break
+        received.extend(lines)
+
+
+class TestLogBroadcaster(unittest.TestCase):
+    def test_twenty_subscribers_receive_every_line(self):
+        lines = 3000
+        broadcaster = LogBroadcaster(capacity=4096, subscriber_capacity=4096, max_subscribers=20)
+        subscriptions = [broadcaster.subscribe() for _ in range(20)]
+        received = [[] for _ in subscriptions]
+        threads = [
+            threading.Thread(target=consume, args=(broadcaster, sub, lines, out))
+            for sub, out in zip(subscriptions, received)
+        ]
+        for thread in threads:
+            thread.start()
+        for i in range(lines):
+            broadcaster.publish(f'line {i}')
+        for thread in threads:
+            thread.join(timeout=30)
+
+        expected = [(i + 1, f'line {i}') for i in range(lines)]
+        for out, sub in zip(received, subscriptions):
+            self.assertEqual(out, expected)
+            self.assertEqual(sub.dropped, 0)
+        self.assertEqual({s['delivered'] for s in broadcaster.stats()['subscribers']}, {lines})
+
+    def test_slow_subscriber_drops_oldest_and_counts(self):
+        broadcaster = LogBroadcaster(capacity=100, subscriber_capacity=10)
+        subscription = broadcaster.subscribe()
+        for i in range(25):
+            broadcaster.publish(f'line {i}')
+        lines, dropped = broadcaster.read(subscription, timeout=0)
+        self.assertEqual(dropped, 15)
+        self.assertEqual([seq for seq, _ in lines], list(range(16, 26)))
+        self.assertEqual(subscription.dropped, 15)
+
+    def test_resume_from_sequence(self):
+        broadcaster = LogBroadcaster(capacity=8, subscriber_capacity=8)
+        for i in range(5):
+            broadcaster.publish(f'line {i}')
+        lines, dropped = broadcaster.read(broadcaster.subscribe(since=2), timeout=0)
+        self.assertEqual((lines, dropped), ([(3, 'line 2'), (4, 'line 3'), (5, 'line 4')], 0))
+
+        # El cursor pedido ya salió del ring: se informa cuánto se perdió
+        for i in range(5, 20):
+            broadcaster.publish(f'line {i}')
+        lines, dropped = broadcaster.read(broadcaster.subscribe(since=2), timeout=0)
+        self.assertEqual(dropped, 10)
+        self.assertEqual([seq for seq, _ in lines], list(range(13, 21)))
+
+        # Sin cursor se empieza por lo nuevo
+        self.assertEqual(broadcaster.read(broadcaster.subscribe(), timeout=0), ([], 0))
+
+    def test_sse_stream(self):
+        broadcaster = LogBroadcaster(max_subscribers=1)
+        subscription = broadcaster.subscribe()
+        self.assertIsNone(broadcaster.subscribe())
+        stream = broadcaster.sse_stream(subscription, keepalive=0.01)
+        self.assertEqual(next(stream), 'retry: 3000\n\n')
+        self.assertEqual(next(stream), ': keepalive\n\n')
+        broadcaster.publish('Traceback:\n  boom')
+        broadcaster.publish('ok')
+        self.assertEqual(next(stream), 'id: 1\ndata: Traceback:\ndata:   boom\n\nid: 2\ndata: ok\n\n')
+
+        # Cerrar la conexión libera el lugar
+        stream.close()
+        self.assertEqual(broadcaster.stats()['subscribers'], [])
+        self.assertIsNotNone(broadcaster.subscribe())
+
+    def test_logging_handler_publishes(self):
+        broadcaster = LogBroadcaster()
+        subscription = broadcaster.subscribe()
+        handler = logging_config.QueueHandler()
+        handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+        logger = logging.getLogger('tests.log_broadcaster')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            with mock.patch.object(logging_config, 'log_broadcaster', broadcaster):
+                logger.warning('hola')
+        finally:
+            logger.removeHandler(handler)
+        self.assertEqual(broadcaster.read(subscription, timeout=0), ([(1, 'WARNING - hola')], 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests del logging asíncrono (utils/log_pipeline.py) con los handlers reales de logging_config."""
+
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils import logging_config
+from utils.log_broadcaster import LogBroadcaster
+from utils.log_pipeline import LogPipeline
+
+
+class TestLogPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_handler = logging_config.DailyRotatingFileHandler(self.tmp.name)
+        self.file_handler.setFormatter(logging.Formatter('%(levelname)s in %(module)s: %(message)s'))
+        self.sse_handler = logging_config.QueueHandler()
+        self.sse_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+        self.broadcaster = LogBroadcaster(capacity=4096, subscriber_capacity=4096)
+        self.subscription = self.broadcaster.subscribe()
+        patcher = mock.patch.object(logging_config, 'log_broadcaster', self.broadcaster)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = logging.getLogger(f'tests.log_pipeline.{self._testMethodName}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.file_handler.close()
+        self.tmp.cleanup()
+
+    def pipeline(self, **kwargs):
+        pipeline = LogPipeline([self.file_handler, self.sse_handler], **kwargs)
+        self.logger.addHandler(pipeline.handler)
+        return pipeline
+
+    def file_lines(self):
+        with open(self.file_handler.baseFilename, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_records_reach_every_handler(self):
+        pipeline = self.pipeline(flush_interval=10, flush_records=10000)
+        for i in range(50):
+            self.logger.info('line %d', i)
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            self.logger.exception('failed %s', 'op')
+        pipeline.stop()
+
+        lines = self.file_lines()
+        self.assertEqual(lines[:50], [f'INFO in test_log_pipeline: line {i}' for i in range(50)])
+        self.assertEqual(lines[50], 'ERROR in test_log_pipeline: failed op')
+        self.assertIn('ValueError: boom', lines[-1])
+        sse, _ = self.broadcaster.read(self.subscription, timeout=0)
+        self.assertEqual(len(sse), 51)
+        self.assertEqual(sse[0][1], 'INFO - line 0')
+        self.assertEqual(pipeline.stats()['processed'], 51)
+
+    def test_file_writes_are_batched(self):
+        pipeline = self.pipeline(flush_interval=10, flush_records=100)
+        flushes = []
+        original = self.file_handler.flush_buffer
+        self.file_handler.flush_buffer = lambda: (flushes.append(1), original())
+        for i in range(1000):
+            self.logger.info('line %d', i)
+        pipeline.stop()
+        self.assertEqual(len(self.file_lines()), 1000)
+        self.assertLessEqual(len(flushes), 11)
+        self.assertEqual(pipeline.stats()['flushes'], len(flushes))
+
+    def test_flushes_on_interval(self):
+        pipeline = self.pipeline(flush_interval=0.05, flush_records=10000)
+        self.logger.info('single line')
+        deadline = time.monotonic() + 5
+        while not self.file_lines() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.file_lines(), ['INFO in test_log_pipeline: single line'])
+        pipeline.stop()
+
+    def test_full_queue_drops_and_counts(self):
+        pipeline = self.pipeline(queue_size=3)
+        pipeline._ensure_listener.pid = os.getpid()  # sin listener: la cola se llena
+        for i in range(4):
+            self.logger.info('info %d', i)
+        self.logger.error('error')
+        stats = pipeline.stats()
+        self.assertEqual((stats['enqueued'], stats['dropped'], stats['queue_depth']), (3, 2, 3))
+        self.assertEqual(stats['dropped_by_level'], {'INFO': 1, 'ERROR': 1})
+
+        pipeline._ensure_listener.reset()
+        pipeline.stop()  # vacía en el hilo actual
+        self.assertEqual(len(self.file_lines()), 3)
+
+    def test_rollover_checked_only_after_midnight(self):
+        self.assertGreater(self.file_handler.next_rollover, time.time())
+        self.file_handler.current_date = '19990101'
+        self.file_handler.next_rollover = 0
+        pipeline = self.pipeline()
+        self.logger.info('after midnight')
+        pipeline.stop()
+        self.assertNotIn('19990101', self.file_handler.baseFilename)
+        self.assertEqual(self.file_lines(), ['INFO in test_log_pipeline: after midnight'])
+        self.assertGreater(self.file_handler.next_rollover, time.time())
+
+
+if __name__ == '__main__':
+    unittest.main()
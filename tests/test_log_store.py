@@ -0,0 +1,86 @@
+"""Tests de la caché de logs recientes comprimida por segmentos (utils/log_store.py)."""
+
+import json
+import logging
+import time
+import unittest
+
+from utils.log_store import RecentLogStore, iter_json_array, parse_level, parse_since
+
+
+def fill(store, count, start, level=logging.INFO, step=1.0, prefix='line'):
+    for i in range(count):
+        store.append(start + i * step, level, f'{prefix} {i}')
+
+
+class TestRecentLogStore(unittest.TestCase):
+    def setUp(self):
+        self.now = time.time()
+        self.store = RecentLogStore(max_bytes=10 * 1024 * 1024, segment_bytes=2048)
+
+    def test_returns_everything_in_order_across_segments(self):
+        fill(self.store, 500, self.now - 1000)
+        self.assertGreater(self.store.stats()['segments'], 5)
+        self.assertEqual(list(self.store.query()), [f'line {i}' for i in range(500)])
+
+    def test_byte_budget_bounds_memory(self):
+        store = RecentLogStore(max_bytes=64 * 1024, segment_bytes=8 * 1024)
+        # Un loop de errores ruidoso: 50000 trazas distintas de ~200 bytes (unos 10 MB sin comprimir)
+        for i in range(50000):
+            store.append(self.now, logging.ERROR, f'Database Error {i}: ' + 'x' * 180)
+        stats = store.stats()
+        self.assertLessEqual(stats['compressed_bytes'] + stats['active_bytes'], 64 * 1024)
+        self.assertGreater(stats['evicted_records'], 0)
+        self.assertGreater(stats['uncompressed_bytes'], stats['compressed_bytes'] * 5)
+        # Se descartan las más viejas y se conservan las últimas
+        self.assertEqual(list(store.query(limit=1))[0].split(':')[0], 'Database Error 49999')
+
+    def test_retention_window(self):
+        fill(self.store, 100, self.now - 7 * 3600, prefix='old')
+        fill(self.store, 100, self.now - 50, prefix='new')
+        self.assertEqual(list(self.store.query()), [f'new {i}' for i in range(100)])
+        # Los segmentos que quedaron fuera de la ventana ya se descartaron
+        self.assertTrue(all(s.last_ts >= self.now - 6 * 3600 for s in self.store.segments))
+        self.assertGreater(self.store.stats()['evicted_records'], 0)
+
+    def test_since_only_decompresses_needed_segments(self):
+        fill(self.store, 1000, self.now - 1000)
+        segments = self.store.stats()['segments']
+        before = self.store.decompressed_segments
+        result = list(self.store.query(since=self.now - 10))
+        self.assertEqual(result, [f'line {i}' for i in range(990, 1000)])
+        self.assertLessEqual(self.store.decompressed_segments - before, 2)
+        self.assertGreater(segments, 10)
+
+    def test_level_filter_skips_segments_without_that_level(self):
+        fill(self.store, 300, self.now - 900)
+        self.store.append(self.now - 500, logging.ERROR, 'boom')
+        fill(self.store, 300, self.now - 400)
+        before = self.store.decompressed_segments
+        self.assertEqual(list(self.store.query(min_level=logging.WARNING)), ['boom'])
+        self.assertEqual(self.store.decompressed_segments - before, 1)
+
+    def test_limit_returns_latest_matches(self):
+        fill(self.store, 1000, self.now - 1000)
+        before = self.store.decompressed_segments
+        self.assertEqual(list(self.store.query(limit=3)), ['line 997', 'line 998', 'line 999'])
+        self.assertLessEqual(self.store.decompressed_segments - before, 1)
+        self.assertEqual(list(self.store.query(limit=0)), [])
+        self.assertEqual(len(list(self.store.query(limit=5000))), 1000)
+
+    def test_query_helpers(self):
+        self.assertIsNone(parse_since(''))
+        self.assertEqual(parse_since('1700000000.5'), 1700000000.5)
+        self.assertEqual(parse_since('2026-01-01T00:00:00-03:00'), parse_since('2026-01-01T00:00:00'))
+        with self.assertRaises(ValueError):
+            parse_since('ayer')
+        self.assertEqual(parse_level('warning'), logging.WARNING)
+        self.assertEqual(parse_level(None), 0)
+        with self.assertRaises(ValueError):
+            parse_level('loud')
+        self.assertEqual(json.loads(''.join(iter_json_array(['a', 'b"\n']))), ['a', 'b"\n'])
+        self.assertEqual(json.loads(''.join(iter_json_array([]))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
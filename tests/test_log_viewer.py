@@ -0,0 +1,126 @@
+"""Tests de la lectura por mmap de los archivos de logs (utils/log_viewer.py)."""
+
+import logging
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from utils import log_viewer
+
+
+def record(i, level='INFO', message=None):
+    return f'[2026-10-18 10:00:{i % 60:02d},000] {level} in module: {message or f"request {i}"}\n'
+
+
+class TestLogViewer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'logs_20261018.txt')
+        lines = []
+        for i in range(300):
+            if i % 50 == 7:
+                lines.append(record(i, 'ERROR', f'failure {i}'))
+                lines.append('Traceback (most recent call last):\n  File "x.py", line 1\n[not a header] ValueError\n')
+            else:
+                lines.append(record(i))
+        self.content = ''.join(lines).encode('utf-8')
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+        # Trozos chicos para que los registros crucen límites de trozo
+        patcher = mock.patch.object(log_viewer, 'CHUNK_SIZE', 700)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, chunks):
+        return b''.join(chunks)
+
+    def test_resolve_log_path(self):
+        self.assertEqual(log_viewer.resolve_log_path(self.tmp.name, 'logs_20261018.txt'), self.path)
+        for name in ('../etc/passwd', 'sub/logs.txt', '..', 'missing.txt', ''):
+            self.assertIsNone(log_viewer.resolve_log_path(self.tmp.name, name))
+
+    def test_full_and_range(self):
+        self.assertEqual(self.read(log_viewer.stream_bytes(self.path)), self.content)
+        self.assertEqual(self.read(log_viewer.stream_bytes(self.path, 1000, 2500)), self.content[1000:2500])
+        self.assertEqual(self.read(log_viewer.stream_bytes(self.path, len(self.content) - 10, 10 ** 9)),
+                         self.content[-10:])
+
+    def test_tail(self):
+        expected = b''.join(line + b'\n' for line in self.content.split(b'\n')[-4:-1])
+        self.assertEqual(self.read(log_viewer.stream_tail(self.path, 3)), expected)
+        self.assertEqual(self.read(log_viewer.stream_tail(self.path, 10 ** 6)), self.content)
+        self.assertEqual(self.read(log_viewer.stream_tail(self.path, 0)), b'')
+
+    def test_level_filter_keeps_tracebacks(self):
+        out = self.read(log_viewer.stream_filtered(self.path, min_level=logging.ERROR)).decode()
+        self.assertEqual(out.count('] ERROR in'), 6)
+        self.assertEqual(out.count('Traceback'), 6)
+        self.assertEqual(out.count('[not a header] ValueError'), 6)
+        self.assertNotIn('] INFO in', out)
+
+    def test_regex_filter_and_tail(self):
+        pattern = log_viewer.compile_filter(r'request 1\d\d$')
+        out = self.read(log_viewer.stream_filtered(self.path, pattern)).decode().splitlines()
+        self.assertEqual(len(out), 100 - 2)  # 107 y 157 son errores
+        self.assertTrue(all('request 1' in line for line in out))
+
+        out = self.read(log_viewer.stream_filtered(self.path, pattern, tail=2)).decode().splitlines()
+        self.assertEqual(out, [record(198).strip(), record(199).strip()])
+
+        pattern = log_viewer.compile_filter('ValueError')
+        out = self.read(log_viewer.stream_filtered(self.path, pattern, min_level=logging.WARNING)).decode()
+        self.assertEqual(out.count('] ERROR in'), 6)
+        with self.assertRaises(ValueError):
+            log_viewer.compile_filter('(')
+
+    def test_patterns_matching_empty_string_terminate(self):
+        def bounded(chunks):
+            # Corta si el generador entrega más que el archivo: antes se repetía sin fin
+            out = b''
+            for chunk in chunks:
+                out += chunk
+                if len(out) > len(self.content):
+                    self.fail('filter yielded more than the whole file')
+            return out
+
+        last = [record(298).strip(), record(299).strip()]
+        for regex in ('$', 'x*', '^'):
+            pattern = log_viewer.compile_filter(regex)
+            self.assertEqual(bounded(log_viewer.stream_filtered(self.path, pattern)), self.content)
+            out = bounded(log_viewer.stream_filtered(self.path, pattern, tail=2)).decode().splitlines()
+            self.assertEqual(out, last)
+
+    def test_empty_file(self):
+        empty = os.path.join(self.tmp.name, 'empty.txt')
+        open(empty, 'wb').close()
+        self.assertEqual(self.read(log_viewer.stream_bytes(empty)), b'')
+        self.assertEqual(self.read(log_viewer.stream_tail(empty, 5)), b'')
+        self.assertEqual(self.read(log_viewer.stream_filtered(empty, min_level=logging.ERROR)), b'')
+
+    def test_memory_does_not_grow_with_file(self):
+        big = os.path.join(self.tmp.name, 'big.txt')
+        with open(big, 'wb') as f:
+            block = ''.join(record(i) for i in range(1000)).encode()
+            for _ in range(200):  # ~14 MB
+                f.write(block)
+        with mock.patch.object(log_viewer, 'CHUNK_SIZE', 256 * 1024):
+            tracemalloc.start()
+            try:
+                total = sum(len(chunk) for chunk in log_viewer.stream_bytes(big))
+                matches = sum(chunk.count(b'request 999\n') for chunk in
+                              log_viewer.stream_filtered(big, log_viewer.compile_filter('request 999$')))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        self.assertEqual(total, os.path.getsize(big))
+        self.assertEqual(matches, 200)
+        self.assertLess(peak, 4 * 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Tests del login sin escritura síncrona en users y de la revocación por token_version."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask, jsonify, request
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+from werkzeug.security import generate_password_hash
+
+from config.config import db
+from services import auth_service
+from utils import principal_cache
+from utils.decorators import token_required
+from utils.login_bookkeeping import LoginBookkeeper
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestLoginBookkeeping(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'login.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key-with-enough-bytes!'
+        db.init_app(self.app)
+        JWTManager(self.app)
+
+        @self.app.route('/login', methods=['POST'])
+        def login():
+            data = request.json
+            return auth_service.login(data['tuition_or_email'], data['password'])
+
+        @self.app.route('/me')
+        @jwt_required()
+        @token_required
+        def me():
+            return jsonify({'uuid': request.user.uuid})
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        from models import UserModel
+        db.create_all()
+        password = generate_password_hash('secret', method='pbkdf2:sha256:1000')
+        db.session.add_all([
+            UserModel(uuid=f'u-{i}', name=f'User {i}', email=f'user{i}@example.com', password=password)
+            for i in range(2)
+        ])
+        db.session.commit()
+        principal_cache.invalidate_all()
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self._capture)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._capture)
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split()[0].upper())
+
+    def use(self, mode):
+        bookkeeper = LoginBookkeeper()
+        bookkeeper.mode = mode
+        bookkeeper.app = self.app
+        bookkeeper._ensure_worker = lambda: None  # el test decide cuándo se escribe
+        patcher = mock.patch.object(auth_service, 'login_bookkeeper', bookkeeper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return bookkeeper
+
+    def login(self, i=0):
+        response = self.client.post('/login', json={'tuition_or_email': f'user{i}@example.com', 'password': 'secret'})
+        db.session.remove()
+        return response
+
+    def stored_tokens(self):
+        from models import UserModel
+        db.session.remove()
+        return {u.uuid: u.auth_token for u in UserModel.query.all()}
+
+    def test_deferred_login_does_not_write_users(self):
+        bookkeeper = self.use('deferred')
+        tokens = [self.login(0).get_json()['auth_token'], self.login(1).get_json()['auth_token'],
+                  self.login(0).get_json()['auth_token']]
+        self.assertTrue(all(tokens))
+        self.assertNotIn('UPDATE', self.statements)
+        self.assertEqual(bookkeeper.stats()['pending'], 2)
+
+        self.statements.clear()
+        self.assertEqual(bookkeeper.flush(), 2)
+        self.assertEqual(self.statements.count('UPDATE'), 1)  # un executemany por lote
+        self.assertEqual(self.stored_tokens(), {'u-0': tokens[2], 'u-1': tokens[1]})
+
+    def test_sync_mode_keeps_previous_behaviour(self):
+        self.use('sync')
+        token = self.login(0).get_json()['auth_token']
+        self.assertIn('UPDATE', self.statements)
+        self.assertEqual(self.stored_tokens()['u-0'], token)
+
+    def test_off_mode_writes_nothing(self):
+        bookkeeper = self.use('off')
+        self.assertEqual(self.login(0).status_code, 200)
+        self.assertEqual(bookkeeper.flush(), 0)
+        self.assertNotIn('UPDATE', self.statements)
+        self.assertIsNone(self.stored_tokens()['u-0'])
+
+    def test_failed_flush_is_retried(self):
+        bookkeeper = self.use('deferred')
+        self.login(0)
+        with mock.patch.object(db.session, 'execute', side_effect=RuntimeError('locked')):
+            self.assertEqual(bookkeeper.flush(), 0)
+        self.assertEqual(bookkeeper.stats()['errors'], 1)
+        self.assertEqual(bookkeeper.flush(), 1)
+        self.assertIsNotNone(self.stored_tokens()['u-0'])
+
+    def test_revoke_tokens(self):
+        from models import UserModel
+        self.use('off')
+        token = self.login(0).get_json()['auth_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual(self.client.get('/me', headers=headers).status_code, 200)
+
+        auth_service.revoke_tokens(db.session.get(UserModel, 'u-0'))
+        response = self.client.get('/me', headers=headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['message'], 'Token has been revoked')
+
+        new_token = self.login(0).get_json()['auth_token']
+        self.assertEqual(self.client.get('/me', headers={'Authorization': f'Bearer {new_token}'}).status_code, 200)
+
+    def test_tokens_without_version_claim_still_work(self):
+        token = create_access_token(identity='user1@example.com')
+        self.assertEqual(self.client.get('/me', headers={'Authorization': f'Bearer {token}'}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Paridad del motor de permisos por máscara (utils/permissions.py) con los chequeos que
+tenían copiados routes/booking.py y routes/rooms.py (recorrido perfiles × accesos).
+"""
+
+import itertools
+import random
+import unittest
+from types import SimpleNamespace
+
+from flask import Flask, jsonify, request
+
+from utils import permissions
+from utils.principal_cache import Principal
+
+ROOM_ACCESS_NAMES = [name for pair in permissions.ROOM_ACCESSES.values() for name in pair]
+PROFILE_NAMES = ['lawyer', 'Admin', 'Administrador', 'dev', 'DEV', 'secretaria']
+ROOM_TYPES = ['coworking', 'meeting', 'otro', None]
+
+
+def legacy_has_access(user, required):
+    """Chequeo anterior: `required` es un nombre o una lista (alcanza con uno)."""
+    required = required if isinstance(required, list) else [required]
+    has_access = False
+    for profile in user.profiles:
+        if profile.name.lower() == 'dev':
+            has_access = True
+            break
+        for access in profile.accesses:
+            if access.name in required:
+                has_access = True
+                break
+        if has_access:
+            break
+    return has_access
+
+
+def legacy_is_admin(user):
+    for profile in user.profiles:
+        if profile.name.lower() in ['admin', 'administrador', 'dev']:
+            return True
+    return False
+
+
+def legacy_required(action, room_type):
+    coworking, meeting = permissions.ROOM_ACCESSES[action]
+    if room_type is None:
+        return [coworking, meeting]
+    return coworking if room_type == 'coworking' else meeting
+
+
+def make_user(profiles):
+    return SimpleNamespace(
+        uuid='u-1',
+        email='a@b.com',
+        profiles=[
+            SimpleNamespace(name=name, accesses=[SimpleNamespace(name=a) for a in accesses])
+            for name, accesses in profiles
+        ],
+    )
+
+
+def user_matrix():
+    users = [make_user([])]
+    subsets = [
+        subset
+        for size in range(len(ROOM_ACCESS_NAMES) + 1)
+        for subset in itertools.combinations(ROOM_ACCESS_NAMES + ['view_news'], size)
+        if size <= 3
+    ]
+    for name in PROFILE_NAMES:
+        for subset in subsets:
+            users.append(make_user([(name, subset)]))
+    rng = random.Random(12)
+    for _ in range(500):
+        users.append(make_user([
+            (rng.choice(PROFILE_NAMES), rng.sample(ROOM_ACCESS_NAMES, rng.randint(0, 4)))
+            for _ in range(rng.randint(2, 3))
+        ]))
+    return users
+
+
+class TestPermissionParity(unittest.TestCase):
+    def test_room_checks_match_legacy_loops(self):
+        checked = 0
+        for user in user_matrix():
+            principal = Principal.from_user(user)
+            for action in permissions.ROOM_ACCESSES:
+                for room_type in ROOM_TYPES:
+                    expected = legacy_has_access(user, legacy_required(action, room_type))
+                    got = permissions.can_access_room(principal, action, room_type)
+                    self.assertEqual(got, expected, (action, room_type, [
+                        (p.name, [a.name for a in p.accesses]) for p in user.profiles]))
+                    checked += 1
+            self.assertEqual(permissions.has_admin_role(principal), legacy_is_admin(user))
+            self.assertEqual(principal.has_access('view_news'), legacy_has_access(user, 'view_news'))
+        self.assertGreater(checked, 10000)
+
+    def test_dev_has_every_bit(self):
+        principal = Principal.from_user(make_user([('Dev', [])]))
+        self.assertEqual(principal.access_mask, permissions.ALL)
+        self.assertTrue(principal.has_access('access_that_does_not_exist_yet'))
+
+    def test_bits_are_stable(self):
+        registry = permissions.PermissionRegistry()
+        first = registry.bit('book_rooms')
+        registry.mask(['a', 'b', 'c'])
+        self.assertEqual(registry.bit('book_rooms'), first)
+        self.assertEqual(len(registry), 4)
+        self.assertEqual(registry.mask(['a', 'b', 'c']).bit_count(), 3)
+
+
+class TestRoomAccessDecorator(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.principal = None
+
+        @self.app.before_request
+        def set_principal():
+            if self.principal is not None:
+                request.principal = self.principal
+
+        @self.app.route('/any')
+        @permissions.room_access_required('book')
+        def any_type():
+            return jsonify({'ok': True})
+
+        @self.app.route('/typed')
+        @permissions.room_access_required(
+            'view', room_type=lambda: request.args.get('room_type', 'coworking'))
+        def typed():
+            return jsonify({'ok': True})
+
+        self.client = self.app.test_client()
+
+    def status(self, path, profiles):
+        user = make_user(profiles)
+        self.principal = Principal.from_user(user)
+        return self.client.get(path).status_code
+
+    def test_without_principal(self):
+        self.assertEqual(self.client.get('/any').status_code, 401)
+
+    def test_decorator_matches_legacy(self):
+        for user_profiles in ([('lawyer', ['book_rooms'])], [('lawyer', ['book_meeting_rooms'])],
+                              [('lawyer', ['view_rooms'])], [('Admin', ['view_meeting_rooms'])],
+                              [('dev', [])], [('lawyer', [])]):
+            user = make_user(user_profiles)
+            expected = 200 if legacy_has_access(user, ['book_rooms', 'book_meeting_rooms']) else 403
+            self.assertEqual(self.status('/any', user_profiles), expected)
+            for room_type in ('coworking', 'meeting'):
+                expected = 200 if legacy_has_access(user, legacy_required('view', room_type)) else 403
+                self.assertEqual(self.status(f'/typed?room_type={room_type}', user_profiles), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Tests de las opciones del pool por entorno y de sus contadores (utils/pool_metrics.py)."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest import mock
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db, engine_options_from_env
+from utils.pool_metrics import InstrumentedQueuePool, pool_stats
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_defaults_and_overrides(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = engine_options_from_env()
+        self.assertIs(options['poolclass'], InstrumentedQueuePool)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertLess(options['pool_recycle'], 28800)  # wait_timeout por defecto de MySQL
+
+        env = {'DB_POOL_SIZE': '3', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_RECYCLE': '60',
+               'DB_POOL_PRE_PING': 'false', 'DB_POOL_TIMEOUT': '2'}
+        with mock.patch.dict(os.environ, env, clear=True):
+            options = engine_options_from_env()
+        self.assertEqual(
+            (options['pool_size'], options['max_overflow'], options['pool_recycle'],
+             options['pool_pre_ping'], options['pool_timeout']),
+            (3, 0, 60, False, 2),
+        )
+
+
+class TestPoolExhaustion(unittest.TestCase):
+    """Carga con el patrón de consultas de create_booking: la sesión retiene la conexión."""
+
+    def build_app(self, pool_size):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'pool.db')}"
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'poolclass': InstrumentedQueuePool,
+            'pool_size': pool_size,
+            'max_overflow': 0,
+            'pool_timeout': 1,
+            'pool_pre_ping': True,
+            'connect_args': {'timeout': 30, 'check_same_thread': False},
+        }
+        db.init_app(app)
+        with app.app_context():
+            engine = db.engine
+
+            @event.listens_for(engine, 'before_cursor_execute')
+            def _network(conn, cursor, statement, parameters, context, executemany):
+                time.sleep(0.03)  # ida y vuelta simulada a MySQL
+
+            from models import RoomModel
+            db.create_all()
+            db.session.add(RoomModel(name='Coworking', capacity=100, price=0))
+            db.session.commit()
+            db.session.remove()
+            self.addCleanup(engine.dispose)
+        return app
+
+    def book(self, app, i):
+        from models import BookingModel, RoomModel
+
+        with app.app_context():
+            try:
+                room = RoomModel.query.filter_by(id=1, deleted_at=None).first()
+                booking_date = date(2026, 11, 2)
+                for email in (f'user{i}@example.com', f'guest{i}@example.com'):
+                    BookingModel.query.filter(
+                        db.func.lower(BookingModel.user_email) == email,
+                        BookingModel.booking_date == booking_date,
+                    ).all()
+                for slot in ('09:00', '10:00', '11:00'):
+                    BookingModel.query.filter(
+                        BookingModel.room_id == room.id,
+                        BookingModel.booking_date == booking_date,
+                        BookingModel.time_slot == slot,
+                    ).all()
+                    db.session.add(BookingModel(
+                        room_id=room.id, booking_date=booking_date, time_slot=slot, user_name='U',
+                        user_email=f'user{i}@example.com', user_phone='0', user_tuition='T',
+                        idempotency_key=f'{i}_{slot}',
+                    ))
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    def run_load(self, app, requests):
+        failures = []
+        lock = threading.Lock()
+
+        def one(i):
+            try:
+                self.book(app, i)
+            except PoolTimeoutError:
+                with lock:
+                    failures.append(i)
+
+        pool_stats.reset()
+        with ThreadPoolExecutor(max_workers=requests) as executor:
+            list(executor.map(one, range(requests)))
+        return failures
+
+    def test_small_pool_is_exhausted(self):
+        app = self.build_app(pool_size=1)
+        failures = self.run_load(app, 6)
+        stats = pool_stats.snapshot()
+        # Cada reserva retiene la única conexión ~0.3 s: las que esperan más de 1 s fallan
+        self.assertGreater(len(failures), 0)
+        self.assertLess(len(failures), 6)
+        self.assertEqual(stats['timeouts'], len(failures))
+        self.assertEqual(stats['checkouts'], 6 - len(failures))
+        self.assertEqual(stats['checkins'], stats['checkouts'])
+        self.assertGreaterEqual(stats['wait_max_ms'], 1000)
+        self.assertGreater(stats['slow_waits'], 0)
+        self.assertGreater(stats['held_mean_ms'], 200)
+        with app.app_context():
+            self.assertEqual(pool_stats.snapshot(db.engine.pool)['pool']['checked_out'], 0)
+
+    def test_sized_pool_serves_the_same_load(self):
+        app = self.build_app(pool_size=6)
+        self.assertEqual(self.run_load(app, 6), [])
+        stats = pool_stats.snapshot()
+        self.assertEqual(stats['timeouts'], 0)
+        self.assertEqual(stats['checkouts'], 6)
+        self.assertLessEqual(stats['connects'], 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
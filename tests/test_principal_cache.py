@@ -0,0 +1,174 @@
+"""Tests de la caché de principals usada por token_required/access_required."""
+
+import os
+import tempfile
+import unittest
+
+from flask import Flask, jsonify, request
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from utils import principal_cache as pc
+from utils.decorators import token_required, access_required
+from utils.permissions import compile_profile
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+class TestPrincipalCache(unittest.TestCase):
+    def principal(self, accesses=('view_news',), dev=False):
+        names = frozenset({'dev'} if dev else {'lawyer'})
+        mask = compile_profile('dev' if dev else 'lawyer', accesses)
+        return pc.Principal('u-1', 'a@b.com', names, frozenset(accesses), dev, mask)
+
+    def test_ttl_expiry(self):
+        cache = pc.PrincipalCache(ttl=10)
+        cache.put(('a@b.com', 1), self.principal(), cache.generation, now=100)
+        self.assertIsNotNone(cache.get(('a@b.com', 1), now=109))
+        self.assertIsNone(cache.get(('a@b.com', 1), now=110))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_invalidate_identity_drops_every_iat(self):
+        cache = pc.PrincipalCache(ttl=60)
+        cache.put(('a@b.com', 1), self.principal(), cache.generation)
+        cache.put(('a@b.com', 2), self.principal(), cache.generation)
+        cache.put(('c@d.com', 1), self.principal(), cache.generation)
+        cache.invalidate_identity('a@b.com')
+        self.assertIsNone(cache.get(('a@b.com', 1)))
+        self.assertIsNone(cache.get(('a@b.com', 2)))
+        self.assertIsNotNone(cache.get(('c@d.com', 1)))
+
+    def test_load_started_before_invalidation_is_not_stored(self):
+        cache = pc.PrincipalCache(ttl=60)
+        generation = cache.generation
+        cache.invalidate_all()
+        self.assertFalse(cache.put(('a@b.com', 1), self.principal(), generation))
+        self.assertIsNone(cache.get(('a@b.com', 1)))
+
+    def test_lru_cap_and_disabled(self):
+        cache = pc.PrincipalCache(ttl=60, max_entries=2)
+        for i in range(3):
+            cache.put(('u%d' % i, 1), self.principal(), cache.generation)
+        self.assertIsNone(cache.get(('u0', 1)))
+        self.assertEqual(cache.stats()['size'], 2)
+
+        disabled = pc.PrincipalCache(ttl=0)
+        self.assertFalse(disabled.put(('a', 1), self.principal(), disabled.generation))
+        self.assertIsNone(disabled.get(('a', 1)))
+
+    def test_has_access(self):
+        self.assertTrue(self.principal().has_access('view_news'))
+        self.assertFalse(self.principal().has_access('manage_news'))
+        self.assertTrue(self.principal(accesses=(), dev=True).has_access('anything'))
+
+
+class TestDecoratorsWithCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'auth.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key-with-enough-bytes!'
+        db.init_app(self.app)
+        JWTManager(self.app)
+
+        @self.app.route('/news')
+        @jwt_required()
+        @token_required
+        @access_required('view_news')
+        def news():
+            return jsonify({'uuid': request.user.uuid, 'email': request.user.email})
+
+        @self.app.route('/profiles')
+        @jwt_required()
+        @token_required
+        def profiles():
+            return jsonify(sorted(p.name for p in request.user.profiles))
+
+        self.saved_cache = pc.principal_cache
+        pc.principal_cache = pc.PrincipalCache(ttl=60)
+        # decorators importó el objeto; se reemplaza también ahí
+        import utils.decorators as decorators
+        self.decorators = decorators
+        decorators.principal_cache = pc.principal_cache
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        from models import UserModel, ProfileModel, AccessModel
+        db.create_all()
+        self.view = AccessModel(uuid='a-view', name='view_news')
+        self.profile = ProfileModel(uuid='p-lawyer', name='lawyer', accesses=[self.view])
+        self.user = UserModel(uuid='u-1', name='Ana', email='ana@example.com', password='x', profiles=[self.profile])
+        db.session.add_all([self.view, self.profile, self.user])
+        db.session.commit()
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(identity='ana@example.com')}
+
+        self.queries = 0
+
+        def count(*args):
+            self.queries += 1
+        event.listen(db.engine, 'before_cursor_execute', count)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        pc.principal_cache = self.saved_cache
+        self.decorators.principal_cache = self.saved_cache
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def get(self, path):
+        response = self.client.get(path, headers=self.headers)
+        db.session.remove()
+        return response
+
+    def test_second_request_does_not_query_the_user(self):
+        first = self.get('/news')
+        self.assertEqual(first.status_code, 200)
+        self.assertGreater(self.queries, 0)
+        self.queries = 0
+        second = self.get('/news')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_json(), {'uuid': 'u-1', 'email': 'ana@example.com'})
+        self.assertEqual(self.queries, 0)
+        self.assertEqual(pc.principal_cache.stats()['hits'], 1)
+
+    def test_request_user_loads_model_lazily(self):
+        self.get('/profiles')
+        response = self.get('/profiles')
+        self.assertEqual(response.get_json(), ['lawyer'])
+
+    def test_invalidation_applies_permission_changes(self):
+        from models import ProfileModel
+        self.assertEqual(self.get('/news').status_code, 200)
+
+        profile = db.session.get(ProfileModel, 'p-lawyer')
+        profile.accesses = []
+        db.session.commit()
+        # Sin invalidar se sigue respondiendo desde la caché hasta que venza el TTL
+        self.assertEqual(self.get('/news').status_code, 200)
+
+        pc.invalidate_all()
+        self.assertEqual(self.get('/news').status_code, 403)
+
+    def test_invalidate_identity_after_profile_change(self):
+        from models import UserModel
+        self.assertEqual(self.get('/news').status_code, 200)
+        user = db.session.get(UserModel, 'u-1')
+        user.profiles = []
+        db.session.commit()
+        pc.invalidate_identity('ana@example.com')
+        self.assertEqual(self.get('/news').status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Tests del arranque de hilos una vez por proceso (utils/process_threads.py)."""
+
+import os
+import threading
+import time
+import unittest
+
+from utils.process_threads import OncePerProcess
+
+
+class TestOncePerProcess(unittest.TestCase):
+    def test_concurrent_callers_start_once(self):
+        calls = []
+
+        def start():
+            calls.append(threading.get_ident())
+            time.sleep(0.05)  # los demás hilos llegan mientras se arranca
+
+        ensure = OncePerProcess(start)
+        threads = [threading.Thread(target=ensure) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(ensure.started())
+
+    def test_new_process_or_reset_starts_again(self):
+        calls = []
+        ensure = OncePerProcess(lambda: calls.append(1))
+        ensure()
+        ensure()
+        ensure.pid = os.getpid() + 1  # lo que ve un worker recién forkeado
+        self.assertFalse(ensure.started())
+        ensure()
+        ensure.reset()
+        ensure()
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
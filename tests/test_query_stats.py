@@ -0,0 +1,114 @@
+"""Tests de la instrumentación de consultas SQL por request (utils/query_stats.py)."""
+
+import unittest
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from utils.query_stats import QueryStats, fingerprint
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_literals_and_parameters_are_normalized(self):
+        self.assertEqual(
+            fingerprint("SELECT *  FROM users\n WHERE id = 42 AND name = 'O''Brien' AND uuid = %(uuid_1)s"),
+            'SELECT * FROM users WHERE id = ? AND name = ? AND uuid = ?',
+        )
+        self.assertEqual(fingerprint('SELECT a FROM t WHERE x = %s'), fingerprint('SELECT a FROM t WHERE x = ?'))
+        self.assertEqual(fingerprint('SELECT anon_1.id FROM users_2 AS anon_1'), 'SELECT anon_1.id FROM users_2 AS anon_1')
+
+    def test_in_and_values_lists_collapse(self):
+        self.assertEqual(
+            fingerprint('SELECT id FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)'),
+            fingerprint('SELECT id FROM t WHERE id IN (%(id_1_1)s)'),
+        )
+        self.assertEqual(
+            fingerprint('INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)'),
+            'INSERT INTO t (a, b) VALUES (?, ?), ...',
+        )
+
+
+class TestQueryStats(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        with self.engine.begin() as conn:
+            conn.execute(text('CREATE TABLE slots (id INTEGER PRIMARY KEY, room_id INTEGER)'))
+            conn.execute(text('INSERT INTO slots (room_id) VALUES (1), (1), (2)'))
+
+        self.stats = QueryStats(slow_query_ms=10_000, nplusone_threshold=5, header=True)
+        self.app = Flask(__name__)
+        engine = self.engine
+
+        @self.app.route('/loop')
+        def loop():
+            with engine.connect() as conn:
+                for slot_id in range(1, 13):
+                    conn.execute(text(f'SELECT room_id FROM slots WHERE id = {slot_id}'))
+                rooms = conn.execute(text('SELECT DISTINCT room_id FROM slots')).all()
+            return jsonify({'rooms': len(rooms)})
+
+        @self.app.route('/single')
+        def single():
+            with engine.connect() as conn:
+                conn.execute(text('SELECT count(*) FROM slots')).scalar()
+            return 'ok'
+
+        self.stats.init_app(self.app)
+        self.addCleanup(self.remove_listeners)
+        self.client = self.app.test_client()
+
+    def remove_listeners(self):
+        for name in ('before_cursor_execute', 'after_cursor_execute'):
+            listener = getattr(self.stats, f'_{name}')
+            if event.contains(Engine, name, listener):
+                event.remove(Engine, name, listener)
+        self.engine.dispose()
+
+    def test_counts_queries_per_request_and_sets_headers(self):
+        response = self.client.get('/single')
+        self.assertTrue(response.headers['X-SQL-Stats'].startswith('queries=1; time_ms='))
+        self.assertIn('n_plus_one=0', response.headers['X-SQL-Stats'])
+        self.assertTrue(response.headers['Server-Timing'].startswith('db;dur='))
+        self.assertIn('SELECT count(*) FROM slots', response.headers['X-SQL-Top'])
+
+    def test_detects_repeated_statement_as_nplusone(self):
+        with self.assertLogs('utils.query_stats', 'WARNING') as logs:
+            response = self.client.get('/loop')
+        self.assertIn('queries=13;', response.headers['X-SQL-Stats'])
+        self.assertIn('n_plus_one=1', response.headers['X-SQL-Stats'])
+        top = response.headers['X-SQL-Top'].split(' | ')
+        self.assertEqual(sorted(int(entry.split('x ', 1)[0]) for entry in top), [1, 12])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Possible N+1 in loop: 12 x SELECT room_id FROM slots WHERE id = ?', logs.output[0])
+
+        stats = self.stats.stats()
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['queries'], 13)
+        self.assertEqual(stats['nplusone'], [
+            {'endpoint': 'loop', 'statement': 'SELECT room_id FROM slots WHERE id = ?', 'requests': 1},
+        ])
+        by_statement = {entry['statement']: entry for entry in stats['statements']}
+        self.assertEqual(by_statement['SELECT room_id FROM slots WHERE id = ?']['max_per_request'], 12)
+
+    def test_slow_query_log_inside_and_outside_requests(self):
+        self.stats.slow_query_seconds = 0
+        with self.assertLogs('utils.query_stats', 'WARNING') as logs:
+            self.client.get('/single')
+            with self.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+        self.assertIn('in single: SELECT count(*) FROM slots', logs.output[0])
+        self.assertIn('in background: SELECT ?', logs.output[1])
+        self.assertEqual(self.stats.stats()['slow_queries'], 2)
+        # Las consultas fuera de una request no se suman a ninguna request
+        self.assertEqual(self.stats.stats()['queries'], 1)
+
+    def test_header_is_opt_in(self):
+        self.stats.header = False
+        response = self.client.get('/single')
+        self.assertNotIn('X-SQL-Stats', response.headers)
+        self.assertEqual(self.stats.stats()['queries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests de las métricas de latencia por endpoint (utils/request_metrics.py)."""
+
+import threading
+import time
+import unittest
+
+from flask import Flask, abort, jsonify, request
+
+from utils.request_metrics import (
+    BUCKET_BOUNDS, BUCKET_COUNT, UNMATCHED, RequestMetrics, bucket_index, quantile,
+)
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = RequestMetrics()
+        self.app = Flask(__name__)
+        self.seen_in_flight = []
+
+        @self.app.route('/items', methods=['GET', 'POST'])
+        def items():
+            if request.method == 'POST':
+                return jsonify({'received': len(request.get_data())}), 201
+            return jsonify({'items': list(range(10))})
+
+        @self.app.route('/slow')
+        def slow():
+            self.seen_in_flight.append(self.metrics.snapshot()[1])
+            time.sleep(0.02)
+            return 'ok'
+
+        @self.app.route('/forbidden')
+        def forbidden():
+            abort(403)
+
+        @self.app.route('/boom')
+        def boom():
+            raise RuntimeError('boom')
+
+        self.metrics.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def series(self, endpoint, status):
+        merged, _ = self.metrics.snapshot()
+        return merged[(endpoint, status)]
+
+    def test_counts_by_endpoint_and_status_class(self):
+        for _ in range(3):
+            self.client.get('/items')
+        self.client.post('/items', data=b'x' * 100)
+        self.client.get('/forbidden')
+        self.client.get('/missing')
+
+        self.assertEqual(self.series('items', '2xx').count, 4)
+        self.assertEqual(self.series('forbidden', '4xx').count, 1)
+        self.assertEqual(self.series(UNMATCHED, '4xx').count, 1)
+        self.assertEqual(self.series('items', '2xx').request_bytes, 100)
+        self.assertGreater(self.series('items', '2xx').response_bytes, 0)
+
+    def test_in_flight_inside_and_after_request(self):
+        self.client.get('/slow')
+        self.assertEqual(self.seen_in_flight, [{'slow': 1}])
+        self.assertEqual(self.metrics.snapshot()[1], {})
+        self.assertEqual(self.client.get('/boom').status_code, 500)
+        self.assertEqual(self.series('boom', '5xx').count, 1)
+        self.assertEqual(self.metrics.snapshot()[1], {})
+        series = self.series('slow', '2xx')
+        self.assertGreaterEqual(series.sum, 0.02)
+
+    def test_quantiles_within_one_bucket(self):
+        self.assertEqual(bucket_index(0), 0)
+        self.assertEqual(bucket_index(BUCKET_BOUNDS[5]), 5)
+        self.assertEqual(bucket_index(BUCKET_BOUNDS[5] * 1.01), 6)
+        self.assertEqual(bucket_index(10 ** 6), BUCKET_COUNT)
+        self.assertIsNone(quantile([0] * (BUCKET_COUNT + 1), 0.5))
+
+        for i in range(1, 1001):
+            self.metrics.observe('x', 200, i / 1000)  # 1 ms a 1 s, uniforme
+        buckets = self.series('x', '2xx').buckets
+        for q in (0.5, 0.95, 0.99):
+            estimate = quantile(buckets, q)
+            self.assertLess(abs(estimate - q) / q, 0.42)  # un bucket es x√2
+
+    def test_prometheus_buckets_are_cumulative(self):
+        for seconds in (0.001, 0.01, 0.1, 100):
+            self.metrics.observe('api.get', 200, seconds)
+        text = self.metrics.to_prometheus()
+        counts = [int(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+                  if line.startswith('http_request_duration_seconds_bucket')]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 4)
+        self.assertEqual(counts[-2], 3)  # 100 s cae en el bucket de desborde
+        self.assertIn('http_request_duration_seconds_count{endpoint="api.get",status="2xx"} 4', text)
+
+        data = self.metrics.to_json()
+        self.assertEqual(data['endpoints'][0]['count'], 4)
+        self.assertTrue({'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'} <= set(data['endpoints'][0]))
+
+    def test_threads_write_their_own_shards_without_losing_counts(self):
+        def worker():
+            for i in range(1000):
+                self.metrics.start('e')
+                self.metrics.observe('e', 200, 0.001, 10, 20)
+                self.metrics.finish('e')
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        series = self.series('e', '2xx')
+        self.assertEqual(series.count, 8000)
+        self.assertEqual(sum(series.buckets), 8000)
+        self.assertEqual(series.request_bytes, 80000)
+        self.assertEqual(series.response_bytes, 160000)
+        self.assertEqual(self.metrics.snapshot()[1], {})
+
+    def test_recording_overhead_is_small(self):
+        calls = 20000
+        start = time.perf_counter()
+        for _ in range(calls):
+            self.metrics.start('e')
+            self.metrics.observe('e', 200, 0.003, 100, 2000)
+            self.metrics.finish('e')
+        per_call = (time.perf_counter() - start) / calls
+        self.assertLess(per_call, 20e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Tests del perfilado de requests a pedido (utils/request_profiler.py)."""
+
+import ast
+import importlib.util
+import os
+import pstats
+import tempfile
+import time
+import unittest
+
+from flask import Flask
+from werkzeug.routing import Map, Rule
+
+from utils.request_profiler import RequestProfiler, pstats_text
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def busy_helper():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'profiles')
+        self.app = Flask(__name__)
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key-with-enough-bytes!'
+        self.profiler = RequestProfiler(self.directory)
+
+        @self.app.route('/work')
+        def work():
+            busy_helper()
+            return 'ok'
+
+        @self.app.route('/fast')
+        def fast():
+            return 'ok'
+
+        self.profiler.init_app(self.app)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def token(self, mode='cprofile'):
+        with self.app.app_context():
+            return self.profiler.issue_token(mode)
+
+    def test_nothing_is_profiled_without_token_or_rules(self):
+        response = self.client.get('/work')
+        self.assertNotIn('X-Profile-File', response.headers)
+        self.assertEqual(self.profiler.list_profiles(), [])
+
+    def test_signed_token_profiles_a_single_request(self):
+        token = self.token()
+        response = self.client.get('/work', headers={'X-Profile': token})
+        name = response.headers['X-Profile-File']
+        self.assertTrue(name.endswith('.prof'))
+        stats = pstats.Stats(self.profiler.profile_path(name))
+        self.assertTrue(any(func[2] == 'busy_helper' for func in stats.stats))
+        self.assertIn('busy_helper', pstats_text(self.profiler.profile_path(name)))
+
+        [profile] = self.profiler.list_profiles()
+        self.assertEqual(profile['endpoint'], 'work')
+        self.assertEqual(profile['mode'], 'cprofile')
+        self.assertGreaterEqual(profile['duration_ms'], 50)
+
+        # El token ya se usó, también para otro worker que comparte el directorio
+        other_worker = RequestProfiler(self.directory)
+        other_worker.init_app(self.app)
+        self.assertNotIn('X-Profile-File', self.client.get('/work', headers={'X-Profile': token}).headers)
+        self.assertNotIn('X-Profile-File', self.client.get('/work', headers={'X-Profile': token[:-2] + 'xx'}).headers)
+        self.assertEqual(len(self.profiler.list_profiles()), 1)
+
+    def test_stack_sampling_mode_writes_collapsed_stacks(self):
+        response = self.client.get('/work', headers={'X-Profile': self.token('sample')})
+        name = response.headers['X-Profile-File']
+        self.assertTrue(name.endswith('.collapsed'))
+        with open(self.profiler.profile_path(name), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any('work (' in line and 'busy_helper (' in line for line in lines))
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertGreater(int(count), 0)
+
+    def test_sampling_rule_is_shared_between_workers(self):
+        self.profiler.set_rule('fast', every=3, limit=2)
+        # Otro worker (otra instancia con el mismo directorio) ve la regla por el archivo
+        other = RequestProfiler(self.directory)
+        self.assertEqual(set(other.get_rules()), {'fast'})
+
+        profiled = [
+            'X-Profile-File' in self.client.get('/fast').headers for _ in range(10)
+        ]
+        self.assertEqual(profiled, [False, False, True, False, False, True, False, False, False, False])
+        self.assertNotIn('X-Profile-File', self.client.get('/work').headers)
+
+        self.assertTrue(self.profiler.delete_rule('fast'))
+        self.assertFalse(self.profiler.delete_rule('fast'))
+        self.assertEqual(other.get_rules(), {})
+        with self.assertRaises(ValueError):
+            self.profiler.set_rule('fast', every=0)
+
+    def test_old_profiles_are_pruned_and_paths_are_checked(self):
+        self.profiler.max_files = 3
+        self.profiler.set_rule('fast', every=1, limit=10)
+        names = [self.client.get('/fast').headers['X-Profile-File'] for _ in range(5)]
+        self.assertEqual(len(self.profiler.list_profiles()), 3)
+        self.assertTrue(self.profiler.delete_profile(names[-1]))
+        for name in ('../sampling.json', 'sampling.json', '', names[-1]):
+            self.assertIsNone(self.profiler.profile_path(name))
+
+    def test_hooks_cost_little_when_off(self):
+        calls = 5000
+        with self.app.test_request_context('/fast'):
+            response = self.app.response_class('ok')
+            start = time.perf_counter()
+            for _ in range(calls):
+                self.profiler._before_request()
+                self.profiler._after_request(response)
+            per_request = (time.perf_counter() - start) / calls
+        self.assertLess(per_request, 20e-6)
+
+
+def dev_url_map():
+    # Las rutas de routes/dev.py en el orden en que se declaran, sin importar el blueprint
+    with open(os.path.join(ROOT, 'routes', 'dev.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    rules = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and getattr(decorator.func, 'attr', None) == 'route':
+                methods = next((ast.literal_eval(k.value) for k in decorator.keywords if k.arg == 'methods'), ['GET'])
+                rules.append(Rule(ast.literal_eval(decorator.args[0]), endpoint=node.name, methods=methods))
+    return Map(rules).bind('localhost')
+
+
+class TestProfilingRoutes(unittest.TestCase):
+    """Las rutas del perfilador no tapan las de los perfiles de permisos (/dev/profiles)."""
+
+    def assert_routes(self, match):
+        self.assertEqual(match('/dev/profiles', 'GET'), 'list_profiles_dev')
+        self.assertEqual(match('/dev/profiles/0b7c6e2a', 'DELETE'), 'delete_profile_dev')
+        self.assertEqual(match('/dev/profiling', 'GET'), 'list_request_profiles')
+        self.assertEqual(match('/dev/profiling/token', 'POST'), 'issue_profile_token')
+        self.assertEqual(match('/dev/profiling/sampling', 'GET'), 'get_profile_sampling')
+        self.assertEqual(match('/dev/profiling/api.status.prof', 'GET'), 'download_request_profile')
+        self.assertEqual(match('/dev/profiling/api.status.prof', 'DELETE'), 'delete_request_profile')
+
+    def test_declared_routes(self):
+        urls = dev_url_map()
+        self.assert_routes(lambda path, method: urls.match(path, method=method)[0])
+
+    @unittest.skipUnless(importlib.util.find_spec('flask_mail'), 'requiere las dependencias de routes/')
+    def test_registered_blueprint(self):
+        from routes.dev import dev_bp
+
+        app = Flask(__name__)
+        app.register_blueprint(dev_bp)
+        urls = app.url_map.bind('localhost')
+        self.assert_routes(lambda path, method: urls.match(path, method=method)[0].split('.', 1)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
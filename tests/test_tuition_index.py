@@ -0,0 +1,143 @@
+"""Tests de professionals.tuition_normalized: sincronización, migración y uso del índice."""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from flask import Flask
+from sqlalchemy import event, func
+from sqlalchemy.dialects.mysql import LONGTEXT
+from sqlalchemy.ext.compiler import compiles
+
+from config.config import db
+from utils import tuition_utils
+
+MIGRATION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'migrations', 'versions', 'd4e5f6a7b8c9_add_tuition_normalized_to_professionals.py',
+)
+
+
+# models/news.py usa LONGTEXT de MySQL; en la base SQLite de los tests es un TEXT común
+@compiles(LONGTEXT, 'sqlite')
+def _longtext_sqlite(element, compiler, **kw):
+    return 'TEXT'
+
+
+def make_professional(tuition, **kwargs):
+    from models import ProfessionalModel
+    fields = dict(name='Ana', title='Abogado', email='ana@example.com', location='San Rafael')
+    fields.update(kwargs)
+    return ProfessionalModel(tuition=tuition, **fields)
+
+
+class TestTuitionIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.tmp.name, 'tuition.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmp.cleanup()
+
+    def explain(self, call):
+        """Plan de SQLite de la consulta SELECT que hace `call`."""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            call()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        statement, parameters = statements[-1]
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        return ' | '.join(row[-1] for row in rows)
+
+    def test_lookup_uses_index(self):
+        db.session.add_all([make_professional(f'{i:05d}', email=f'p{i}@example.com') for i in range(200)])
+        db.session.commit()
+        plan = self.explain(lambda: tuition_utils.find_professional_by_tuition('00042'))
+        self.assertIn('ix_professionals_tuition_normalized', plan)
+
+        plan = self.explain(lambda: tuition_utils.professionals_by_tuition(['00001', '00002']))
+        self.assertIn('ix_professionals_tuition_normalized', plan)
+
+        # La expresión anterior no puede usar ningún índice
+        from models import ProfessionalModel
+        plan = self.explain(lambda: ProfessionalModel.query.filter(
+            func.replace(func.replace(ProfessionalModel.tuition, ' ', ''), '.', '') == '00042'
+        ).first())
+        self.assertIn('SCAN', plan)
+        self.assertNotIn('ix_professionals_tuition_normalized', plan)
+
+    def test_column_follows_tuition(self):
+        professional = make_professional('12.345 ')
+        db.session.add(professional)
+        db.session.commit()
+        self.assertEqual(professional.tuition_normalized, '12345')
+        self.assertEqual(tuition_utils.find_professional_by_tuition('12 345').uuid, professional.uuid)
+
+        professional.tuition = '6.789'
+        db.session.commit()
+        self.assertIsNone(tuition_utils.find_professional_by_tuition('12345'))
+        self.assertEqual(tuition_utils.find_professional_by_tuition('6789').uuid, professional.uuid)
+
+        professional.tuition = ' . '
+        self.assertIsNone(professional.tuition_normalized)
+
+    def test_batch_lookup_skips_deleted_and_chunks(self):
+        from datetime import datetime
+        deleted = make_professional('999', email='x@example.com', deleted_at=datetime.utcnow())
+        db.session.add_all([make_professional(str(1000 + i), email=f'p{i}@example.com') for i in range(30)] + [deleted])
+        db.session.commit()
+        original = tuition_utils.TUITION_LOOKUP_CHUNK
+        tuition_utils.TUITION_LOOKUP_CHUNK = 7
+        try:
+            found = tuition_utils.professionals_by_tuition([str(1000 + i) for i in range(30)] + ['999', None, ''])
+        finally:
+            tuition_utils.TUITION_LOOKUP_CHUNK = original
+        self.assertEqual(sorted(found), [str(1000 + i) for i in range(30)])
+
+
+class TestTuitionMigration(unittest.TestCase):
+    def test_upgrade_backfills_and_indexes(self):
+        spec = importlib.util.spec_from_file_location('tuition_migration', MIGRATION_PATH)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        engine = sa.create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                'CREATE TABLE professionals (uuid VARCHAR(36) PRIMARY KEY, tuition VARCHAR(10), deleted_at DATETIME)')
+            conn.exec_driver_sql(
+                "INSERT INTO professionals (uuid, tuition) VALUES ('a', '1.234'), ('b', ' 56 78'), ('c', NULL), ('d', '.')")
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+                # Idempotente, como las otras migraciones del repo
+                migration.upgrade()
+
+        with engine.connect() as conn:
+            rows = dict(conn.exec_driver_sql('SELECT uuid, tuition_normalized FROM professionals').fetchall())
+            indexes = {index['name'] for index in sa.inspect(conn).get_indexes('professionals')}
+        self.assertEqual(rows, {'a': '1234', 'b': '5678', 'c': None, 'd': None})
+        self.assertIn('ix_professionals_tuition_normalized', indexes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests del segmento compartido de salud de los workers (utils/worker_health.py)."""
+
+import gc
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+from utils.worker_health import FIELD_NAMES, MISSING, HealthSegment, WorkerHealth
+
+
+def run_worker(path, ready, done):
+    health = WorkerHealth(path=path, slots=4, interval=0.05)
+    health.probes['requests_in_flight'] = lambda: 7
+    health.start()
+    ready.set()
+    done.wait(10)
+
+
+class TestWorkerHealth(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'health')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sample_of_current_process(self):
+        health = WorkerHealth(path=self.path, slots=4, interval=60)
+        health.probes['pool_checked_out'] = lambda: 3
+        health.probes['ip_cache_entries'] = lambda: 1 / 0
+        health.start()
+        self.addCleanup(health.gc_pauses.uninstall)
+        self.addCleanup(health.stop)
+        gc.collect()
+
+        report = health.report()
+        [worker] = report['workers']
+        self.assertEqual(worker['pid'], os.getpid())
+        self.assertTrue(worker['current'])
+        self.assertFalse(worker['stale'])
+        self.assertGreater(worker['rss_bytes'], 0)
+        self.assertGreater(worker['open_fds'], 0)
+        self.assertGreaterEqual(worker['threads'], 2)
+        self.assertGreater(worker['gc_collections_2'], 0)
+        self.assertGreater(worker['gc_pause_total_ms'], 0)
+        self.assertEqual(worker['pool_checked_out'], 3)
+        self.assertIsNone(worker['ip_cache_entries'])  # la sonda falló
+        self.assertIsNone(worker['log_queue_depth'])  # sin sonda
+        self.assertEqual(report['totals']['pool_checked_out'], 3)
+
+    def test_aggregates_across_worker_processes(self):
+        context = multiprocessing.get_context('fork')
+        done = context.Event()
+        workers = []
+        for _ in range(3):
+            ready = context.Event()
+            process = context.Process(target=run_worker, args=(self.path, ready, done))
+            process.start()
+            workers.append((process, ready))
+        try:
+            for _, ready in workers:
+                self.assertTrue(ready.wait(10))
+            report = WorkerHealth(path=self.path, slots=4).report()
+            pids = {process.pid for process, _ in workers}
+            self.assertEqual({worker['pid'] for worker in report['workers']}, pids)
+            self.assertEqual(report['totals']['requests_in_flight'], 21)
+            self.assertEqual(len({worker['slot'] for worker in report['workers']}), 3)
+        finally:
+            done.set()
+            for process, _ in workers:
+                process.join(10)
+
+        # Los procesos terminaron: sus slots quedan libres y no se informan
+        self.assertEqual(WorkerHealth(path=self.path, slots=4).report()['workers'], [])
+        segment = HealthSegment(self.path, 4)
+        self.addCleanup(segment.close)
+        self.assertEqual(segment.claim(os.getpid()), 0)
+
+    def test_dead_slots_are_reclaimed_and_full_segment_refuses(self):
+        segment = HealthSegment(self.path, 2)
+        self.addCleanup(segment.close)
+        dead = dict.fromkeys(FIELD_NAMES, MISSING)
+        dead.update(pid=2 ** 22 + 12345, started_at=0.0, updated_at=0.0)  # pid que no existe
+        segment.write(0, dead)
+        segment.write(1, dict(dead, pid=os.getppid()))
+        self.assertEqual(segment.claim(os.getpid()), 0)
+        self.assertEqual(segment.claim(os.getpid()), 0)
+        # Los dos slots son de procesos vivos: no hay lugar para otro
+        self.assertIsNone(segment.claim(1))
+
+    def test_reader_never_sees_a_torn_slot(self):
+        segment = HealthSegment(self.path, 1)
+        self.addCleanup(segment.close)
+        stop = threading.Event()
+
+        def writer():
+            n = 1
+            while not stop.is_set():
+                segment.write(0, {name: n for name in FIELD_NAMES})
+                n += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            reads = 0
+            for _ in range(20000):
+                values = segment.read(0)
+                if values is not None:
+                    reads += 1
+                    self.assertEqual(len(set(values.values())), 1)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertGreater(reads, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Lecturas en una réplica de MySQL para los endpoints de solo lectura.
+
+Con DB_REPLICA_URI configurada, init_db agrega el bind 'replica' y `db.session` es una
+RoutingSession. Las consultas de una vista marcada con @read_replica (solo GET/HEAD) van a la
+réplica; el resto del tráfico, los hooks y los decoradores de autenticación siguen en el primario.
+
+- Read-your-writes: cuando la sesión escribe (flush, UPDATE/DELETE explícito) todas sus lecturas
+  siguientes van al primario. La respuesta de una request que escribió lleva la cookie
+  `db_primary_until` y, mientras no vence (DB_REPLICA_STICKY_SECONDS, 5 s), las vistas marcadas
+  de ese cliente leen del primario aunque la réplica todavía no haya aplicado el cambio.
+- Failover: la conexión a la réplica se toma antes de la primera consulta; si falla, esa consulta
+  y las de los próximos DB_REPLICA_RETRY_SECONDS (30 s) de ese worker van al primario, sin pagar
+  el timeout de conexión en cada request. Una réplica que se cae a mitad de una consulta sí
+  devuelve el error.
+
+Sin DB_REPLICA_URI el decorador no hace nada.
+"""
+
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+PIN_COOKIE = 'db_primary_until'
+READ_METHODS = ('GET', 'HEAD')
+
+# Claves en session.info (se descartan con la sesión al terminar el contexto de la app)
+READ_REPLICA = 'db_routing.read_replica'
+WROTE = 'db_routing.wrote'
+
+
+class ReplicaRouter:
+    def __init__(self, sticky_seconds=None, retry_seconds=None):
+        self.sticky_seconds = (
+            sticky_seconds if sticky_seconds is not None else float(os.getenv('DB_REPLICA_STICKY_SECONDS', '5'))
+        )
+        self.retry_seconds = (
+            retry_seconds if retry_seconds is not None else float(os.getenv('DB_REPLICA_RETRY_SECONDS', '30'))
+        )
+        self.db = None
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.down_until = 0.0
+            self.last_error = None
+            self.replica_reads = 0
+            self.primary_reads = 0  # consultas de vistas marcadas que igual fueron al primario
+            self.pinned_requests = 0
+            self.failovers = 0
+
+    def init_app(self, app, db):
+        self.db = db
+        self.enabled = REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {})
+        if self.enabled:
+            app.after_request_funcs.setdefault(None, []).append(self._after_request)
+
+    def _after_request(self, response):
+        registry = self.db.session.registry
+        if registry.has() and registry().info.get(WROTE):
+            response.set_cookie(
+                PIN_COOKIE,
+                f'{time.time() + self.sticky_seconds:.3f}',
+                max_age=max(1, round(self.sticky_seconds)),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def pinned(self):
+        try:
+            return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def mark_down(self, error):
+        with self.lock:
+            self.failovers += 1
+            self.down_until = time.monotonic() + self.retry_seconds
+            self.last_error = str(getattr(error, 'orig', error))
+        logger.warning(f"Read replica unavailable, reading from primary for {self.retry_seconds:.0f}s: {self.last_error}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'enabled': self.enabled,
+                'available': time.monotonic() >= self.down_until,
+                'retry_in_seconds': round(max(0.0, self.down_until - time.monotonic()), 1),
+                'last_error': self.last_error,
+                'replica_reads': self.replica_reads,
+                'primary_reads': self.primary_reads,
+                'pinned_requests': self.pinned_requests,
+                'failovers': self.failovers,
+                'sticky_seconds': self.sticky_seconds,
+                'retry_seconds': self.retry_seconds,
+            }
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """Session de Flask-SQLAlchemy que manda a la réplica las lecturas de las vistas marcadas."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        info = self.info
+        if self._flushing or isinstance(clause, UpdateBase):
+            info[WROTE] = True
+            return engine
+        if bind is not None or not info.get(READ_REPLICA):
+            return engine
+        engines = self._db.engines
+        replica = engines.get(REPLICA_BIND)
+        # Los modelos con __bind_key__ propio no tienen réplica
+        if replica is None or engine is not engines.get(None):
+            return engine
+        if info.get(WROTE) or time.monotonic() < replica_router.down_until:
+            replica_router.count('primary_reads')
+            return engine
+        try:
+            # Toma (o reutiliza) la conexión de la transacción: si la réplica no responde, la
+            # consulta todavía no se ejecutó y puede ir al primario
+            self.connection(bind_arguments={'bind': replica})
+        except DBAPIError as exc:
+            replica_router.mark_down(exc)
+            replica_router.count('primary_reads')
+            return engine
+        replica_router.count('replica_reads')
+        return replica
+
+
+def read_replica(view):
+    """Envía a la réplica las consultas de la vista (GET/HEAD), salvo que el cliente esté fijado al primario.
+
+    Va debajo de los decoradores de autenticación, para que el usuario y sus permisos se lean
+    siempre del primario.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not replica_router.enabled or request.method not in READ_METHODS:
+            return view(*args, **kwargs)
+        if replica_router.pinned():
+            replica_router.count('pinned_requests')
+            return view(*args, **kwargs)
+        info = replica_router.db.session.info
+        previous = info.get(READ_REPLICA)
+        info[READ_REPLICA] = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            info[READ_REPLICA] = previous
+
+    return wrapper
@@ -1,8 +1,60 @@
 from functools import wraps
 from flask import request, jsonify
 from flask_jwt_extended import get_jwt_identity, get_jwt, verify_jwt_in_request
+from config.config import db
 from models import UserModel
 from datetime import datetime, timezone
+from utils.principal_cache import Principal, principal_cache
+
+
+class CurrentUser:
+    """
+    request.user cuando el principal sale de la caché: uuid y email se contestan sin ir a
+    la base; cualquier otro atributo (profiles, name, ...) carga el UserModel la primera vez.
+    """
+
+    __slots__ = ('principal', '_user')
+
+    def __init__(self, principal):
+        self.principal = principal
+        self._user = None
+
+    @property
+    def uuid(self):
+        return self.principal.uuid
+
+    @property
+    def email(self):
+        return self.principal.email
+
+    def _load(self):
+        if self._user is None:
+            self._user = db.session.get(UserModel, self.principal.uuid)
+            if self._user is None:
+                raise LookupError(f'User {self.principal.uuid} no longer exists')
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        return '<User %r>' % self.principal.uuid
+
+
+def load_principal(email, issued_at):
+    """Principal del JWT actual: de la caché por (email, iat) o armado desde la base."""
+    key = (email, issued_at)
+    principal = principal_cache.get(key)
+    if principal is not None:
+        return principal, None
+
+    generation = principal_cache.generation
+    user = UserModel.query.filter_by(email=email).first()
+    if not user:
+        return None, None
+    principal = Principal.from_user(user)
+    principal_cache.put(key, principal, generation)
+    return principal, user
 
 
 def token_required(f):
@@ -22,11 +74,17 @@ def token_required(f):
             if datetime.fromtimestamp(expiration, timezone.utc) < datetime.now(timezone.utc):
                 return jsonify({'message': 'Token has expired'}), 401
             
-            user = UserModel.query.filter_by(email=email).first()
-            if not user:
+            principal, user = load_principal(email, claims.get('iat'))
+            if not principal:
                 return jsonify({'message': 'User not found'}), 404
+
+            # Tokens emitidos antes del último revoke_tokens (los anteriores a 'tv' no lo traen)
+            token_version = claims.get('tv')
+            if token_version is not None and token_version != principal.token_version:
+                return jsonify({'message': 'Token has been revoked'}), 401
             
-            request.user = user
+            request.principal = principal
+            request.user = user if user is not None else CurrentUser(principal)
 
         except Exception as e:
             return jsonify({'message': 'Token is invalid', 'error': str(e)}), 401
@@ -38,30 +96,13 @@ def access_required(access_name):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            user = getattr(request, 'user', None)
-            if user is None:
+            principal = getattr(request, 'principal', None)
+            if principal is None:
                 return jsonify({'message': 'User not set, token required'}), 401
             
-            has_access = False
-            for profile in user.profiles:
-                p_name = profile.name.lower()
-                if p_name == 'dev':
-                    has_access = True
-                    break
-                
-
-                
-                # Check database granted accesses for other profiles (Admin, etc.)
-                for access in profile.accesses:
-                    if access.name == access_name:
-                        has_access = True
-                        break
-                if has_access:
-                    break
-            
-            if not has_access:
+            if not principal.has_access(access_name):
                 return jsonify({'message': 'Access denied'}), 403
 
             return f(*args, **kwargs)
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,28 @@
+"""
+Generación de códigos QR para los formularios de pago. qrcode (y PIL, que usa para
+renderizar) se cargan recién cuando se genera el primer QR.
+"""
+
+import base64
+from io import BytesIO
+
+import qrcode
+
+
+def make_qr_png_bytes(qr_payload, box_size=8, border=2, err=qrcode.constants.ERROR_CORRECT_M):
+    qr = qrcode.QRCode(version=None, error_correction=err, box_size=box_size, border=border)
+    qr.add_data(qr_payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    buf.seek(0)
+    return buf
+
+
+def make_qr_base64(data):
+    """QR en PNG codificado en base64, como lo espera el frontend."""
+    qr = qrcode.make(data)
+    buffered = BytesIO()
+    qr.save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode('utf-8')
@@ -0,0 +1,220 @@
+"""
+Base local de geolocalización por rangos de IP, en un archivo binario que se abre con mmap.
+
+El archivo se arma a partir de un dump CSV (ej. los de ipinfo) con `build_geo_db` y se
+consulta sin copiarlo a memoria: cada sección es un arreglo de claves de ancho fijo
+(big-endian, 4 bytes para IPv4 y 16 para IPv6) ordenado por inicio de rango, así que una
+búsqueda es un bisect sobre el mmap seguido de la lectura de un registro.
+
+Formato (little-endian):
+  header    MAGIC, n_v4, n_v6, n_records, n_strings, offsets de cada sección
+  v4/v6     starts[n] (claves), ends[n] (claves), record_idx[n] (uint32)
+  records   n_records * 5 uint32 (índices en la tabla de strings)
+  strings   offsets[n_strings + 1] (uint32) + blob utf-8
+"""
+
+import csv
+import io
+import ipaddress
+import mmap
+import os
+import socket
+import struct
+import tempfile
+from bisect import bisect_right
+
+MAGIC = b'CJGEODB1'
+HEADER = struct.Struct('<8s4I6Q')
+GEO_FIELDS = ['pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor']
+UNKNOWN = 'Desconocido'
+
+# Columnas del CSV → campos internos (mismos nombres que devuelve la API HTTP de ipinfo)
+CSV_COLUMNS = {
+    'pais': ('country', 'country_code'),
+    'ciudad': ('city',),
+    'continente': ('continent', 'continent_code'),
+    'proveedor': ('as_name', 'org'),
+    'dominio_proveedor': ('as_domain',),
+}
+
+
+class _Keys:
+    """Vista secuencial de claves de ancho fijo dentro del mmap, para usar con bisect."""
+
+    __slots__ = ('buf', 'offset', 'width', 'count')
+
+    def __init__(self, buf, offset, width, count):
+        self.buf = buf
+        self.offset = offset
+        self.width = width
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        start = self.offset + i * self.width
+        return self.buf[start:start + self.width]
+
+
+class GeoRangeDB:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mtime = os.fstat(self._file.fileno()).st_mtime
+        (magic, n_v4, n_v6, self.n_records, self.n_strings,
+         v4_off, v6_off, records_off, str_offsets_off, str_blob_off, _) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f'{path} no es una base de geolocalización válida')
+        self._sections = {
+            4: self._section(v4_off, 4, n_v4),
+            6: self._section(v6_off, 16, n_v6),
+        }
+        self._records_off = records_off
+        self._str_offsets_off = str_offsets_off
+        self._str_blob_off = str_blob_off
+        # Los registros se repiten mucho (mismo país/proveedor): se decodifican una sola vez
+        self._decoded = {}
+
+    def _section(self, offset, width, count):
+        starts = _Keys(self._mm, offset, width, count)
+        ends = _Keys(self._mm, offset + width * count, width, count)
+        idx_off = offset + 2 * width * count
+        return starts, ends, idx_off
+
+    def __len__(self):
+        return len(self._sections[4][0]) + len(self._sections[6][0])
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def _string(self, i):
+        start, end = struct.unpack_from('<2I', self._mm, self._str_offsets_off + 4 * i)
+        return self._mm[self._str_blob_off + start:self._str_blob_off + end].decode('utf-8')
+
+    def _record(self, idx):
+        record = self._decoded.get(idx)
+        if record is None:
+            string_ids = struct.unpack_from('<5I', self._mm, self._records_off + 20 * idx)
+            record = {field: self._string(sid) for field, sid in zip(GEO_FIELDS, string_ids)}
+            self._decoded[idx] = record
+        return record
+
+    def lookup(self, ip_address):
+        """Retorna el dict de geolocalización del rango que contiene la IP, o None."""
+        try:
+            key = socket.inet_pton(socket.AF_INET, ip_address)
+            version = 4
+        except (OSError, TypeError):
+            try:
+                key = socket.inet_pton(socket.AF_INET6, ip_address)
+                version = 6
+            except (OSError, TypeError):
+                return None
+            if key[:12] == b'\x00' * 10 + b'\xff\xff':
+                key = key[12:]
+                version = 4
+        starts, ends, idx_off = self._sections[version]
+        pos = bisect_right(starts, key) - 1
+        if pos < 0 or ends[pos] < key:
+            return None
+        (record_idx,) = struct.unpack_from('<I', self._mm, idx_off + 4 * pos)
+        return dict(self._record(record_idx))
+
+
+def rows_from_csv(handle):
+    """
+    Lee un dump CSV con rangos `start_ip,end_ip` o `network` (CIDR) y columnas de ipinfo
+    (country, city, continent, as_name, as_domain...). Devuelve (inicio, fin, campos).
+    """
+    reader = csv.DictReader(handle)
+    for row in reader:
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+        try:
+            if row.get('network'):
+                network = ipaddress.ip_network(row['network'], strict=False)
+                start, end = network.network_address, network.broadcast_address
+            else:
+                start = ipaddress.ip_address(row['start_ip'])
+                end = ipaddress.ip_address(row['end_ip'])
+        except (KeyError, ValueError):
+            continue
+        if start.version != end.version:
+            continue
+        fields = {}
+        for field, columns in CSV_COLUMNS.items():
+            fields[field] = next((row[c] for c in columns if row.get(c)), UNKNOWN)
+        yield start, end, fields
+
+
+def build_geo_db(rows, path):
+    """Escribe la base en `path` de forma atómica (archivo temporal + os.replace)."""
+    strings = {}
+    records = {}
+    sections = {4: [], 6: []}
+
+    def string_id(value):
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    for start, end, fields in rows:
+        key = tuple(string_id(fields.get(field) or UNKNOWN) for field in GEO_FIELDS)
+        if key not in records:
+            records[key] = len(records)
+        sections[start.version].append((start.packed, end.packed, records[key]))
+
+    for entries in sections.values():
+        entries.sort()
+
+    out = io.BytesIO()
+    out.write(b'\x00' * HEADER.size)
+    offsets = {}
+    for version in (4, 6):
+        offsets[version] = out.tell()
+        entries = sections[version]
+        for start, _, _ in entries:
+            out.write(start)
+        for _, end, _ in entries:
+            out.write(end)
+        out.write(struct.pack(f'<{len(entries)}I', *(idx for _, _, idx in entries)))
+
+    records_off = out.tell()
+    for key in records:
+        out.write(struct.pack('<5I', *key))
+
+    str_offsets_off = out.tell()
+    encoded = [value.encode('utf-8') for value in strings]
+    position = 0
+    boundaries = [0]
+    for value in encoded:
+        position += len(value)
+        boundaries.append(position)
+    out.write(struct.pack(f'<{len(boundaries)}I', *boundaries))
+    str_blob_off = out.tell()
+    for value in encoded:
+        out.write(value)
+
+    out.seek(0)
+    out.write(HEADER.pack(
+        MAGIC, len(sections[4]), len(sections[6]), len(records), len(strings),
+        offsets[4], offsets[6], records_off, str_offsets_off, str_blob_off, 0,
+    ))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(out.getvalue())
+        # mkstemp crea el archivo con 0600; la base la leen los workers de la aplicación
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(sections[4]) + len(sections[6])
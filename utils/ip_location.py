@@ -1,36 +1,93 @@
 import os
+import threading
+import time
+
 import requests
 import logging
 
+from utils.ip_geo_db import GeoRangeDB, GEO_FIELDS, UNKNOWN
+
 logger = logging.getLogger(__name__)
 
+# Backend de geolocalización: "http" (ipinfo.io, comportamiento original) o "local"
+# (archivo de rangos generado con scripts/update_geo_db.py). En modo local solo se consulta
+# la API cuando IP_GEO_HTTP_FALLBACK=true y la IP no está en la base.
+IP_GEO_DB_RECHECK_SECONDS = 60
+
+_local_db = None
+_local_db_checked_at = 0.0
+_local_db_lock = threading.Lock()
+
+
+def _unknown_location():
+    return {field: UNKNOWN for field in GEO_FIELDS}
+
+
+def get_local_db():
+    """
+    Retorna la base local abierta (o None). Si el archivo fue reemplazado por una
+    actualización se vuelve a abrir; la verificación se hace como mucho una vez por minuto.
+    """
+    global _local_db, _local_db_checked_at
+    path = os.getenv("IP_GEO_DB_PATH", "")
+    if not path:
+        return None
+
+    now = time.monotonic()
+    db = _local_db
+    if db is not None and db.path == path and now - _local_db_checked_at < IP_GEO_DB_RECHECK_SECONDS:
+        return db
+
+    with _local_db_lock:
+        _local_db_checked_at = now
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            if _local_db is None:
+                logger.warning(f"IP_GEO_DB_PATH apunta a {path}, pero el archivo no existe.")
+            return _local_db
+        if _local_db is None or _local_db.path != path or _local_db.mtime != mtime:
+            try:
+                new_db = GeoRangeDB(path)
+            except (OSError, ValueError) as e:
+                logger.error(f"No se pudo abrir la base de geolocalización {path}: {e}")
+                return _local_db
+            # La base anterior no se cierra: otro hilo puede estar leyendo su mmap, y se
+            # libera sola cuando deja de estar referenciada
+            _local_db = new_db
+            logger.info(f"Base de geolocalización cargada: {path} ({len(new_db)} rangos)")
+        return _local_db
+
+
 def get_ip_location(ip_address):
     """
-    Obtiene la geolocalización (País y Ciudad) para una dirección IP usando la API de ipinfo.io.
+    Obtiene la geolocalización (País y Ciudad) para una dirección IP, desde la base local
+    o usando la API de ipinfo.io según IP_GEO_BACKEND.
     """
     # Si la IP es localhost, devolver valores por defecto
     if ip_address in ['127.0.0.1', '::1', 'localhost']:
-        return {
-            "pais": "Desconocido",
-            "ciudad": "Desconocido",
-            "continente": "Desconocido",
-            "proveedor": "Desconocido",
-            "dominio_proveedor": "Desconocido"
-        }
+        return _unknown_location()
+
+    if os.getenv("IP_GEO_BACKEND", "http").lower() == "local":
+        db = get_local_db()
+        location = db.lookup(ip_address) if db is not None else None
+        if location is not None:
+            return location
+        if os.getenv("IP_GEO_HTTP_FALLBACK", "false").lower() != "true":
+            return _unknown_location()
+
+    return _get_ip_location_http(ip_address)
 
+
+def _get_ip_location_http(ip_address):
     token = os.getenv("IPINFO_TOKEN")
     if not token:
         logger.warning("IPINFO_TOKEN no está configurado en las variables de entorno.")
-        return {
-            "pais": "Desconocido",
-            "ciudad": "Desconocido",
-            "continente": "Desconocido",
-            "proveedor": "Desconocido",
-            "dominio_proveedor": "Desconocido"
-        }
+        return _unknown_location()
 
     try:
-        url = f"https://ipinfo.io/{ip_address}/json?token={token}"
+        base_url = os.getenv("IPINFO_BASE_URL", "https://ipinfo.io")
+        url = f"{base_url}/{ip_address}/json?token={token}"
         response = requests.get(url, timeout=5)
         response.raise_for_status()
         data = response.json()
@@ -54,10 +111,4 @@ def get_ip_location(ip_address):
         }
     except requests.RequestException as e:
         logger.error(f"Error al obtener la ubicación de la IP {ip_address}: {e}")
-        return {
-            "pais": "Desconocido",
-            "ciudad": "Desconocido",
-            "continente": "Desconocido",
-            "proveedor": "Desconocido",
-            "dominio_proveedor": "Desconocido"
-        }
+        return _unknown_location()
@@ -1,172 +1,605 @@
+import os
+import queue
+import sys
 import time
+from collections import OrderedDict
 from threading import RLock, Thread
 import logging
+from sortedcontainers import SortedList
 from config.config import db
 from models.ip_manager import IPRegistry
 from utils.ip_location import get_ip_location
+from utils.ip_shared_state import SharedIPState, from_epoch
+from utils.ip_range_matcher import RangeMatcher, RANGE_REGION_TYPES
+from utils.ip_rate_series import RequestRateTracker, SECONDS as RATE_SECONDS
+from utils.process_threads import OncePerProcess
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+GEO_FIELDS = ['pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor']
+LOCAL_IPS = ['127.0.0.1', '::1', 'localhost']
+SYNC_COLUMNS = [
+    'last_seen', 'requests_minute', 'requests_month', 'last_minute_reset', 'last_month_reset', 'is_blocked',
+] + GEO_FIELDS
+
+
+class IPRecord:
+    """Estado en memoria de una IP. Usa __slots__ para que cada entrada ocupe lo mínimo."""
+
+    __slots__ = (
+        'ip', 'last_seen', 'requests_minute', 'requests_month', 'last_minute_reset', 'last_month_reset',
+        'is_blocked', 'pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor',
+        'geo_attempted', 'dirty', 'new', 'pending',
+    )
+
+    def __init__(self, ip, now=None):
+        now = now or datetime.utcnow()
+        self.ip = ip
+        self.last_seen = now
+        self.requests_minute = 0
+        self.requests_month = 0
+        self.last_minute_reset = now
+        self.last_month_reset = now
+        self.is_blocked = False
+        self.pais = 'Desconocido'
+        self.ciudad = 'Desconocido'
+        self.continente = 'Desconocido'
+        self.proveedor = 'Desconocido'
+        self.dominio_proveedor = 'Desconocido'
+        self.geo_attempted = False
+        self.dirty = False  # hay cambios sin sincronizar
+        self.new = False  # no existe todavía en BD
+        self.pending = False  # admitida sin saber aún si existe en BD
+
+    @classmethod
+    def from_model(cls, ip_record):
+        record = cls(ip_record.ip, ip_record.last_seen)
+        record.requests_minute = ip_record.requests_minute or 0
+        record.requests_month = ip_record.requests_month or 0
+        record.last_minute_reset = ip_record.last_minute_reset
+        record.last_month_reset = ip_record.last_month_reset
+        record.is_blocked = bool(ip_record.is_blocked)
+        for field in GEO_FIELDS:
+            value = getattr(ip_record, field)
+            # Los valores de geolocalización se repiten mucho entre IPs: se comparten
+            setattr(record, field, sys.intern(value) if value else 'Desconocido')
+        return record
+
+    def needs_geo(self):
+        if self.ip in LOCAL_IPS or self.geo_attempted:
+            return False
+        return any(getattr(self, field) == 'Desconocido' for field in GEO_FIELDS)
+
+    def apply_location(self, location_data):
+        """Completa los campos de geolocalización conocidos. Retorna True si cambió algo."""
+        changed = False
+        for field in GEO_FIELDS:
+            value = location_data.get(field, 'Desconocido')
+            if value and value != 'Desconocido':
+                setattr(self, field, sys.intern(value))
+                changed = True
+        return changed
+
+    def to_row(self):
+        row = {column: getattr(self, column) for column in SYNC_COLUMNS}
+        row['ip'] = self.ip
+        return row
+
+    def to_dict(self):
+        return {
+            'ip': self.ip,
+            'last_seen': self.last_seen.isoformat(),
+            'requests_minute': self.requests_minute,
+            'requests_month': self.requests_month,
+            'is_blocked': self.is_blocked,
+            'pais': self.pais,
+            'ciudad': self.ciudad,
+            'continente': self.continente,
+            'proveedor': self.proveedor,
+            'dominio_proveedor': self.dominio_proveedor
+        }
+
+
+class IPRecordStore:
+    """
+    Caché LRU acotada de IPRecord. No es thread-safe: se usa siempre bajo el lock del
+    IPCacheManager. Las entradas provisorias (pending) se desalojan como cualquier otra: no tienen
+    estado en BD y, si la IP vuelve, se admite de nuevo.
+
+    Además mantiene un índice ordenado por (last_seen, ip) para listar las IPs más recientes
+    con paginación por cursor sin copiar ni ordenar toda la caché.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._records = OrderedDict()
+        self._by_last_seen = SortedList()
+        self._index_keys = {}  # { ip: clave actual en _by_last_seen }
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, ip_address):
+        return ip_address in self._records
+
+    def values(self):
+        return self._records.values()
+
+    def get(self, ip_address):
+        record = self._records.get(ip_address)
+        if record is not None:
+            self._records.move_to_end(ip_address)
+        return record
+
+    def peek(self, ip_address):
+        return self._records.get(ip_address)
+
+    def put(self, ip_address, record):
+        """Inserta como más reciente y retorna los registros desalojados."""
+        self._records[ip_address] = record
+        self._records.move_to_end(ip_address)
+        self._index(record)
+        evicted = []
+        while len(self._records) > self.max_entries:
+            victim_ip, victim = self._records.popitem(last=False)
+            self._by_last_seen.remove(self._index_keys.pop(victim_ip))
+            evicted.append(victim)
+        return evicted
+
+    def _index(self, record):
+        key = (record.last_seen, record.ip)
+        old_key = self._index_keys.get(record.ip)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._by_last_seen.remove(old_key)
+        self._by_last_seen.add(key)
+        self._index_keys[record.ip] = key
+
+    def reindex(self, record):
+        """Actualiza la posición en el índice después de cambiar last_seen."""
+        if self._records.get(record.ip) is record:
+            self._index(record)
+
+    def iter_recent(self, before=None):
+        """Registros del más reciente al más antiguo, empezando después de la clave `before`."""
+        if before is None:
+            keys = reversed(self._by_last_seen)
+        else:
+            keys = self._by_last_seen.irange(maximum=before, inclusive=(True, False), reverse=True)
+        for _, ip_address in keys:
+            yield self._records[ip_address]
+
+
 class IPCacheManager:
     def __init__(self):
-        self.ip_cache = {}  # { "ip": { "record": dict, "dirty": bool, "new": bool } }
-        self.blocked_regions = {'country': set(), 'continent': set()}
+        self.ip_cache = IPRecordStore(int(os.getenv('IP_CACHE_MAX_ENTRIES', '50000')))
+        # Registros desalojados con cambios sin escribir; se siguen consultando hasta que se sincronizan
+        self.evicted_dirty = {}
+        self.blocked_regions = {'country': set(), 'continent': set(), 'cidr': set(), 'asn': set(), 'provider': set()}
+        # Bloqueos por prefijo CIDR / ASN / proveedor, compilados; se consulta sin tomar el lock
+        self.range_matcher = RangeMatcher()
         self.lock = RLock()
+        # Peticiones por segundo de cada IP en la última hora (top-N e histograma en /dev/ips)
+        self.rates = RequestRateTracker(int(os.getenv('IP_RATE_MAX_SERIES', '10000')))
         self.last_sync = time.time()
         self.SYNC_INTERVAL = 600  # 10 minutos
+        self.SYNC_CHUNK_SIZE = int(os.getenv('IP_SYNC_CHUNK_SIZE', '500'))
         self.app = None
+        self._evicted_flush_running = False
+
+        # Estado compartido entre workers del host (contadores y bloqueos). Sin ruta, cada worker lleva el suyo.
+        self.SHARED_STATE_PATH = os.getenv('IP_SHARED_STATE_PATH', '')
+        self.shared = None
+        self.shared_blocked = {}  # { ip: bool } decisiones de bloqueo vistas por todos los workers
+        # Los contadores compartidos de una IP sin peticiones en este lapso se borran en cada sync
+        # (la misma ventana tras la que se descarta su serie de peticiones por segundo)
+        self.SHARED_IDLE_SECONDS = RATE_SECONDS
+        self._block_version = None
+
+        # Modo no bloqueante: las IPs desconocidas se admiten con el estado en memoria
+        # y la carga desde BD + geolocalización se resuelven en segundo plano.
+        self.ASYNC_GEO = os.getenv('IP_GEO_ASYNC', 'true').lower() == 'true'
+        self.GEO_WORKERS = int(os.getenv('IP_GEO_WORKERS', '4'))
+        self.geo_queue = queue.Queue(maxsize=int(os.getenv('IP_GEO_QUEUE_SIZE', '1000')))
+        self.geo_scheduled = set()
+        self.geo_dropped = 0
+        self._ensure_geo_workers = OncePerProcess(self._start_geo_workers)
 
     def init_app(self, app):
         self.app = app
+        if self.SHARED_STATE_PATH:
+            self.shared = SharedIPState(self.SHARED_STATE_PATH)
         self._load_regions()
 
     def _load_regions(self):
+        # Las IPs no se precargan (cada una se carga desde BD la primera vez que se ve), salvo el
+        # conjunto de bloqueadas: con la admisión asíncrona es lo único que decide antes de la BD
+        blocked_ips = []
         with self.app.app_context():
             from models.blocked_region import BlockedRegion
+            try:
+                blocked_ips = [ip for (ip,) in db.session.query(IPRegistry.ip).filter(IPRegistry.is_blocked.is_(True))]
+            except Exception as e:
+                logger.warning(f"Error cargando IPs bloqueadas: {e}")
             try:
                 # Si la tabla recién se creó, no fallará
                 regions = BlockedRegion.query.all()
                 for r in regions:
-                    if r.region_type == 'country':
-                        self.blocked_regions['country'].add(r.region_name)
-                    elif r.region_type == 'continent':
-                        self.blocked_regions['continent'].add(r.region_name)
+                    self.blocked_regions.setdefault(r.region_type, set()).add(r.region_name)
             except Exception as e:
                 logger.warning(f"Error cargando regiones bloqueadas (quizá falta migrar DB): {e}")
-            
-            try:
-                # Load all existing IPs into cache
-                existing_ips = IPRegistry.query.all()
-                for ip_record in existing_ips:
-                    data = ip_record.to_dict()
-                    data['last_seen'] = datetime.fromisoformat(data['last_seen'])
-                    data['last_minute_reset'] = ip_record.last_minute_reset
-                    data['last_month_reset'] = ip_record.last_month_reset
-                    self.ip_cache[ip_record.ip] = {'record': data, 'dirty': False, 'new': False}
-            except Exception as e:
-                logger.warning(f"Error cargando el historial de IPs a caché: {e}")
 
-    def get_or_load_ip(self, ip_address):
-        record_data = None
-        
-        if ip_address in self.ip_cache:
-            record_data = self.ip_cache[ip_address]['record']
+        if self.shared:
+            if blocked_ips:
+                self.shared.seed_blocked_ips(blocked_ips)
+            for region_type, names in self.blocked_regions.items():
+                for name in names:
+                    self.shared.add_region(region_type, name)
+            self._refresh_shared_blocks()
         else:
+            with self.lock:
+                for ip_address in blocked_ips:
+                    self.shared_blocked.setdefault(ip_address, True)
+            self._compile_ranges()
+
+    def _compile_ranges(self):
+        with self.lock:
+            cidrs = list(self.blocked_regions.get('cidr', ()))
+            providers = list(self.blocked_regions.get('asn', ())) + list(self.blocked_regions.get('provider', ()))
+        # Se construye fuera del lock y se publica reemplazando la referencia
+        self.range_matcher = RangeMatcher(cidrs, providers)
+
+    def _refresh_shared_blocks(self):
+        # Una lectura indexada por petición; solo se recarga la lista cuando otro worker la cambió
+        version = self.shared.block_version()
+        if version == self._block_version:
+            return
+        version, ips, regions = self.shared.load_blocks()
+        with self.lock:
+            ranges_changed = any(
+                regions.get(region_type, set()) != self.blocked_regions.get(region_type, set())
+                for region_type in RANGE_REGION_TYPES
+            )
+            self.shared_blocked = ips
+            self.blocked_regions = regions
+            for ip_address, is_blocked in ips.items():
+                record = self.ip_cache.peek(ip_address)
+                if record is not None and record.is_blocked != is_blocked:
+                    record.is_blocked = is_blocked
+            self._block_version = version
+        if ranges_changed:
+            self._compile_ranges()
+
+    @staticmethod
+    def _apply_shared_counters(record, counters):
+        if not counters:
+            return
+        record.requests_minute = counters['requests_minute']
+        record.last_minute_reset = from_epoch(counters['last_minute_reset'])
+        record.requests_month = counters['requests_month']
+        record.last_month_reset = from_epoch(counters['last_month_reset'])
+        record.last_seen = from_epoch(counters['last_seen'])
+
+    def block_region(self, region_type, region_name):
+        with self.lock:
+            self.blocked_regions.setdefault(region_type, set()).add(region_name)
+        if self.shared:
+            self.shared.add_region(region_type, region_name)
+        self._compile_ranges()
+
+    def unblock_region(self, region_name):
+        with self.lock:
+            for names in self.blocked_regions.values():
+                names.discard(region_name)
+        if self.shared:
+            self.shared.remove_region(region_name)
+        self._compile_ranges()
+
+    def _lookup(self, ip_address):
+        record = self.ip_cache.get(ip_address)
+        if record is None and ip_address in self.evicted_dirty:
+            # Desalojado pero todavía sin escribir: se recupera tal cual
+            record = self.evicted_dirty.pop(ip_address)
+            self._install(record)
+        return record
+
+    def _install(self, record):
+        evicted = self.ip_cache.put(record.ip, record)
+        for victim in evicted:
+            if victim.pending:
+                # Sin estado en BD: se descarta, y el enriquecimiento encolado no encontrará el registro
+                self.geo_scheduled.discard(victim.ip)
+            elif victim.dirty or victim.new:
+                self.evicted_dirty[victim.ip] = victim
+        if self.evicted_dirty and not self._evicted_flush_running and self.app is not None:
+            self._evicted_flush_running = True
+            Thread(target=self._flush_evicted).start()
+
+    def get_or_load_ip(self, ip_address):
+        with self.lock:
+            record = self._lookup(ip_address)
+
+        if record is None or record.pending:
             # Load from DB
             with self.lock:
                 with self.app.app_context():
                     ip_record = IPRegistry.query.filter_by(ip=ip_address).first()
                     if ip_record:
-                        data = ip_record.to_dict()
-                        # Convert string dates back to datetime for internal use
-                        data['last_seen'] = datetime.fromisoformat(data['last_seen'])
-                        data['last_minute_reset'] = ip_record.last_minute_reset
-                        data['last_month_reset'] = ip_record.last_month_reset
-                        self.ip_cache[ip_address] = {'record': data, 'dirty': False, 'new': False}
-                        record_data = data
+                        record = self._merge_loaded(IPRecord.from_model(ip_record))
                     else:
                         # Fetch fresh location
-                        location_data = get_ip_location(ip_address)
-                        now = datetime.utcnow()
-                        data = {
-                            'ip': ip_address,
-                            'last_seen': now,
-                            'requests_minute': 0,
-                            'requests_month': 0,
-                            'last_minute_reset': now,
-                            'last_month_reset': now,
-                            'pais': location_data.get('pais', 'Desconocido'),
-                            'ciudad': location_data.get('ciudad', 'Desconocido'),
-                            'continente': location_data.get('continente', 'Desconocido'),
-                            'proveedor': location_data.get('proveedor', 'Desconocido'),
-                            'dominio_proveedor': location_data.get('dominio_proveedor', 'Desconocido'),
-                            'is_blocked': False,
-                            'geo_attempted': True
-                        }
-                        self.ip_cache[ip_address] = {'record': data, 'dirty': True, 'new': True}
-                        record_data = data
+                        fresh = IPRecord(ip_address)
+                        fresh.apply_location(get_ip_location(ip_address))
+                        fresh.geo_attempted = True
+                        fresh.new = True
+                        record = self._merge_loaded(fresh)
 
         # Check if we should update Desconocido fields for an existing IP (cached or loaded from DB)
-        if record_data and ip_address not in ['127.0.0.1', '::1', 'localhost']:
-            if not record_data.get('geo_attempted'):
-                record_data['geo_attempted'] = True
-                has_desconocido = any(
-                    record_data.get(field) == 'Desconocido'
-                    for field in ['pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor']
+        if record.needs_geo():
+            record.geo_attempted = True
+            self._apply_location(record, get_ip_location(ip_address))
+
+        return record
+
+    def _merge_loaded(self, record):
+        """
+        Instala en caché un registro resuelto (desde BD o recién creado). Si la IP ya
+        estaba admitida de forma provisoria, conserva lo acumulado en memoria mientras tanto.
+        """
+        with self.lock:
+            current = self._lookup(record.ip)
+            if current is not None and not current.pending:
+                # Otro hilo ya resolvió la IP; su estado es el vigente
+                return current
+            record.dirty = record.new
+            if current is not None:
+                if current.requests_month:
+                    if record.last_month_reset and record.last_month_reset.month == current.last_month_reset.month:
+                        record.requests_month += current.requests_month
+                    else:
+                        record.requests_month = current.requests_month
+                        record.last_month_reset = current.last_month_reset
+                    record.requests_minute = current.requests_minute
+                    record.last_minute_reset = current.last_minute_reset
+                    record.last_seen = max(record.last_seen, current.last_seen)
+                    record.dirty = True
+                if current.is_blocked and not record.is_blocked:
+                    record.is_blocked = True
+                    record.dirty = True
+            if self.shared and not record.new:
+                # Lo acumulado mientras tanto ya está en el estado compartido: se le suma el histórico de BD
+                counters = self.shared.seed(
+                    record.ip,
+                    record.requests_month,
+                    record.last_month_reset or record.last_seen,
+                    record.last_seen,
                 )
-                if has_desconocido:
-                    location_data = get_ip_location(ip_address)
-                    new_data_fetched = any(
-                        location_data.get(field) != 'Desconocido'
-                        for field in ['pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor']
-                    )
-                    if new_data_fetched:
-                        with self.lock:
-                            for field in ['pais', 'ciudad', 'continente', 'proveedor', 'dominio_proveedor']:
-                                if location_data.get(field) != 'Desconocido':
-                                    record_data[field] = location_data[field]
-                            self.ip_cache[ip_address]['dirty'] = True
-
-        return record_data
+                self._apply_shared_counters(record, counters)
+            if record.ip in self.shared_blocked:
+                record.is_blocked = self.shared_blocked[record.ip]
+            self._install(record)
+            return record
+
+    def _apply_location(self, record, location_data):
+        with self.lock:
+            if record.apply_location(location_data):
+                record.dirty = True
+
+    def _admit_ip(self, ip_address):
+        """
+        Resuelve la IP solo con el estado en memoria, sin BD ni red. Las IPs desconocidas
+        se admiten con un registro provisorio y se encolan para enriquecerlas en segundo plano;
+        los bloqueos por región aplican en cuanto llega la geolocalización.
+        """
+        with self.lock:
+            record = self._lookup(ip_address)
+            if record is None:
+                record = IPRecord(ip_address)
+                record.pending = True
+                # Bloqueada en BD o por otro worker: se rechaza sin esperar al enriquecimiento
+                record.is_blocked = self.shared_blocked.get(ip_address, False)
+                self._install(record)
+            if record.pending or record.needs_geo():
+                self._schedule_enrichment(ip_address)
+            return record
+
+    def _get_record(self, ip_address):
+        if self.ASYNC_GEO:
+            return self._admit_ip(ip_address)
+        return self.get_or_load_ip(ip_address)
+
+    def _schedule_enrichment(self, ip_address):
+        if ip_address in self.geo_scheduled:
+            return
+        self._ensure_geo_workers()
+        try:
+            self.geo_queue.put_nowait(ip_address)
+            self.geo_scheduled.add(ip_address)
+        except queue.Full:
+            # Se reintenta en la próxima petición de la misma IP
+            self.geo_dropped += 1
+
+    def _start_geo_workers(self):
+        for i in range(self.GEO_WORKERS):
+            Thread(target=self._geo_worker, name=f'ip-geo-{i}', daemon=True).start()
+
+    def _geo_worker(self):
+        while True:
+            ip_address = self.geo_queue.get()
+            try:
+                with self.app.app_context():
+                    self._enrich_ip(ip_address)
+            except Exception as e:
+                logger.error(f"Error enriqueciendo la IP {ip_address}: {e}")
+            finally:
+                with self.lock:
+                    self.geo_scheduled.discard(ip_address)
+                self.geo_queue.task_done()
+
+    def _enrich_ip(self, ip_address):
+        with self.lock:
+            record = self.ip_cache.peek(ip_address)
+        if record is None:
+            return
+        if record.pending:
+            ip_record = IPRegistry.query.filter_by(ip=ip_address).first()
+            if ip_record:
+                record = self._merge_loaded(IPRecord.from_model(ip_record))
+            else:
+                with self.lock:
+                    if record.pending:
+                        record.pending = False
+                        record.new = True
+                        record.dirty = True
+
+        if record.needs_geo():
+            record.geo_attempted = True
+            self._apply_location(record, get_ip_location(ip_address))
+
+    def _resolve_pending(self, ip_address):
+        # Para operaciones administrativas que necesitan el registro definitivo (block/unblock)
+        record = self._lookup(ip_address)
+        if record.pending:
+            with self.app.app_context():
+                ip_record = IPRegistry.query.filter_by(ip=ip_address).first()
+            if ip_record:
+                return self._merge_loaded(IPRecord.from_model(ip_record))
+            record.pending = False
+            record.new = True
+        return record
 
     def track_request(self, ip_address):
         now = datetime.utcnow()
         with self.lock:
-            record_data = self.get_or_load_ip(ip_address)
-            
+            record = self._get_record(ip_address)
+
             # Lógica de reset por minuto
-            if not record_data['last_minute_reset'] or (now - record_data['last_minute_reset']).total_seconds() > 60:
-                record_data['requests_minute'] = 1
-                record_data['last_minute_reset'] = now
+            if not record.last_minute_reset or (now - record.last_minute_reset).total_seconds() > 60:
+                record.requests_minute = 1
+                record.last_minute_reset = now
             else:
-                record_data['requests_minute'] += 1
-                
+                record.requests_minute += 1
+
             # Lógica de reset por mes
-            if not record_data['last_month_reset'] or record_data['last_month_reset'].month != now.month:
-                record_data['requests_month'] = 1
-                record_data['last_month_reset'] = now
+            if not record.last_month_reset or record.last_month_reset.month != now.month:
+                record.requests_month = 1
+                record.last_month_reset = now
             else:
-                record_data['requests_month'] += 1
-                
-            record_data['last_seen'] = now
-            self.ip_cache[ip_address]['dirty'] = True
+                record.requests_month += 1
+
+            record.last_seen = now
+            record.dirty = True
+            self.ip_cache.reindex(record)
+            requests_month = record.requests_month
+            seeded = not record.pending
+
+        self.rates.record(ip_address)
+
+        if self.shared:
+            # Los contadores locales pasan a reflejar el total del host
+            counters = self.shared.increment(ip_address, now, requests_month, seeded)
+            with self.lock:
+                self._apply_shared_counters(record, counters)
+                self.ip_cache.reindex(record)
 
         self.check_sync()
 
     def check_blocked(self, ip_address):
         # Verifica si IP o su región asociada está bloqueada
+        if self.shared:
+            self._refresh_shared_blocks()
+        if self.range_matcher.match_ip(ip_address):
+            return True
         with self.lock:
-            record_data = self.get_or_load_ip(ip_address)
-            
-            if record_data['is_blocked']:
+            record = self._get_record(ip_address)
+
+            if record.is_blocked:
                 return True
-                
+
             # Validar contra regiones bloqueadas
-            pais = record_data.get('pais')
-            continente = record_data.get('continente')
-            
-            if pais and pais in self.blocked_regions['country']:
+            if record.pais and record.pais in self.blocked_regions['country']:
+                return True
+            if record.continente and record.continente in self.blocked_regions['continent']:
                 return True
-            if continente and continente in self.blocked_regions['continent']:
+            if self.range_matcher.match_provider(record.proveedor, record.dominio_proveedor):
                 return True
-                
+
         return False
 
+    def list_recent(self, limit=100, cursor=None, pais=None, proveedor=None, blocked=None):
+        """
+        Página de IPs ordenadas por last_seen descendente. `cursor` es el valor de
+        `next_cursor` de la página anterior. Retorna (items, total, next_cursor).
+        """
+        before = None
+        if cursor:
+            last_seen, _, ip_address = cursor.partition('|')
+            try:
+                before = (datetime.fromisoformat(last_seen), ip_address)
+            except ValueError:
+                raise ValueError('Invalid cursor')
+        proveedor = proveedor.lower() if proveedor else None
+
+        def matches(record):
+            if pais and record.pais != pais:
+                return False
+            if proveedor and proveedor not in record.proveedor.lower():
+                return False
+            if blocked is not None and record.is_blocked != blocked:
+                return False
+            return True
+
+        filtered = bool(pais or proveedor or blocked is not None)
+        items = []
+        next_cursor = None
+        with self.lock:
+            for record in self.ip_cache.iter_recent(before):
+                if not matches(record):
+                    continue
+                if len(items) == limit:
+                    last = items[-1]
+                    next_cursor = f"{last['last_seen']}|{last['ip']}"
+                    break
+                items.append(record.to_dict())
+            # Sin filtros el total es el tamaño de la caché; con filtros hay que contarlos
+            total = sum(1 for record in self.ip_cache.values() if matches(record)) if filtered else len(self.ip_cache)
+        return items, total, next_cursor
+
+    def export_all(self):
+        """
+        Todas las IPs de la caché por last_seen descendente. El conjunto y el orden se copian de
+        una vez bajo el lock (una IP que recibe peticiones mientras tanto no se pierde ni se
+        repite); la serialización se hace afuera, así que los contadores son los del momento en
+        que se lee cada registro.
+        """
+        with self.lock:
+            records = list(self.ip_cache.iter_recent())
+        return [record.to_dict() for record in records]
+
     def block_ip(self, ip_address):
         with self.lock:
-            record = self.get_or_load_ip(ip_address)
-            record['is_blocked'] = True
-            self.ip_cache[ip_address]['dirty'] = True
-            # Force immediate sync for bans
-            self._sync_to_db_sync()
+            self._get_record(ip_address)
+            record = self._resolve_pending(ip_address)
+            record.is_blocked = True
+            record.dirty = True
+            self.shared_blocked[ip_address] = True
+        if self.shared:
+            self.shared.set_ip_blocked(ip_address, True)
+        # Force immediate sync for bans
+        self._sync_to_db_sync()
 
     def unblock_ip(self, ip_address):
         with self.lock:
-            record = self.get_or_load_ip(ip_address)
-            record['is_blocked'] = False
-            self.ip_cache[ip_address]['dirty'] = True
-            self._sync_to_db_sync()
+            self._get_record(ip_address)
+            record = self._resolve_pending(ip_address)
+            record.is_blocked = False
+            record.dirty = True
+            self.shared_blocked[ip_address] = False
+        if self.shared:
+            self.shared.set_ip_blocked(ip_address, False)
+        self._sync_to_db_sync()
 
     def check_sync(self):
         if time.time() - self.last_sync > self.SYNC_INTERVAL:
@@ -178,53 +611,99 @@ class IPCacheManager:
     def _sync_to_db(self):
         with self.app.app_context():
             self._sync_to_db_sync()
+        if self.shared:
+            self._prune_shared_counters()
+
+    def _prune_shared_counters(self):
+        # Después del sync: lo que se borra ya está en BD (y en la caché de los workers que la tengan)
+        try:
+            pruned = self.shared.prune_counters(self.SHARED_IDLE_SECONDS)
+        except Exception as e:
+            logger.error(f"Error pruning shared IP counters: {e}")
+            return
+        if pruned:
+            logger.info(f"Shared IP counters pruned: {pruned} IPs inactive for {self.SHARED_IDLE_SECONDS}s.")
 
-    def _sync_to_db_sync(self):
+    def _flush_evicted(self):
         try:
+            with self.app.app_context():
+                self._sync_to_db_sync(evicted_only=True)
+        finally:
             with self.lock:
-                to_sync = {ip: info for ip, info in self.ip_cache.items() if info['dirty'] or info['new']}
-                
-                for ip, info in to_sync.items():
-                    record_data = info['record']
-                    if info['new']:
-                        ip_record = IPRegistry(
-                            ip=record_data['ip'],
-                            last_seen=record_data['last_seen'],
-                            requests_minute=record_data['requests_minute'],
-                            requests_month=record_data['requests_month'],
-                            last_minute_reset=record_data['last_minute_reset'],
-                            last_month_reset=record_data['last_month_reset'],
-                            pais=record_data['pais'],
-                            ciudad=record_data['ciudad'],
-                            continente=record_data['continente'],
-                            proveedor=record_data['proveedor'],
-                            dominio_proveedor=record_data['dominio_proveedor'],
-                            is_blocked=record_data['is_blocked']
-                        )
-                        db.session.add(ip_record)
-                        info['new'] = False
-                    else:
-                        ip_record = IPRegistry.query.filter_by(ip=ip).first()
-                        if ip_record:
-                            ip_record.last_seen = record_data['last_seen']
-                            ip_record.requests_minute = record_data['requests_minute']
-                            ip_record.requests_month = record_data['requests_month']
-                            ip_record.last_minute_reset = record_data['last_minute_reset']
-                            ip_record.last_month_reset = record_data['last_month_reset']
-                            ip_record.is_blocked = record_data['is_blocked']
-                            # Sync updated geolocation data if any changed from Desconocido
-                            ip_record.pais = record_data['pais']
-                            ip_record.ciudad = record_data['ciudad']
-                            ip_record.continente = record_data['continente']
-                            ip_record.proveedor = record_data['proveedor']
-                            ip_record.dominio_proveedor = record_data['dominio_proveedor']
-                    
-                    info['dirty'] = False
-                    
-            db.session.commit()
-            logger.info("IP cache synced to database.")
+                self._evicted_flush_running = False
+
+    def _snapshot_dirty(self, evicted_only=False):
+        """Copia los registros pendientes de sincronizar y limpia sus flags; es lo único que se hace con el lock."""
+        rows = []
+        with self.lock:
+            candidates = list(self.evicted_dirty.values())
+            if not evicted_only:
+                candidates.extend(self.ip_cache.values())
+            # Las IPs provisorias se sincronizan cuando el enriquecimiento determina si ya existen en BD
+            for record in candidates:
+                if (record.dirty or record.new) and not record.pending:
+                    rows.append(record.to_row())
+                    record.dirty = False
+                    record.new = False
+        return rows
+
+    def _after_flush(self, rows, written):
+        with self.lock:
+            for row in rows[:written]:
+                record = self.evicted_dirty.get(row['ip'])
+                if record is not None and not record.dirty:
+                    del self.evicted_dirty[row['ip']]
+            # Lo que no llegó a escribirse queda marcado para el próximo ciclo
+            for row in rows[written:]:
+                record = self.ip_cache.peek(row['ip']) or self.evicted_dirty.get(row['ip'])
+                if record is not None:
+                    record.dirty = True
+
+    @staticmethod
+    def _upsert_statement(rows):
+        table = IPRegistry.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(table).values(rows)
+            return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in SYNC_COLUMNS})
+
+        # SQLite/PostgreSQL (entornos locales y benchmarks)
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=['ip'],
+            set_={column: stmt.excluded[column] for column in SYNC_COLUMNS}
+        )
+
+    def _sync_to_db_sync(self, evicted_only=False):
+        lock_start = time.perf_counter()
+        rows = self._snapshot_dirty(evicted_only)
+        lock_held = time.perf_counter() - lock_start
+        if not rows:
+            return
+
+        flush_start = time.perf_counter()
+        written = 0
+        try:
+            for i in range(0, len(rows), self.SYNC_CHUNK_SIZE):
+                chunk = rows[i:i + self.SYNC_CHUNK_SIZE]
+                db.session.execute(self._upsert_statement(chunk))
+                db.session.commit()
+                written += len(chunk)
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error syncing IP cache: {e}")
+        self._after_flush(rows, written)
+
+        elapsed = time.perf_counter() - flush_start
+        rate = written / elapsed if elapsed > 0 else 0
+        logger.info(
+            f"IP cache synced to database: {written}/{len(rows)} filas en {elapsed:.2f}s "
+            f"({rate:.0f} filas/s), lock retenido {lock_held * 1000:.1f} ms."
+        )
 
 ip_manager_cache = IPCacheManager()
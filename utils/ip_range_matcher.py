@@ -0,0 +1,184 @@
+"""
+Bloqueo por rangos: prefijos CIDR (IPv4/IPv6) y proveedores/ASN.
+
+Los prefijos se compilan en un trie binario guardado en arrays planos. Una vez construido
+es inmutable, así que las consultas no necesitan lock: cuando cambia la lista de bloqueos se
+arma un RangeMatcher nuevo y se reemplaza la referencia. Cada consulta recorre como máximo
+tantos nodos como bits tenga el prefijo más largo.
+"""
+
+import ipaddress
+import re
+import socket
+from array import array
+
+ASN_PATTERN = re.compile(r'^AS(\d+)$', re.IGNORECASE)
+ASN_PREFIX_PATTERN = re.compile(r'^AS(\d+)\b', re.IGNORECASE)
+# Solo dígitos y puntos, o una palabra con ':' y sin espacios: parece una IP mal escrita
+IP_LIKE_PATTERN = re.compile(r'^[\d.]+$|^[\w.%]*:[\w.:%]*$')
+
+RANGE_REGION_TYPES = ('cidr', 'asn', 'provider')
+
+
+class PrefixTrie:
+    __slots__ = ('bits', 'left', 'right', 'terminal', 'labels', 'size')
+
+    def __init__(self, bits, prefixes):
+        """prefixes: iterable de (red como entero, largo del prefijo, etiqueta)."""
+        left = [0]
+        right = [0]
+        terminal = [-1]
+        labels = []
+        for network, prefixlen, label in prefixes:
+            node = 0
+            for i in range(prefixlen):
+                children = right if (network >> (bits - 1 - i)) & 1 else left
+                child = children[node]
+                if not child:
+                    # El nodo 0 es la raíz y nunca es hijo: 0 significa "sin hijo"
+                    child = len(left)
+                    left.append(0)
+                    right.append(0)
+                    terminal.append(-1)
+                    children[node] = child
+                node = child
+            if terminal[node] < 0:
+                terminal[node] = len(labels)
+                labels.append(label)
+
+        self.bits = bits
+        self.left = array('l', left)
+        self.right = array('l', right)
+        self.terminal = array('l', terminal)
+        self.labels = labels
+        self.size = len(labels)
+
+    def lookup(self, value):
+        """Retorna la etiqueta del primer prefijo que contiene al valor, o None."""
+        left = self.left
+        right = self.right
+        terminal = self.terminal
+        node = 0
+        shift = self.bits - 1
+        while True:
+            idx = terminal[node]
+            if idx >= 0:
+                return self.labels[idx]
+            if shift < 0:
+                return None
+            node = right[node] if (value >> shift) & 1 else left[node]
+            if not node:
+                return None
+            shift -= 1
+
+
+def _ip_to_int(ip_address):
+    """Retorna (versión, entero) o (None, None) si no es una IP válida."""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+    except (OSError, TypeError):
+        pass
+    try:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, ip_address), 'big')
+    except (OSError, TypeError):
+        return None, None
+    # IPv4 mapeada en IPv6 (::ffff:a.b.c.d)
+    if value >> 32 == 0xFFFF:
+        return 4, value & 0xFFFFFFFF
+    return 6, value
+
+
+def normalize_provider(name):
+    name = (name or '').strip()
+    match = ASN_PATTERN.match(name)
+    if match:
+        return f'as{match.group(1)}'
+    return name.lower()
+
+
+def normalize_region(region_type, region_name):
+    """Valida y lleva a forma canónica un bloqueo por rango. Lanza ValueError si no es válido."""
+    region_name = (region_name or '').strip()
+    if not region_name:
+        raise ValueError('region_name is required')
+    if region_type == 'cidr':
+        return str(ipaddress.ip_network(region_name, strict=False))
+    if region_type == 'asn':
+        match = ASN_PATTERN.match(region_name) or re.match(r'^(\d+)$', region_name)
+        if not match:
+            raise ValueError(f'Invalid ASN: {region_name}')
+        return f'AS{match.group(1)}'
+    return region_name
+
+
+def parse_block_target(value, target_type=None):
+    """
+    Clasifica lo recibido en /dev/ips/block: una IP suelta, un prefijo CIDR, un ASN
+    (AS15169) o el nombre de un proveedor. Retorna (tipo, valor canónico).
+
+    Un valor con forma de IP que no lo es (203.0.113.300, 10.0.0.) lanza ValueError en lugar
+    de tomarse como proveedor; target_type='provider' fuerza el nombre tal cual y cualquier otro
+    target_type exige que el valor sea de ese tipo.
+    """
+    value = (value or '').strip()
+    if not value:
+        raise ValueError('A target is required')
+    if target_type == 'provider':
+        return 'provider', value
+    if target_type not in (None, 'ip') + RANGE_REGION_TYPES:
+        raise ValueError(f'type must be one of: ip, {", ".join(RANGE_REGION_TYPES)}')
+
+    if _ip_to_int(value)[0] is not None:
+        parsed = 'ip', value
+    elif '/' in value:
+        parsed = 'cidr', normalize_region('cidr', value)
+    elif ASN_PATTERN.match(value):
+        parsed = 'asn', normalize_region('asn', value)
+    elif IP_LIKE_PATTERN.match(value):
+        raise ValueError(f'Invalid IP address: {value}')
+    else:
+        parsed = 'provider', value
+    if target_type is not None and parsed[0] != target_type:
+        raise ValueError(f'{value} is not a valid {target_type}')
+    return parsed
+
+
+class RangeMatcher:
+    def __init__(self, cidrs=(), providers=()):
+        v4 = []
+        v6 = []
+        for cidr in cidrs:
+            try:
+                network = ipaddress.ip_network(cidr, strict=False)
+            except ValueError:
+                continue
+            target = v4 if network.version == 4 else v6
+            target.append((int(network.network_address), network.prefixlen, str(network)))
+        self.v4 = PrefixTrie(32, v4)
+        self.v6 = PrefixTrie(128, v6)
+        self.providers = frozenset(normalize_provider(p) for p in providers if p)
+
+    def __len__(self):
+        return self.v4.size + self.v6.size + len(self.providers)
+
+    def match_ip(self, ip_address):
+        version, value = _ip_to_int(ip_address)
+        if version == 4:
+            return self.v4.lookup(value) if self.v4.size else None
+        if version == 6:
+            return self.v6.lookup(value) if self.v6.size else None
+        return None
+
+    def match_provider(self, proveedor, dominio_proveedor=None):
+        if not self.providers:
+            return False
+        for name in (proveedor, dominio_proveedor):
+            if not name or name == 'Desconocido':
+                continue
+            if normalize_provider(name) in self.providers:
+                return True
+            # ipinfo devuelve "org" como "AS15169 Google LLC" cuando no hay as_name
+            match = ASN_PREFIX_PATTERN.match(name)
+            if match and f'as{match.group(1)}' in self.providers:
+                return True
+        return False
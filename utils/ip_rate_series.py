@@ -0,0 +1,181 @@
+"""
+Serie de peticiones por segundo de cada IP durante la última hora.
+
+Cada IP activa tiene un ring buffer de 3600 bytes (un contador saturado en 255 por segundo)
+y sumas corridas para las ventanas de WINDOWS, así que registrar una petición es O(1) y
+el total de una IP en una ventana también: al avanzar el reloj solo se restan los segundos
+que salen de cada ventana. El top-N recorre las IPs una vez y usa heapq.nlargest
+(O(N log k)).
+
+Es por proceso: con varios workers cada uno ve las peticiones que atendió.
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from threading import Lock
+
+SECONDS = 3600
+WINDOWS = (10, 60, 300, 3600)
+MAX_COUNT = 255
+
+
+def _ring_sum(counts, start, stop):
+    """Suma los contadores de los segundos absolutos [start, stop)."""
+    length = stop - start
+    if length <= 0:
+        return 0
+    a = start % SECONDS
+    if a + length <= SECONDS:
+        return sum(counts[a:a + length])
+    return sum(counts[a:]) + sum(counts[:a + length - SECONDS])
+
+
+def _ring_clear(counts, start, stop):
+    length = stop - start
+    if length <= 0:
+        return
+    a = start % SECONDS
+    if a + length <= SECONDS:
+        counts[a:a + length] = bytes(length)
+    else:
+        counts[a:] = bytes(SECONDS - a)
+        counts[:a + length - SECONDS] = bytes(a + length - SECONDS)
+
+
+class RateSeries:
+    __slots__ = ('counts', 'last_second', 'sums')
+
+    def __init__(self, second):
+        self.counts = bytearray(SECONDS)
+        self.last_second = second
+        self.sums = [0] * len(WINDOWS)
+
+    def advance(self, second):
+        """Mueve el reloj de la serie: descuenta lo que sale de cada ventana y libera los slots."""
+        last = self.last_second
+        elapsed = second - last
+        if elapsed <= 0:
+            return
+        self.last_second = second
+        sums = self.sums
+        if elapsed >= SECONDS or not sums[-1]:
+            # Nada que descontar: la última hora quedó vacía
+            if sums[-1]:
+                self.counts = bytearray(SECONDS)
+                self.sums = [0] * len(WINDOWS)
+            return
+        counts = self.counts
+        for i, window in enumerate(WINDOWS):
+            if sums[i]:
+                if elapsed >= window:
+                    sums[i] = 0
+                else:
+                    sums[i] -= _ring_sum(counts, last - window + 1, second - window + 1)
+        _ring_clear(counts, last + 1, second + 1)
+
+    def record(self, second):
+        # Si el reloj retrocede se cuenta en el último segundo conocido
+        self.advance(second)
+        idx = self.last_second % SECONDS
+        if self.counts[idx] < MAX_COUNT:
+            self.counts[idx] += 1
+            sums = self.sums
+            for i in range(len(sums)):
+                sums[i] += 1
+
+    def per_second(self, window):
+        """Contadores de los últimos `window` segundos, del más antiguo al actual."""
+        start = self.last_second - window + 1
+        a = start % SECONDS
+        if a + window <= SECONDS:
+            return list(self.counts[a:a + window])
+        return list(self.counts[a:]) + list(self.counts[:a + window - SECONDS])
+
+
+class RequestRateTracker:
+    def __init__(self, max_series=10000):
+        self.max_series = max_series
+        # Orden de uso: cuando se llena se descarta la IP que lleva más tiempo sin peticiones
+        self._series = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self._series)
+
+    @staticmethod
+    def window_index(window):
+        """Valida la ventana pedida; lanza ValueError si no es una de WINDOWS."""
+        try:
+            return WINDOWS.index(int(window))
+        except (TypeError, ValueError):
+            raise ValueError(f'window must be one of {", ".join(str(w) for w in WINDOWS)}')
+
+    def record(self, ip_address, now=None):
+        second = int(now if now is not None else time.time())
+        with self.lock:
+            series = self._series.get(ip_address)
+            if series is None:
+                series = RateSeries(second)
+                self._series[ip_address] = series
+                if len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+            else:
+                self._series.move_to_end(ip_address)
+            series.record(second)
+
+    def _totals(self, window_index, second):
+        """(total, ip) de las IPs con peticiones en la ventana. Se llama con el lock tomado."""
+        stale = []
+        for ip_address, series in self._series.items():
+            series.advance(second)
+            total = series.sums[window_index]
+            if total:
+                yield total, ip_address
+            elif series.sums[-1] == 0:
+                stale.append(ip_address)
+        # Sin peticiones en la última hora: la serie ya no aporta nada
+        for ip_address in stale:
+            del self._series[ip_address]
+
+    def top(self, window, limit=20, now=None):
+        window_index = self.window_index(window)
+        second = int(now if now is not None else time.time())
+        with self.lock:
+            best = heapq.nlargest(limit, self._totals(window_index, second))
+        window = WINDOWS[window_index]
+        return [
+            {'ip': ip_address, 'requests': total, 'rate': round(total / window, 3)}
+            for total, ip_address in best
+        ]
+
+    def histogram(self, window, now=None):
+        """Cantidad de IPs por rango de peticiones en la ventana (buckets en potencias de 2)."""
+        window_index = self.window_index(window)
+        second = int(now if now is not None else time.time())
+        buckets = {}
+        with self.lock:
+            for total, _ in self._totals(window_index, second):
+                exponent = total.bit_length() - 1
+                buckets[exponent] = buckets.get(exponent, 0) + 1
+        return [
+            {'min_requests': 1 << exponent, 'max_requests': (2 << exponent) - 1, 'ips': buckets[exponent]}
+            for exponent in sorted(buckets)
+        ]
+
+    def series(self, ip_address, window, bucket=1, now=None):
+        """Peticiones de una IP en la ventana, agrupadas de a `bucket` segundos. None si no hay datos."""
+        window = WINDOWS[self.window_index(window)]
+        bucket = max(1, min(int(bucket), window))
+        second = int(now if now is not None else time.time())
+        with self.lock:
+            series = self._series.get(ip_address)
+            if series is None:
+                return None
+            series.advance(second)
+            counts = series.per_second(window)
+            start = series.last_second - window + 1
+        return [
+            {'start': start + i, 'requests': sum(counts[i:i + bucket])}
+            for i in range(0, window, bucket)
+        ]
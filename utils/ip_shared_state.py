@@ -0,0 +1,239 @@
+"""
+Estado de IPs compartido entre los workers de gunicorn de un mismo host.
+
+Usa un archivo SQLite local en modo WAL: los contadores por IP se incrementan de forma
+atómica dentro de una transacción y los bloqueos (IPs y regiones) llevan un número de
+versión que cada worker consulta en cada petición para recargarlos apenas cambian.
+No depende de ningún servicio externo.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ip_counters (
+    ip TEXT PRIMARY KEY,
+    requests_minute INTEGER NOT NULL,
+    last_minute_reset REAL NOT NULL,
+    requests_month INTEGER NOT NULL,
+    month_key INTEGER NOT NULL,
+    last_month_reset REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seeded INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ip_blocks (
+    ip TEXT PRIMARY KEY,
+    is_blocked INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS region_blocks (
+    region_name TEXT PRIMARY KEY,
+    region_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('block_version', 0);
+"""
+
+# Si la fila no existe (primera petición o se podó por inactividad) arranca del total que el
+# worker ya conocía para la IP
+INCREMENT_SQL = """
+INSERT INTO ip_counters (ip, requests_minute, last_minute_reset, requests_month, month_key, last_month_reset, last_seen, seeded)
+VALUES (:ip, 1, :now, :requests_month, :month_key, :now, :now, :seeded)
+ON CONFLICT(ip) DO UPDATE SET
+    requests_minute = CASE WHEN :now - last_minute_reset > 60 THEN 1 ELSE requests_minute + 1 END,
+    last_minute_reset = CASE WHEN :now - last_minute_reset > 60 THEN :now ELSE last_minute_reset END,
+    requests_month = CASE WHEN month_key != :month_key THEN 1 ELSE requests_month + 1 END,
+    last_month_reset = CASE WHEN month_key != :month_key THEN :now ELSE last_month_reset END,
+    month_key = :month_key,
+    last_seen = MAX(last_seen, :now)
+"""
+
+# Suma el histórico de BD una sola vez por IP, aunque varios workers la carguen a la vez
+SEED_SQL = """
+INSERT INTO ip_counters (ip, requests_minute, last_minute_reset, requests_month, month_key, last_month_reset, last_seen, seeded)
+VALUES (:ip, 0, :now, :requests_month, :month_key, :month_reset, :last_seen, 1)
+ON CONFLICT(ip) DO UPDATE SET
+    requests_month = CASE WHEN month_key = :month_key THEN requests_month + :requests_month ELSE requests_month END,
+    last_seen = MAX(last_seen, :last_seen),
+    seeded = 1
+WHERE seeded = 0
+"""
+
+SELECT_COUNTERS_SQL = """
+SELECT requests_minute, last_minute_reset, requests_month, last_month_reset, last_seen
+FROM ip_counters WHERE ip = ?
+"""
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def month_key(dt):
+    return dt.year * 12 + dt.month
+
+
+class SharedIPState:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # Una conexión por hilo y por proceso (las conexiones SQLite no sobreviven a un fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=10000')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _write(self, fn):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+            conn.execute('COMMIT')
+            return result
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _counters(conn, ip_address):
+        row = conn.execute(SELECT_COUNTERS_SQL, (ip_address,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'requests_minute': row[0],
+            'last_minute_reset': row[1],
+            'requests_month': row[2],
+            'last_month_reset': row[3],
+            'last_seen': row[4],
+        }
+
+    def increment(self, ip_address, now_dt, requests_month=1, seeded=False):
+        """
+        Registra una petición y retorna los contadores resultantes (timestamps en epoch UTC).
+        requests_month y seeded son los valores con que se crea la fila si no existe: el total del
+        mes que el worker ya tiene para la IP (contando esta petición) y si ese total ya incluye
+        el histórico de BD.
+        """
+        params = {
+            'ip': ip_address,
+            'now': _epoch(now_dt),
+            'month_key': month_key(now_dt),
+            'requests_month': max(1, requests_month),
+            'seeded': int(bool(seeded)),
+        }
+
+        def run(conn):
+            conn.execute(INCREMENT_SQL, params)
+            return self._counters(conn, ip_address)
+        return self._write(run)
+
+    def seed(self, ip_address, requests_month, month_reset_dt, last_seen_dt):
+        """Incorpora los contadores persistidos en BD la primera vez que algún worker carga la IP."""
+        params = {
+            'ip': ip_address,
+            'now': time.time(),
+            'requests_month': requests_month or 0,
+            'month_key': month_key(month_reset_dt),
+            'month_reset': _epoch(month_reset_dt),
+            'last_seen': _epoch(last_seen_dt),
+        }
+
+        def run(conn):
+            conn.execute(SEED_SQL, params)
+            return self._counters(conn, ip_address)
+        return self._write(run)
+
+    def get_counters(self, ip_address):
+        return self._counters(self._connect(), ip_address)
+
+    def prune_counters(self, idle_seconds, now=None):
+        """Borra los contadores de las IPs sin peticiones en los últimos idle_seconds. Retorna cuántos borró."""
+        cutoff = (now if now is not None else time.time()) - idle_seconds
+
+        def run(conn):
+            return conn.execute('DELETE FROM ip_counters WHERE last_seen < ?', (cutoff,)).rowcount
+        return self._write(run)
+
+    def block_version(self):
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'block_version'").fetchone()
+        return row[0]
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'block_version'")
+
+    def set_ip_blocked(self, ip_address, is_blocked):
+        def run(conn):
+            conn.execute(
+                'INSERT INTO ip_blocks (ip, is_blocked) VALUES (?, ?) '
+                'ON CONFLICT(ip) DO UPDATE SET is_blocked = excluded.is_blocked',
+                (ip_address, int(bool(is_blocked))),
+            )
+            self._bump_version(conn)
+        self._write(run)
+
+    def seed_blocked_ips(self, ip_addresses):
+        """Agrega IPs bloqueadas en BD; no pisa una decisión ya tomada por algún worker (bloqueo o desbloqueo)."""
+        def run(conn):
+            cursor = conn.executemany(
+                'INSERT OR IGNORE INTO ip_blocks (ip, is_blocked) VALUES (?, 1)',
+                [(ip_address,) for ip_address in ip_addresses],
+            )
+            if cursor.rowcount:
+                self._bump_version(conn)
+        self._write(run)
+
+    def add_region(self, region_type, region_name):
+        def run(conn):
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO region_blocks (region_name, region_type) VALUES (?, ?)',
+                (region_name, region_type),
+            )
+            if cursor.rowcount:
+                self._bump_version(conn)
+        self._write(run)
+
+    def remove_region(self, region_name):
+        def run(conn):
+            cursor = conn.execute('DELETE FROM region_blocks WHERE region_name = ?', (region_name,))
+            if cursor.rowcount:
+                self._bump_version(conn)
+        self._write(run)
+
+    def load_blocks(self):
+        """Retorna (versión, {ip: bloqueada}, {'country': set, 'continent': set}) en una lectura consistente."""
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'block_version'").fetchone()[0]
+            ips = {ip: bool(blocked) for ip, blocked in conn.execute('SELECT ip, is_blocked FROM ip_blocks')}
+            regions = {'country': set(), 'continent': set()}
+            for name, region_type in conn.execute('SELECT region_name, region_type FROM region_blocks'):
+                regions.setdefault(region_type, set()).add(name)
+        finally:
+            conn.execute('COMMIT')
+        return version, ips, regions
+
+
+def _epoch(dt):
+    # Los datetimes del caché son naive en UTC (datetime.utcnow)
+    return (dt - EPOCH).total_seconds()
+
+
+def from_epoch(seconds):
+    return EPOCH + timedelta(seconds=seconds)
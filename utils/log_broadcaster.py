@@ -0,0 +1,149 @@
+"""
+Difusión de los logs en vivo a todos los clientes de /dev/logs (SSE).
+
+Antes había una sola queue.Queue global y cada mensaje lo recibía el primer stream que lo
+sacaba. Ahora cada línea se guarda una sola vez en un ring buffer compartido con un número de
+secuencia creciente y cada suscriptor lleva su propio cursor:
+
+- publish() escribe una posición del ring y despierta al hilo notificador; no recorre a los
+  suscriptores, así que su costo no depende de cuántos haya conectados.
+- Cada suscriptor ve como máximo sus últimas `capacity` líneas pendientes (su buffer acotado).
+  Si se atrasa más, salta a las más nuevas y suma lo perdido a `dropped`.
+- El cursor es el `id:` de cada evento SSE: al reconectarse, EventSource manda Last-Event-ID
+  (o se pasa ?since=) y el stream sigue desde ahí mientras esas líneas sigan en el ring.
+
+Cada stream ocupa un hilo del worker mientras está abierto; por eso se limita la cantidad de
+streams simultáneos (LOG_STREAM_MAX_SUBSCRIBERS) y su duración (LOG_STREAM_MAX_SECONDS), y el
+cliente retoma sin perder líneas gracias al cursor. Cada worker difunde solo sus propios logs.
+"""
+
+import os
+import threading
+import time
+
+from utils.process_threads import OncePerProcess
+
+RING_CAPACITY = int(os.getenv('LOG_STREAM_RING_SIZE', '2000'))
+SUBSCRIBER_CAPACITY = int(os.getenv('LOG_STREAM_SUBSCRIBER_BUFFER', '500'))
+MAX_SUBSCRIBERS = int(os.getenv('LOG_STREAM_MAX_SUBSCRIBERS', '10'))
+MAX_STREAM_SECONDS = float(os.getenv('LOG_STREAM_MAX_SECONDS', '600'))
+KEEPALIVE_SECONDS = 15
+
+
+class Subscription:
+    __slots__ = ('cursor', 'capacity', 'dropped', 'delivered', 'created_at')
+
+    def __init__(self, cursor, capacity):
+        self.cursor = cursor  # próxima secuencia a entregar
+        self.capacity = capacity
+        self.dropped = 0
+        self.delivered = 0
+        self.created_at = time.time()
+
+
+class LogBroadcaster:
+    def __init__(self, capacity=RING_CAPACITY, subscriber_capacity=SUBSCRIBER_CAPACITY,
+                 max_subscribers=MAX_SUBSCRIBERS):
+        self.capacity = capacity
+        self.subscriber_capacity = subscriber_capacity
+        self.max_subscribers = max_subscribers
+        self.ring = [None] * capacity
+        self.next_seq = 1
+        self.lock = threading.Lock()
+        self.new_lines = threading.Condition(self.lock)
+        self.pending = threading.Event()
+        self.subscriptions = set()
+        self.rejected = 0
+        self._ensure_notifier = OncePerProcess(self._start_notifier)
+
+    def publish(self, msg):
+        with self.lock:
+            self.ring[self.next_seq % self.capacity] = msg
+            self.next_seq += 1
+        # Un solo hilo espera este evento; él despierta a los suscriptores fuera del logging
+        self.pending.set()
+        self._ensure_notifier()
+
+    def subscribe(self, since=None, capacity=None):
+        """Retorna una Subscription, o None si ya se alcanzó LOG_STREAM_MAX_SUBSCRIBERS."""
+        with self.lock:
+            if len(self.subscriptions) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            cursor = self.next_seq if since is None else min(since + 1, self.next_seq)
+            subscription = Subscription(cursor, min(capacity or self.subscriber_capacity, self.capacity))
+            self.subscriptions.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def read(self, subscription, timeout=None):
+        """Espera líneas nuevas. Retorna ([(seq, msg), ...], líneas perdidas desde la última lectura)."""
+        with self.lock:
+            if subscription.cursor >= self.next_seq:
+                self.new_lines.wait_for(lambda: subscription.cursor < self.next_seq, timeout)
+            oldest = self.next_seq - subscription.capacity
+            dropped = 0
+            if subscription.cursor < oldest:
+                dropped = oldest - subscription.cursor
+                subscription.dropped += dropped
+                subscription.cursor = oldest
+            lines = [(seq, self.ring[seq % self.capacity]) for seq in range(subscription.cursor, self.next_seq)]
+            subscription.cursor = self.next_seq
+            subscription.delivered += len(lines)
+        return lines, dropped
+
+    def sse_stream(self, subscription, keepalive=KEEPALIVE_SECONDS, max_seconds=MAX_STREAM_SECONDS):
+        """Generador SSE de una suscripción; la libera al cerrarse la conexión."""
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                # Esperar como máximo `keepalive` segundos para que Gunicorn no detecte un "worker timeout"
+                lines, dropped = self.read(subscription, timeout=keepalive)
+                chunks = []
+                if dropped:
+                    chunks.append(f'event: dropped\ndata: {dropped}\n\n')
+                for seq, msg in lines:
+                    data = '\n'.join(f'data: {line}' for line in msg.split('\n'))
+                    chunks.append(f'id: {seq}\n{data}\n\n')
+                yield ''.join(chunks) or ': keepalive\n\n'
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def _start_notifier(self):
+        threading.Thread(target=self._notifier, name='log-broadcast', daemon=True).start()
+
+    def _notifier(self):
+        while True:
+            self.pending.wait()
+            self.pending.clear()
+            with self.lock:
+                self.new_lines.notify_all()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'published': self.next_seq - 1,
+                'ring_capacity': self.capacity,
+                'max_subscribers': self.max_subscribers,
+                'rejected': self.rejected,
+                'subscribers': [
+                    {
+                        'cursor': s.cursor,
+                        'lag': self.next_seq - s.cursor,
+                        'capacity': s.capacity,
+                        'delivered': s.delivered,
+                        'dropped': s.dropped,
+                        'connected_seconds': round(time.time() - s.created_at, 1),
+                    }
+                    for s in self.subscriptions
+                ],
+            }
+
+
+log_broadcaster = LogBroadcaster()
@@ -0,0 +1,195 @@
+"""
+Logging asíncrono: el hilo del request solo encola el registro y un hilo listener lo pasa a
+los handlers reales (archivo diario y difusión SSE / caché de 6 horas).
+
+- El encolado no bloquea: si la cola (LOG_QUEUE_SIZE) está llena, el registro se descarta y
+  se cuenta en `dropped`, por nivel.
+- El listener toma los registros en lotes de hasta LOG_BATCH_SIZE y baja el archivo a disco
+  cada LOG_FLUSH_SECONDS o cada LOG_FLUSH_RECORDS registros, lo que ocurra primero. Los
+  handlers con `defer_flush` (DailyRotatingFileHandler) no hacen flush por registro.
+- Al salir del proceso se vacía la cola antes de que logging cierre los handlers.
+
+LOG_ASYNC=false vuelve a colgar los handlers directamente del logger raíz.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from utils.process_threads import OncePerProcess
+
+_STOP = object()
+
+
+class PipelineHandler(logging.Handler):
+    """Handler del logger raíz: deja el registro listo para otro hilo y lo encola."""
+
+    def __init__(self, pipeline):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def handle(self, record):
+        # Sin el lock del handler: Queue.put_nowait ya es thread-safe
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        try:
+            self.pipeline.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        # Los args y el traceback pueden referenciar objetos vivos del request: se resuelven acá.
+        # El formato completo (fecha, nivel, módulo) lo hace cada handler en el listener.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    def __init__(self, handlers, queue_size=None, batch_size=None, flush_interval=None, flush_records=None):
+        self.handlers = list(handlers)
+        self.capacity = queue_size or int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+        self.batch_size = batch_size or int(os.getenv('LOG_BATCH_SIZE', '500'))
+        self.flush_interval = flush_interval or float(os.getenv('LOG_FLUSH_SECONDS', '1'))
+        self.flush_records = flush_records or int(os.getenv('LOG_FLUSH_RECORDS', '200'))
+        self.queue = queue.Queue(maxsize=self.capacity)
+        self.handler = PipelineHandler(self)
+        for handler in self.handlers:
+            if hasattr(handler, 'defer_flush'):
+                handler.defer_flush = True
+        self.lock = threading.Lock()
+        self._listener = None
+        self._ensure_listener = OncePerProcess(self._start_listener)
+        self.enqueued = 0
+        self.dropped = 0
+        self.dropped_by_level = {}
+        self.max_depth = 0
+        self.processed = 0
+        self.batches = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+                self.dropped_by_level[record.levelname] = self.dropped_by_level.get(record.levelname, 0) + 1
+            return
+        # Contadores sin lock: son métricas aproximadas y el lock costaría más que el encolado
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _start_listener(self):
+        self._listener = threading.Thread(target=self._listen, name='log-listener', daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, last_flush + self.flush_interval - time.monotonic()) if pending else None
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = False
+            for record in batch:
+                if record is _STOP:
+                    stop = True
+                else:
+                    self._dispatch(record)
+                    pending += 1
+            if batch:
+                self.batches += 1
+
+            now = time.monotonic()
+            if pending and (stop or pending >= self.flush_records or now - last_flush >= self.flush_interval):
+                self._flush()
+                pending = 0
+                last_flush = now
+            elif not pending:
+                last_flush = now
+            if stop:
+                return
+
+    def _dispatch(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        self.processed += 1
+
+    def _flush(self):
+        start = time.perf_counter()
+        for handler in self.handlers:
+            try:
+                getattr(handler, 'flush_buffer', handler.flush)()
+            except Exception:
+                pass
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def stop(self, timeout=5):
+        """Procesa todo lo encolado y hace flush; lo usa atexit antes del cierre de logging."""
+        listener = self._listener
+        if listener is not None and listener.is_alive() and self._ensure_listener.started():
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                return
+            listener.join(timeout)
+            self._listener = None
+            self._ensure_listener.reset()
+            return
+        # Sin listener en este proceso (p. ej. después de un fork): vaciar en el hilo actual
+        drained = False
+        while True:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not _STOP:
+                self._dispatch(record)
+                drained = True
+        if drained:
+            self._flush()
+
+    def register_atexit(self):
+        atexit.register(self.stop)
+
+    def stats(self):
+        return {
+            'mode': 'async',
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.capacity,
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'dropped_by_level': dict(self.dropped_by_level),
+            'processed': self.processed,
+            'batches': self.batches,
+            'flushes': self.flushes,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+            'flush_interval_seconds': self.flush_interval,
+            'flush_records': self.flush_records,
+            'listener_alive': bool(self._listener and self._listener.is_alive()),
+        }
@@ -0,0 +1,197 @@
+"""
+Caché de logs recientes de /dev/logs/recent, acotada en bytes y comprimida por segmentos.
+
+Reemplaza al deque de strings de las últimas 6 horas, que no tenía tope de memoria. Las líneas
+entran a un segmento activo; al llegar a LOG_CACHE_SEGMENT_BYTES se sella comprimido con zlib
+junto con su índice (primer/último timestamp, nivel máximo y cantidad por nivel). Cuando el
+total supera LOG_CACHE_MAX_BYTES o un segmento sale de la ventana de 6 horas se descarta el más
+viejo.
+
+Las consultas (since, level, limit) eligen los segmentos por su índice y solo descomprimen esos;
+los resultados se devuelven como generador para poder transmitirlos sin armar la lista entera.
+"""
+
+import bisect
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import deque
+
+SIX_HOURS_IN_SECONDS = 6 * 60 * 60
+ARG_TZ = datetime.timezone(datetime.timedelta(hours=-3))
+
+
+class Segment:
+    __slots__ = ('first_ts', 'last_ts', 'count', 'max_level', 'level_counts', 'data', 'raw_bytes')
+
+    def __init__(self, records):
+        self.first_ts = records[0][0]
+        self.last_ts = records[-1][0]
+        self.count = len(records)
+        self.level_counts = {}
+        for _, levelno, _ in records:
+            self.level_counts[levelno] = self.level_counts.get(levelno, 0) + 1
+        self.max_level = max(self.level_counts)
+        raw = '\n'.join(json.dumps(record, ensure_ascii=False) for record in records).encode('utf-8')
+        self.raw_bytes = len(raw)
+        self.data = zlib.compress(raw)
+
+    def records(self):
+        for line in zlib.decompress(self.data).decode('utf-8').split('\n'):
+            yield json.loads(line)
+
+
+class RecentLogStore:
+    def __init__(self, max_bytes=None, segment_bytes=None, retention=SIX_HOURS_IN_SECONDS):
+        self.max_bytes = max_bytes or int(os.getenv('LOG_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+        self.segment_bytes = segment_bytes or int(os.getenv('LOG_CACHE_SEGMENT_BYTES', str(64 * 1024)))
+        self.retention = retention
+        self.segments = deque()  # sellados, del más viejo al más nuevo
+        self.active = []  # (timestamp, levelno, mensaje)
+        self.active_bytes = 0
+        self.compressed_bytes = 0
+        self.lock = threading.Lock()
+        self.appended = 0
+        self.evicted_records = 0
+        self.decompressed_segments = 0
+
+    def append(self, ts, levelno, msg):
+        with self.lock:
+            self.active.append((ts, levelno, msg))
+            self.active_bytes += len(msg) + 32
+            self.appended += 1
+            if self.active_bytes >= self.segment_bytes:
+                self._seal()
+            self._evict(ts)
+
+    def _seal(self):
+        segment = Segment(self.active)
+        self.segments.append(segment)
+        self.compressed_bytes += len(segment.data)
+        self.active = []
+        self.active_bytes = 0
+
+    def _evict(self, now):
+        cutoff = now - self.retention
+        while self.segments and (
+            self.compressed_bytes + self.active_bytes > self.max_bytes or self.segments[0].last_ts < cutoff
+        ):
+            segment = self.segments.popleft()
+            self.compressed_bytes -= len(segment.data)
+            self.evicted_records += segment.count
+
+    def _decompress(self, segment):
+        self.decompressed_segments += 1
+        return segment.records()
+
+    def query(self, since=None, min_level=0, limit=None):
+        """Mensajes desde `since` con nivel >= `min_level`, en orden cronológico.
+
+        Con `limit` devuelve los últimos `limit` que cumplen el filtro.
+        """
+        with self.lock:
+            segments = list(self.segments)
+            active = list(self.active)
+        cutoff = time.time() - self.retention
+        since = cutoff if since is None else max(since, cutoff)
+
+        def wanted(segment):
+            return segment.max_level >= min_level
+
+        if limit is None:
+            start = bisect.bisect_left(segments, since, key=lambda s: s.last_ts)
+            for segment in segments[start:]:
+                if wanted(segment):
+                    for ts, levelno, msg in self._decompress(segment):
+                        if ts >= since and levelno >= min_level:
+                            yield msg
+            for ts, levelno, msg in active:
+                if ts >= since and levelno >= min_level:
+                    yield msg
+            return
+
+        if limit <= 0:
+            return
+        newest_first = []
+        for ts, levelno, msg in reversed(active):
+            if ts >= since and levelno >= min_level:
+                newest_first.append(msg)
+                if len(newest_first) >= limit:
+                    break
+        for segment in reversed(segments):
+            if len(newest_first) >= limit or segment.last_ts < since:
+                break
+            if not wanted(segment):
+                continue
+            for ts, levelno, msg in reversed(list(self._decompress(segment))):
+                if ts >= since and levelno >= min_level:
+                    newest_first.append(msg)
+                    if len(newest_first) >= limit:
+                        break
+        yield from reversed(newest_first)
+
+    def clear(self):
+        with self.lock:
+            self.segments.clear()
+            self.active = []
+            self.active_bytes = 0
+            self.compressed_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            raw_bytes = sum(segment.raw_bytes for segment in self.segments)
+            return {
+                'segments': len(self.segments),
+                'records': sum(segment.count for segment in self.segments) + len(self.active),
+                'compressed_bytes': self.compressed_bytes,
+                'uncompressed_bytes': raw_bytes,
+                'active_bytes': self.active_bytes,
+                'max_bytes': self.max_bytes,
+                'appended': self.appended,
+                'evicted_records': self.evicted_records,
+                'decompressed_segments': self.decompressed_segments,
+                'oldest': self.segments[0].first_ts if self.segments else (self.active[0][0] if self.active else None),
+            }
+
+
+def parse_since(value):
+    """Epoch en segundos o fecha ISO 8601 (sin zona se toma hora de Argentina)."""
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid since: {value}')
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=ARG_TZ)
+    return moment.timestamp()
+
+
+def parse_level(value):
+    if value in (None, ''):
+        return 0
+    levelno = logging.getLevelName(value.upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f'Invalid level: {value}')
+    return levelno
+
+
+def iter_json_array(items):
+    """Serializa un iterable como arreglo JSON de a un elemento por vez."""
+    yield '['
+    first = True
+    for item in items:
+        yield ('' if first else ',') + json.dumps(item, ensure_ascii=False)
+        first = False
+    yield ']'
+
+
+recent_logs = RecentLogStore()
@@ -0,0 +1,216 @@
+"""
+Lectura de los archivos diarios de logs para /dev/logs/view sin cargarlos en memoria.
+
+El archivo se mapea con mmap y se entrega en trozos de CHUNK_SIZE; después de enviar cada trozo
+se le avisa al kernel (MADV_DONTNEED) que esas páginas ya no hacen falta, así que la memoria del
+worker no crece con el tamaño del archivo. Se puede pedir:
+
+- un rango de bytes (header Range),
+- las últimas N líneas (tail), buscándolas hacia atrás desde el final,
+- un filtro por regex y/o nivel mínimo que recorre el archivo por trozos. La unidad del filtro
+  es el registro: la línea "[fecha] NIVEL in modulo: ..." más sus líneas de continuación
+  (tracebacks). Los trozos sin ninguna coincidencia se descartan con una sola búsqueda.
+"""
+
+import logging
+import mmap
+import os
+import re
+from collections import deque
+
+CHUNK_SIZE = 1024 * 1024
+HEADER = re.compile(rb'^\[\d{4}-\d{2}-\d{2} [^\]\n]*\] ([A-Z]+) in ', re.M)
+LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+def resolve_log_path(log_dir, filename):
+    """Ruta del archivo dentro de log_dir, o None si no existe o intenta salir del directorio."""
+    if not filename or os.path.basename(filename) != filename or '..' in filename:
+        return None
+    path = os.path.join(log_dir, filename)
+    return path if os.path.isfile(path) else None
+
+
+def compile_filter(pattern):
+    if not pattern:
+        return None
+    try:
+        return re.compile(pattern.encode('utf-8'), re.M)
+    except re.error as e:
+        raise ValueError(f'Invalid regex: {e}')
+
+
+def _open(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, 'madvise'):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+def _release(mm, released, stop):
+    """Suelta las páginas completas ya enviadas hasta `stop`; retorna el nuevo límite liberado."""
+    # Solo páginas enteras: liberar la página parcial del final hace que el RSS vuelva a crecer
+    stop -= stop % mmap.PAGESIZE
+    if stop > released and hasattr(mm, 'madvise'):
+        mm.madvise(mmap.MADV_DONTNEED, released, stop - released)
+        return stop
+    return released
+
+
+def stream_bytes(path, start=0, stop=None):
+    mm = _open(path)
+    if mm is None:
+        return
+    try:
+        stop = len(mm) if stop is None else min(stop, len(mm))
+        pos = start
+        released = start - start % mmap.PAGESIZE
+        while pos < stop:
+            end = min(pos + CHUNK_SIZE, stop)
+            yield mm[pos:end]
+            released = _release(mm, released, end)
+            pos = end
+    finally:
+        mm.close()
+
+
+def tail_offset(mm, lines):
+    """Offset donde empiezan las últimas `lines` líneas."""
+    size = len(mm)
+    pos = size - 1 if size and mm[size - 1] == ord('\n') else size
+    for _ in range(lines):
+        newline = mm.rfind(b'\n', 0, pos)
+        if newline < 0:
+            return 0
+        pos = newline
+    return min(pos + 1, size)
+
+
+def stream_tail(path, lines):
+    mm = _open(path)
+    if mm is None:
+        return
+    try:
+        start = tail_offset(mm, lines)
+    finally:
+        mm.close()
+    yield from stream_bytes(path, start)
+
+
+def _chunks(mm, start, stop):
+    """Trozos de hasta CHUNK_SIZE que terminan justo antes del encabezado de un registro."""
+    pos = start
+    released = start - start % mmap.PAGESIZE
+    while pos < stop:
+        end = min(pos + CHUNK_SIZE, stop)
+        if end < stop:
+            cut = mm.rfind(b'\n[', pos, end)
+            while cut > pos and not HEADER.match(mm, cut + 1):
+                cut = mm.rfind(b'\n[', pos, cut)
+            if cut > pos:
+                end = cut + 1
+            else:
+                # Un registro más largo que el trozo: cortar al menos en un fin de línea
+                newline = mm.rfind(b'\n', pos, end)
+                if newline >= pos:
+                    end = newline + 1
+        yield mm[pos:end]
+        released = _release(mm, released, end)
+        pos = end
+
+
+def _next_header(chunk, pos):
+    match = HEADER.search(chunk, pos)
+    return match.start() if match else len(chunk)
+
+
+def _record_start(chunk, pos):
+    """Inicio del registro que contiene `pos` (0 si el trozo empieza con líneas de continuación)."""
+    cut = chunk.rfind(b'\n[', 0, pos + 1)
+    while cut >= 0 and not HEADER.match(chunk, cut + 1):
+        cut = chunk.rfind(b'\n[', 0, cut)
+    return cut + 1 if cut >= 0 else 0
+
+
+def _level_needles(min_level):
+    return [f'] {name} in '.encode() for name in LEVEL_NAMES if logging.getLevelName(name) >= min_level]
+
+
+def _level_headers(chunk, needles):
+    """Inicios de los encabezados con alguno de los niveles pedidos, en orden.
+
+    Se buscan con bytes.find (literal) en lugar de un regex anclado con ^, que el motor de re
+    prueba en cada posición del trozo.
+    """
+    starts = []
+    for needle in needles:
+        pos = chunk.find(needle)
+        while pos >= 0:
+            start = chunk.rfind(b'\n', 0, pos) + 1
+            match = HEADER.match(chunk, start)
+            if match and match.end() == pos + len(needle):
+                starts.append(start)
+            pos = chunk.find(needle, pos + 1)
+    starts.sort()
+    return starts
+
+
+def _matching_spans(chunk, pattern, needles):
+    """(inicio, fin) de los registros del trozo que cumplen el filtro.
+
+    Se salta de coincidencia en coincidencia (nivel o regex), así que el costo depende de la
+    cantidad de resultados y no de la cantidad de registros.
+    """
+    if needles is not None:
+        for start in _level_headers(chunk, needles):
+            end = _next_header(chunk, start + 1)
+            if pattern is None or pattern.search(chunk, start, end):
+                yield start, end
+        return
+    pos = 0
+    while True:
+        match = pattern.search(chunk, pos)
+        # Un patrón que acepta la cadena vacía (`$`, `x*`) vuelve a coincidir al final del trozo
+        if match is None or match.start() >= len(chunk):
+            return
+        start = _record_start(chunk, match.start())
+        end = _next_header(chunk, max(match.end(), match.start() + 1))
+        yield start, end
+        pos = max(end, match.end() + 1)
+
+
+def iter_matching_records(mm, pattern=None, min_level=0):
+    needles = _level_needles(min_level) if min_level else None
+    for chunk in _chunks(mm, 0, len(mm)):
+        if needles is not None and not any(needle in chunk for needle in needles):
+            continue
+        if pattern is not None and not pattern.search(chunk):
+            continue
+        for start, end in _matching_spans(chunk, pattern, needles):
+            yield chunk[start:end]
+
+
+def stream_filtered(path, pattern=None, min_level=0, tail=None):
+    """Registros que cumplen el filtro; con `tail` solo los últimos N (en memoria solo esos N)."""
+    mm = _open(path)
+    if mm is None:
+        return
+    try:
+        records = iter_matching_records(mm, pattern, min_level)
+        if tail is not None:
+            records = deque(records, maxlen=tail)
+        buffered = []
+        size = 0
+        for record in records:
+            buffered.append(record)
+            size += len(record)
+            if size >= CHUNK_SIZE:
+                yield b''.join(buffered)
+                buffered, size = [], 0
+        if buffered:
+            yield b''.join(buffered)
+    finally:
+        mm.close()
@@ -1,11 +1,12 @@
 import logging
 import os
 import time
-from collections import deque
-import queue
 import datetime
 from sqlalchemy.engine import Engine
 from sqlalchemy import event
+from utils.log_broadcaster import log_broadcaster
+from utils.log_pipeline import LogPipeline
+from utils.log_store import recent_logs
 
 # Configuración de Zona Horaria de Argentina (UTC-3)
 arg_tz = datetime.timezone(datetime.timedelta(hours=-3))
@@ -16,13 +17,8 @@ def argentina_time_converter(*args):
     # Desplazamiento de 3 horas para Argentina (3 * 3600 = 10800 segundos)
     return time.gmtime(secs - 10800)
 
-# Cola para almacenar logs en tiempo real para SSE
-log_queue = queue.Queue(maxsize=100)
-
-# Cache volátil para las últimas 6 horas
-# Almacena tuplas (timestamp, mensaje)
-log_cache = deque()
-SIX_HOURS_IN_SECONDS = 6 * 60 * 60
+# Pipeline asíncrono del logger raíz (None con LOG_ASYNC=false)
+log_pipeline = None
 
 class DailyRotatingFileHandler(logging.FileHandler):
     def __init__(self, log_dir, prefix="logs_", suffix=".txt", backupCount=30, encoding='utf-8'):
@@ -34,17 +30,36 @@ class DailyRotatingFileHandler(logging.FileHandler):
         
         filename = os.path.join(log_dir, f"{prefix}{self.current_date}{suffix}")
         super().__init__(filename, encoding=encoding)
+        self.next_rollover = self._next_midnight()
+        # Con el pipeline asíncrono el listener decide cuándo bajar el buffer a disco
+        self.defer_flush = False
+
+    @staticmethod
+    def _next_midnight():
+        now = datetime.datetime.now(arg_tz)
+        tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return tomorrow.timestamp()
 
     def emit(self, record):
-        current_date_check = datetime.datetime.now(arg_tz).strftime("%Y%m%d")
-        if self.current_date != current_date_check:
-            self.current_date = current_date_check
-            self.close()
-            self.baseFilename = os.path.join(self.log_dir, f"{self.prefix}{self.current_date}{self.suffix}")
-            self.stream = self._open()
-            self._cleanup()
+        # Solo se arma la fecha cuando pasó la medianoche, no en cada registro
+        if record.created >= self.next_rollover:
+            self.next_rollover = self._next_midnight()
+            current_date_check = datetime.datetime.now(arg_tz).strftime("%Y%m%d")
+            if self.current_date != current_date_check:
+                self.current_date = current_date_check
+                self.close()
+                self.baseFilename = os.path.join(self.log_dir, f"{self.prefix}{self.current_date}{self.suffix}")
+                self.stream = self._open()
+                self._cleanup()
         super().emit(record)
 
+    def flush(self):
+        if not self.defer_flush:
+            super().flush()
+
+    def flush_buffer(self):
+        super().flush()
+
     def _cleanup(self):
         try:
             now = time.time()
@@ -66,20 +81,13 @@ class QueueHandler(logging.Handler):
     def emit(self, record):
         try:
             msg = self.format(record)
-            now = time.time()
-            
-            # Añadir a la cola SSE
-            if log_queue.full():
-                log_queue.get_nowait()
-            log_queue.put_nowait(msg)
-            
-            # Añadir al cache de 6 horas
-            log_cache.append((now, msg))
-            
-            # Limpiar logs antiguos (mayores a 6 horas)
-            while log_cache and log_cache[0][0] < now - SIX_HOURS_IN_SECONDS:
-                log_cache.popleft()
-                
+
+            # Difundir a todos los streams SSE de /dev/logs
+            log_broadcaster.publish(msg)
+
+            # Añadir al cache de 6 horas (comprimida y acotada en bytes)
+            recent_logs.append(record.created, record.levelno, msg)
+
         except Exception:
             self.handleError(record)
 
@@ -104,12 +112,21 @@ def setup_logging(app):
     # Configuración del logger raíz
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(q_handler)
-    
-    # También añadir a Flask app logger
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(q_handler)
+
+    global log_pipeline
+    if os.getenv('LOG_ASYNC', 'true').lower() == 'true':
+        # El request solo encola; archivo y SSE se atienden en el hilo listener.
+        # app.logger propaga al raíz, así que no se le agregan handlers propios.
+        log_pipeline = LogPipeline([file_handler, q_handler])
+        log_pipeline.register_atexit()
+        root_logger.addHandler(log_pipeline.handler)
+    else:
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(q_handler)
+
+        # También añadir a Flask app logger
+        app.logger.addHandler(file_handler)
+        app.logger.addHandler(q_handler)
 
     # Configure database error logging
     logging.getLogger('sqlalchemy').setLevel(logging.WARNING)
@@ -129,17 +146,12 @@ def setup_logging(app):
             exc_info=sqla_exc or orig_exc
         )
 
-def get_log_stream():
-    while True:
-        try:
-            # Esperar como máximo 15 segundos para evitar que Gunicorn detecte un "worker timeout"
-            msg = log_queue.get(timeout=15)
-            yield f"data: {msg}\n\n"
-        except queue.Empty:
-            # Enviar un comentario SSE vacío para mantener la conexión viva y reiniciar el contador de timeout de Gunicorn
-            yield ": keepalive\n\n"
-
-def get_recent_logs():
-    """Devuelve los logs de las últimas 6 horas almacenados en el cache volátil."""
-    now = time.time()
-    return [msg for ts, msg in log_cache if ts >= now - SIX_HOURS_IN_SECONDS]
+def get_recent_logs(since=None, min_level=0, limit=None):
+    """Devuelve (como generador) los logs de las últimas 6 horas almacenados en el cache volátil."""
+    return recent_logs.query(since=since, min_level=min_level, limit=limit)
+
+def get_log_pipeline_stats():
+    """Profundidad de cola, descartes y flushes del logging asíncrono de este worker."""
+    if log_pipeline is None:
+        return {'mode': 'sync'}
+    return log_pipeline.stats()
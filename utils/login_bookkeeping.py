@@ -0,0 +1,120 @@
+"""
+Registro de sesiones del login (users.auth_token / token_expiration_date) fuera del request.
+
+La validación de tokens no lee esas columnas (la revocación usa users.token_version), así que
+escribirlas y hacer commit en cada login solo suma latencia y esperas de lock sobre `users`
+cuando muchos abogados entran a la vez. AUTH_LOGIN_BOOKKEEPING elige el modo:
+
+- deferred (por defecto): el login deja el último token de cada usuario en un buffer y un hilo
+  lo escribe cada AUTH_LOGIN_FLUSH_SECONDS (o antes si se juntan AUTH_LOGIN_FLUSH_BATCH) con un
+  único UPDATE por lote. Si el proceso muere sin apagarse, se pierde lo que no se escribió.
+- sync: el comportamiento anterior (UPDATE + commit dentro del request).
+- off: no se guarda nada.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from sqlalchemy import update
+
+from config.config import db
+from utils.process_threads import OncePerProcess
+
+logger = logging.getLogger(__name__)
+
+MODES = ('deferred', 'sync', 'off')
+
+
+class LoginBookkeeper:
+    def __init__(self):
+        self.mode = os.getenv('AUTH_LOGIN_BOOKKEEPING', 'deferred').lower()
+        if self.mode not in MODES:
+            logger.warning(f"AUTH_LOGIN_BOOKKEEPING={self.mode!r} no es válido; se usa 'deferred'")
+            self.mode = 'deferred'
+        self.flush_interval = float(os.getenv('AUTH_LOGIN_FLUSH_SECONDS', '2'))
+        self.batch_size = int(os.getenv('AUTH_LOGIN_FLUSH_BATCH', '500'))
+        self.app = None
+        self.pending = {}  # { uuid_user: (token, expiration) } solo el último login de cada usuario
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self._ensure_worker = OncePerProcess(self._start_worker)
+        self.recorded = 0
+        self.flushed = 0
+        self.batches = 0
+        self.errors = 0
+
+    def init_app(self, app):
+        self.app = app
+        atexit.register(self.flush)
+
+    def record(self, user, token, expires_at):
+        self.recorded += 1
+        if self.mode == 'off':
+            return
+        if self.mode == 'sync' or self.app is None:
+            user.token_expiration_date = expires_at
+            user.auth_token = token
+            db.session.add(user)
+            db.session.commit()
+            return
+        with self.lock:
+            self.pending[user.uuid] = (token, expires_at)
+            full = len(self.pending) >= self.batch_size
+        self._ensure_worker()
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        """Escribe lo pendiente. Retorna la cantidad de usuarios actualizados."""
+        with self.lock:
+            batch, self.pending = self.pending, {}
+        if not batch or self.app is None:
+            return 0
+        from models import UserModel
+
+        rows = [
+            {'uuid': uuid_user, 'auth_token': token, 'token_expiration_date': expires_at}
+            for uuid_user, (token, expires_at) in batch.items()
+        ]
+        try:
+            with self.app.app_context():
+                db.session.execute(update(UserModel), rows)
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Error guardando {len(rows)} logins: {e}")
+            with self.lock:
+                self.errors += 1
+                # Lo que llegó mientras tanto es más nuevo y tiene prioridad
+                for uuid_user, entry in batch.items():
+                    self.pending.setdefault(uuid_user, entry)
+            return 0
+        with self.lock:
+            self.flushed += len(rows)
+            self.batches += 1
+        return len(rows)
+
+    def _start_worker(self):
+        threading.Thread(target=self._worker, name='login-bookkeeping', daemon=True).start()
+
+    def _worker(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'mode': self.mode,
+                'pending': len(self.pending),
+                'recorded': self.recorded,
+                'flushed': self.flushed,
+                'batches': self.batches,
+                'errors': self.errors,
+                'flush_interval_seconds': self.flush_interval,
+            }
+
+
+login_bookkeeper = LoginBookkeeper()
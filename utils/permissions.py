@@ -0,0 +1,111 @@
+"""
+Motor de permisos por máscara de bits.
+
+Cada nombre de acceso (y cada rol, como 'role:admin') recibe un bit la primera vez que se
+usa. Al armar el Principal (utils/principal_cache.py) los accesos de cada perfil se compilan
+en una máscara; el perfil 'dev' tiene todos los bits. Después, cualquier chequeo (un acceso,
+"alguno de estos accesos" o "es admin") es un único AND contra una máscara precalculada.
+
+Los permisos de salas dependen del tipo: 'coworking' usa book_rooms/view_rooms/manage_rooms
+y cualquier otro tipo usa las variantes *_meeting_rooms.
+"""
+
+import threading
+from functools import lru_cache, wraps
+
+from flask import request, jsonify
+
+ALL = -1  # todos los bits (perfil dev)
+
+ADMIN_ROLES = ('admin', 'administrador', 'dev')
+
+ROOM_ACCESSES = {
+    'book': ('book_rooms', 'book_meeting_rooms'),
+    'view': ('view_rooms', 'view_meeting_rooms'),
+    'manage': ('manage_rooms', 'manage_meeting_rooms'),
+}
+
+
+class PermissionRegistry:
+    """Asigna un bit por nombre. Los bits no se reasignan, así las máscaras guardadas siguen valiendo."""
+
+    def __init__(self):
+        self._bits = {}
+        self._lock = threading.Lock()
+
+    def bit(self, name):
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(name)
+                if bit is None:
+                    bit = 1 << len(self._bits)
+                    self._bits[name] = bit
+        return bit
+
+    def mask(self, names):
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+    def __len__(self):
+        return len(self._bits)
+
+
+registry = PermissionRegistry()
+
+
+def role(profile_name):
+    return 'role:' + profile_name.lower()
+
+
+def compile_profile(profile_name, access_names):
+    """Máscara de un perfil: sus accesos más el bit de su rol."""
+    if profile_name.lower() == 'dev':
+        return ALL
+    return registry.mask(access_names) | registry.bit(role(profile_name))
+
+
+@lru_cache(maxsize=1024)
+def required_mask(*names):
+    return registry.mask(names)
+
+
+def allows(principal, *access_names):
+    """True si el principal tiene alguno de los accesos (o es dev)."""
+    return bool(principal.access_mask & required_mask(*access_names))
+
+
+def has_admin_role(principal):
+    return bool(principal.access_mask & required_mask(*(role(name) for name in ADMIN_ROLES)))
+
+
+def room_access(action, room_type):
+    coworking, meeting = ROOM_ACCESSES[action]
+    return coworking if room_type == 'coworking' else meeting
+
+
+def can_access_room(principal, action, room_type=None):
+    """Permiso de `action` ('book', 'view', 'manage') para un tipo de sala, o para cualquiera si room_type es None."""
+    if room_type is None:
+        return allows(principal, *ROOM_ACCESSES[action])
+    return allows(principal, room_access(action, room_type))
+
+
+def room_access_required(action, room_type=None):
+    """
+    Decorador para usar debajo de @token_required. `room_type` es una función sin argumentos
+    que devuelve el tipo de sala de la petición; sin ella alcanza con el permiso de cualquier tipo.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            principal = getattr(request, 'principal', None)
+            if principal is None:
+                return jsonify({'message': 'User not set, token required'}), 401
+            if not can_access_room(principal, action, room_type() if room_type else None):
+                return jsonify({'message': 'Access denied'}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
@@ -0,0 +1,153 @@
+"""
+Contadores del pool de conexiones de SQLAlchemy, por worker, para /dev/db/pool y /dev/workers.
+
+InstrumentedQueuePool es un QueuePool que mide cuánto espera cada checkout (incluye el ping de
+pool_pre_ping) y cuenta los que terminan en TimeoutError por pool agotado. Los eventos del pool
+cuentan conexiones nuevas, checkouts, checkins, invalidaciones (p. ej. un pre-ping que encontró
+la conexión cerrada por wait_timeout) y cierres (incluye los reciclados por pool_recycle), y
+miden cuánto tiempo queda tomada cada conexión. Se usa como `poolclass` en
+SQLALCHEMY_ENGINE_OPTIONS (ver config/config.py).
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+CHECKED_OUT_AT = 'pool_metrics_checked_out_at'
+
+
+class PoolStats:
+    def __init__(self, slow_wait_ms=None):
+        self.slow_wait_seconds = (
+            slow_wait_ms if slow_wait_ms is not None else float(os.getenv('DB_POOL_SLOW_WAIT_MS', '100'))
+        ) / 1000
+        self.reset()
+
+    def reset(self):
+        self.lock = threading.Lock()  # también después de un fork, por si el padre lo tenía tomado
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.closes = 0
+        self.timeouts = 0
+        self.slow_waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.held_total = 0.0
+        self.held_max = 0.0
+        self.since = time.time()
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+            if seconds >= self.slow_wait_seconds:
+                self.slow_waits += 1
+
+    def record_timeout(self, seconds):
+        with self.lock:
+            self.timeouts += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def record_held(self, seconds):
+        with self.lock:
+            self.checkins += 1
+            self.held_total += seconds
+            if seconds > self.held_max:
+                self.held_max = seconds
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool=None):
+        with self.lock:
+            attempts = self.checkouts + self.timeouts
+            data = {
+                'pid': os.getpid(),
+                'since': self.since,
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'closes': self.closes,
+                'timeouts': self.timeouts,
+                'slow_waits': self.slow_waits,
+                'slow_wait_ms': self.slow_wait_seconds * 1000,
+                'wait_mean_ms': round(self.wait_total / attempts * 1000, 3) if attempts else None,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                'held_mean_ms': round(self.held_total / self.checkins * 1000, 3) if self.checkins else None,
+                'held_max_ms': round(self.held_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data['pool'] = {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'max_overflow': pool._max_overflow,
+                'timeout_seconds': pool.timeout(),
+                'recycle_seconds': pool._recycle,
+                'pre_ping': pool._pre_ping,
+            }
+        return data
+
+
+pool_stats = PoolStats()
+if hasattr(os, 'register_at_fork'):
+    # Cada worker cuenta lo suyo, sin arrastrar lo que hizo el master antes del fork
+    os.register_at_fork(after_in_child=pool_stats.reset)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_stats.record_timeout(time.perf_counter() - start)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+@event.listens_for(InstrumentedQueuePool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.count('connects')
+
+
+@event.listens_for(InstrumentedQueuePool, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info[CHECKED_OUT_AT] = time.perf_counter()
+    pool_stats.count('checkouts')
+
+
+@event.listens_for(InstrumentedQueuePool, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop(CHECKED_OUT_AT, None) if connection_record is not None else None
+    if started is not None:
+        pool_stats.record_held(time.perf_counter() - started)
+
+
+@event.listens_for(InstrumentedQueuePool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.count('invalidations')
+
+
+@event.listens_for(InstrumentedQueuePool, 'soft_invalidate')
+def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.count('soft_invalidations')
+
+
+@event.listens_for(InstrumentedQueuePool, 'close')
+def _on_close(dbapi_connection, connection_record):
+    pool_stats.count('closes')
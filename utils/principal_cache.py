@@ -0,0 +1,143 @@
+"""
+Caché por proceso del usuario autenticado ("principal") para token_required/access_required.
+
+Sin caché, cada request autenticado hace un SELECT del usuario más el subquery de perfiles
+(lazy='subquery') y después access_required recorre perfiles × accesos en Python. Acá se
+guarda, por (identidad del JWT, iat), un Principal inmutable con el uuid, el email, los
+nombres de perfil, un frozenset con los nombres de acceso y la máscara de bits compilada por
+utils/permissions.py.
+
+- Las entradas viven AUTH_PRINCIPAL_CACHE_TTL segundos (60 por defecto; 0 desactiva la caché).
+- Los endpoints que cambian perfiles o accesos llaman a invalidate_identity/invalidate_all.
+  La invalidación es local al proceso: los demás workers ven el cambio cuando vence el TTL.
+- Una carga que empezó antes de una invalidación no se guarda (contador de generación), así
+  un request lento no vuelve a meter permisos viejos en la caché.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, FrozenSet
+
+from utils.permissions import compile_profile, required_mask
+
+
+class Principal(NamedTuple):
+    uuid: str
+    email: str
+    profile_names: FrozenSet[str]
+    accesses: FrozenSet[str]
+    is_dev: bool
+    access_mask: int
+    token_version: int = 0
+
+    def has_access(self, access_name):
+        return bool(self.access_mask & required_mask(access_name))
+
+    @classmethod
+    def from_user(cls, user):
+        profile_names = set()
+        accesses = set()
+        access_mask = 0
+        for profile in user.profiles:
+            names = [access.name for access in profile.accesses]
+            profile_names.add(profile.name.lower())
+            accesses.update(names)
+            access_mask |= compile_profile(profile.name, names)
+        return cls(
+            uuid=user.uuid,
+            email=user.email,
+            profile_names=frozenset(profile_names),
+            accesses=frozenset(accesses),
+            is_dev='dev' in profile_names,
+            access_mask=access_mask,
+            token_version=getattr(user, 'token_version', 0) or 0,
+        )
+
+
+class PrincipalCache:
+    """LRU con TTL de Principal por (identidad, iat). Thread-safe."""
+
+    def __init__(self, ttl=60.0, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def get(self, key, now=None):
+        if not self.enabled:
+            return None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def put(self, key, principal, generation, now=None):
+        """Guarda el principal salvo que haya habido una invalidación desde `generation`."""
+        if not self.enabled:
+            return False
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entries[key] = (principal, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate_identity(self, identity):
+        """Descarta todas las entradas (cualquier iat) de una identidad (email del JWT)."""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if k[0] == identity]:
+                del self._entries[key]
+
+    def invalidate_all(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'ttl_seconds': self.ttl,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'generation': self.generation,
+            }
+
+
+principal_cache = PrincipalCache(
+    ttl=float(os.getenv('AUTH_PRINCIPAL_CACHE_TTL', '60')),
+    max_entries=int(os.getenv('AUTH_PRINCIPAL_CACHE_MAX', '5000')),
+)
+
+
+def invalidate_identity(identity):
+    principal_cache.invalidate_identity(identity)
+
+
+def invalidate_all():
+    principal_cache.invalidate_all()
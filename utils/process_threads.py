@@ -0,0 +1,36 @@
+"""
+Arranque de hilos de fondo una vez por proceso.
+
+Los hilos no sobreviven a un fork de gunicorn: cada worker tiene que arrancar los suyos la
+primera vez que los necesita. OncePerProcess compara el pid actual con el del último arranque
+sin tomar lock (el camino de todas las peticiones) y, cuando difiere, vuelve a comprobarlo bajo
+lock para que dos hilos del mismo worker no arranquen dos veces lo mismo.
+"""
+
+import os
+import threading
+
+
+class OncePerProcess:
+    """Envuelve `start` para que se ejecute una sola vez en cada proceso."""
+
+    def __init__(self, start):
+        self.start = start
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.start()
+
+    def started(self):
+        return self.pid == os.getpid()
+
+    def reset(self):
+        """Permite volver a arrancar en este proceso (después de detener los hilos)."""
+        self.pid = None
@@ -0,0 +1,227 @@
+"""
+Instrumentación de las consultas SQL de cada request (before/after_cursor_execute).
+
+Por request se cuentan las consultas, el tiempo total en la base y las sentencias agrupadas por
+huella (la sentencia normalizada: literales y parámetros reemplazados por ?, listas IN colapsadas
+y espacios unificados). Al terminar la request:
+
+- si una misma huella se ejecutó más de SQL_NPLUSONE_THRESHOLD veces (10) se loguea un aviso de
+  posible N+1 con el endpoint;
+- con SQL_STATS_HEADER=true la respuesta lleva X-SQL-Stats, X-SQL-Top y Server-Timing (pensado
+  para desarrollo: las huellas muestran el esquema, nunca los valores);
+- los totales por huella se suman a los del worker, que muestra /dev/sql.
+
+Cada consulta que tarda SQL_SLOW_QUERY_MS (500) o más se loguea en el momento, dentro o fuera de
+una request. SQL_INSTRUMENTATION=false no registra los listeners.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.request_metrics import UNMATCHED
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_CACHE_SIZE = 2048
+TOP_HEADER_STATEMENTS = 3
+HEADER_STATEMENT_CHARS = 120
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r'%\(\w+\)s|%s|:\w+|\?|\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.I)
+_VALUES_LIST = re.compile(r'\bVALUES \(([?, ]+)\)(?:, \(\1\))+', re.I)
+_SPACE = re.compile(r'\s+')
+
+_fingerprints = {}
+
+
+def fingerprint(statement):
+    """Sentencia normalizada para agrupar ejecuciones de la misma consulta."""
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    text = _SPACE.sub(' ', statement).strip()
+    text = _STRING.sub('?', text)
+    text = _PARAM.sub('?', text)
+    text = _IN_LIST.sub('IN (...)', text)
+    text = _VALUES_LIST.sub(r'VALUES (\1), ...', text)
+    if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+        _fingerprints.clear()
+    _fingerprints[statement] = text
+    return text
+
+
+class RequestQueries:
+    __slots__ = ('endpoint', 'count', 'seconds', 'statements')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}  # huella -> [ejecuciones, segundos]
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def top(self, limit):
+        return sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+
+    def repeated(self, threshold):
+        return [(statement, count) for statement, (count, _) in self.statements.items() if count > threshold]
+
+
+class QueryStats:
+    def __init__(self, slow_query_ms=None, nplusone_threshold=None, header=None, max_statements=500):
+        self.slow_query_seconds = (
+            slow_query_ms if slow_query_ms is not None else float(os.getenv('SQL_SLOW_QUERY_MS', '500'))
+        ) / 1000
+        self.nplusone_threshold = (
+            nplusone_threshold if nplusone_threshold is not None else int(os.getenv('SQL_NPLUSONE_THRESHOLD', '10'))
+        )
+        self.header = header if header is not None else os.getenv('SQL_STATS_HEADER', 'false').lower() == 'true'
+        self.max_statements = max_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.statements = {}  # huella -> {'count', 'seconds', 'max_per_request', 'endpoints'}
+        self.requests = 0
+        self.queries = 0
+        self.slow_queries = 0
+        self.nplusone = {}  # (endpoint, huella) -> veces detectado
+
+    # --- listeners del Engine ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        current = getattr(self._local, 'current', None)
+        if current is not None:
+            current.add(fingerprint(statement), elapsed)
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms) in {current.endpoint if current else 'background'}: "
+                f"{fingerprint(statement)}"
+            )
+
+    # --- hooks de la request ---
+
+    def init_app(self, app):
+        if os.getenv('SQL_INSTRUMENTATION', 'true').lower() != 'true':
+            return
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        # Primero de los before_request, para contar también las consultas de los demás hooks
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._after_request)
+
+    def _before_request(self):
+        self._local.current = RequestQueries(request.endpoint or UNMATCHED)
+
+    def _after_request(self, response):
+        current = getattr(self._local, 'current', None)
+        self._local.current = None
+        if current is None:
+            return response
+        repeated = current.repeated(self.nplusone_threshold)
+        for statement, count in repeated:
+            logger.warning(f"Possible N+1 in {current.endpoint}: {count} x {statement}")
+        self._record(current, repeated)
+        if self.header:
+            self._add_headers(response, current, len(repeated))
+        return response
+
+    def _add_headers(self, response, current, nplusone):
+        ms = current.seconds * 1000
+        response.headers['X-SQL-Stats'] = f'queries={current.count}; time_ms={ms:.1f}; n_plus_one={nplusone}'
+        response.headers['Server-Timing'] = f'db;dur={ms:.1f};desc="{current.count} queries"'
+        if current.statements:
+            response.headers['X-SQL-Top'] = ' | '.join(
+                f'{count}x {seconds * 1000:.1f}ms {_header_safe(statement)}'
+                for statement, (count, seconds) in current.top(TOP_HEADER_STATEMENTS)
+            )
+
+    def _record(self, current, repeated):
+        with self._lock:
+            self.requests += 1
+            self.queries += current.count
+            for statement, (count, seconds) in current.statements.items():
+                entry = self.statements.get(statement)
+                if entry is None:
+                    if len(self.statements) >= self.max_statements:
+                        continue
+                    entry = self.statements[statement] = {
+                        'count': 0, 'seconds': 0.0, 'max_per_request': 0, 'endpoints': set(),
+                    }
+                entry['count'] += count
+                entry['seconds'] += seconds
+                entry['max_per_request'] = max(entry['max_per_request'], count)
+                entry['endpoints'].add(current.endpoint)
+            for statement, _ in repeated:
+                key = (current.endpoint, statement)
+                self.nplusone[key] = self.nplusone.get(key, 0) + 1
+
+    def stats(self, limit=20):
+        with self._lock:
+            top = sorted(self.statements.items(), key=lambda item: item[1]['seconds'], reverse=True)[:limit]
+            return {
+                'pid': os.getpid(),
+                'requests': self.requests,
+                'queries': self.queries,
+                'queries_per_request': round(self.queries / self.requests, 2) if self.requests else None,
+                'slow_queries': self.slow_queries,
+                'slow_query_ms': self.slow_query_seconds * 1000,
+                'nplusone_threshold': self.nplusone_threshold,
+                'statements': [
+                    {
+                        'statement': statement,
+                        'count': entry['count'],
+                        'total_ms': round(entry['seconds'] * 1000, 3),
+                        'mean_ms': round(entry['seconds'] / entry['count'] * 1000, 3),
+                        'max_per_request': entry['max_per_request'],
+                        'endpoints': sorted(entry['endpoints']),
+                    }
+                    for statement, entry in top
+                ],
+                'nplusone': [
+                    {'endpoint': endpoint, 'statement': statement, 'requests': count}
+                    for (endpoint, statement), count in sorted(
+                        self.nplusone.items(), key=lambda item: item[1], reverse=True
+                    )
+                ],
+            }
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.nplusone.clear()
+            self.requests = self.queries = self.slow_queries = 0
+
+
+def _header_safe(statement):
+    text = statement if len(statement) <= HEADER_STATEMENT_CHARS else statement[:HEADER_STATEMENT_CHARS] + '...'
+    return text.replace('|', '/').encode('latin-1', 'replace').decode('latin-1')
+
+
+query_stats = QueryStats()
@@ -0,0 +1,228 @@
+"""
+Métricas por endpoint de Flask: histograma de latencia, bytes de request/response y requests en
+curso, expuestas en /dev/metrics (JSON o formato de texto de Prometheus).
+
+- Los buckets de latencia son fijos y crecen en escala logarítmica (x√2 desde 100 µs hasta
+  ~70 s); p50/p95/p99 se interpolan dentro del bucket, así que tienen un error de un bucket.
+- Cada hilo escribe en su propio shard (threading.local) sin lock; al leer se suman todos los
+  shards. La lectura puede ver una request a medio registrar, nada más.
+- La latencia se mide desde el primer before_request hasta el último after_request; no incluye
+  el envío de respuestas transmitidas (SSE, archivos).
+- Cada worker de gunicorn tiene sus propias métricas.
+
+METRICS_ENABLED=false desactiva los hooks.
+"""
+
+import math
+import os
+import threading
+import time
+
+from flask import request
+
+BUCKET_BASE = 0.0001  # 100 µs
+BUCKET_COUNT = 40
+# Límite superior de cada bucket; el bucket BUCKET_COUNT es el de desborde (+Inf)
+BUCKET_BOUNDS = tuple(BUCKET_BASE * 2 ** (i / 2) for i in range(BUCKET_COUNT))
+QUANTILES = (0.5, 0.95, 0.99)
+UNMATCHED = '<unmatched>'
+
+
+def bucket_index(seconds):
+    if seconds <= BUCKET_BASE:
+        return 0
+    return min(math.ceil(2 * math.log2(seconds / BUCKET_BASE) - 1e-9), BUCKET_COUNT)
+
+
+def quantile(buckets, q):
+    """Cuantil estimado desde los conteos por bucket, interpolando dentro del bucket."""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            if i == BUCKET_COUNT:
+                return BUCKET_BOUNDS[-1]
+            lower = BUCKET_BOUNDS[i - 1] if i else 0.0
+            return lower + (BUCKET_BOUNDS[i] - lower) * (rank - seen) / count
+        seen += count
+    return BUCKET_BOUNDS[-1]
+
+
+class Series:
+    __slots__ = ('buckets', 'count', 'sum', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.buckets = [0] * (BUCKET_COUNT + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def merge(self, other):
+        for i, count in enumerate(other.buckets):
+            if count:
+                self.buckets[i] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.request_bytes += other.request_bytes
+        self.response_bytes += other.response_bytes
+
+
+class Shard:
+    __slots__ = ('series', 'in_flight', 'current')
+
+    def __init__(self):
+        self.series = {}  # (endpoint, clase de status) -> Series
+        self.in_flight = {}  # endpoint -> requests en curso iniciadas por este hilo
+        self.current = None  # (perf_counter de inicio, endpoint) de la request que atiende el hilo
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # solo para registrar shards nuevos
+        self.started_at = time.time()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def start(self, endpoint):
+        in_flight = self._shard().in_flight
+        in_flight[endpoint] = in_flight.get(endpoint, 0) + 1
+
+    def finish(self, endpoint):
+        in_flight = self._shard().in_flight
+        in_flight[endpoint] = in_flight.get(endpoint, 0) - 1
+
+    def observe(self, endpoint, status, seconds, request_bytes=0, response_bytes=0):
+        series_by_key = self._shard().series
+        key = (endpoint, f'{status // 100}xx')
+        series = series_by_key.get(key)
+        if series is None:
+            series = series_by_key[key] = Series()
+        series.buckets[bucket_index(seconds)] += 1
+        series.count += 1
+        series.sum += seconds
+        series.request_bytes += request_bytes
+        series.response_bytes += response_bytes
+
+    def snapshot(self):
+        """Suma de todos los shards: ({(endpoint, status): Series}, {endpoint: en curso})."""
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        in_flight = {}
+        for shard in shards:
+            for key, series in list(shard.series.items()):
+                merged.setdefault(key, Series()).merge(series)
+            for endpoint, count in list(shard.in_flight.items()):
+                in_flight[endpoint] = in_flight.get(endpoint, 0) + count
+        return merged, {endpoint: count for endpoint, count in in_flight.items() if count}
+
+    def to_json(self):
+        merged, in_flight = self.snapshot()
+        endpoints = []
+        for (endpoint, status), series in sorted(merged.items()):
+            entry = {
+                'endpoint': endpoint,
+                'status': status,
+                'count': series.count,
+                'mean_ms': round(series.sum / series.count * 1000, 3) if series.count else None,
+                'request_bytes': series.request_bytes,
+                'response_bytes': series.response_bytes,
+            }
+            for q in QUANTILES:
+                value = quantile(series.buckets, q)
+                entry[f'p{int(q * 100)}_ms'] = round(value * 1000, 3) if value is not None else None
+            endpoints.append(entry)
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'in_flight': in_flight,
+            'endpoints': endpoints,
+        }
+
+    def to_prometheus(self):
+        merged, in_flight = self.snapshot()
+        lines = [
+            '# HELP http_request_duration_seconds Latencia de las requests por endpoint',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, status), series in sorted(merged.items()):
+            labels = f'endpoint="{_escape(endpoint)}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS, series.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {series.sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {series.count}')
+        for name, attr in (('http_request_size_bytes_total', 'request_bytes'),
+                           ('http_response_size_bytes_total', 'response_bytes')):
+            lines.append(f'# TYPE {name} counter')
+            for (endpoint, status), series in sorted(merged.items()):
+                lines.append(f'{name}{{endpoint="{_escape(endpoint)}",status="{status}"}} {getattr(series, attr)}')
+        lines.append('# TYPE http_requests_in_flight gauge')
+        for endpoint, count in sorted(in_flight.items()):
+            lines.append(f'http_requests_in_flight{{endpoint="{_escape(endpoint)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app):
+        if os.getenv('METRICS_ENABLED', 'true').lower() != 'true':
+            return
+        # Primero de los before_request y último de los after_request, para medir todo el resto
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._after_request)
+
+    # El inicio se guarda en el shard del hilo y no en flask.g (cada acceso a g pasa por un
+    # LocalProxy), y no hay teardown_request: Flask le suma un costo fijo a cada hook registrado.
+    # after_request corre también cuando la vista falla y un error handler arma la respuesta; si
+    # igual no corrió (otro after_request lanzó una excepción), la próxima request del hilo cierra
+    # la pendiente sin observarla.
+    def _before_request(self):
+        endpoint = request.endpoint or UNMATCHED
+        shard = self._shard()
+        if shard.current is not None:
+            shard.in_flight[shard.current[1]] -= 1
+        shard.current = (time.perf_counter(), endpoint)
+        shard.in_flight[endpoint] = shard.in_flight.get(endpoint, 0) + 1
+
+    def _after_request(self, response):
+        shard = self._shard()
+        started, shard.current = shard.current, None
+        if started is not None:
+            start, endpoint = started
+            shard.in_flight[endpoint] -= 1
+            self.observe(
+                endpoint,
+                response.status_code,
+                time.perf_counter() - start,
+                _content_length(request.environ.get('CONTENT_LENGTH')),
+                response.content_length or 0,
+            )
+        return response
+
+
+def _content_length(value):
+    # Del environ directo: request.content_length pasa por EnvironHeaders y cuesta varias veces más
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+request_metrics = RequestMetrics()
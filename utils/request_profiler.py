@@ -0,0 +1,362 @@
+"""
+Perfilado de requests en producción, a pedido y sin costo cuando no se usa.
+
+Una request se perfila si:
+
+- trae el header X-Profile con un token firmado emitido por /dev/profiling/token (manage_dev).
+  El token vence a los PROFILE_TOKEN_SECONDS (600) y sirve para una sola request;
+- o su endpoint tiene una regla de muestreo (1 de cada N requests, hasta `limit` perfiles por
+  worker, hasta `expires_at`). Las reglas se guardan en logs/profiles/sampling.json para que las
+  vean todos los workers; cada worker revisa el mtime del archivo cada RULES_CHECK_SECONDS.
+
+Modos:
+
+- 'cprofile': cProfile del hilo de la request; se guarda el .prof de pstats.
+- 'sample': un hilo toma el stack de la request cada PROFILE_SAMPLE_INTERVAL_MS (5 ms) y se
+  guardan las pilas colapsadas ("a;b;c 12", el formato de flamegraph.pl/speedscope). Cuesta
+  mucho menos que cProfile en requests largas.
+
+Los archivos quedan en logs/profiles/ (se conservan los últimos PROFILE_MAX_FILES, 100) y la
+respuesta perfilada lleva X-Profile-File con el nombre. Cuando no hay token ni reglas, cada
+request paga una búsqueda en el environ y una comparación de tiempo.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from utils.request_metrics import UNMATCHED
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Profile'
+MODES = ('cprofile', 'sample')
+RULES_FILE = 'sampling.json'
+RULES_CHECK_SECONDS = 2.0
+TOKEN_SALT = 'request-profile'
+PROFILE_NAME = re.compile(r'^(\d{8}-\d{6})_(.+)_(\d+)ms_([0-9a-f]{8})\.(prof|collapsed)$')
+
+
+class StackSampler:
+    """Muestrea el stack de un hilo desde otro hilo y cuenta las pilas repetidas."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ActiveProfile:
+    __slots__ = ('mode', 'endpoint', 'profile_id', 'started', 'profiler', 'sampler')
+
+    def __init__(self, mode, endpoint, profile_id):
+        self.mode = mode
+        self.endpoint = endpoint
+        self.profile_id = profile_id
+        self.started = time.perf_counter()
+        self.profiler = None
+        self.sampler = None
+
+    def start(self, sample_interval):
+        if self.mode == 'sample':
+            self.sampler = StackSampler(threading.get_ident(), sample_interval)
+            self.sampler.start()
+        else:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+
+
+class RequestProfiler:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.max_files = int(os.getenv('PROFILE_MAX_FILES', '100'))
+        self.token_seconds = int(os.getenv('PROFILE_TOKEN_SECONDS', '600'))
+        self.sample_interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5')) / 1000
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.rules = {}  # endpoint -> regla (ver set_rule)
+        self._rules_mtime = None
+        self._next_rules_check = 0.0
+        self._seen = Counter()  # requests vistas por endpoint con regla, en este worker
+        self._taken = Counter()  # perfiles tomados por endpoint con regla, en este worker
+
+    def init_app(self, app):
+        if os.getenv('PROFILING_ENABLED', 'true').lower() != 'true':
+            return
+        if self.directory is None:
+            self.directory = os.path.join(app.root_path, 'logs', 'profiles')
+        # Primero de los before_request y último de los after_request
+        app.before_request_funcs.setdefault(None, []).insert(0, self._before_request)
+        app.after_request_funcs.setdefault(None, []).insert(0, self._after_request)
+
+    # --- tokens ---
+
+    def _serializer(self):
+        return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt=TOKEN_SALT)
+
+    def issue_token(self, mode='cprofile', issued_by=None):
+        if mode not in MODES:
+            raise ValueError(f'Invalid mode: {mode}')
+        return self._serializer().dumps({'mode': mode, 'id': uuid.uuid4().hex[:8], 'by': issued_by})
+
+    def _claim_token(self, token):
+        """Modo e id del token si es válido y no se usó todavía; None si no."""
+        try:
+            data = self._serializer().loads(token, max_age=self.token_seconds)
+        except BadSignature:
+            return None
+        if data.get('mode') not in MODES or not re.fullmatch(r'[0-9a-f]{8}', data.get('id', '')):
+            return None
+        # El archivo marcador se crea de forma atómica: si otro worker ya lo creó, el token está usado
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            os.close(os.open(os.path.join(self.directory, f".token-{data['id']}"), os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return None
+        return data['mode'], data['id']
+
+    # --- reglas de muestreo ---
+
+    def _rules_path(self):
+        return os.path.join(self.directory, RULES_FILE)
+
+    def _check_rules(self, now):
+        self._next_rules_check = now + RULES_CHECK_SECONDS
+        try:
+            mtime = os.stat(self._rules_path()).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._rules_mtime:
+            return
+        rules = {}
+        if mtime is not None:
+            try:
+                with open(self._rules_path(), encoding='utf-8') as f:
+                    rules = json.load(f)
+            except (OSError, ValueError):
+                logger.exception('Could not read profiling rules')
+        with self._lock:
+            self.rules = rules
+            self._rules_mtime = mtime
+            self._seen.clear()
+            self._taken.clear()
+
+    def _write_rules(self, rules):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f'{self._rules_path()}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(rules, f, indent=2)
+        os.replace(tmp, self._rules_path())
+        self._next_rules_check = 0.0
+
+    def get_rules(self):
+        self._check_rules(time.monotonic())
+        now = time.time()
+        return {endpoint: rule for endpoint, rule in self.rules.items() if rule['expires_at'] > now}
+
+    def set_rule(self, endpoint, every, limit=10, mode='cprofile', minutes=60):
+        if mode not in MODES:
+            raise ValueError(f'Invalid mode: {mode}')
+        if every < 1 or limit < 1 or minutes <= 0:
+            raise ValueError('every, limit and minutes must be positive')
+        rules = self.get_rules()
+        rules[endpoint] = {'every': every, 'limit': limit, 'mode': mode, 'expires_at': time.time() + minutes * 60}
+        self._write_rules(rules)
+        return rules[endpoint]
+
+    def delete_rule(self, endpoint):
+        rules = self.get_rules()
+        if rules.pop(endpoint, None) is None:
+            return False
+        self._write_rules(rules)
+        return True
+
+    def _sampled_mode(self, endpoint):
+        rule = self.rules.get(endpoint)
+        if rule is None or rule['expires_at'] < time.time():
+            return None
+        with self._lock:
+            self._seen[endpoint] += 1
+            if self._seen[endpoint] % rule['every'] or self._taken[endpoint] >= rule['limit']:
+                return None
+            self._taken[endpoint] += 1
+        return rule['mode']
+
+    # --- hooks de la request ---
+
+    def _before_request(self):
+        # Si una request anterior del hilo no llegó a after_request, se descarta su perfil
+        leftover = getattr(self._local, 'active', None)
+        if leftover is not None:
+            self._local.active = None
+            leftover.stop()
+
+        token = request.environ.get('HTTP_X_PROFILE')
+        now = time.monotonic()
+        if now >= self._next_rules_check:
+            self._check_rules(now)
+        if token is None and not self.rules:
+            return
+
+        endpoint = request.endpoint or UNMATCHED
+        mode = profile_id = None
+        if token is not None:
+            claimed = self._claim_token(token)
+            if claimed is not None:
+                mode, profile_id = claimed
+        if mode is None and self.rules:
+            mode = self._sampled_mode(endpoint)
+            profile_id = uuid.uuid4().hex[:8]
+        if mode is None:
+            return
+        active = ActiveProfile(mode, endpoint, profile_id)
+        try:
+            active.start(self.sample_interval)
+        except ValueError:
+            # Otro profiler ya está activo en el proceso (por ejemplo, un debugger)
+            logger.warning(f'Could not start profiler for {endpoint}: another profiler is active')
+            return
+        self._local.active = active
+
+    def _after_request(self, response):
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            return response
+        self._local.active = None
+        active.stop()
+        try:
+            response.headers['X-Profile-File'] = self._save(active, time.perf_counter() - active.started)
+        except Exception:
+            logger.exception(f'Could not save profile for {active.endpoint}')
+        return response
+
+    # --- archivos ---
+
+    def _save(self, active, seconds):
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        endpoint = re.sub(r'[^\w.-]', '-', active.endpoint)
+        extension = 'prof' if active.mode == 'cprofile' else 'collapsed'
+        name = f'{stamp}_{endpoint}_{round(seconds * 1000)}ms_{active.profile_id}.{extension}'
+        path = os.path.join(self.directory, name)
+        if active.profiler is not None:
+            active.profiler.dump_stats(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(active.sampler.collapsed())
+        logger.info(f'Profile saved: {name}')
+        self._prune()
+        return name
+
+    def _prune(self):
+        profiles = self.list_profiles()
+        for profile in profiles[self.max_files:]:
+            self.delete_profile(profile['name'])
+        # Los marcadores de tokens solo hacen falta mientras el token puede seguir vigente
+        cutoff = time.time() - self.token_seconds
+        for name in os.listdir(self.directory):
+            if name.startswith('.token-'):
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self):
+        """Perfiles guardados, del más nuevo al más viejo."""
+        if self.directory is None or not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            match = PROFILE_NAME.match(name)
+            if match is None:
+                continue
+            stamp, endpoint, ms, _, extension = match.groups()
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append((stat.st_mtime_ns, {
+                'name': name,
+                'created_at': datetime.strptime(stamp, '%Y%m%d-%H%M%S').isoformat(),
+                'endpoint': endpoint,
+                'duration_ms': int(ms),
+                'mode': 'cprofile' if extension == 'prof' else 'sample',
+                'size': stat.st_size,
+            }))
+        profiles.sort(key=lambda item: item[0], reverse=True)
+        return [profile for _, profile in profiles]
+
+    def profile_path(self, name):
+        """Ruta de un perfil guardado, o None si el nombre no es de un perfil o no existe."""
+        if self.directory is None or not PROFILE_NAME.match(name or ''):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def delete_profile(self, name):
+        path = self.profile_path(name)
+        if path is None:
+            return False
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def pstats_text(path, sort='cumulative', limit=60):
+    """Resumen legible de un .prof (las `limit` funciones con más tiempo según `sort`)."""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+request_profiler = RequestProfiler()
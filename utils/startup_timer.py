@@ -0,0 +1,48 @@
+"""
+Medición del arranque de cada worker, por fase (imports, configuración, bootstrap,
+blueprints, caché de IPs). El reporte queda en app.extensions['startup_timings'] y se
+consulta en /dev/startup.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []  # [(nombre, segundos)] en orden
+        self._mark = self.started
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+            self._mark = time.perf_counter()
+
+    def mark(self, name):
+        """Cierra una fase que empezó donde terminó la anterior (útil para bloques de imports)."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._mark))
+        self._mark = now
+
+    def report(self):
+        return {
+            'pid': os.getpid(),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'phases': [{'name': name, 'ms': round(seconds * 1000, 1)} for name, seconds in self.phases],
+        }
+
+    def finish(self, app):
+        report = self.report()
+        app.extensions['startup_timings'] = report
+        summary = ', '.join(f"{p['name']} {p['ms']:.0f}ms" for p in report['phases'])
+        app.logger.info(f"Arranque del worker {report['pid']} en {report['total_ms']:.0f}ms ({summary})")
+        return report
@@ -0,0 +1,240 @@
+"""
+Scraping de liquidaciones en Tribunales Mendoza: la versión directa con requests
+(+ BeautifulSoup) y las funciones auxiliares del scraper con Playwright. routes/forms.py
+importa este módulo (y playwright) recién en la primera liquidación.
+"""
+
+import logging
+import os
+import random
+import time
+
+import requests
+
+
+# FUNC Q PARSEA EL RESULTADO DEL SCRAPP DE LIQ A UN JSON MAS LIMPIO
+def parse_resultado_html(html_content: str) -> dict:
+    """
+    Parsea el HTML de respuesta de Tribunales Mendoza y extrae los datos de la liquidación.
+    
+    Estructura esperada de la tabla:
+    - Fila 1: Concepto (pesos) | Monto capital
+    - Fila 2: Tasa utilizada: ... | &nbsp;
+    - Fila 3: Fecha de origen: DD/MM/YYYY | &nbsp;
+    - Fila 4: Fecha de liquidación: DD/MM/YYYY | &nbsp;
+    - Filas N: DD/MM/YYYY .. DD/MM/YYYY: (X% / 365) x N días = X.XXXX% | vacío
+    - Fila: Tasa de interés: X.XX% | monto_intereses
+    - Fila: &nbsp; | ==========
+    - Fila: &nbsp; | total_final
+    """
+    from bs4 import BeautifulSoup
+    import re
+    
+    resultado = {
+        "concepto": None,
+        "capital": None,
+        "tasa_utilizada": None,
+        "fecha_origen": None,
+        "fecha_liquidacion": None,
+        "periodos": [],
+        "tasa_interes_porcentaje": None,
+        "monto_intereses": None,
+        "total_final": None
+    }
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Buscar la tabla principal
+    table = soup.find('table', class_='table-striped')
+    if not table:
+        table = soup.find('table')
+    
+    if not table:
+        return resultado
+    
+    rows = table.find_all('tr')
+    
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) < 2:
+            continue
+        
+        col1 = cells[0].get_text(strip=True).replace('\xa0', ' ').replace('&nbsp;', ' ').strip()
+        col2 = cells[1].get_text(strip=True).replace('\xa0', ' ').replace('&nbsp;', ' ').strip()
+        
+        # Ignorar filas vacías o separadores
+        if col2 == "==========" or (not col1 and not col2):
+            continue
+        
+        # Fila con concepto y capital (primera fila con número en col2)
+        if col1 and col2 and col2.isdigit() and resultado["capital"] is None:
+            resultado["concepto"] = col1
+            resultado["capital"] = int(col2)
+            continue
+        
+        # Tasa utilizada
+        if col1.startswith("Tasa utilizada:"):
+            resultado["tasa_utilizada"] = col1.replace("Tasa utilizada:", "").strip()
+            continue
+        
+        # Fecha de origen
+        if col1.startswith("Fecha de origen:"):
+            resultado["fecha_origen"] = col1.replace("Fecha de origen:", "").strip()
+            continue
+        
+        # Fecha de liquidación
+        if col1.startswith("Fecha de liquidación:"):
+            resultado["fecha_liquidacion"] = col1.replace("Fecha de liquidación:", "").strip()
+            continue
+        
+        # Período de cálculo de interés
+        # Formato: "DD/MM/YYYY .. DD/MM/YYYY: (X% / 365) x N días = X.XXXX%"
+        periodo_match = re.match(
+            r'(\d{2}/\d{2}/\d{4})\s*\.\.\s*(\d{2}/\d{2}/\d{4}):\s*\(([^)]+)\)\s*x\s*(\d+)\s*días\s*=\s*([\d.,]+%)',
+            col1
+        )
+        if periodo_match:
+            resultado["periodos"].append({
+                "fecha_desde": periodo_match.group(1),
+                "fecha_hasta": periodo_match.group(2),
+                "tasa": periodo_match.group(3).strip(),
+                "dias": int(periodo_match.group(4)),
+                "resultado_porcentaje": periodo_match.group(5)
+            })
+            continue
+        
+        # Tasa de interés total
+        if col1.startswith("Tasa de interés:"):
+            tasa_match = re.search(r'([\d.,]+%)', col1)
+            if tasa_match:
+                resultado["tasa_interes_porcentaje"] = tasa_match.group(1)
+            if col2 and col2.isdigit():
+                resultado["monto_intereses"] = int(col2)
+            continue
+        
+        # Total final (fila donde col1 está vacío y col2 es un número)
+        if not col1 and col2 and col2.isdigit():
+            resultado["total_final"] = int(col2)
+            continue
+    
+    return resultado
+
+
+def scrape_liquidacion_directo(concepto: str, tasa: str, capital: float, fecha_desde: str, fecha_hasta: str) -> dict:
+    """
+    Realiza scraping directo al endpoint de Tribunales Mendoza usando requests.
+    Mucho más rápido que Playwright (segundos vs minutos).
+    
+    Args:
+        concepto: Descripción del concepto a liquidar
+        tasa: Valor de la tasa (ej: "Tasa Banco Nación Activa")
+        capital: Monto del capital
+        fecha_desde: Fecha inicio (DD/MM/YYYY)
+        fecha_hasta: Fecha fin (DD/MM/YYYY)
+    
+    Returns:
+        dict con los resultados parseados
+    """
+    url = "https://tribunalesmza.com.ar/pdforms/calculo/post"
+    
+    # Mapeo de nombres descriptivos a valores del formulario
+    # Estos valores deben coincidir con los 'value' del <select> en el formulario original
+    TASA_MAP = {
+        "Tasa Banco Nación Activa": "0",
+        "Tasa Banco Nación Libre 36 meses - Fuera de uso": "1",
+        "Tasa Banco Nación Libre 60 meses - Fuera de uso": "2",
+        "Tasa Banco Nación Libre 72 meses - Ley 9516": "3",
+        "Tasa Banco Nación Pasiva": "4",
+        "Tasa Ley 4087": "5",
+        "Unidad de Valor Adquisitivo (UVA)": "6",
+    }
+    
+    # Obtener el valor numérico de la tasa
+    tasa_value = TASA_MAP.get(tasa, "0")  # Default a "0" si no se encuentra
+    print(f"📊 Tasa recibida: '{tasa}' -> valor: '{tasa_value}'")
+    
+    # Headers para simular un navegador
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+        "Accept-Language": "es-AR,es;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Origin": "https://tribunalesmza.com.ar",
+        "Referer": "https://tribunalesmza.com.ar/pdforms/calculo/form",
+        "sec-ch-ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": '"Windows"',
+        "Sec-Fetch-Dest": "document",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-Site": "same-origin",
+        "Sec-Fetch-User": "?1",
+        "Upgrade-Insecure-Requests": "1",
+    }
+    
+    # Asegurar que capital sea entero (sin decimales)
+    capital_int = int(float(capital))
+    
+    # Payload del formulario (nombres de campos según el formulario original)
+    payload = {
+        "concepto": concepto,
+        "tasa": tasa_value,
+        "capital": str(capital_int),
+        "desde": fecha_desde,
+        "hasta": fecha_hasta,
+        "submit": "Calcular"
+    }
+    
+    # Crear sesión para manejar cookies
+    session = requests.Session()
+    
+    # Primero hacemos GET al formulario para obtener cookies
+    try:
+        session.get("https://tribunalesmza.com.ar/pdforms/calculo/form", headers=headers, timeout=30)
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudo obtener cookies iniciales: {e}")
+    
+    # Hacer POST al endpoint
+    response = session.post(url, data=payload, headers=headers, timeout=60)
+    
+    print(f"📡 Response status: {response.status_code}")
+    
+    if response.status_code != 200:
+        raise Exception(f"Error en la petición: HTTP {response.status_code}")
+    
+    html_content = response.text
+    
+    # Guardar HTML para debug siempre (temporalmente)
+    debug_path = os.path.join(os.path.dirname(__file__), "scrape_debug.html")
+    with open(debug_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+    print(f"📄 HTML guardado en: {debug_path}")
+    
+    # Parsear el HTML completo (la función ya busca la tabla internamente)
+    resultado = parse_resultado_html(html_content)
+    
+    print(f"📊 Resultado parseado: {resultado}")
+    
+    # Verificar que se encontraron resultados
+    if resultado["total_final"] is None:
+        print(f"❌ No se encontró total_final. Verificar HTML en: {debug_path}")
+        raise Exception(f"No se pudo extraer el total final de la liquidación. HTML guardado en: {debug_path}")
+    
+    return resultado
+
+
+#Scraper de las liquidaciones a la otra web de colegio de abogados
+# Funciones auxiliares
+def human_delay(min_seconds=0.5, max_seconds=2.0):
+    delay = random.uniform(min_seconds, max_seconds)
+    time.sleep(delay)
+
+def move_mouse_randomly(page):
+    page.mouse.move(
+        random.randint(100, 500),
+        random.randint(100, 500)
+    )
+
+def scroll_randomly(page):
+    page.evaluate("window.scrollBy(0, {})".format(random.randint(100, 300)))
+    human_delay(0.3, 1.0)
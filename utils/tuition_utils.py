@@ -1,11 +1,20 @@
 """Utilidades para normalizar matrículas y resolver profesionales."""
 
-from typing import Optional
-
-from sqlalchemy import func
+from typing import Dict, Iterable, Optional
 
+from models.professional import tuition_key
 from utils.membership_sheet_parser import normalize_text, MONTH_NAMES_PATTERN
 
+# Tamaño de cada IN (...) al resolver muchas matrículas juntas
+TUITION_LOOKUP_CHUNK = 500
+
+# Backfill de professionals.tuition_normalized con la misma regla que tuition_key()
+BACKFILL_TUITION_NORMALIZED_SQL = (
+    "UPDATE professionals "
+    "SET tuition_normalized = NULLIF(REPLACE(REPLACE(tuition, ' ', ''), '.', ''), '') "
+    "WHERE tuition IS NOT NULL"
+)
+
 
 def normalize_tuition(raw) -> Optional[str]:
     """
@@ -42,18 +51,36 @@ def tuition_display_from_raw(raw) -> Optional[str]:
 
 
 def find_professional_by_tuition(tuition_normalized: str):
-    """Busca un profesional por matrícula normalizada."""
+    """Busca un profesional por matrícula (usa el índice de tuition_normalized)."""
     from models import ProfessionalModel
 
-    if not tuition_normalized:
+    key = tuition_key(tuition_normalized)
+    if not key:
         return None
 
     return ProfessionalModel.query.filter(
-        func.replace(func.replace(ProfessionalModel.tuition, ' ', ''), '.', '') == tuition_normalized,
+        ProfessionalModel.tuition_normalized == key,
         ProfessionalModel.deleted_at == None,
     ).first()
 
 
+def professionals_by_tuition(tuitions: Iterable[str]) -> Dict[str, object]:
+    """Profesionales activos de varias matrículas, en consultas IN por el índice. Si hay repetidos gana el primero."""
+    from models import ProfessionalModel
+
+    keys = sorted({key for key in (tuition_key(t) for t in tuitions) if key})
+    result = {}
+    for start in range(0, len(keys), TUITION_LOOKUP_CHUNK):
+        chunk = keys[start:start + TUITION_LOOKUP_CHUNK]
+        professionals = ProfessionalModel.query.filter(
+            ProfessionalModel.tuition_normalized.in_(chunk),
+            ProfessionalModel.deleted_at == None,
+        ).all()
+        for professional in professionals:
+            result.setdefault(professional.tuition_normalized, professional)
+    return result
+
+
 def link_membership_status_uuids(status_record, tuition_normalized: str):
     """Vincula lawyer_membership_status con professionals/users por UUID."""
     professional = find_professional_by_tuition(tuition_normalized)
@@ -0,0 +1,356 @@
+"""
+Salud de cada worker de gunicorn (memoria, descriptores, hilos, GC, pool de SQLAlchemy, caché
+de IPs, cola de logs, requests en curso) agregada entre workers en /dev/workers.
+
+Cada worker tiene un hilo que cada WORKER_HEALTH_INTERVAL segundos (5) toma una muestra y la
+escribe en su slot de un segmento de memoria compartida: un archivo mapeado con mmap en
+/dev/shm (WORKER_HEALTH_PATH). El segmento tiene WORKER_HEALTH_SLOTS slots de tamaño fijo (32);
+cada worker reclama uno libre o de un proceso que ya no existe (bajo flock) y después solo
+escribe el suyo, así que no hay locks entre procesos al publicar. Cada slot lleva un contador de
+secuencia (seqlock): quien lee reintenta si el contador es impar o cambió durante la lectura.
+
+Las pausas del GC se miden con gc.callbacks. WORKER_HEALTH_USS=false evita calcular la USS,
+que lee /proc/<pid>/smaps y es la parte más cara de la muestra.
+"""
+
+import atexit
+import fcntl
+import gc
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import psutil
+
+from utils.process_threads import OncePerProcess
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'CJWH0002'
+HEADER = struct.Struct('<8sI')
+SEQ = struct.Struct('<Q')
+MISSING = -1
+
+# (campo, formato de struct); los enteros en MISSING se devuelven como None
+FIELDS = (
+    ('pid', 'q'),
+    ('started_at', 'd'),
+    ('updated_at', 'd'),
+    ('rss_bytes', 'q'),
+    ('uss_bytes', 'q'),
+    ('open_fds', 'q'),
+    ('threads', 'q'),
+    ('gc_pending_0', 'q'),
+    ('gc_pending_1', 'q'),
+    ('gc_pending_2', 'q'),
+    ('gc_collections_0', 'q'),
+    ('gc_collections_1', 'q'),
+    ('gc_collections_2', 'q'),
+    ('gc_pause_total_ms', 'd'),
+    ('gc_pause_max_ms', 'd'),
+    ('gc_last_pause_ms', 'd'),
+    ('pool_size', 'q'),
+    ('pool_checked_out', 'q'),
+    ('pool_overflow', 'q'),
+    ('pool_timeouts', 'q'),
+    ('ip_cache_entries', 'q'),
+    ('log_queue_depth', 'q'),
+    ('log_dropped', 'q'),
+    ('requests_in_flight', 'q'),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+PAYLOAD = struct.Struct('<' + ''.join(fmt for _, fmt in FIELDS))
+SLOT_SIZE = SEQ.size + PAYLOAD.size
+
+
+def default_path():
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'colejus-worker-health')
+
+
+def pid_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class GCPauseTracker:
+    """Duración de cada recolección del GC, medida con gc.callbacks."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self._started = None
+        self._installed = False
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            self.total += pause
+            self.last = pause
+            if pause > self.max:
+                self.max = pause
+
+
+class HealthSegment:
+    """Slots de tamaño fijo en un archivo mapeado y compartido por los workers del host."""
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        size = HEADER.size + slots * SLOT_SIZE
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            existing = os.fstat(self._fd).st_size
+            header = os.pread(self._fd, HEADER.size, 0) if existing >= HEADER.size else b''
+            if existing != size or header != HEADER.pack(MAGIC, slots):
+                # Archivo nuevo o de otro formato/tamaño: se reinicia en ceros
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, slots), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def _offset(self, slot):
+        return HEADER.size + slot * SLOT_SIZE
+
+    def claim(self, pid):
+        """Reserva un slot para `pid`: el suyo si ya tenía, uno libre o uno de un proceso muerto."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            free = None
+            for slot in range(self.slots):
+                owner = self.read(slot)
+                owner_pid = owner['pid'] if owner else 0
+                if owner_pid == pid:
+                    return slot
+                if free is None and not pid_alive(owner_pid):
+                    free = slot
+            if free is None:
+                return None
+            values = dict.fromkeys(FIELD_NAMES, MISSING)
+            values.update(pid=pid, started_at=time.time(), updated_at=0.0)
+            self.write(free, values)
+            return free
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def release(self, slot):
+        offset = self._offset(slot)
+        seq = SEQ.unpack_from(self._mm, offset)[0]
+        SEQ.pack_into(self._mm, offset, seq + 1)
+        self._mm[offset + SEQ.size:offset + SLOT_SIZE] = bytes(PAYLOAD.size)
+        SEQ.pack_into(self._mm, offset, seq + 2)
+
+    def write(self, slot, values):
+        """Publica la muestra del slot; solo la llama el worker dueño del slot."""
+        offset = self._offset(slot)
+        payload = PAYLOAD.pack(*(values[name] for name in FIELD_NAMES))
+        seq = SEQ.unpack_from(self._mm, offset)[0]
+        SEQ.pack_into(self._mm, offset, seq + 1)
+        self._mm[offset + SEQ.size:offset + SLOT_SIZE] = payload
+        SEQ.pack_into(self._mm, offset, seq + 2)
+
+    def read(self, slot, retries=100):
+        """Copia consistente del slot, o None si está vacío."""
+        offset = self._offset(slot)
+        for _ in range(retries):
+            before = SEQ.unpack_from(self._mm, offset)[0]
+            if before % 2:
+                time.sleep(0)
+                continue
+            raw = self._mm[offset + SEQ.size:offset + SLOT_SIZE]
+            if SEQ.unpack_from(self._mm, offset)[0] == before:
+                values = dict(zip(FIELD_NAMES, PAYLOAD.unpack(raw)))
+                return values if values['pid'] > 0 else None
+        return None
+
+    def read_all(self):
+        return [(slot, values) for slot in range(self.slots) if (values := self.read(slot)) is not None]
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+class WorkerHealth:
+    def __init__(self, path=None, slots=None, interval=None):
+        self.path = path or os.getenv('WORKER_HEALTH_PATH') or default_path()
+        self.slots = slots or int(os.getenv('WORKER_HEALTH_SLOTS', '32'))
+        self.interval = interval or float(os.getenv('WORKER_HEALTH_INTERVAL', '5'))
+        self.collect_uss = os.getenv('WORKER_HEALTH_USS', 'true').lower() == 'true'
+        self.probes = {}  # campo -> función sin argumentos que retorna un entero (o None)
+        self.gc_pauses = GCPauseTracker()
+        self.segment = None
+        self.slot = None
+        self.started_at = time.time()
+        self._pid = None
+        self._process = None
+        self._ensure_sampler = OncePerProcess(self.start)
+
+    def init_app(self, app):
+        if os.getenv('WORKER_HEALTH_ENABLED', 'true').lower() != 'true':
+            return
+        self._register_default_probes(app)
+        app.before_request(self._ensure_sampler)
+
+    def _register_default_probes(self, app):
+        from config.config import db
+        from utils.ip_manager_cache import ip_manager_cache
+        from utils.logging_config import get_log_pipeline_stats
+        from utils.pool_metrics import pool_stats
+        from utils.request_metrics import request_metrics
+
+        with app.app_context():
+            pool = db.engine.pool
+        if hasattr(pool, 'checkedout'):
+            self.probes['pool_size'] = pool.size
+            self.probes['pool_checked_out'] = pool.checkedout
+            self.probes['pool_overflow'] = pool.overflow
+            self.probes['pool_timeouts'] = lambda: pool_stats.timeouts
+        self.probes['ip_cache_entries'] = lambda: len(ip_manager_cache.ip_cache)
+        self.probes['log_queue_depth'] = lambda: get_log_pipeline_stats().get('queue_depth')
+        self.probes['log_dropped'] = lambda: get_log_pipeline_stats().get('dropped')
+        self.probes['requests_in_flight'] = lambda: sum(request_metrics.snapshot()[1].values())
+
+    def start(self):
+        """Reclama el slot de este proceso y arranca el hilo que lo actualiza."""
+        self._pid = os.getpid()
+        self._process = psutil.Process(self._pid)
+        self.started_at = time.time()
+        self.gc_pauses.install()
+        # Un segmento heredado del proceso padre apunta al slot del padre: se abre uno propio
+        self.segment = self.slot = None
+        try:
+            self.segment = HealthSegment(self.path, self.slots)
+            self.slot = self.segment.claim(self._pid)
+        except OSError as e:
+            logger.warning(f'Worker health segment unavailable at {self.path}: {e}')
+            self.segment = self.slot = None
+            return
+        if self.slot is None:
+            logger.warning(f'No free worker health slot for pid {self._pid} ({self.slots} slots)')
+            return
+        self.publish()
+        threading.Thread(target=self._run, name='worker-health', daemon=True).start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Libera el slot de este proceso (al salir del worker) y detiene el hilo."""
+        if self._pid != os.getpid():
+            return
+        self._pid = None
+        slot, self.slot = self.slot, None
+        if self.segment is not None and slot is not None:
+            self.segment.release(slot)
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            try:
+                self.publish()
+            except Exception:
+                logger.exception('Could not publish worker health')
+
+    def sample(self):
+        process = self._process or psutil.Process()
+        values = dict.fromkeys(FIELD_NAMES, MISSING)
+        memory = process.memory_full_info() if self.collect_uss else process.memory_info()
+        counts = gc.get_count()
+        stats = gc.get_stats()
+        values.update(
+            pid=process.pid,
+            started_at=self.started_at,
+            updated_at=time.time(),
+            rss_bytes=memory.rss,
+            uss_bytes=getattr(memory, 'uss', MISSING),
+            open_fds=process.num_fds(),
+            threads=threading.active_count(),
+            gc_pending_0=counts[0],
+            gc_pending_1=counts[1],
+            gc_pending_2=counts[2],
+            gc_collections_0=stats[0]['collections'],
+            gc_collections_1=stats[1]['collections'],
+            gc_collections_2=stats[2]['collections'],
+            gc_pause_total_ms=self.gc_pauses.total * 1000,
+            gc_pause_max_ms=self.gc_pauses.max * 1000,
+            gc_last_pause_ms=self.gc_pauses.last * 1000,
+        )
+        for name, probe in self.probes.items():
+            try:
+                value = probe()
+            except Exception:
+                value = None
+            values[name] = MISSING if value is None else int(value)
+        return values
+
+    def publish(self):
+        segment, slot = self.segment, self.slot
+        if segment is not None and slot is not None:
+            segment.write(slot, self.sample())
+
+    def report(self):
+        """Slots de los workers vivos (el propio se actualiza en el momento) y totales."""
+        own = self.segment is not None and self._pid == os.getpid()
+        segment = self.segment if own else HealthSegment(self.path, self.slots)
+        if own:
+            self.publish()
+        now = time.time()
+        workers = []
+        for slot, values in segment.read_all():
+            if not pid_alive(values['pid']):
+                continue
+            entry = {name: (None if value == MISSING else value) for name, value in values.items()}
+            entry['slot'] = slot
+            entry['age_seconds'] = round(now - values['updated_at'], 1) if values['updated_at'] else None
+            # Un worker cuyo hilo de muestreo no publica hace 3 intervalos está trabado o saturado
+            entry['stale'] = entry['age_seconds'] is None or entry['age_seconds'] > 3 * self.interval
+            entry['current'] = values['pid'] == os.getpid()
+            for field in ('gc_pause_total_ms', 'gc_pause_max_ms', 'gc_last_pause_ms'):
+                entry[field] = round(entry[field], 3)
+            workers.append(entry)
+        if not own:
+            segment.close()
+        workers.sort(key=lambda entry: entry['pid'])
+        totals = {}
+        for field in ('rss_bytes', 'uss_bytes', 'open_fds', 'threads', 'pool_checked_out', 'pool_overflow',
+                      'pool_timeouts', 'log_queue_depth', 'requests_in_flight'):
+            values = [entry[field] for entry in workers if entry[field] is not None]
+            totals[field] = sum(values) if values else None
+        return {
+            'path': self.path,
+            'interval_seconds': self.interval,
+            'workers': workers,
+            'totals': totals,
+        }
+
+
+worker_health = WorkerHealth()